@@ -4,7 +4,7 @@ Export the local knowledge base that achieved 96.7% accuracy
 for uploading to Railway deployment.
 """
 
-import sqlite3
+import asyncio
 import json
 import csv
 import sys
@@ -13,67 +13,80 @@ import os
 # Add path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.db.connection import DatabaseManager
+
 LOCAL_DB = "data/fact_system.db"
 OUTPUT_JSON = "data/knowledge_export.json"
 OUTPUT_CSV = "data/knowledge_export.csv"
 
-def export_knowledge():
-    """Export knowledge base from local database."""
-    
-    print("📚 Exporting Local Knowledge Base (96.7% Accuracy Test Data)")
-    print("=" * 70)
-    
-    # Connect to local database
-    conn = sqlite3.connect(LOCAL_DB)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get all knowledge entries
-    cursor.execute("""
-        SELECT id, question, answer, category, state, tags,
-               priority, difficulty, personas, source
-        FROM knowledge_base
-        ORDER BY id
-    """)
-    
-    entries = []
-    for row in cursor.fetchall():
-        entry = dict(row)
-        entries.append(entry)
-    
-    print(f"Found {len(entries)} knowledge entries")
+EXPORT_QUERY = """
+    SELECT id, question, answer, category, state, tags,
+           priority, difficulty, personas, source
+    FROM knowledge_base
+    ORDER BY id
+"""
+
+
+async def write_exports(manager):
+    """Stream knowledge_base rows into the JSON and CSV exports batch by batch."""
+    total = (await manager.execute_query("SELECT COUNT(*) AS n FROM knowledge_base")).rows[0]["n"]
+    print(f"Found {total} knowledge entries")
     
     # Get statistics
-    cursor.execute("SELECT category, COUNT(*) FROM knowledge_base GROUP BY category")
-    categories = cursor.fetchall()
+    categories = await manager.execute_query(
+        "SELECT category, COUNT(*) AS n FROM knowledge_base GROUP BY category")
     
     print("\n📊 Categories:")
-    for cat, count in categories:
-        print(f"   • {cat}: {count} entries")
+    for row in categories.rows:
+        print(f"   • {row['category']}: {row['n']} entries")
     
-    # Export to JSON
-    export_data = {
-        "metadata": {
-            "source": "local_fact_system",
-            "accuracy_test_result": "96.7%",
-            "total_entries": len(entries),
-            "export_date": "2025-09-10"
-        },
-        "knowledge_base": entries
+    metadata = {
+        "source": "local_fact_system",
+        "accuracy_test_result": "96.7%",
+        "total_entries": total,
+        "export_date": "2025-09-10"
     }
     
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(export_data, f, indent=2)
-    print(f"\n✅ Exported to JSON: {OUTPUT_JSON}")
+    # Same document layout as json.dump(indent=2), written one entry at a time
+    with open(OUTPUT_JSON, 'w') as json_file, open(OUTPUT_CSV, 'w', newline='') as csv_file:
+        json_file.write('{\n  "metadata": ')
+        json_file.write(json.dumps(metadata, indent=2).replace("\n", "\n  "))
+        json_file.write(',\n  "knowledge_base": [')
+        
+        writer = csv.writer(csv_file)
+        exported = 0
+        async with manager.stream_query(EXPORT_QUERY) as stream:
+            writer.writerow(stream.columns)
+            async for batch in stream:
+                writer.writerows(batch)
+                for row in batch:
+                    entry = json.dumps(dict(zip(stream.columns, row)), indent=2).replace("\n", "\n    ")
+                    json_file.write(("," if exported else "") + "\n    " + entry)
+                    exported += 1
+        
+        json_file.write("\n  ]\n}" if exported else "]\n}")
     
-    # Export to CSV
-    with open(OUTPUT_CSV, 'w', newline='') as f:
-        if entries:
-            fieldnames = entries[0].keys()
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(entries)
+    print(f"\n✅ Exported to JSON: {OUTPUT_JSON}")
     print(f"✅ Exported to CSV: {OUTPUT_CSV}")
+    return exported
+
+
+async def stream_export():
+    manager = DatabaseManager(LOCAL_DB)
+    try:
+        return await write_exports(manager)
+    finally:
+        await manager.cleanup()
+
+
+def export_knowledge():
+    """Export knowledge base from local database."""
+    
+    print("📚 Exporting Local Knowledge Base (96.7% Accuracy Test Data)")
+    print("=" * 70)
+    
+    # Rows are streamed from the database, so memory stays flat for any table size
+    exported = asyncio.run(stream_export())
     
     # Create upload script for Railway
     upload_script = """#!/usr/bin/env python3
@@ -115,11 +128,9 @@ if __name__ == "__main__":
     os.chmod("scripts/upload_to_railway.py", 0o755)
     print("✅ Created upload script: scripts/upload_to_railway.py")
     
-    conn.close()
-    
     print("\n" + "=" * 70)
     print("📋 This is the exact data that achieved 96.7% accuracy!")
-    print("   Total entries: {}".format(len(entries)))
+    print("   Total entries: {}".format(exported))
     print("\nNext steps:")
     print("1. Review data/knowledge_export.json")
     print("2. Run scripts/upload_to_railway.py to upload to Railway")
@@ -47,7 +47,7 @@ class CompleteKnowledgeImporter:
     async def initialize_extended_schema(self):
         """Initialize extended database schema for all features."""
         try:
-            async with self.db_manager.get_connection() as db:
+            async with self.db_manager.writer() as db:
                 # Execute extended schema creation
                 await db.executescript(EXTENDED_DATABASE_SCHEMA)
                 await db.commit()
@@ -67,7 +67,7 @@ class CompleteKnowledgeImporter:
             personas_data = data.get("persona_detection_system", {}).get("personas", {})
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for persona_type, persona_info in personas_data.items():
                     await conn.execute("""
                         INSERT OR REPLACE INTO personas 
@@ -104,7 +104,7 @@ class CompleteKnowledgeImporter:
             states_data = data.get("states", {})
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for state_code, state_info in states_data.items():
                     # Import general contractor requirements
                     gc_info = state_info.get("general_contractor", {})
@@ -175,7 +175,7 @@ class CompleteKnowledgeImporter:
             branching_data = data.get("branching_logic", {})
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 # Import persona detection branching
                 persona_detection = branching_data.get("persona_detection", {})
                 for persona_type, config in persona_detection.items():
@@ -240,7 +240,7 @@ class CompleteKnowledgeImporter:
             count = 0
             
             # Store trust indicators as conversation pathways
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 indicators = trust_system.get("trust_indicators", {})
                 
                 for indicator_type, indicator_data in indicators.items():
@@ -286,7 +286,7 @@ class CompleteKnowledgeImporter:
             stories_data = data.get("success_stories", [])
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for story in stories_data:
                     customer = story.get("customer_profile", {})
                     results = story.get("results", {})
@@ -334,7 +334,7 @@ class CompleteKnowledgeImporter:
             triggers = retrieval_data.get("retrieval_triggers", {})
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for trigger_name, config in triggers.items():
                     await conn.execute("""
                         INSERT OR REPLACE INTO retrieval_configs 
@@ -376,7 +376,7 @@ class CompleteKnowledgeImporter:
             nodes = pathway_data.get("nodes", [])
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for node in nodes:
                     # Import each node as a conversation pathway
                     await conn.execute("""
@@ -417,7 +417,7 @@ class CompleteKnowledgeImporter:
             endpoints = webhooks_data.get("endpoints", {})
             count = 0
             
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for webhook_name, config in endpoints.items():
                     await conn.execute("""
                         INSERT OR REPLACE INTO webhook_configs 
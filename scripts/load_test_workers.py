@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+FACT Web Server Worker Scaling Load Test
+
+Starts the web server against a generated SQLite knowledge base once per
+worker count, drives /knowledge/search with concurrent clients for a fixed
+duration, and prints throughput and latency per worker count so scaling
+with WEB_WORKERS can be read off directly.
+
+Usage:
+    python scripts/load_test_workers.py --workers 1,2,4 --duration 15
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from db.models import DATABASE_SCHEMA, FULLTEXT_SCHEMA  # noqa: E402
+
+QUERIES = [
+    "How long does the Georgia exam take?",
+    "What is the bond amount in Florida?",
+    "contractor license requirements texas",
+    "how much are the exam fees",
+    "can I take the test online",
+    "reciprocity between states",
+]
+
+TOPICS = ["exam", "bond", "license", "insurance", "renewal", "reciprocity", "fees", "experience"]
+STATES = ["GA", "FL", "TX", "CA", "NC", "AL", "TN", "SC"]
+
+
+def create_database(path: str, entries: int) -> None:
+    """Create a knowledge base with generated entries."""
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executescript(FULLTEXT_SCHEMA)
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, tags, state) VALUES (?, ?, ?, ?, ?)",
+            [
+                (f"What are the {TOPICS[i % 8]} requirements in {STATES[i % 8]} for case {i}?",
+                 f"For case {i}, {STATES[i % 8]} {TOPICS[i % 8]} rules require documentation, "
+                 f"a completed application and the applicable fees.",
+                 TOPICS[i % 8], f"{TOPICS[i % 8]},{STATES[i % 8].lower()}", STATES[i % 8])
+                for i in range(entries)
+            ])
+
+
+def start_server(port: int, workers: int, database_path: str, log_path: str,
+                 extra_env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(port),
+        "WEB_WORKERS": str(workers),
+        "WEB_ACCESS_LOG": "off",
+        "DATABASE_PATH": database_path,
+    })
+    # The driver only checks that these are present
+    env.setdefault("ANTHROPIC_API_KEY", "load-test-anthropic-key")
+    env.setdefault("ARCADE_API_KEY", "load-test-arcade-key")
+    env.pop("DATABASE_URL", None)
+    env.pop("GROQ_API_KEY", None)
+    env.update(extra_env or {})
+    log = open(log_path, "ab")
+    return subprocess.Popen(
+        [sys.executable, "-c", "import web_server; web_server.start_server()"],
+        cwd=SRC_DIR, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+
+async def wait_ready(base_url: str, workers: int, timeout: float = 120.0) -> None:
+    """Wait until every worker answers and the search index is loaded."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{base_url}/metrics/workers") as response:
+                    if response.status == 200 and (await response.json())["worker_count"] >= workers:
+                        async with session.post(f"{base_url}/knowledge/search",
+                                                json={"query": QUERIES[0], "limit": 5}) as search:
+                            if search.status == 200:
+                                return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server with {workers} worker(s) did not become ready")
+
+
+async def drive(base_url: str, concurrency: int, duration: float) -> Dict[str, List[float]]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async def client(index: int) -> None:
+        nonlocal errors
+        n = index
+        while time.monotonic() < deadline:
+            payload = {"query": QUERIES[n % len(QUERIES)], "limit": 5}
+            n += 1
+            started = time.perf_counter()
+            try:
+                async with session.post(f"{base_url}/knowledge/search", json=payload) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                        continue
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return {"latencies": latencies, "errors": [errors]}
+
+
+def client_process(base_url: str, concurrency: int, duration: float, results) -> None:
+    results.put(asyncio.run(drive(base_url, concurrency, duration)))
+
+
+def run_load(base_url: str, clients: int, concurrency: int, duration: float) -> Dict[str, float]:
+    """Run load from several client processes so the client is not the bottleneck."""
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client_process,
+                                         args=(base_url, max(1, concurrency // clients), duration, results))
+                 for _ in range(clients)]
+    for process in processes:
+        process.start()
+    latencies: List[float] = []
+    errors = 0
+    for _ in processes:
+        result = results.get()
+        latencies += result["latencies"]
+        errors += result["errors"][0]
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+    }
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure web server throughput by worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent requests in flight")
+    parser.add_argument("--clients", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help="Client processes generating load")
+    parser.add_argument("--entries", type=int, default=2000, help="Knowledge base entries to generate")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="fact-load-") as directory:
+        database_path = os.path.join(directory, "load_test.db")
+        create_database(database_path, args.entries)
+        log_path = os.path.join(directory, "server.log")
+        print(f"Knowledge base: {args.entries} entries; {os.cpu_count()} CPU cores; "
+              f"{args.clients} client process(es), concurrency {args.concurrency}")
+
+        for workers in worker_counts:
+            server = start_server(args.port, workers, database_path, log_path)
+            try:
+                asyncio.run(wait_ready(base_url, workers))
+                result = run_load(base_url, args.clients, args.concurrency, args.duration)
+            except Exception:
+                print(Path(log_path).read_text(errors="replace")[-4000:])
+                raise
+            finally:
+                stop_server(server)
+            results.append((workers, result))
+            print(f"  {workers} worker(s): {result['rps']:.0f} req/s")
+
+    baseline = results[0][1]["rps"] or 1.0
+    print(f"\n{'workers':>8} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers, result in results:
+        print(f"{workers:>8} {result['rps']:>9.0f} {result['rps'] / baseline:>7.2f}x "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+FACT Replay Load Test
+
+Replays a recorded query log (QUERY_LOG_PATH on the server), or open-loop
+Poisson arrivals, against the web server and prints coordinated-omission
+corrected latency percentiles, throughput and cache hit rate per phase.
+
+Without --base-url the script starts its own server on a generated SQLite
+knowledge base, with the LLM replaced by a local mock so /query traffic
+costs nothing and has a controlled latency. Every pass replays the same
+schedule; the first pass runs against a cold cache.
+
+Usage:
+    python scripts/replay_load_test.py --log queries.jsonl --speedup 4 --passes 2
+    python scripts/replay_load_test.py --rate 200 --duration 20 --workers 2
+    python scripts/replay_load_test.py --rate 50 --base-url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from load_test_workers import create_database, start_server, stop_server  # noqa: E402
+from benchmarking.replay import (  # noqa: E402
+    LoadPhase, PhaseReport, ReplayHarness, format_reports, load_query_log, poisson_schedule)
+from benchmarking.mock_llm import MockLLMConfig, MockLLMServer  # noqa: E402
+
+
+async def wait_ready(base_url: str, timeout: float = 120.0) -> None:
+    """Wait until /ready reports the server warmed up."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{base_url}/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+def build_phases(args: argparse.Namespace) -> List[LoadPhase]:
+    if args.log:
+        recorded = load_query_log(args.log, speedup=args.speedup)
+    else:
+        recorded = [poisson_schedule(args.rate, args.duration, seed=args.seed)]
+    if args.passes == 1:
+        return recorded
+    # Same schedule each pass: the first sees a cold cache, later ones a warm one
+    return [LoadPhase(f"{phase.name}#{number}", phase.requests)
+            for number in range(1, args.passes + 1) for phase in recorded]
+
+
+async def run(args: argparse.Namespace, phases: List[LoadPhase], base_url: str) -> List[PhaseReport]:
+    await wait_ready(base_url)
+    harness = ReplayHarness(base_url, max_connections=args.connections, timeout=args.timeout)
+    return await harness.run(phases)
+
+
+async def run_with_local_server(args: argparse.Namespace, phases: List[LoadPhase],
+                                directory: str) -> List[PhaseReport]:
+    mock = MockLLMServer(MockLLMConfig(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms,
+                                       error_rate=args.llm_error_rate, seed=args.seed))
+    mock_url = await mock.start()
+    database_path = os.path.join(directory, "replay.db")
+    create_database(database_path, args.entries)
+    log_path = os.path.join(directory, "server.log")
+    server = start_server(args.port, args.workers, database_path, log_path,
+                          extra_env={"GROQ_API_KEY": "mock-llm-key", "GROQ_BASE_URL": mock_url})
+    try:
+        return await run(args, phases, f"http://127.0.0.1:{args.port}")
+    except Exception:
+        print(Path(log_path).read_text(errors="replace")[-4000:])
+        raise
+    finally:
+        stop_server(server)
+        await mock.stop()
+        print(f"Mock LLM: {mock.requests} request(s), {mock.failures} injected failure(s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded or Poisson load against the web server")
+    source = parser.add_argument_group("workload")
+    source.add_argument("--log", help="Recorded query log (JSON lines); default is Poisson arrivals")
+    source.add_argument("--speedup", type=float, default=1.0, help="Replay the log this many times faster")
+    source.add_argument("--rate", type=float, default=50.0, help="Poisson arrivals per second")
+    source.add_argument("--duration", type=float, default=15.0, help="Seconds of Poisson arrivals")
+    source.add_argument("--seed", type=int, default=0)
+    source.add_argument("--passes", type=int, default=2, help="Times to replay the workload")
+    target = parser.add_argument_group("target")
+    target.add_argument("--base-url", help="Existing server to test instead of starting one")
+    target.add_argument("--workers", type=int, default=1)
+    target.add_argument("--entries", type=int, default=2000, help="Knowledge base entries to generate")
+    target.add_argument("--port", type=int, default=8766)
+    target.add_argument("--llm-latency-ms", type=float, default=MockLLMConfig.latency_ms)
+    target.add_argument("--llm-jitter-ms", type=float, default=MockLLMConfig.jitter_ms)
+    target.add_argument("--llm-error-rate", type=float, default=0.0)
+    client = parser.add_argument_group("client")
+    client.add_argument("--connections", type=int, default=256, help="Client connection pool size")
+    client.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    client.add_argument("--json", dest="json_path", help="Also write the reports to this file")
+    args = parser.parse_args(argv)
+
+    phases = build_phases(args)
+    total = sum(len(phase.requests) for phase in phases)
+    print(f"{len(phases)} phase(s), {total} request(s)")
+
+    if args.base_url:
+        reports = asyncio.run(run(args, phases, args.base_url.rstrip("/")))
+    else:
+        with tempfile.TemporaryDirectory(prefix="fact-replay-") as directory:
+            reports = asyncio.run(run_with_local_server(args, phases, directory))
+
+    print()
+    print(format_reports(reports))
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump([report.to_dict() for report in reports], handle, indent=2)
+    return 0 if all(report.requests > report.errors for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
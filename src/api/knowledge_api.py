@@ -8,11 +8,16 @@ trust scoring, and advanced retrieval.
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 import json
 import structlog
 
+try:
+    from ..core.admission import Lane, require_admission
+except ImportError:
+    from core.admission import Lane, require_admission
+
 logger = structlog.get_logger(__name__)
 
 # Create API router
@@ -422,7 +427,8 @@ async def get_objection_response(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/analytics/conversation/{call_id}")
+@router.get("/analytics/conversation/{call_id}",
+            dependencies=[Depends(require_admission("analytics", Lane.ANALYTICS))])
 async def get_conversation_analytics(call_id: str):
     """
     Get analytics for a specific conversation.
@@ -0,0 +1,255 @@
+"""
+Shared Phrase Matching Engine
+
+Compiles every persona indicator, context clue and objection phrase used by
+the VAPI scoring and routing modules into a single Aho-Corasick automaton,
+so an utterance is scanned once in linear time no matter how many phrases
+are registered. Per-call incremental counters keep running totals so each
+new utterance only scans the new text instead of the whole history.
+"""
+
+import threading
+from collections import Counter, OrderedDict, deque
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+Tag = Tuple[str, str]
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton for case-insensitive substring matching."""
+
+    __slots__ = ("phrases", "_goto", "_fail", "_out")
+
+    def __init__(self, phrases: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            phrases: Phrases to match; they are lowercased and deduplicated
+                while preserving their first-seen order.
+        """
+        self.phrases: List[str] = list(dict.fromkeys(p.lower() for p in phrases if p))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for phrase_id, phrase in enumerate(self.phrases):
+            node = 0
+            for char in phrase:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._out.append(())
+                node = child
+            self._out[node] = self._out[node] + (phrase_id,)
+
+        # Breadth-first pass to wire failure links and merge outputs
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (end_index, phrase_id) for every occurrence, overlaps included.
+
+        The text is expected to be lowercased already.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for phrase_id in out[node]:
+                yield index, phrase_id
+
+    def count(self, text: str) -> Counter:
+        """Count occurrences of each phrase id in a single pass over text."""
+        counts: Counter = Counter()
+        for _, phrase_id in self.iter_matches(text):
+            counts[phrase_id] += 1
+        return counts
+
+
+class PhraseMatches:
+    """Result of scanning one text against a phrase lexicon."""
+
+    __slots__ = ("phrase_counts", "_distinct", "_occurrences")
+
+    def __init__(self, phrase_counts: Dict[str, int],
+                 distinct: Counter, occurrences: Counter):
+        self.phrase_counts = phrase_counts
+        self._distinct = distinct
+        self._occurrences = occurrences
+
+    def distinct(self, group: str, label: str) -> int:
+        """Number of phrases under (group, label) present in the text."""
+        return self._distinct.get((group, label), 0)
+
+    def occurrences(self, group: str, label: str) -> int:
+        """Total occurrences of all phrases under (group, label)."""
+        return self._occurrences.get((group, label), 0)
+
+    def any(self, group: str, label: str) -> bool:
+        """Whether any phrase under (group, label) is present."""
+        return (group, label) in self._distinct
+
+    def group_occurrences(self, group: str) -> Counter:
+        """Occurrence totals for every label in a group."""
+        return Counter({
+            label: count for (tag_group, label), count in self._occurrences.items()
+            if tag_group == group
+        })
+
+
+class PhraseLexicon:
+    """
+    Registry of tagged phrase groups compiled into one shared automaton.
+
+    Each module registers its vocabulary under a group name with one phrase
+    list per label. The automaton is rebuilt lazily on the first scan after a
+    registration, so registering at import time costs nothing on the hot path.
+    """
+
+    def __init__(self):
+        self._groups: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._compiled: Optional[Tuple[int, AhoCorasick, List[List[Tag]]]] = None
+        self._last_scan: Optional[Tuple[int, str, PhraseMatches]] = None
+
+    def register(self, group: str, labels: Mapping[str, Iterable[str]]) -> None:
+        """
+        Register (or replace) a phrase group.
+
+        Args:
+            group: Group name, e.g. "routing.indicator"
+            labels: Mapping of label to the phrases that signal it
+        """
+        with self._lock:
+            self._groups[group] = {label: tuple(phrases) for label, phrases in labels.items()}
+            self._version += 1
+
+    def groups(self) -> Dict[str, Dict[str, Tuple[str, ...]]]:
+        """Return a copy of the registered groups."""
+        with self._lock:
+            return {group: dict(labels) for group, labels in self._groups.items()}
+
+    def _compile(self) -> Tuple[int, AhoCorasick, List[List[Tag]]]:
+        compiled = self._compiled
+        if compiled is not None and compiled[0] == self._version:
+            return compiled
+
+        with self._lock:
+            if self._compiled is not None and self._compiled[0] == self._version:
+                return self._compiled
+
+            phrase_tags: Dict[str, List[Tag]] = {}
+            for group, labels in self._groups.items():
+                for label, phrases in labels.items():
+                    for phrase in phrases:
+                        if phrase:
+                            phrase_tags.setdefault(phrase.lower(), []).append((group, label))
+
+            automaton = AhoCorasick(phrase_tags.keys())
+            tags = [phrase_tags[phrase] for phrase in automaton.phrases]
+            self._compiled = (self._version, automaton, tags)
+            return self._compiled
+
+    def scan(self, text: str) -> PhraseMatches:
+        """
+        Find every registered phrase in text with one linear pass.
+
+        The most recent result is memoised because the same utterance is
+        typically inspected by several handlers within one webhook call.
+        """
+        version, automaton, tags = self._compile()
+        last = self._last_scan
+        if last is not None and last[0] == version and last[1] == text:
+            return last[2]
+
+        phrase_counts: Dict[str, int] = {}
+        distinct: Counter = Counter()
+        occurrences: Counter = Counter()
+        for phrase_id, count in automaton.count(text.lower()).items():
+            phrase_counts[automaton.phrases[phrase_id]] = count
+            for tag in tags[phrase_id]:
+                distinct[tag] += 1
+                occurrences[tag] += count
+
+        matches = PhraseMatches(phrase_counts, distinct, occurrences)
+        self._last_scan = (version, text, matches)
+        return matches
+
+
+class IncrementalPhraseCounter:
+    """
+    Running per-call occurrence counts for one lexicon group.
+
+    Only the newly observed utterance is scanned; totals cover a sliding
+    window of the most recent utterances so they agree with callers that
+    keep a bounded conversation history.
+    """
+
+    def __init__(self, lexicon: PhraseLexicon, group: str,
+                 window: int = 20, max_calls: int = 1000):
+        """
+        Initialize the counter.
+
+        Args:
+            lexicon: Lexicon to scan with
+            group: Group whose label occurrences are tracked
+            window: Number of most recent utterances included in totals
+            max_calls: Maximum tracked calls before the least recent is dropped
+        """
+        self.lexicon = lexicon
+        self.group = group
+        self.window = window
+        self.max_calls = max_calls
+        self._calls: "OrderedDict[str, Tuple[deque, Counter]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, call_id: str, text: str) -> Counter:
+        """Scan a new utterance for a call and return the updated totals."""
+        utterance_counts = self.lexicon.scan(text).group_occurrences(self.group)
+
+        with self._lock:
+            state = self._calls.get(call_id)
+            if state is None:
+                state = (deque(), Counter())
+                self._calls[call_id] = state
+                while len(self._calls) > self.max_calls:
+                    self._calls.popitem(last=False)
+            else:
+                self._calls.move_to_end(call_id)
+
+            history, totals = state
+            history.append(utterance_counts)
+            totals.update(utterance_counts)
+            while len(history) > self.window:
+                totals.subtract(history.popleft())
+            return +totals
+
+    def totals(self, call_id: str) -> Counter:
+        """Current windowed totals for a call."""
+        with self._lock:
+            state = self._calls.get(call_id)
+            return +state[1] if state else Counter()
+
+    def reset(self, call_id: str) -> None:
+        """Forget all counts for a call."""
+        with self._lock:
+            self._calls.pop(call_id, None)
+
+
+# Shared lexicon used by the VAPI scoring and routing modules
+phrase_lexicon = PhraseLexicon()
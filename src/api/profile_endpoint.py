@@ -0,0 +1,122 @@
+"""
+Sampling profiler endpoint.
+
+GET /debug/profile?seconds=N returns the Python stacks of this worker
+process in collapsed-stack format, ready for flamegraph.pl or speedscope.
+With PROFILER_CONTINUOUS set the last N seconds are returned at once;
+otherwise the worker is sampled for the next N seconds.
+
+GET /debug/loop returns this worker's event loop lag and the stacks of
+recent calls that blocked it (captured with LOOP_BLOCK_DETECT).
+
+The endpoint is opt-in twice over: the router is a debug router
+(ENABLE_DEBUG_ROUTES=1 or ENABLED_ROUTERS=profile), and every request must
+carry PROFILER_TOKEN as a bearer token.
+"""
+
+import asyncio
+import hmac
+import os
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import structlog
+
+try:
+    from ..monitoring.sampling_profiler import (DEFAULT_HZ, MAX_HZ, SamplingProfiler, format_collapsed,
+                                                get_continuous_profiler)
+    from ..monitoring.loop_monitor import get_loop_monitor
+except ImportError:
+    from monitoring.sampling_profiler import (DEFAULT_HZ, MAX_HZ, SamplingProfiler, format_collapsed,
+                                              get_continuous_profiler)
+    from monitoring.loop_monitor import get_loop_monitor
+
+logger = structlog.get_logger(__name__)
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+PROFILER_TOKEN_ENV = "PROFILER_TOKEN"
+MAX_PROFILE_SECONDS = 120
+
+# One on-demand profile at a time per worker
+_profile_lock = asyncio.Lock()
+
+
+async def require_profiler_token(authorization: Optional[str] = Header(None)):
+    """
+    FastAPI dependency checking the profiler bearer token.
+
+    Raises:
+        HTTPException: 503 when no token is configured, 401 when it doesn't match
+    """
+    expected = os.getenv(PROFILER_TOKEN_ENV)
+    if not expected:
+        raise HTTPException(status_code=503, detail="Profiling is not configured (set PROFILER_TOKEN)")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid profiler token",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return True
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_profiler_token)])
+async def profile(seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+                  hz: float = Query(DEFAULT_HZ, gt=0, le=MAX_HZ),
+                  idle: bool = Query(False, description="Include stacks of waiting threads")):
+    """
+    Profile this worker process.
+
+    Args:
+        seconds: Window to report
+        hz: Sampling rate for an on-demand profile
+        idle: Include waiting threads (on-demand profiles only)
+
+    Returns:
+        Collapsed stacks, one "frame;frame;... count" line per distinct stack
+    """
+    continuous = get_continuous_profiler()
+    if continuous is not None and continuous.running:
+        body = continuous.collapsed(seconds=seconds)
+        mode = "continuous"
+    else:
+        if _profile_lock.locked():
+            raise HTTPException(status_code=409, detail="A profile is already being taken in this worker")
+        async with _profile_lock:
+            sampler = SamplingProfiler(hz=hz, retention=int(seconds) + 2, include_idle=idle)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+        body = format_collapsed(sampler.counts())
+        mode = "on-demand"
+
+    pid = os.getpid()
+    logger.info("Profile taken", mode=mode, seconds=seconds, pid=pid)
+    filename = f"profile-{pid}-{int(time.time())}.folded"
+    return PlainTextResponse(body, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Profile-Mode": mode,
+        "X-Profile-Pid": str(pid),
+    })
+
+
+@router.get("/loop", dependencies=[Depends(require_profiler_token)])
+async def loop_lag():
+    """
+    Event loop lag of this worker process.
+
+    Returns:
+        Lag percentiles, blocking detection settings and recent blocked calls
+    """
+    monitor = get_loop_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=503, detail="Event loop monitor is not running")
+    return {
+        "pid": os.getpid(),
+        **monitor.stats(),
+        "detect_blocking": monitor.detect_blocking,
+        "block_threshold_ms": monitor.block_threshold_ms,
+        "blocked_calls": monitor.recent_blocks(),
+    }
@@ -0,0 +1,52 @@
+"""
+FACT System API Response Classes
+
+This module provides the response classes for the fast serialization path.
+FastJSONResponse renders with orjson and is the application's default
+response class. trusted_response() sends a model the handler already
+validated, and skips FastAPI's second validation against response_model.
+RawJSONResponse sends a body that was already encoded, such as one joined
+from cached knowledge entry fragments.
+"""
+
+from typing import Any, Mapping, Optional
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    from ..core.serialization import dumps
+except ImportError:
+    from core.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (stdlib json when it is not installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Response whose content is already encoded JSON bytes."""
+
+    media_type = "application/json"
+
+
+def trusted_response(model: BaseModel, status_code: int = 200,
+                     headers: Optional[Mapping[str, str]] = None) -> FastJSONResponse:
+    """
+    Respond with a model built by the handler itself.
+
+    Returning a Response from a route skips FastAPI's response_model
+    validation, which would otherwise validate the model a second time.
+    The route's response_model still documents the schema.
+
+    Args:
+        model: Validated response model
+        status_code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        Rendered JSON response
+    """
+    return FastJSONResponse(model.model_dump(mode="json"), status_code=status_code, headers=headers)
@@ -0,0 +1,110 @@
+"""
+FACT System API Router Registry
+
+This module lists every optional API router and imports only the ones that
+are enabled, so debug and test endpoints (and the SDKs they pull in) cost
+nothing at startup unless switched on.
+
+Routers are enabled by default except debug/test routers, which need
+ENABLE_DEBUG_ROUTES=1. ENABLED_ROUTERS and DISABLED_ROUTERS take
+comma-separated router names to switch individual routers on or off.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+LOADED = "loaded"
+DISABLED = "disabled"
+UNAVAILABLE = "unavailable"
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    """An optional router and when to include it."""
+    name: str
+    # Module within the api package exposing the router
+    module: str
+    description: str
+    attribute: str = "router"
+    # Debug/test endpoints are off unless ENABLE_DEBUG_ROUTES is set
+    debug: bool = False
+    # Only included when this router loaded too
+    requires: Optional[str] = None
+
+
+ROUTERS: Sequence[RouterSpec] = (
+    RouterSpec("knowledge", "knowledge_api", "Knowledge API endpoints"),
+    RouterSpec("vapi", "vapi_webhook", "VAPI webhook endpoints"),
+    RouterSpec("vapi_enhanced", "vapi_enhanced_webhook", "VAPI enhanced webhook with scoring",
+               requires="vapi"),
+    RouterSpec("vapi_fixed", "vapi_webhook_fix", "VAPI fixed webhook", requires="vapi"),
+    RouterSpec("training", "training_api", "Training API endpoints"),
+    RouterSpec("vapi_simple", "vapi_webhook_simple", "VAPI simple webhook endpoints",
+               debug=True, requires="vapi"),
+    RouterSpec("vapi_debug", "vapi_debug_webhook", "VAPI debug webhook", debug=True, requires="vapi"),
+    RouterSpec("debug", "debug_endpoint", "Debug endpoints", debug=True),
+    RouterSpec("test_groq", "test_groq", "Groq test endpoint", debug=True),
+    RouterSpec("debug_query", "debug_query", "Debug query endpoint", debug=True),
+    RouterSpec("profile", "profile_endpoint", "Sampling profiler endpoint", debug=True),
+    RouterSpec("test_direct_groq", "test_direct_groq", "Direct Groq test endpoint", debug=True),
+)
+
+
+def _names(value: Optional[str]) -> set:
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_enabled(spec: RouterSpec, env: Mapping[str, str] = os.environ) -> bool:
+    """Whether a router is switched on by the environment."""
+    if spec.name in _names(env.get("DISABLED_ROUTERS")):
+        return False
+    if spec.name in _names(env.get("ENABLED_ROUTERS")):
+        return True
+    return not spec.debug or _flag(env.get("ENABLE_DEBUG_ROUTES"))
+
+
+def include_routers(app, specs: Sequence[RouterSpec] = ROUTERS,
+                    env: Mapping[str, str] = os.environ) -> Dict[str, str]:
+    """
+    Import and include the enabled routers.
+
+    Args:
+        app: FastAPI application
+        specs: Routers to consider, in inclusion order
+        env: Environment holding the switches
+
+    Returns:
+        Status per router name: "loaded", "disabled" or "unavailable"
+    """
+    status: Dict[str, str] = {}
+    for spec in specs:
+        if not is_enabled(spec, env) or (spec.requires and status.get(spec.requires) != LOADED):
+            status[spec.name] = DISABLED
+            continue
+        try:
+            # __import__ rather than importlib.import_module: only the former
+            # shows up in `python -X importtime` reports
+            module = __import__(spec.module, globals(), fromlist=[spec.attribute], level=1)
+            app.include_router(getattr(module, spec.attribute))
+        except ImportError as e:
+            status[spec.name] = UNAVAILABLE
+            logger.warning(f"{spec.description} not available", router=spec.name, error=str(e))
+            continue
+        status[spec.name] = LOADED
+        logger.info(f"{spec.description} loaded")
+    return status
+
+
+def loaded(status: Mapping[str, str]) -> List[str]:
+    """Names of the routers that were included."""
+    return [name for name, state in status.items() if state == LOADED]
@@ -5,16 +5,22 @@ Provides endpoints for training the knowledge base retriever
 based on user feedback and interaction patterns.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import structlog
 
+try:
+    from ..core.admission import Lane, require_admission
+except ImportError:
+    from core.admission import Lane, require_admission
+
 logger = structlog.get_logger(__name__)
 
-# Create router
-router = APIRouter(prefix="/training", tags=["training"])
+# Create router; training jobs yield to voice traffic under load
+router = APIRouter(prefix="/training", tags=["training"],
+                   dependencies=[Depends(require_admission("analytics", Lane.ANALYTICS))])
 
 # Import training module
 try:
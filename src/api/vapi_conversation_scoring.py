@@ -7,11 +7,18 @@ to enable dynamic response adjustments based on caller engagement.
 
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 import structlog
 import json
 
+from .phrase_matcher import phrase_lexicon, PhraseMatches
+
+try:
+    from ..core.conversation_store import ConversationStateStore, create_conversation_store
+except ImportError:
+    from core.conversation_store import ConversationStateStore, create_conversation_store
+
 logger = structlog.get_logger(__name__)
 
 
@@ -34,7 +41,11 @@ class PersonaType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# Trust events retained per call (summaries only report the last 10)
+MAX_EVENTS_PER_CALL = 50
+
+
+@dataclass(slots=True)
 class ConversationMetrics:
     """Metrics tracked throughout the conversation."""
     trust_score: float = 45.0
@@ -51,69 +62,174 @@ class ConversationMetrics:
     roi_calculated: bool = False
     appointment_ready: bool = False
     qualifier_interest: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to JSON-compatible dictionary."""
+        data = asdict(self)
+        data["persona_type"] = self.persona_type.value
+        data["stage"] = self.stage.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationMetrics":
+        """Rebuild metrics from a dictionary produced by to_dict."""
+        values = dict(data)
+        values["persona_type"] = PersonaType(values.get("persona_type", PersonaType.UNKNOWN.value))
+        values["stage"] = ConversationStage(values.get("stage", ConversationStage.DISCOVERY.value))
+        return cls(**values)
 
 
-@dataclass
+@dataclass(slots=True)
 class TrustEvent:
     """Event that affects trust score."""
     event_type: str  # positive, negative, neutral
     description: str
     impact: float  # -10 to +10
     timestamp: datetime = field(default_factory=datetime.utcnow)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to JSON-compatible dictionary."""
+        return {
+            "event_type": self.event_type,
+            "description": self.description,
+            "impact": self.impact,
+            "timestamp": self.timestamp.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrustEvent":
+        """Rebuild an event from a dictionary produced by to_dict."""
+        return cls(
+            event_type=data["event_type"],
+            description=data["description"],
+            impact=data["impact"],
+            timestamp=datetime.fromisoformat(data["timestamp"])
+        )
+
+
+class ConversationRecord:
+    """Per-call scoring state: metrics plus recent trust events."""
+    
+    __slots__ = ("metrics", "events")
+    
+    def __init__(self, metrics: Optional[ConversationMetrics] = None,
+                 events: Optional[List[TrustEvent]] = None):
+        self.metrics = metrics or ConversationMetrics()
+        self.events = events or []
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to JSON-compatible dictionary."""
+        return {
+            "metrics": self.metrics.to_dict(),
+            "events": [event.to_dict() for event in self.events]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationRecord":
+        """Rebuild a record from a dictionary produced by to_dict."""
+        return cls(
+            metrics=ConversationMetrics.from_dict(data["metrics"]),
+            events=[TrustEvent.from_dict(event) for event in data.get("events", [])]
+        )
+
+
+# Keyword lists per persona; a keyword counts once per utterance
+PERSONA_KEYWORDS: Dict[PersonaType, List[str]] = {
+    PersonaType.OVERWHELMED_VETERAN: [
+        "complicated", "stressed", "too much", "overwhelming",
+        "drowning", "confused by all", "bureaucracy", "red tape"
+    ],
+    PersonaType.CONFUSED_NEWCOMER: [
+        "new to this", "first time", "beginner", "never done",
+        "where do i start", "don't understand", "explain", "help me understand"
+    ],
+    PersonaType.URGENT_OPERATOR: [
+        "quickly", "urgent", "deadline", "asap", "immediately",
+        "time sensitive", "rush", "need this now", "fast"
+    ],
+    PersonaType.STRATEGIC_INVESTOR: [
+        "income", "business", "profit", "passive income", "roi",
+        "make money", "earn", "qualifier", "network", "opportunity"
+    ],
+    PersonaType.SKEPTICAL_SHOPPER: [
+        "price", "cost", "cheaper", "compare", "other options",
+        "guarantee", "proof", "references", "why should i"
+    ],
+}
+
+# Trust and objection signal phrases
+TRUST_SIGNAL_PHRASES: Dict[str, List[str]] = {
+    "positive_high": ["ready to start", "want to move forward", "interested"],
+    "positive_medium": ["makes sense", "good point", "tell me more"],
+    "negative_high": ["not interested", "too expensive", "goodbye"],
+    "negative_medium": ["not sure", "skeptical", "doubt"],
+    "interest": ["interested", "tell me more", "sounds good"],
+    "hesitation": ["not sure", "expensive", "think about"],
+    "value_mention": ["benefit", "value", "roi", "income", "earn"],
+}
+
+phrase_lexicon.register(
+    "scoring.persona",
+    {persona.value: keywords for persona, keywords in PERSONA_KEYWORDS.items()}
+)
+phrase_lexicon.register("scoring.trust", TRUST_SIGNAL_PHRASES)
 
 
 class ConversationScorer:
     """Manages conversation scoring and journey progression."""
     
-    def __init__(self):
-        """Initialize the conversation scorer."""
-        self.conversations: Dict[str, ConversationMetrics] = {}
-        self.event_history: Dict[str, List[TrustEvent]] = {}
+    def __init__(self, store: Optional[ConversationStateStore] = None):
+        """
+        Initialize the conversation scorer.
         
+        Args:
+            store: Per-call state store; defaults to the shared, TTL-bounded
+                store selected by CONVERSATION_STATE_URL
+        """
+        self.store = store if store is not None else create_conversation_store(
+            "vapi.scoring",
+            encode=ConversationRecord.to_dict,
+            decode=ConversationRecord.from_dict
+        )
+        
+    def scan_signals(self, text: str) -> PhraseMatches:
+        """Scan text once for every persona and trust signal phrase."""
+        return phrase_lexicon.scan(text)
+    
+    def _get_record(self, call_id: str) -> ConversationRecord:
+        return self.store.get_or_create(call_id, ConversationRecord)
+    
     def get_or_create_conversation(self, call_id: str) -> ConversationMetrics:
-        """Get existing or create new conversation metrics."""
-        if call_id not in self.conversations:
-            self.conversations[call_id] = ConversationMetrics()
-            self.event_history[call_id] = []
-        return self.conversations[call_id]
+        """
+        Get existing or create new conversation metrics.
+        
+        Callers that modify the returned metrics directly must call
+        save_conversation() so other workers see the change.
+        """
+        return self._get_record(call_id).metrics
+    
+    def save_conversation(self, call_id: str) -> None:
+        """Persist in-place changes to a conversation's metrics."""
+        self.store.flush(call_id)
+    
+    def end_conversation(self, call_id: str) -> None:
+        """Mark a call as ended so its state is evicted after the grace TTL."""
+        self.store.end(call_id)
+    
+    def reset_conversation(self, call_id: str) -> None:
+        """Drop all state for a call."""
+        self.store.delete(call_id)
     
     def detect_persona(self, call_id: str, text: str) -> Tuple[PersonaType, float]:
         """
         Detect customer persona from conversation text.
         Returns persona type and confidence score.
         """
-        text_lower = text.lower()
-        persona_scores = {}
-        
-        # Overwhelmed Veteran patterns
-        overwhelmed_keywords = ["complicated", "stressed", "too much", "overwhelming", 
-                               "drowning", "confused by all", "bureaucracy", "red tape"]
-        overwhelmed_score = sum(1 for kw in overwhelmed_keywords if kw in text_lower)
-        persona_scores[PersonaType.OVERWHELMED_VETERAN] = overwhelmed_score
-        
-        # Confused Newcomer patterns
-        newcomer_keywords = ["new to this", "first time", "beginner", "never done",
-                            "where do i start", "don't understand", "explain", "help me understand"]
-        newcomer_score = sum(1 for kw in newcomer_keywords if kw in text_lower)
-        persona_scores[PersonaType.CONFUSED_NEWCOMER] = newcomer_score
-        
-        # Urgent Operator patterns
-        urgent_keywords = ["quickly", "urgent", "deadline", "asap", "immediately",
-                          "time sensitive", "rush", "need this now", "fast"]
-        urgent_score = sum(1 for kw in urgent_keywords if kw in text_lower)
-        persona_scores[PersonaType.URGENT_OPERATOR] = urgent_score
-        
-        # Strategic Investor patterns
-        investor_keywords = ["income", "business", "profit", "passive income", "roi",
-                           "make money", "earn", "qualifier", "network", "opportunity"]
-        investor_score = sum(1 for kw in investor_keywords if kw in text_lower)
-        persona_scores[PersonaType.STRATEGIC_INVESTOR] = investor_score
-        
-        # Skeptical Shopper patterns
-        skeptical_keywords = ["price", "cost", "cheaper", "compare", "other options",
-                            "guarantee", "proof", "references", "why should i"]
-        skeptical_score = sum(1 for kw in skeptical_keywords if kw in text_lower)
-        persona_scores[PersonaType.SKEPTICAL_SHOPPER] = skeptical_score
+        matches = phrase_lexicon.scan(text)
+        persona_scores = {
+            persona: matches.distinct("scoring.persona", persona.value)
+            for persona in PERSONA_KEYWORDS
+        }
         
         # Determine persona with highest score
         if max(persona_scores.values()) == 0:
@@ -136,6 +252,7 @@ class ConversationScorer:
                 metrics.urgency_level = "medium"
             else:
                 metrics.urgency_level = "low"
+            self.save_conversation(call_id)
         
         logger.info(f"Persona detected for {call_id}: {detected_persona.value} (confidence: {confidence:.2f})")
         return detected_persona, confidence
@@ -146,16 +263,17 @@ class ConversationScorer:
         Process an event that affects trust score.
         Returns updated trust score.
         """
-        metrics = self.get_or_create_conversation(call_id)
+        record = self._get_record(call_id)
+        metrics = record.metrics
         
         # Determine impact based on event type and description
         impact = custom_impact if custom_impact is not None else self._calculate_impact(event_type, description)
         
         # Create and store event
         event = TrustEvent(event_type=event_type, description=description, impact=impact)
-        if call_id not in self.event_history:
-            self.event_history[call_id] = []
-        self.event_history[call_id].append(event)
+        record.events.append(event)
+        if len(record.events) > MAX_EVENTS_PER_CALL:
+            del record.events[:-MAX_EVENTS_PER_CALL]
         
         # Update trust score
         old_score = metrics.trust_score
@@ -173,20 +291,22 @@ class ConversationScorer:
         # Check for transfer triggers
         self._check_transfer_triggers(metrics)
         
+        self.store.put(call_id, record)
+        
         logger.info(f"Trust event for {call_id}: {event_type} ({description}) | Score: {old_score:.1f} → {metrics.trust_score:.1f}")
         
         return metrics.trust_score
     
     def _calculate_impact(self, event_type: str, description: str) -> float:
         """Calculate trust impact based on event type and description."""
-        description_lower = description.lower()
+        signals = phrase_lexicon.scan(description)
         
         if event_type == "positive":
             # High impact positive events
-            if any(kw in description_lower for kw in ["ready to start", "want to move forward", "interested"]):
+            if signals.any("scoring.trust", "positive_high"):
                 return 10.0
             # Medium impact positive events
-            elif any(kw in description_lower for kw in ["makes sense", "good point", "tell me more"]):
+            elif signals.any("scoring.trust", "positive_medium"):
                 return 5.0
             # Low impact positive events
             else:
@@ -194,10 +314,10 @@ class ConversationScorer:
                 
         elif event_type == "negative":
             # High impact negative events
-            if any(kw in description_lower for kw in ["not interested", "too expensive", "goodbye"]):
+            if signals.any("scoring.trust", "negative_high"):
                 return -10.0
             # Medium impact negative events
-            elif any(kw in description_lower for kw in ["not sure", "skeptical", "doubt"]):
+            elif signals.any("scoring.trust", "negative_medium"):
                 return -5.0
             # Low impact negative events
             else:
@@ -377,8 +497,9 @@ class ConversationScorer:
     
     def get_conversation_summary(self, call_id: str) -> Dict[str, Any]:
         """Get comprehensive conversation summary for handoff or analysis."""
-        metrics = self.get_or_create_conversation(call_id)
-        events = self.event_history.get(call_id, [])
+        record = self._get_record(call_id)
+        metrics = record.metrics
+        events = record.events
         
         return {
             "call_id": call_id,
@@ -5,21 +5,27 @@ Integrates the conversation scoring system to provide dynamic,
 journey-based responses for the CLP Sales and Expert agents.
 """
 
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union
 from fastapi import APIRouter, Request, Header, Depends
 from pydantic import BaseModel, Field
+import asyncio
 import structlog
 from datetime import datetime
 
 from .vapi_webhook import (
     VAPIFunctionCall, VAPIMessage, VAPICall, 
     VAPIWebhookRequest as OldVAPIWebhookRequest, VAPIWebhookResponse,
-    verify_vapi_request, search_knowledge_base
+    verify_vapi_request, search_knowledge_base, search_knowledge_many, shed_answer
 )
 from .vapi_conversation_scoring import (
     conversation_scorer, PersonaType, ConversationStage
 )
 
+try:
+    from ..core.admission import Lane, get_admission_controller
+except ImportError:
+    from core.admission import Lane, get_admission_controller
+
 logger = structlog.get_logger(__name__)
 
 router = APIRouter(prefix="/vapi-enhanced", tags=["vapi-enhanced"])
@@ -60,10 +66,11 @@ async def detect_persona_enhanced(text: str, call_id: str) -> Dict[str, Any]:
     persona, confidence = conversation_scorer.detect_persona(call_id, text)
     metrics = conversation_scorer.get_or_create_conversation(call_id)
     
-    # Process trust events based on content
-    if any(word in text.lower() for word in ["interested", "tell me more", "sounds good"]):
+    # Process trust events based on content (same scan as persona detection)
+    signals = conversation_scorer.scan_signals(text)
+    if signals.any("scoring.trust", "interest"):
         conversation_scorer.process_trust_event(call_id, "positive", "Shows interest")
-    elif any(word in text.lower() for word in ["not sure", "expensive", "think about"]):
+    elif signals.any("scoring.trust", "hesitation"):
         conversation_scorer.process_trust_event(call_id, "negative", "Shows hesitation")
     
     # Get response tone recommendations
@@ -193,6 +200,24 @@ async def handle_objection_enhanced(call_id: str, objection_type: str) -> Dict[s
     }
 
 
+def _search_arguments(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """search_knowledge_base() arguments for searchKnowledge parameters."""
+    return {
+        "query": parameters.get("query", ""),
+        "state": parameters.get("state"),
+        "category": parameters.get("category"),
+        "limit": parameters.get("limit", 3)
+    }
+
+
+def _track_value_mention(parameters: Dict[str, Any], call_id: str) -> None:
+    """Track value mention if a knowledge search is discussing benefits."""
+    if conversation_scorer.scan_signals(parameters.get("query", "")).any("scoring.trust", "value_mention"):
+        metrics = conversation_scorer.get_or_create_conversation(call_id)
+        metrics.value_mentions += 1
+        conversation_scorer.save_conversation(call_id)
+
+
 def _get_follow_up_question(metrics) -> str:
     """Get appropriate follow-up question based on stage and persona."""
     
@@ -218,19 +243,8 @@ async def process_function_call(function_name: str, parameters: Dict[str, Any],
     """
     if function_name == "searchKnowledge":
         # Standard knowledge search with context awareness
-        result = await search_knowledge_base(
-            query=parameters.get("query", ""),
-            state=parameters.get("state"),
-            category=parameters.get("category"),
-            limit=parameters.get("limit", 3)
-        )
-        
-        # Track value mention if discussing benefits
-        if any(word in parameters.get("query", "").lower() 
-              for word in ["benefit", "value", "roi", "income", "earn"]):
-            metrics = conversation_scorer.get_or_create_conversation(call_id)
-            metrics.value_mentions += 1
-        
+        result = await search_knowledge_base(**_search_arguments(parameters))
+        _track_value_mention(parameters, call_id)
         return result
     
     elif function_name == "detectPersona":
@@ -285,6 +299,7 @@ async def process_function_call(function_name: str, parameters: Dict[str, Any],
         # Analyze qualifier network opportunity
         metrics = conversation_scorer.get_or_create_conversation(call_id)
         metrics.qualifier_interest = True
+        conversation_scorer.save_conversation(call_id)
         
         state = parameters.get("state", "GA")
         license_type = parameters.get("licenseType", "general")
@@ -325,34 +340,97 @@ async def process_function_call(function_name: str, parameters: Dict[str, Any],
         }
 
 
+async def process_function_calls(calls: List[Tuple[str, Dict[str, Any]]], call_id: str) -> List[Dict[str, Any]]:
+    """
+    Process all function calls of one message concurrently.
+    
+    Knowledge searches are answered together by one batch search; the other
+    calls run alongside it. A failing call yields an error result without
+    affecting the others.
+    
+    Args:
+        calls: (function name, parameters) pairs
+        call_id: VAPI call ID
+        
+    Returns:
+        Results in the order of the calls
+    """
+    searches = [position for position, (name, _) in enumerate(calls) if name == "searchKnowledge"]
+    others = [position for position, (name, _) in enumerate(calls) if name != "searchKnowledge"]
+    
+    async def run_searches() -> List[Dict[str, Any]]:
+        if not searches:
+            return []
+        results = await search_knowledge_many([_search_arguments(calls[position][1]) for position in searches])
+        for position in searches:
+            _track_value_mention(calls[position][1], call_id)
+        return results
+    
+    search_results, *other_results = await asyncio.gather(
+        run_searches(),
+        *(process_function_call(*calls[position], call_id) for position in others),
+        return_exceptions=True
+    )
+    if isinstance(search_results, BaseException):
+        search_results = [search_results] * len(searches)
+    
+    results: List[Dict[str, Any]] = [None] * len(calls)
+    for position, result in zip(searches + others, list(search_results) + other_results):
+        if isinstance(result, BaseException):
+            logger.error(f"Tool call failed: {result}", function=calls[position][0])
+            result = {"error": f"{calls[position][0]} failed: {result}"}
+        results[position] = result
+    return results
+
+
 @router.post("/webhook", dependencies=[Depends(verify_vapi_request)])
 async def enhanced_vapi_webhook(request: VAPIWebhookRequest):
     """
     Enhanced VAPI webhook with conversation scoring and journey progression.
     Handles both old (function-call) and new (tool-calls) formats.
+    
+    Shares the VAPI webhook's admission control; shed messages get the
+    default answer for every call at once.
     """
+    admission = get_admission_controller()
+    ticket = await admission.admit("vapi_webhook", Lane.VOICE, admission.voice_deadline("vapi_webhook"))
+    if ticket is None:
+        call_id = request.call.id if request.call else "default-call-id"
+        if request.message.toolCalls:
+            return {"results": [
+                {"toolCallId": tool_call.id, "result": shed_answer(tool_call.function.arguments)}
+                for tool_call in request.message.toolCalls
+            ]}
+        function_call = request.message.functionCall
+        return VAPIWebhookResponse(
+            result=shed_answer(function_call.parameters if function_call else None),
+            metadata={"call_id": call_id, "shed": True}
+        )
+    with ticket:
+        return await _handle_enhanced_webhook(request)
+
+
+async def _handle_enhanced_webhook(request: VAPIWebhookRequest):
     try:
         # Get call_id (use default if not provided in new format)
         call_id = request.call.id if request.call else "default-call-id"
+        # Load the call's scoring state off the event loop; the scorer then reads it locally
+        await conversation_scorer.store.refresh(call_id)
         
         # Handle new tool-calls format
         if request.message.type == "tool-calls" and request.message.toolCalls:
             logger.info(f"Processing tool-calls", count=len(request.message.toolCalls))
             
-            # Process all tool calls and return results array
-            results = []
-            for tool_call in request.message.toolCalls:
-                function_name = tool_call.function.name
-                parameters = tool_call.function.arguments
-                logger.info(f"Processing tool: {function_name}")
-                
-                # Process the function call (reuse existing logic)
-                result = await process_function_call(function_name, parameters, call_id)
-                
-                results.append({
-                    "toolCallId": tool_call.id,
-                    "result": result
-                })
+            # Process all tool calls together and return results array
+            tool_calls = request.message.toolCalls
+            outcomes = await process_function_calls(
+                [(tool_call.function.name, tool_call.function.arguments) for tool_call in tool_calls],
+                call_id
+            )
+            results = [
+                {"toolCallId": tool_call.id, "result": result}
+                for tool_call, result in zip(tool_calls, outcomes)
+            ]
             
             # Return results in the format VAPI expects for tool-calls
             return {"results": results}
@@ -389,6 +467,7 @@ async def enhanced_vapi_webhook(request: VAPIWebhookRequest):
 @router.get("/conversation/{call_id}/summary")
 async def get_conversation_summary(call_id: str):
     """Get conversation summary with scoring metrics."""
+    await conversation_scorer.store.refresh(call_id)
     summary = conversation_scorer.get_conversation_summary(call_id)
     return summary
 
@@ -396,8 +475,5 @@ async def get_conversation_summary(call_id: str):
 @router.post("/conversation/{call_id}/reset")
 async def reset_conversation(call_id: str):
     """Reset conversation metrics for a call ID."""
-    if call_id in conversation_scorer.conversations:
-        del conversation_scorer.conversations[call_id]
-    if call_id in conversation_scorer.event_history:
-        del conversation_scorer.event_history[call_id]
+    conversation_scorer.reset_conversation(call_id)
     return {"status": "reset", "call_id": call_id}
\ No newline at end of file
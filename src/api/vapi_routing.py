@@ -10,8 +10,13 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 import structlog
 
+from .phrase_matcher import phrase_lexicon, IncrementalPhraseCounter, PhraseMatches
+
 logger = structlog.get_logger(__name__)
 
+# Utterances kept per call for history scoring (matches the webhook cache)
+HISTORY_WINDOW = 20
+
 @dataclass
 class PersonaScores:
     """Persona detection scores for routing decisions."""
@@ -96,56 +101,67 @@ class VAPISquadRouter:
                 "opportunity_seeking": ["opportunity", "potential", "possible", "chance"]
             }
         }
+        
+        # Compile all indicators and context clues into the shared lexicon
+        phrase_lexicon.register("routing.indicator", self.persona_indicators)
+        phrase_lexicon.register("routing.context", {
+            f"{persona}:{category}": clues
+            for persona, categories in self.context_clues.items()
+            for category, clues in categories.items()
+        })
+        self.history_counter = IncrementalPhraseCounter(
+            phrase_lexicon, "routing.indicator", window=HISTORY_WINDOW
+        )
     
-    def analyze_conversation_text(self, text: str, conversation_history: List[str] = None) -> PersonaScores:
+    def analyze_conversation_text(self, text: str, conversation_history: List[str] = None,
+                                  call_id: Optional[str] = None) -> PersonaScores:
         """
         Analyze conversation text to determine persona scores.
         
         Args:
             text: Recent conversation text
             conversation_history: Full conversation history for context
+            call_id: Call identifier; when given, history scoring uses running
+                per-call counts and only ``text`` (the new utterance) is scanned
             
         Returns:
             PersonaScores with confidence levels for each persona
         """
-        text_lower = text.lower()
+        matches = phrase_lexicon.scan(text)
         scores = PersonaScores()
         
         # Analyze recent text
-        for persona, indicators in self.persona_indicators.items():
-            score = 0.0
-            matches = 0
-            
-            for indicator in indicators:
-                if indicator.lower() in text_lower:
-                    matches += 1
-                    score += 1.0
+        for persona in self.persona_indicators:
+            matched = matches.distinct("routing.indicator", persona)
+            score = float(matched)
             
             # Bonus for multiple matches
-            if matches > 1:
-                score += matches * 0.5
+            if matched > 1:
+                score += matched * 0.5
             
             # Context analysis
             if persona in self.context_clues:
-                context_score = self._analyze_context(text_lower, self.context_clues[persona])
-                score += context_score
+                score += self._analyze_context(matches, persona)
             
             # Normalize score
             setattr(scores, persona, min(score / 10.0, 1.0))
         
         # Analyze conversation history if available
-        if conversation_history:
+        if call_id is not None:
+            history_counts = self.history_counter.observe(call_id, text)
+            scores = self._combine_scores(scores, self._history_scores(history_counts))
+        elif conversation_history:
             history_scores = self._analyze_conversation_history(conversation_history)
             scores = self._combine_scores(scores, history_scores)
         
         return scores
     
-    def _analyze_context(self, text: str, context_clues: Dict[str, List[str]]) -> float:
+    def _analyze_context(self, matches: PhraseMatches, persona: str) -> float:
         """Analyze contextual clues for deeper persona understanding."""
         total_score = 0.0
         
-        for category, clues in context_clues.items():
-            category_matches = sum(1 for clue in clues if clue in text)
+        for category in self.context_clues[persona]:
+            category_matches = matches.distinct("routing.context", f"{persona}:{category}")
             if category_matches > 0:
                 total_score += category_matches * 0.3
         
@@ -153,17 +169,15 @@ class VAPISquadRouter:
     
     def _analyze_conversation_history(self, history: List[str]) -> PersonaScores:
         """Analyze full conversation history for patterns."""
-        combined_text = " ".join(history).lower()
-        
-        # Look for patterns across the conversation
+        combined = phrase_lexicon.scan(" ".join(history))
+        return self._history_scores(combined.group_occurrences("routing.indicator"))
+    
+    def _history_scores(self, indicator_counts: Dict[str, int]) -> PersonaScores:
+        """Convert indicator occurrence counts into history persona scores."""
         scores = PersonaScores()
         
-        for persona, indicators in self.persona_indicators.items():
-            pattern_score = 0.0
-            
-            # Count indicator frequency
-            for indicator in indicators:
-                pattern_score += combined_text.count(indicator.lower()) * 0.2
+        for persona in self.persona_indicators:
+            pattern_score = indicator_counts.get(persona, 0) * 0.2
             
             # Normalize
             setattr(scores, persona, min(pattern_score / 5.0, 1.0))
@@ -184,7 +198,8 @@ class VAPISquadRouter:
         return combined
     
     def get_routing_recommendation(self, text: str, conversation_history: List[str] = None, 
-                                 current_assistant: str = None) -> RoutingRecommendation:
+                                 current_assistant: str = None,
+                                 call_id: Optional[str] = None) -> RoutingRecommendation:
         """
         Get routing recommendation based on conversation analysis.
         
@@ -192,11 +207,12 @@ class VAPISquadRouter:
             text: Recent conversation text
             conversation_history: Full conversation history
             current_assistant: Currently active assistant ID
+            call_id: Call identifier for incremental history scoring
             
         Returns:
             RoutingRecommendation with suggested persona and reasoning
         """
-        scores = self.analyze_conversation_text(text, conversation_history)
+        scores = self.analyze_conversation_text(text, conversation_history, call_id=call_id)
         
         # Find highest scoring persona
         persona_scores = {
@@ -278,7 +294,8 @@ def get_router() -> VAPISquadRouter:
     return _router
 
 async def detect_persona_webhook(text: str, conversation_history: List[str] = None, 
-                                current_assistant: str = None) -> Dict[str, Any]:
+                                current_assistant: str = None,
+                                call_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Webhook function for persona detection and routing.
     
@@ -289,7 +306,8 @@ async def detect_persona_webhook(text: str, conversation_history: List[str] = No
         recommendation = router.get_routing_recommendation(
             text=text,
             conversation_history=conversation_history,
-            current_assistant=current_assistant
+            current_assistant=current_assistant,
+            call_id=call_id
         )
         
         return {
@@ -15,6 +15,17 @@ import asyncio
 import structlog
 import os
 
+try:
+    from ..core.admission import Lane, get_admission_controller
+    from ..core.conversation_store import create_conversation_store
+    from ..db.kb_queries import KnowledgeQuery, KB_ANSWER_COLUMNS
+except ImportError:
+    from core.admission import Lane, get_admission_controller
+    from core.conversation_store import create_conversation_store
+    from db.kb_queries import KnowledgeQuery, KB_ANSWER_COLUMNS
+
+from .responses import trusted_response
+
 logger = structlog.get_logger(__name__)
 
 # Create VAPI webhook router
@@ -71,8 +82,9 @@ class VAPIWebhookResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(None, description="Response metadata")
 
 
-# In-memory cache for conversation context (use Redis in production)
-conversation_cache = {}
+# Per-call conversation context, TTL-evicted and shared across workers
+# when CONVERSATION_STATE_URL points at a file or Redis backend
+conversation_cache = create_conversation_store("vapi.call")
 
 
 async def search_knowledge_base(query: str, state: Optional[str] = None, 
@@ -164,19 +176,7 @@ async def search_knowledge_base(query: str, state: Optional[str] = None,
                 best_result = search_results[0]
                 logger.info(f"Found result with score: {best_result.score}, question: {best_result.question[:50]}...")
                 
-                return {
-                    "answer": best_result.answer,
-                    "category": best_result.category or category or "general",
-                    "confidence": best_result.score,
-                    "source": "knowledge_base",  # Fixed: source is not a field in SearchResult
-                    "state": best_result.state or state,  # Use result's state if available
-                    "voice_optimized": True,
-                    "match_type": best_result.match_type,
-                    "metadata": {
-                        "question_id": best_result.id,
-                        "retrieval_time_ms": best_result.retrieval_time_ms
-                    }
-                }
+                return _voice_answer(best_result, category, state)
             else:
                 logger.warning(f"No results found for query: {query}")
         else:
@@ -191,25 +191,15 @@ async def search_knowledge_base(query: str, state: Optional[str] = None,
         if not _enhanced_retriever and _driver and _driver.database_manager:
             logger.info(f"Using SQL fallback for query: {query}")
             
-            # Escape query for SQL
-            safe_query = query.replace("'", "''")
-            
-            # Build SQL query
-            sql = f"""
-                SELECT id, question, answer, category, state, tags, priority
-                FROM knowledge_base 
-                WHERE (question LIKE '%{safe_query}%' OR answer LIKE '%{safe_query}%')
-            """
-            
-            # Add filters if provided
-            if state:
-                sql += f" AND state = '{state.upper()}'"
-            if category:
-                sql += f" AND category = '{category}'"
+            query_spec = (KnowledgeQuery(KB_ANSWER_COLUMNS)
+                          .matching(query, ("question", "answer"))
+                          .where("state", state.upper() if state else None)
+                          .where("category", category)
+                          .order_by_priority()
+                          .limit(limit)
+                          .build())
             
-            sql += f" ORDER BY priority DESC, id LIMIT {limit}"
-            
-            result = await _driver.database_manager.execute_query(sql)
+            result = await _driver.database_manager.execute_query(query_spec.sql, query_spec.params)
             
             if result.rows and len(result.rows) > 0:
                 row = result.rows[0]
@@ -234,6 +224,28 @@ async def search_knowledge_base(query: str, state: Optional[str] = None,
         logger.error(f"Error searching knowledge base: {e}")
     
     # Default response if no results or error
+    return _default_answer(category, state)
+
+
+def _voice_answer(best_result, category: Optional[str], state: Optional[str]) -> Dict[str, Any]:
+    """Voice response for the best search result."""
+    return {
+        "answer": best_result.answer,
+        "category": best_result.category or category or "general",
+        "confidence": best_result.score,
+        "source": "knowledge_base",  # Fixed: source is not a field in SearchResult
+        "state": best_result.state or state,  # Use result's state if available
+        "voice_optimized": True,
+        "match_type": best_result.match_type,
+        "metadata": {
+            "question_id": best_result.id,
+            "retrieval_time_ms": best_result.retrieval_time_ms
+        }
+    }
+
+
+def _default_answer(category: Optional[str], state: Optional[str]) -> Dict[str, Any]:
+    """Voice response when the knowledge base has no answer."""
     default_answer = "I can help you with contractor licensing information. "
     if state:
         default_answer += f"For {state}, "
@@ -249,6 +261,42 @@ async def search_knowledge_base(query: str, state: Optional[str] = None,
     }
 
 
+async def search_knowledge_many(searches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Answer several knowledge searches from one VAPI message together.
+    
+    With the shared enhanced retriever, all searches go through one
+    search_many() call, which runs duplicate queries once. Without it,
+    each search goes through search_knowledge_base() concurrently.
+    
+    Args:
+        searches: search_knowledge_base() keyword arguments per search
+        
+    Returns:
+        Voice responses in the order of the searches
+    """
+    from shared_state import get_enhanced_retriever
+    retriever = get_enhanced_retriever()
+    if retriever is None:
+        return list(await asyncio.gather(*(search_knowledge_base(**search) for search in searches)))
+    
+    from retrieval.enhanced_search import SearchQuery
+    try:
+        batches = await retriever.search_many([
+            SearchQuery(search.get("query", ""), search.get("category"), search.get("state"), search.get("limit", 3))
+            for search in searches
+        ])
+    except Exception as e:
+        logger.error(f"Batch knowledge search failed: {e}")
+        batches = [[] for _ in searches]
+    
+    return [
+        _voice_answer(results[0], search.get("category"), search.get("state")) if results
+        else _default_answer(search.get("category"), search.get("state"))
+        for search, results in zip(searches, batches)
+    ]
+
+
 async def detect_persona(conversation_text: str, call_id: str, 
                        assistant_id: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -259,30 +307,28 @@ async def detect_persona(conversation_text: str, call_id: str,
         from .vapi_routing import detect_persona_webhook
         
         # Get conversation history from cache
-        cached_data = conversation_cache.get(call_id, {})
+        cached_data = await conversation_cache.aget(call_id) or {}
         conversation_history = cached_data.get("history", [])
         
         # Add current text to history
         conversation_history.append(conversation_text)
-        
-        # Update cache
-        if call_id not in conversation_cache:
-            conversation_cache[call_id] = {}
-        conversation_cache[call_id]["history"] = conversation_history[-20:]  # Keep last 20 messages
+        cached_data["history"] = conversation_history[-20:]  # Keep last 20 messages
         
         # Use advanced routing system
         result = await detect_persona_webhook(
             text=conversation_text,
             conversation_history=conversation_history,
-            current_assistant=assistant_id
+            current_assistant=assistant_id,
+            call_id=call_id
         )
         
         # Cache detected persona
-        conversation_cache[call_id].update({
+        cached_data.update({
             "persona": result["detected_persona"],
             "confidence": result["confidence"],
             "detected_at": datetime.utcnow().isoformat()
         })
+        conversation_cache.put(call_id, cached_data)
         
         return result
         
@@ -315,7 +361,7 @@ async def calculate_trust_score(call_id: str, events: List[Dict]) -> Dict[str, A
     Calculate trust score based on conversation events.
     """
     # Get current score from cache or start at baseline
-    cached_data = conversation_cache.get(call_id, {})
+    cached_data = await conversation_cache.aget(call_id) or {}
     current_score = cached_data.get("trust_score", 45.0)
     
     # Process events
@@ -326,9 +372,8 @@ async def calculate_trust_score(call_id: str, events: List[Dict]) -> Dict[str, A
             current_score = max(0, current_score - 5)
     
     # Update cache
-    if call_id not in conversation_cache:
-        conversation_cache[call_id] = {}
-    conversation_cache[call_id]["trust_score"] = current_score
+    cached_data["trust_score"] = current_score
+    conversation_cache.put(call_id, cached_data)
     
     # Determine response strategy
     if current_score >= 70:
@@ -349,6 +394,12 @@ async def calculate_trust_score(call_id: str, events: List[Dict]) -> Dict[str, A
     }
 
 
+def shed_answer(parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fallback voice answer for a function call shed by admission control."""
+    parameters = parameters or {}
+    return dict(_default_answer(parameters.get("category"), parameters.get("state")), shed=True)
+
+
 @router.post("/webhook", response_model=VAPIWebhookResponse, dependencies=[Depends(verify_vapi_request)])
 async def vapi_webhook(request: VAPIWebhookRequest):
     """
@@ -356,7 +407,24 @@ async def vapi_webhook(request: VAPIWebhookRequest):
     
     Processes VAPI function calls and returns voice-optimized responses.
     Secured with signature verification and optional API key.
+    
+    Calls go through admission control; when the server can't answer
+    within VAPI's timeout, the default answer is returned at once.
     """
+    admission = get_admission_controller()
+    ticket = await admission.admit("vapi_webhook", Lane.VOICE, admission.voice_deadline("vapi_webhook"))
+    if ticket is None:
+        function_call = request.message.functionCall
+        return trusted_response(VAPIWebhookResponse(
+            result=shed_answer(function_call.parameters if function_call else None),
+            metadata={"call_id": request.call.id, "function": function_call.name if function_call else None,
+                      "shed": True}
+        ))
+    with ticket:
+        return await _handle_webhook(request)
+
+
+async def _handle_webhook(request: VAPIWebhookRequest):
     try:
         logger.info(f"VAPI webhook called", 
                    function=request.message.functionCall.name if request.message.functionCall else None,
@@ -376,10 +444,10 @@ async def vapi_webhook(request: VAPIWebhookRequest):
                     limit=parameters.get("limit", 3)
                 )
                 
-                return VAPIWebhookResponse(
+                return trusted_response(VAPIWebhookResponse(
                     result=result,
                     metadata={"call_id": request.call.id, "function": "searchKnowledge"}
-                )
+                ))
             
             elif function_name == "detectPersona":
                 # Detect caller persona with enhanced routing
@@ -389,10 +457,10 @@ async def vapi_webhook(request: VAPIWebhookRequest):
                     assistant_id=request.call.assistantId
                 )
                 
-                return VAPIWebhookResponse(
+                return trusted_response(VAPIWebhookResponse(
                     result=result,
                     metadata={"call_id": request.call.id, "function": "detectPersona"}
-                )
+                ))
             
             elif function_name == "calculateTrust":
                 # Calculate trust score
@@ -401,10 +469,10 @@ async def vapi_webhook(request: VAPIWebhookRequest):
                     events=parameters.get("events", [])
                 )
                 
-                return VAPIWebhookResponse(
+                return trusted_response(VAPIWebhookResponse(
                     result=result,
                     metadata={"call_id": request.call.id, "function": "calculateTrust"}
-                )
+                ))
             
             elif function_name == "getStateRequirements":
                 # Get state-specific requirements
@@ -415,15 +483,15 @@ async def vapi_webhook(request: VAPIWebhookRequest):
                     category="state_licensing_requirements"
                 )
                 
-                return VAPIWebhookResponse(
+                return trusted_response(VAPIWebhookResponse(
                     result=result,
                     metadata={"call_id": request.call.id, "function": "getStateRequirements"}
-                )
+                ))
             
             elif function_name == "handleObjection":
                 # Handle objection
                 objection_type = parameters.get("type", "general")
-                persona = conversation_cache.get(request.call.id, {}).get("persona", "general_inquirer")
+                persona = (await conversation_cache.aget(request.call.id) or {}).get("persona", "general_inquirer")
                 
                 objection_responses = {
                     "too_expensive": "I understand cost is important. Most contractors recover their licensing investment within 2 months. Would you like to hear how?",
@@ -432,37 +500,37 @@ async def vapi_webhook(request: VAPIWebhookRequest):
                     "general": "I understand. Let me help address your specific concerns."
                 }
                 
-                return VAPIWebhookResponse(
+                return trusted_response(VAPIWebhookResponse(
                     result={
                         "response": objection_responses.get(objection_type, objection_responses["general"]),
                         "follow_up": "Would you like to hear from someone who had similar concerns?",
                         "persona_adjusted": persona != "general_inquirer"
                     },
                     metadata={"call_id": request.call.id, "function": "handleObjection"}
-                )
+                ))
             
             else:
                 # Unknown function
                 logger.warning(f"Unknown function called: {function_name}")
-                return VAPIWebhookResponse(
+                return trusted_response(VAPIWebhookResponse(
                     result={"message": "I can help you with contractor licensing information."},
                     error=f"Unknown function: {function_name}",
                     metadata={"call_id": request.call.id}
-                )
+                ))
         
         # Handle other message types
-        return VAPIWebhookResponse(
+        return trusted_response(VAPIWebhookResponse(
             result={"message": "Message received"},
             metadata={"call_id": request.call.id, "message_type": request.message.type}
-        )
+        ))
         
     except Exception as e:
         logger.error(f"VAPI webhook error: {e}")
-        return VAPIWebhookResponse(
+        return trusted_response(VAPIWebhookResponse(
             result={"message": "I'm having trouble accessing that information right now."},
             error=str(e),
             metadata={"call_id": request.call.id if request.call else "unknown"}
-        )
+        ))
 
 
 @router.post("/webhook/call-status", dependencies=[Depends(verify_vapi_request)])
@@ -479,11 +547,16 @@ async def vapi_call_status(request: Request):
         
         logger.info(f"VAPI call status update", call_id=call_id, status=status)
         
-        if status == "ended":
-            # Clean up conversation cache
-            if call_id in conversation_cache:
-                del conversation_cache[call_id]
-                logger.info(f"Cleaned up cache for call {call_id}")
+        if status == "ended" and call_id:
+            # Let per-call state expire after the post-call grace period
+            from .vapi_conversation_scoring import conversation_scorer
+            await conversation_cache.refresh(call_id)
+            await conversation_scorer.store.refresh(call_id)
+            conversation_cache.end(call_id)
+            conversation_scorer.end_conversation(call_id)
+            from .vapi_routing import get_router
+            get_router().history_counter.reset(call_id)
+            logger.info(f"Scheduled state eviction for call {call_id}")
         
         return {"status": "received", "call_id": call_id}
         
@@ -9,16 +9,19 @@ and execution in containerized environments.
 try:
     from .client import ArcadeClient
     from .gateway import ArcadeGateway
+    from .routing import ExecutionRouter
     from .errors import ArcadeError, ArcadeConnectionError, ArcadeExecutionError
 except ImportError:
     # Fallback to absolute imports when called from scripts
     from arcade.client import ArcadeClient
     from arcade.gateway import ArcadeGateway
+    from arcade.routing import ExecutionRouter
     from arcade.errors import ArcadeError, ArcadeConnectionError, ArcadeExecutionError
 
 __all__ = [
     'ArcadeClient',
     'ArcadeGateway', 
+    'ExecutionRouter',
     'ArcadeError',
     'ArcadeConnectionError',
     'ArcadeExecutionError'
@@ -7,6 +7,7 @@ tool hosting and execution platform using the arcadepy library.
 
 import asyncio
 import json
+import random
 import time
 from typing import Dict, Any, List, Optional, Union
 import structlog
@@ -65,7 +66,11 @@ class ArcadeClient:
                  api_key: Optional[str] = None,
                  base_url: Optional[str] = None,
                  timeout: int = 30,
-                 max_retries: int = 3):
+                 max_retries: int = 3,
+                 backoff_base: float = 0.25,
+                 backoff_cap: float = 4.0,
+                 attempt_timeout: Optional[float] = None,
+                 client: Optional[Any] = None):
         """
         Initialize Arcade client.
         
@@ -74,18 +79,26 @@ class ArcadeClient:
             base_url: Base URL for Arcade.dev API
             timeout: Request timeout in seconds
             max_retries: Maximum retry attempts
+            backoff_base: Base delay for jittered exponential backoff in seconds
+            backoff_cap: Maximum backoff delay in seconds
+            attempt_timeout: Per-attempt timeout so one slow attempt cannot
+                consume the whole deadline (defaults to the remaining budget)
+            client: Pre-built arcadepy-compatible client (e.g. a fake for tests)
         """
-        if not ARCADE_AVAILABLE:
+        if not ARCADE_AVAILABLE and client is None:
             raise ImportError("arcadepy library not available. Install with: pip install arcadepy")
         
         self.api_key = api_key
         self.base_url = base_url or "https://api.arcade.dev"
         self.timeout = timeout
         self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.attempt_timeout = attempt_timeout
         
         # Initialize arcade client
-        self._client = None
-        self._connected = False
+        self._client = client
+        self._connected = client is not None
         
         logger.info("ArcadeClient initialized",
                    base_url=self.base_url,
@@ -169,11 +182,9 @@ class ArcadeClient:
             if user_id:
                 execution_request["user_id"] = user_id
             
-            # Execute tool with timeout
-            result = await asyncio.wait_for(
-                self._execute_with_retry(execution_request),
-                timeout=execution_timeout
-            )
+            # Execute tool with retries bounded by a single deadline
+            deadline = time.monotonic() + execution_timeout
+            result = await self._execute_with_retry(execution_request, deadline)
             
             execution_time = (time.time() - start_time) * 1000
             
@@ -184,7 +195,7 @@ class ArcadeClient:
             
             return self._process_execution_result(result, execution_time)
             
-        except asyncio.TimeoutError:
+        except (asyncio.TimeoutError, ArcadeTimeoutError):
             execution_time = (time.time() - start_time) * 1000
             logger.error("Tool execution timed out",
                         tool_name=tool_name,
@@ -400,28 +411,63 @@ class ArcadeClient:
             logger.error("Connection test failed", error=str(e))
             raise
     
-    async def _execute_with_retry(self, execution_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute tool with retry logic."""
+    async def _execute_with_retry(self,
+                                  execution_request: Dict[str, Any],
+                                  deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute tool with retry logic inside a deadline.
+        
+        Each attempt is bounded by attempt_timeout (or the remaining budget),
+        and retries wait a full-jitter exponential backoff that is skipped
+        when it would not leave time for another attempt.
+        
+        Args:
+            execution_request: Request payload for the Arcade client
+            deadline: time.monotonic() value by which execution must finish
+            
+        Raises:
+            ArcadeTimeoutError: If the deadline passes before any attempt succeeds
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
         last_error = None
         
         for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            attempt_budget = min(remaining, self.attempt_timeout or remaining)
+            
             try:
-                return await self._client.tools.execute(execution_request)
+                return await asyncio.wait_for(
+                    self._client.tools.execute(execution_request),
+                    timeout=attempt_budget
+                )
             except Exception as e:
                 last_error = e
-                if attempt < self.max_retries:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    logger.warning("Tool execution attempt failed, retrying",
-                                 attempt=attempt + 1,
-                                 max_retries=self.max_retries,
-                                 wait_time=wait_time,
-                                 error=str(e))
-                    await asyncio.sleep(wait_time)
-                else:
+                if attempt >= self.max_retries:
                     logger.error("All retry attempts exhausted",
                                attempts=self.max_retries + 1,
-                               error=str(e))
+                               error=str(e) or type(e).__name__)
+                    break
+                
+                # Full jitter keeps concurrent callers from retrying in lockstep
+                wait_time = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+                if time.monotonic() + wait_time >= deadline:
+                    logger.warning("No time left in deadline for another attempt",
+                                 attempt=attempt + 1,
+                                 error=str(e) or type(e).__name__)
+                    break
+                
+                logger.warning("Tool execution attempt failed, retrying",
+                             attempt=attempt + 1,
+                             max_retries=self.max_retries,
+                             wait_time=wait_time,
+                             error=str(e) or type(e).__name__)
+                await asyncio.sleep(wait_time)
         
+        if last_error is None or isinstance(last_error, asyncio.TimeoutError):
+            raise ArcadeTimeoutError("Deadline exceeded before tool execution completed")
         raise last_error
     
     def _process_execution_result(self, result: Dict[str, Any], execution_time: float) -> Dict[str, Any]:
@@ -6,13 +6,15 @@ requests between local execution and Arcade.dev platform.
 """
 
 import asyncio
-from typing import Dict, Any, Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
 import structlog
 
 try:
     # Try relative imports first (when used as package)
     from .client import ArcadeClient
-    from .errors import ArcadeError, ArcadeExecutionError
+    from .errors import ArcadeError, ArcadeExecutionError, ArcadeTimeoutError
+    from .routing import ExecutionRouter
     from ..core.errors import ToolExecutionError
 except ImportError:
     # Fall back to absolute imports (when run as script)
@@ -24,7 +26,8 @@ except ImportError:
         sys.path.insert(0, src_path)
     
     from arcade.client import ArcadeClient
-    from arcade.errors import ArcadeError, ArcadeExecutionError
+    from arcade.errors import ArcadeError, ArcadeExecutionError, ArcadeTimeoutError
+    from arcade.routing import ExecutionRouter
     from core.errors import ToolExecutionError
 
 
@@ -42,7 +45,10 @@ class ArcadeGateway:
     def __init__(self, 
                  arcade_client: Optional[ArcadeClient] = None,
                  enable_fallback: bool = True,
-                 prefer_arcade: bool = False):
+                 prefer_arcade: bool = False,
+                 router: Optional[ExecutionRouter] = None,
+                 idempotent_tools: Optional[Iterable[str]] = None,
+                 enable_hedging: bool = True):
         """
         Initialize Arcade gateway.
         
@@ -50,31 +56,51 @@ class ArcadeGateway:
             arcade_client: Optional Arcade client for remote execution
             enable_fallback: Whether to fallback to local execution on Arcade failure
             prefer_arcade: Whether to prefer Arcade execution over local
+            router: Latency/error tracker used to order methods (created if omitted)
+            idempotent_tools: Tools that are safe to hedge with a duplicate request
+            enable_hedging: Whether idempotent tools are hedged after the p95 delay
         """
         self.arcade_client = arcade_client
         self.enable_fallback = enable_fallback
         self.prefer_arcade = prefer_arcade
+        self.router = router or ExecutionRouter()
+        self.idempotent_tools = set(idempotent_tools or [])
+        self.enable_hedging = enable_hedging
+        self.stats = {
+            "executions": 0,
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+            "circuit_rejections": 0
+        }
         
         logger.info("ArcadeGateway initialized",
                    has_arcade_client=bool(arcade_client),
                    enable_fallback=enable_fallback,
-                   prefer_arcade=prefer_arcade)
+                   prefer_arcade=prefer_arcade,
+                   idempotent_tools=len(self.idempotent_tools))
     
     async def execute_tool(self,
                           tool_name: str,
                           arguments: Dict[str, Any],
                           local_function: Optional[callable] = None,
                           user_id: Optional[str] = None,
-                          timeout: Optional[int] = None) -> Dict[str, Any]:
+                          timeout: Optional[int] = None,
+                          idempotent: Optional[bool] = None) -> Dict[str, Any]:
         """
         Execute a tool using the best available method.
         
+        Methods are ordered by observed latency and error rate, methods whose
+        per-tool circuit is open are skipped, and idempotent tools are hedged
+        with a second request once the first exceeds the p95 latency. The
+        timeout is a deadline shared by every method tried.
+        
         Args:
             tool_name: Name of the tool to execute
             arguments: Tool arguments
             local_function: Local function to execute if available
             user_id: Optional user identifier
             timeout: Execution timeout
+            idempotent: Override whether the tool may be hedged
             
         Returns:
             Tool execution result
@@ -82,43 +108,59 @@ class ArcadeGateway:
         Raises:
             ToolExecutionError: If execution fails on all available methods
         """
-        execution_methods = self._determine_execution_order(tool_name, local_function)
+        self.stats["executions"] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        if idempotent is None:
+            idempotent = tool_name in self.idempotent_tools
+        
+        preferred = self._determine_execution_order(tool_name, local_function)
+        execution_methods = self.router.order(tool_name, preferred)
+        if len(execution_methods) < len(preferred):
+            self.stats["circuit_rejections"] += len(preferred) - len(execution_methods)
         
         last_error = None
         
         for method in execution_methods:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                last_error = last_error or ArcadeTimeoutError(f"Deadline of {timeout} seconds exceeded")
+                break
+            
             try:
+                logger.debug("Attempting execution",
+                           method=method,
+                           tool_name=tool_name,
+                           user_id=user_id)
+                
                 if method == "arcade":
-                    logger.debug("Attempting Arcade execution",
-                               tool_name=tool_name,
-                               user_id=user_id)
-                    
-                    result = await self._execute_via_arcade(
-                        tool_name, arguments, user_id, timeout
+                    attempt = lambda: self._execute_via_arcade(
+                        tool_name, arguments, user_id, remaining
                     )
-                    
-                    logger.info("Tool executed successfully via Arcade",
-                               tool_name=tool_name,
-                               user_id=user_id)
-                    
-                    return result
-                
-                elif method == "local":
-                    logger.debug("Attempting local execution",
-                               tool_name=tool_name,
-                               user_id=user_id)
-                    
-                    result = await self._execute_locally(
+                else:
+                    attempt = lambda: self._execute_locally(
                         tool_name, local_function, arguments
                     )
-                    
-                    logger.info("Tool executed successfully locally",
-                               tool_name=tool_name,
-                               user_id=user_id)
-                    
-                    return result
+                
+                hedge_delay = None
+                if idempotent and self.enable_hedging:
+                    hedge_delay = self.router.hedge_delay(tool_name, method)
+                
+                result = await asyncio.wait_for(
+                    self._execute_measured(tool_name, method, attempt, hedge_delay),
+                    timeout=remaining
+                )
+                
+                logger.info("Tool executed successfully",
+                           method=method,
+                           tool_name=tool_name,
+                           user_id=user_id)
+                
+                return result
                     
             except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = ArcadeTimeoutError(f"Deadline of {timeout} seconds exceeded")
                 last_error = e
                 logger.warning("Execution method failed",
                              method=method,
@@ -127,7 +169,10 @@ class ArcadeGateway:
                 
                 # If this is the last method and fallback is disabled, raise immediately
                 if not self.enable_fallback and method == execution_methods[0]:
-                    raise
+                    raise e
+        
+        if last_error is None and preferred:
+            last_error = ArcadeExecutionError("Circuit open for every execution method")
         
         # All methods failed
         error_msg = f"Tool execution failed on all available methods. Last error: {str(last_error)}"
@@ -138,6 +183,63 @@ class ArcadeGateway:
         
         raise ToolExecutionError(error_msg)
     
+    async def _execute_measured(self,
+                               tool_name: str,
+                               method: str,
+                               attempt: Callable[[], Awaitable[Dict[str, Any]]],
+                               hedge_delay: Optional[float]) -> Dict[str, Any]:
+        """Run one method (hedged if a delay is given) and record its latency and outcome."""
+        start = time.perf_counter()
+        try:
+            if hedge_delay is None:
+                result = await attempt()
+            else:
+                result = await self._execute_hedged(attempt, hedge_delay)
+        except asyncio.CancelledError:
+            # Deadline cancellations count against the method too
+            self.router.record(tool_name, method, (time.perf_counter() - start) * 1000, False)
+            raise
+        except Exception:
+            self.router.record(tool_name, method, (time.perf_counter() - start) * 1000, False)
+            raise
+        self.router.record(tool_name, method, (time.perf_counter() - start) * 1000, True)
+        return result
+    
+    async def _execute_hedged(self,
+                             attempt: Callable[[], Awaitable[Dict[str, Any]]],
+                             delay: float) -> Dict[str, Any]:
+        """
+        Start a second identical request if the first has not finished after delay.
+        
+        The first successful response wins and the other request is cancelled;
+        an error is only raised once both requests have failed.
+        """
+        primary = asyncio.ensure_future(attempt())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            
+            self.stats["hedged_requests"] += 1
+            hedge = asyncio.ensure_future(attempt())
+            tasks.add(hedge)
+            pending = set(tasks)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
     def _determine_execution_order(self, 
                                   tool_name: str, 
                                   local_function: Optional[callable]) -> list:
@@ -184,7 +286,7 @@ class ArcadeGateway:
                                  tool_name: str,
                                  arguments: Dict[str, Any],
                                  user_id: Optional[str],
-                                 timeout: Optional[int]) -> Dict[str, Any]:
+                                 timeout: Optional[float]) -> Dict[str, Any]:
         """
         Execute tool via Arcade.dev platform.
         
@@ -316,13 +418,18 @@ class ArcadeGateway:
             "arcade_client_configured": bool(self.arcade_client),
             "fallback_enabled": self.enable_fallback,
             "prefer_arcade": self.prefer_arcade,
-            "available_methods": ["arcade"] if self.arcade_client else [] + ["local"]
+            "available_methods": (["arcade"] if self.arcade_client else []) + ["local"],
+            "hedging_enabled": self.enable_hedging,
+            "idempotent_tools": sorted(self.idempotent_tools),
+            **self.stats,
+            "routing": self.router.get_stats()
         }
 
 
 def create_arcade_gateway(arcade_client: Optional[ArcadeClient] = None,
                          enable_fallback: bool = True,
-                         prefer_arcade: bool = False) -> ArcadeGateway:
+                         prefer_arcade: bool = False,
+                         idempotent_tools: Optional[Iterable[str]] = None) -> ArcadeGateway:
     """
     Create and configure an Arcade gateway.
     
@@ -330,6 +437,7 @@ def create_arcade_gateway(arcade_client: Optional[ArcadeClient] = None,
         arcade_client: Optional Arcade client
         enable_fallback: Whether to enable fallback between methods
         prefer_arcade: Whether to prefer Arcade over local execution
+        idempotent_tools: Tools that may be hedged with duplicate requests
         
     Returns:
         Configured ArcadeGateway instance
@@ -337,5 +445,6 @@ def create_arcade_gateway(arcade_client: Optional[ArcadeClient] = None,
     return ArcadeGateway(
         arcade_client=arcade_client,
         enable_fallback=enable_fallback,
-        prefer_arcade=prefer_arcade
+        prefer_arcade=prefer_arcade,
+        idempotent_tools=idempotent_tools
     )
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+FACT System Arcade Execution Routing
+
+This module tracks per-tool latency and error rates for each execution
+method (Arcade or local) and uses them to order methods, decide when to
+hedge idempotent requests and gate methods behind per-tool circuit
+breakers.
+"""
+
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import structlog
+
+try:
+    # Try relative imports first (when used as package)
+    from ..cache.resilience import CacheCircuitBreaker, CircuitBreakerConfig
+except ImportError:
+    # Fall back to absolute imports (when run as script)
+    import sys
+    from pathlib import Path
+    # Add src to path if not already there
+    src_path = str(Path(__file__).parent.parent)
+    if src_path not in sys.path:
+        sys.path.insert(0, src_path)
+
+    from cache.resilience import CacheCircuitBreaker, CircuitBreakerConfig
+
+
+logger = structlog.get_logger(__name__)
+
+
+class MethodStats:
+    """
+    Exponentially weighted latency and error rate for one (tool, method).
+
+    A bounded window of recent successful latencies is kept for percentile
+    estimates used as the hedging delay.
+    """
+
+    __slots__ = ("alpha", "latency_ms", "error_rate", "samples", "_window")
+
+    def __init__(self, alpha: float = 0.2, window: int = 100):
+        self.alpha = alpha
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self._window: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_ms: float, success: bool) -> None:
+        self.samples += 1
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.alpha * (latency_ms - self.latency_ms)
+        self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+        if success:
+            self._window.append(latency_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile over the recent window, or None without data."""
+        if not self._window:
+            return None
+        ordered = sorted(self._window)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "ewma_latency_ms": self.latency_ms,
+            "ewma_error_rate": self.error_rate,
+            "samples": self.samples,
+            "p95_latency_ms": self.percentile(95)
+        }
+
+
+class ExecutionRouter:
+    """
+    Latency-aware ordering of execution methods per tool.
+
+    Each method is scored by its EWMA latency inflated by its EWMA error rate
+    (a method failing half the time costs twice its latency plus the penalty).
+    Methods are only reordered once every candidate has min_samples
+    observations, so the configured preference holds until there is data;
+    a small exploration rate promotes under-sampled methods so a healthy
+    primary does not hide a faster alternative forever.
+    """
+
+    def __init__(self,
+                 alpha: float = 0.2,
+                 min_samples: int = 5,
+                 error_penalty_ms: float = 1000.0,
+                 hedge_percentile: float = 95.0,
+                 min_hedge_delay_ms: float = 10.0,
+                 explore_rate: float = 0.05,
+                 breaker_config: Optional[CircuitBreakerConfig] = None,
+                 rng: Optional[random.Random] = None):
+        """
+        Initialize execution router.
+
+        Args:
+            alpha: EWMA smoothing factor
+            min_samples: Observations needed per method before reordering or hedging
+            error_penalty_ms: Latency charged for a failed attempt when scoring
+            hedge_percentile: Latency percentile used as the hedging delay
+            min_hedge_delay_ms: Lower bound for the hedging delay
+            explore_rate: Probability of trying an under-sampled method first
+            breaker_config: Circuit breaker configuration for every (tool, method)
+            rng: Random source for exploration (injectable for tests)
+        """
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.error_penalty_ms = error_penalty_ms
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay_ms = min_hedge_delay_ms
+        self.explore_rate = explore_rate
+        self._rng = rng or random.Random()
+        self.breaker_config = breaker_config or CircuitBreakerConfig(
+            failure_threshold=5, recovery_timeout=30.0, success_threshold=1
+        )
+
+        self._stats: Dict[Tuple[str, str], MethodStats] = {}
+        self._breakers: Dict[Tuple[str, str], CacheCircuitBreaker] = {}
+
+    def stats(self, tool_name: str, method: str) -> MethodStats:
+        key = (tool_name, method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = MethodStats(self.alpha)
+        return stats
+
+    def breaker(self, tool_name: str, method: str) -> CacheCircuitBreaker:
+        key = (tool_name, method)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CacheCircuitBreaker(config=self.breaker_config)
+        return breaker
+
+    def record(self, tool_name: str, method: str, latency_ms: float, success: bool) -> None:
+        """Record the outcome of one execution attempt."""
+        self.stats(tool_name, method).record(latency_ms, success)
+        breaker = self.breaker(tool_name, method)
+        if success:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def score(self, tool_name: str, method: str) -> float:
+        stats = self.stats(tool_name, method)
+        latency = stats.latency_ms or 0.0
+        return (latency + self.error_penalty_ms * stats.error_rate) / max(1e-6, 1.0 - stats.error_rate)
+
+    def order(self, tool_name: str, methods: List[str]) -> List[str]:
+        """
+        Order candidate methods for a tool.
+
+        Methods with an open circuit are dropped; the rest are sorted by score
+        once all have enough samples, otherwise the given order is kept.
+        """
+        available = [m for m in methods if self.breaker(tool_name, m).allow_request()]
+        if len(available) < 2:
+            return available
+
+        undersampled = [m for m in available if self.stats(tool_name, m).samples < self.min_samples]
+        if not undersampled:
+            # sorted() is stable, so ties keep the configured preference
+            return sorted(available, key=lambda m: self.score(tool_name, m))
+        if undersampled[0] != available[0] and self._rng.random() < self.explore_rate:
+            available.remove(undersampled[0])
+            available.insert(0, undersampled[0])
+        return available
+
+    def hedge_delay(self, tool_name: str, method: str) -> Optional[float]:
+        """Seconds to wait before hedging a request, or None if there is no data yet."""
+        stats = self.stats(tool_name, method)
+        if stats.samples < self.min_samples:
+            return None
+        delay_ms = stats.percentile(self.hedge_percentile)
+        if delay_ms is None:
+            return None
+        return max(delay_ms, self.min_hedge_delay_ms) / 1000.0
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        """Per-tool, per-method routing statistics."""
+        result: Dict[str, Dict[str, object]] = {}
+        for (tool_name, method), stats in self._stats.items():
+            entry = stats.to_dict()
+            entry["circuit"] = self.breaker(tool_name, method).state.value
+            result.setdefault(tool_name, {})[method] = entry
+        return result
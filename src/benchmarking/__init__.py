@@ -45,6 +45,21 @@ from .visualization import (
     ReportSection
 )
 
+from .replay import (
+    ReplayHarness,
+    ReplayRequest,
+    LoadPhase,
+    PhaseReport,
+    load_query_log,
+    poisson_schedule,
+    format_reports
+)
+
+from .mock_llm import (
+    MockLLMServer,
+    MockLLMConfig
+)
+
 __all__ = [
     # Framework
     "BenchmarkFramework",
@@ -79,7 +94,18 @@ __all__ = [
     "ReportGenerator",
     "BenchmarkReport",
     "ChartData",
-    "ReportSection"
+    "ReportSection",
+    
+    # Replay load testing
+    "ReplayHarness",
+    "ReplayRequest",
+    "LoadPhase",
+    "PhaseReport",
+    "load_query_log",
+    "poisson_schedule",
+    "format_reports",
+    "MockLLMServer",
+    "MockLLMConfig"
 ]
 
 # Version info
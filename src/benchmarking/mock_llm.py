@@ -0,0 +1,176 @@
+"""
+FACT Mock LLM Server
+
+A local stand-in for the Groq and OpenAI chat completion APIs, for load
+tests that must not reach (or pay for) a real model. Responses are
+well-formed chat completions; latency, throughput and failures are injected
+from a seeded random generator, so a run can be repeated exactly.
+
+Point the server under test at it with GROQ_BASE_URL=http://host:port (the
+Groq SDK adds /openai/v1) or OPENAI_BASE_URL=http://host:port/v1.
+
+Usage:
+    python -m benchmarking.mock_llm --port 9100 --latency-ms 400 --jitter-ms 100
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class MockLLMConfig:
+    """Injected behaviour of the mock LLM."""
+    # Time to first token
+    latency_ms: float = 300.0
+    # Standard deviation of a normal jitter added to latency_ms (clamped at 0)
+    jitter_ms: float = 50.0
+    # Generation speed; 0 returns the completion with no per-token delay
+    tokens_per_second: float = 0.0
+    completion_tokens: int = 120
+    # Fraction of requests answered with a 500, and with a 429
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int = 0
+    model: str = "mock-llm"
+
+
+class MockLLMServer:
+    """Groq/OpenAI-compatible chat completion server with injected latency."""
+
+    def __init__(self, config: Optional[MockLLMConfig] = None):
+        """
+        Initialize the mock server.
+
+        Args:
+            config: Injected latency and failure settings
+        """
+        self.config = config or MockLLMConfig()
+        self._random = random.Random(self.config.seed)
+        self._ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+        self.requests = 0
+        self.failures = 0
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        for prefix in ("/openai/v1", "/v1"):
+            app.router.add_post(f"{prefix}/chat/completions", self._chat_completions)
+            app.router.add_get(f"{prefix}/models", self._models)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving in the running event loop.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+
+        Returns:
+            Base URL of the server
+        """
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        logger.info("Mock LLM listening", base_url=self.base_url, latency_ms=self.config.latency_ms)
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _delay_seconds(self) -> float:
+        config = self.config
+        latency = config.latency_ms + self._random.gauss(0.0, config.jitter_ms) if config.jitter_ms else config.latency_ms
+        delay = max(0.0, latency) / 1000
+        if config.tokens_per_second:
+            delay += config.completion_tokens / config.tokens_per_second
+        return delay
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": {"message": "Invalid JSON body"}}, status=400)
+
+        # Draw everything up front so the sequence doesn't depend on timing
+        delay = self._delay_seconds()
+        outcome = self._random.random()
+        await asyncio.sleep(delay)
+
+        if outcome < self.config.error_rate:
+            self.failures += 1
+            return web.json_response({"error": {"message": "Injected server error", "type": "server_error"}},
+                                     status=500)
+        if outcome < self.config.error_rate + self.config.rate_limit_rate:
+            self.failures += 1
+            return web.json_response({"error": {"message": "Injected rate limit", "type": "rate_limit"}},
+                                     status=429, headers={"retry-after": "1"})
+        return web.json_response(self._completion(payload))
+
+    def _completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        messages = payload.get("messages") or []
+        last = messages[-1].get("content", "") if messages else ""
+        if not isinstance(last, str):
+            last = json.dumps(last)
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+        return {
+            "id": f"chatcmpl-mock-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model") or self.config.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"Mock answer to: {last[:200]}"},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.config.completion_tokens,
+                "total_tokens": prompt_tokens + self.config.completion_tokens,
+            },
+        }
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [
+            {"id": self.config.model, "object": "model", "owned_by": "mock"}]})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mock Groq/OpenAI chat completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=MockLLMConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=MockLLMConfig.jitter_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=MockLLMConfig.tokens_per_second)
+    parser.add_argument("--error-rate", type=float, default=MockLLMConfig.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=MockLLMConfig.rate_limit_rate)
+    parser.add_argument("--seed", type=int, default=MockLLMConfig.seed)
+    args = parser.parse_args()
+
+    server = MockLLMServer(MockLLMConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed))
+    web.run_app(server.create_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -91,14 +91,18 @@ class SystemProfiler:
     and performance bottleneck identification.
     """
     
-    def __init__(self, sampling_interval: float = 0.1):
+    def __init__(self, sampling_interval: float = 0.1, count_processes: bool = False):
         """
         Initialize system profiler.
         
         Args:
             sampling_interval: Resource sampling interval in seconds
+            count_processes: Record the system-wide process count in snapshots.
+                This lists every pid on the machine, so it is off by default;
+                for hot functions use monitoring.sampling_profiler instead
         """
         self.sampling_interval = sampling_interval
+        self.count_processes = count_processes
         self.profile_points: List[ProfilePoint] = []
         self.system_snapshots: List[SystemSnapshot] = []
         self.active_profiles: Dict[str, float] = {}
@@ -216,7 +220,7 @@ class SystemProfiler:
                 disk_io_write_mb=disk_io.write_bytes / (1024 * 1024) if disk_io else 0,
                 network_sent_mb=network_io.bytes_sent / (1024 * 1024) if network_io else 0,
                 network_recv_mb=network_io.bytes_recv / (1024 * 1024) if network_io else 0,
-                process_count=len(psutil.pids()),
+                process_count=len(psutil.pids()) if self.count_processes else 0,
                 thread_count=threading.active_count()
             )
         except Exception as e:
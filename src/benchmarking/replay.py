@@ -0,0 +1,385 @@
+"""
+FACT Replay Load Testing
+
+Deterministic load tests against a running web server. A workload is a
+schedule of HTTP requests with fixed send offsets, either replayed from a
+recorded query log (monitoring.query_log) with the original inter-arrival
+times, or drawn as open-loop Poisson arrivals from a seeded generator.
+
+The harness is open-loop: each request is sent at its scheduled time
+whether or not earlier requests have completed, and latency is measured
+from the scheduled time rather than from the moment the request was
+actually sent. A stalled server therefore shows up as latency for every
+request it delayed, not as a pause in sending (coordinated omission).
+Service time, measured from the actual send, is reported alongside.
+
+Each phase (e.g. cold cache, then warm cache) is reported separately with
+latency percentiles, throughput, errors and the server's result cache hit
+rate, read from /metrics/workers before and after the phase.
+"""
+
+import asyncio
+import json
+import math
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import aiohttp
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Endpoint used for shorthand log records and generated workloads
+DEFAULT_SEARCH_PATH = "/knowledge/search"
+
+# Percentiles reported for every phase
+REPORTED_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+# Sends later than this after their scheduled time mean the client itself
+# fell behind; the phase report counts them
+LATE_SEND_MS = 10.0
+
+DEFAULT_QUERIES = (
+    "How long does the Georgia exam take?",
+    "What is the bond amount in Florida?",
+    "contractor license requirements texas",
+    "how much are the exam fees",
+    "can I take the test online",
+    "reciprocity between states",
+    "do I need insurance for a california license",
+    "how do I renew my license in north carolina",
+)
+
+
+@dataclass
+class ReplayRequest:
+    """One scheduled request."""
+    # Seconds after the start of the phase
+    offset: float
+    path: str
+    body: Any = None
+    method: str = "POST"
+
+
+@dataclass
+class LoadPhase:
+    """A named schedule of requests, reported on its own."""
+    name: str
+    requests: List[ReplayRequest]
+
+    @property
+    def duration(self) -> float:
+        return self.requests[-1].offset if self.requests else 0.0
+
+
+@dataclass
+class RequestOutcome:
+    """Timing of one sent request, in event loop seconds."""
+    scheduled: float
+    sent: float
+    finished: float
+    status: int
+    error: Optional[str] = None
+
+    @property
+    def latency_ms(self) -> float:
+        """Latency from the scheduled send time (corrected for coordinated omission)."""
+        return (self.finished - self.scheduled) * 1000
+
+    @property
+    def service_ms(self) -> float:
+        """Latency from the actual send time."""
+        return (self.finished - self.sent) * 1000
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 400
+
+
+@dataclass
+class PhaseReport:
+    """Results of one phase."""
+    name: str
+    requests: int
+    errors: int
+    duration_s: float
+    offered_rps: float
+    throughput_rps: float
+    latency_ms: Dict[str, float]
+    service_ms: Dict[str, float]
+    late_sends: int
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    # Result cache lookups during the phase, None when the server doesn't report them
+    cache_hits: Optional[int] = None
+    cache_misses: Optional[int] = None
+
+    @property
+    def cache_hit_rate(self) -> Optional[float]:
+        if self.cache_hits is None:
+            return None
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["cache_hit_rate"] = self.cache_hit_rate
+        return data
+
+
+def percentiles(values: Iterable[float], points: Sequence[float] = REPORTED_PERCENTILES) -> Dict[str, float]:
+    """
+    Exact nearest-rank percentiles.
+
+    Args:
+        values: Samples
+        points: Percentiles to report
+
+    Returns:
+        Dictionary such as {"p50": ..., "p99.9": ..., "max": ...}; all 0.0 without samples
+    """
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        label = f"p{point:g}"
+        if not ordered:
+            result[label] = 0.0
+            continue
+        # Rounded first so 99.9% of 1000 is rank 999, not 1000
+        rank = max(1, math.ceil(round(point * len(ordered) / 100, 9)))
+        result[label] = round(ordered[rank - 1], 3)
+    result["max"] = round(ordered[-1], 3) if ordered else 0.0
+    return result
+
+
+def _parse_timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    raise ValueError(f"Unsupported timestamp: {value!r}")
+
+
+def _record_request(record: Dict[str, Any]) -> ReplayRequest:
+    if "path" in record:
+        return ReplayRequest(0.0, record["path"], record.get("body"), record.get("method", "POST"))
+    # Shorthand: a knowledge search
+    body = {"query": record["query"], "limit": record.get("limit", 5)}
+    for key in ("category", "state"):
+        if record.get(key):
+            body[key] = record[key]
+    return ReplayRequest(0.0, DEFAULT_SEARCH_PATH, body)
+
+
+def load_query_log(path: str, speedup: float = 1.0) -> List[LoadPhase]:
+    """
+    Read a recorded query log into replay phases.
+
+    Each line is a JSON object with a "timestamp" (epoch seconds or ISO
+    8601) and either "path" and "body" as written by QueryLogRecorder, or
+    a shorthand "query" with optional "category", "state" and "limit" for
+    /knowledge/search. An optional "phase" field splits the log into
+    phases, in order of first appearance; each phase's offsets start at
+    its first request.
+
+    Args:
+        path: JSON lines file
+        speedup: Divide inter-arrival times by this factor
+
+    Returns:
+        Phases with requests ordered by offset
+
+    Raises:
+        ValueError: If a line is not a valid record
+    """
+    if speedup <= 0:
+        raise ValueError("speedup must be positive")
+    grouped: Dict[str, List[tuple]] = {}
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                timestamp = _parse_timestamp(record["timestamp"])
+                request = _record_request(record)
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: invalid query log record: {e}") from e
+            grouped.setdefault(record.get("phase") or "replay", []).append((timestamp, number, request))
+
+    phases = []
+    for name, records in grouped.items():
+        records.sort(key=lambda item: (item[0], item[1]))
+        first = records[0][0]
+        for timestamp, _, request in records:
+            request.offset = (timestamp - first) / speedup
+        phases.append(LoadPhase(name, [request for _, _, request in records]))
+    return phases
+
+
+def poisson_schedule(rate: float, duration: float, templates: Optional[Sequence[ReplayRequest]] = None,
+                     seed: int = 0, name: str = "poisson") -> LoadPhase:
+    """
+    Open-loop Poisson arrivals, identical for the same arguments.
+
+    Args:
+        rate: Mean requests per second
+        duration: Seconds of arrivals
+        templates: Requests to draw from uniformly (offsets are ignored);
+            defaults to /knowledge/search over DEFAULT_QUERIES
+        seed: Random seed
+        name: Phase name
+
+    Returns:
+        Phase with exponentially distributed inter-arrival times
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    if templates is None:
+        templates = [ReplayRequest(0.0, DEFAULT_SEARCH_PATH, {"query": query, "limit": 5})
+                     for query in DEFAULT_QUERIES]
+    rng = random.Random(seed)
+    requests = []
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        template = templates[rng.randrange(len(templates))]
+        requests.append(ReplayRequest(offset, template.path, template.body, template.method))
+        offset += rng.expovariate(rate)
+    return LoadPhase(name, requests)
+
+
+class ReplayHarness:
+    """Sends load phases to a server on schedule and reports each phase."""
+
+    def __init__(self, base_url: str, max_connections: int = 256, timeout: float = 30.0,
+                 metrics_path: Optional[str] = "/metrics/workers"):
+        """
+        Initialize the harness.
+
+        Args:
+            base_url: Server URL, e.g. http://127.0.0.1:8000
+            max_connections: Connection pool size. Requests beyond it wait for
+                a connection, and that wait counts toward their latency
+            timeout: Per-request timeout in seconds
+            metrics_path: Endpoint reporting cache_hits/cache_misses totals, or None
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.metrics_path = metrics_path
+
+    async def run(self, phases: Sequence[LoadPhase]) -> List[PhaseReport]:
+        """Run phases one after another."""
+        reports = []
+        for phase in phases:
+            report = await self.run_phase(phase)
+            logger.info("Replay phase finished", phase=phase.name, requests=report.requests,
+                        p99_ms=report.latency_ms["p99"], errors=report.errors)
+            reports.append(report)
+        return reports
+
+    async def run_phase(self, phase: LoadPhase) -> PhaseReport:
+        """
+        Send one phase on schedule and wait for every response.
+
+        Args:
+            phase: Requests with their offsets
+
+        Returns:
+            Report for the phase
+        """
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            before = await self._cache_counters(session)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            tasks = []
+            for request in sorted(phase.requests, key=lambda r: r.offset):
+                scheduled = started + request.offset
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Never wait for earlier responses before sending
+                tasks.append(asyncio.create_task(self._send(session, request, scheduled)))
+            outcomes = await asyncio.gather(*tasks)
+            elapsed = loop.time() - started
+            after = await self._cache_counters(session)
+        return self._report(phase, outcomes, elapsed, before, after)
+
+    async def _send(self, session: aiohttp.ClientSession, request: ReplayRequest,
+                    scheduled: float) -> RequestOutcome:
+        loop = asyncio.get_running_loop()
+        sent = loop.time()
+        try:
+            async with session.request(request.method, self.base_url + request.path,
+                                       json=request.body) as response:
+                await response.read()
+                return RequestOutcome(scheduled, sent, loop.time(), response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return RequestOutcome(scheduled, sent, loop.time(), 0, error=type(e).__name__)
+
+    async def _cache_counters(self, session: aiohttp.ClientSession) -> Optional[Dict[str, int]]:
+        if not self.metrics_path:
+            return None
+        try:
+            async with session.get(self.base_url + self.metrics_path) as response:
+                if response.status != 200:
+                    return None
+                totals = (await response.json()).get("totals", {})
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+        if "cache_hits" not in totals:
+            return None
+        return {"hits": totals["cache_hits"], "misses": totals["cache_misses"]}
+
+    def _report(self, phase: LoadPhase, outcomes: List[RequestOutcome], elapsed: float,
+                before: Optional[Dict[str, int]], after: Optional[Dict[str, int]]) -> PhaseReport:
+        status_counts: Dict[str, int] = {}
+        for outcome in outcomes:
+            key = outcome.error or str(outcome.status)
+            status_counts[key] = status_counts.get(key, 0) + 1
+        succeeded = [outcome for outcome in outcomes if outcome.ok]
+        report = PhaseReport(
+            name=phase.name,
+            requests=len(outcomes),
+            errors=len(outcomes) - len(succeeded),
+            duration_s=round(elapsed, 3),
+            offered_rps=round(len(outcomes) / phase.duration, 2) if phase.duration else 0.0,
+            throughput_rps=round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+            latency_ms=percentiles(outcome.latency_ms for outcome in outcomes),
+            service_ms=percentiles(outcome.service_ms for outcome in outcomes),
+            late_sends=sum(1 for outcome in outcomes
+                           if (outcome.sent - outcome.scheduled) * 1000 > LATE_SEND_MS),
+            status_counts=status_counts,
+        )
+        if before is not None and after is not None:
+            report.cache_hits = after["hits"] - before["hits"]
+            report.cache_misses = after["misses"] - before["misses"]
+        return report
+
+
+def format_reports(reports: Sequence[PhaseReport]) -> str:
+    """Render phase reports as a text table."""
+    lines = [f"{'phase':<14} {'reqs':>6} {'err':>5} {'offered':>8} {'rps':>8} "
+             f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'p99.9 ms':>9} {'max ms':>8} "
+             f"{'svc p99':>8} {'cache hit':>9}"]
+    for report in reports:
+        latency = report.latency_ms
+        hit_rate = report.cache_hit_rate
+        lines.append(
+            f"{report.name[:14]:<14} {report.requests:>6} {report.errors:>5} {report.offered_rps:>8.1f} "
+            f"{report.throughput_rps:>8.1f} {latency['p50']:>8.1f} {latency['p90']:>8.1f} "
+            f"{latency['p99']:>8.1f} {latency['p99.9']:>9.1f} {latency['max']:>8.1f} "
+            f"{report.service_ms['p99']:>8.1f} {'n/a' if hit_rate is None else f'{hit_rate:.1%}':>9}")
+    late = sum(report.late_sends for report in reports)
+    if late:
+        lines.append(f"warning: {late} request(s) sent more than {LATE_SEND_MS:g} ms late; "
+                     f"the client could not keep up with the schedule")
+    return "\n".join(lines)
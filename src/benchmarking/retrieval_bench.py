@@ -0,0 +1,442 @@
+"""
+FACT Retrieval Micro-Benchmarks
+
+Measures the in-memory retrieval path stage by stage as the knowledge base
+grows: index build time and memory, query preprocessing, fuzzy scoring,
+candidate filtering and ranking. Knowledge bases of any size are
+synthesized deterministically from the shipped knowledge base files, so two
+runs with the same seed measure the same work.
+
+Results are written as JSON. A run can be compared against a stored
+baseline, and the comparison fails when a metric regresses by more than a
+relative threshold (ignoring changes below a small absolute floor, which
+are timer noise).
+
+Usage:
+    python -m benchmarking.retrieval_bench run --sizes 1500,15000 --output current.json
+    python -m benchmarking.retrieval_bench compare baseline.json current.json --threshold 0.25
+    python -m benchmarking.retrieval_bench run --compare baseline.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import structlog
+
+try:
+    from ..retrieval.enhanced_search import FuzzyMatcher, InMemoryIndex, QueryPreprocessor
+    from .replay import percentiles
+except ImportError:
+    from retrieval.enhanced_search import FuzzyMatcher, InMemoryIndex, QueryPreprocessor
+    from benchmarking.replay import percentiles
+
+
+logger = structlog.get_logger(__name__)
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+DEFAULT_DATA_FILES = (DATA_DIR / "knowledge_base_final_1500_complete.json",)
+DEFAULT_SIZES = (1500, 15000, 150000)
+
+# Ranking is linear in the knowledge base, so fewer queries are timed on
+# larger ones: SIZE_QUERY_BUDGET // size, but at least MIN_QUERIES
+SIZE_QUERY_BUDGET = 45000
+MIN_QUERIES = 3
+
+# Fuzzy scoring is timed per call over this many (query, text) pairs
+FUZZY_SAMPLES = 400
+
+# Sub-millisecond stages keep the fastest of this many runs per sample
+CHEAP_STAGE_REPEAT = 5
+
+# A metric regresses when it grows by more than the threshold and by more
+# than the floor for its unit
+DEFAULT_THRESHOLD = 0.25
+ABSOLUTE_FLOOR = {"ms": 0.05, "mb": 0.5}
+
+STATE_CODES = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY",
+    "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND",
+    "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+)
+
+
+@dataclass
+class BenchmarkQuery:
+    """A timed query and the filters it is run with."""
+    text: str
+    kind: str
+    category: Optional[str] = None
+    state: Optional[str] = None
+
+
+def load_seed_entries(paths: Sequence[Path] = DEFAULT_DATA_FILES) -> List[Dict[str, Any]]:
+    """
+    Read knowledge base entries from exported JSON files.
+
+    Files may hold a list of entries or an object with a "knowledge_base"
+    or "entries" list. Entries without a question and answer are skipped.
+
+    Args:
+        paths: JSON files
+
+    Returns:
+        Entries in file order
+    """
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            data = data.get("knowledge_base") or data.get("entries") or []
+        entries += [entry for entry in data if entry.get("question") and entry.get("answer")]
+    if not entries:
+        raise ValueError("No knowledge base entries found in the data files")
+    return entries
+
+
+def synthesize_entries(seeds: Sequence[Dict[str, Any]], size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Deterministically grow seed entries into a knowledge base of a given size.
+
+    The first copy of each seed entry is kept as is. Later copies move to
+    another state and get words from the corpus vocabulary appended to the
+    question and answer, so they are distinct strings with realistic
+    keyword overlap.
+
+    Args:
+        seeds: Entries to grow from
+        size: Number of entries to produce
+        seed: Random seed
+
+    Returns:
+        Entries with ids 1..size
+    """
+    rng = random.Random(seed)
+    vocabulary = sorted({word for entry in seeds for word in entry["question"].lower().split()
+                         if word.isalpha() and len(word) > 3})
+    entries = []
+    for i in range(size):
+        base = seeds[i % len(seeds)]
+        copy = i // len(seeds)
+        entry = {
+            "id": i + 1,
+            "question": base["question"],
+            "answer": base["answer"],
+            "category": base.get("category") or "general",
+            "tags": base.get("tags"),
+            "state": base.get("state"),
+            "priority": base.get("priority"),
+            "difficulty": base.get("difficulty"),
+            "personas": base.get("personas"),
+            "source": base.get("source"),
+        }
+        if copy:
+            extra = " ".join(rng.sample(vocabulary, 2))
+            entry["question"] = f"{base['question']} ({extra})"
+            entry["answer"] = f"{base['answer']} See also: {' '.join(rng.sample(vocabulary, 3))}."
+            entry["state"] = STATE_CODES[(i + copy) % len(STATE_CODES)]
+        entries.append(entry)
+    return entries
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    words = text.split()
+    long_words = [i for i, word in enumerate(words) if len(word) > 4]
+    for i in rng.sample(long_words, min(2, len(long_words))):
+        word = words[i]
+        j = rng.randrange(1, len(word) - 2)
+        words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    return " ".join(words)
+
+
+def make_queries(seeds: Sequence[Dict[str, Any]], count: int, seed: int = 0) -> List[BenchmarkQuery]:
+    """
+    Deterministic query mix drawn from seed questions.
+
+    Cycles through exact questions, questions with transposed letters,
+    keyword-only queries, keyword queries filtered by state, and two-word
+    queries filtered by category.
+
+    Args:
+        seeds: Entries to draw questions from
+        count: Number of queries
+        seed: Random seed
+
+    Returns:
+        Queries
+    """
+    rng = random.Random(seed + 1)
+    preprocessor = QueryPreprocessor()
+    queries = []
+    for i in range(count):
+        entry = seeds[rng.randrange(len(seeds))]
+        question = entry["question"]
+        words = [w for w in preprocessor.normalize(question).split()
+                 if w not in preprocessor.stop_words and len(w) > 2]
+        kind = ("exact", "typo", "keywords", "state", "short")[i % 5]
+        if kind == "exact":
+            queries.append(BenchmarkQuery(question, kind))
+        elif kind == "typo":
+            queries.append(BenchmarkQuery(_typo(question, rng), kind))
+        elif kind == "keywords":
+            queries.append(BenchmarkQuery(" ".join(words[:4]), kind))
+        elif kind == "state":
+            queries.append(BenchmarkQuery(" ".join(words[:3]), kind, state=entry.get("state") or "GA"))
+        else:
+            queries.append(BenchmarkQuery(" ".join(words[:2]), kind, category=entry.get("category")))
+    return queries
+
+
+def _timed(function: Callable[[], Any], repeat: int = 1) -> float:
+    """Milliseconds for one call; the fastest of `repeat` calls, as timeit advises."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _stats(samples: Sequence[float]) -> Dict[str, float]:
+    stats = percentiles(samples, (50.0, 90.0, 99.0))
+    stats["mean"] = round(sum(samples) / len(samples), 3) if samples else 0.0
+    stats["samples"] = len(samples)
+    return stats
+
+
+def queries_for_size(size: int) -> int:
+    return max(MIN_QUERIES, SIZE_QUERY_BUDGET // size)
+
+
+def benchmark_size(seeds: Sequence[Dict[str, Any]], size: int, queries: Optional[int] = None,
+                   seed: int = 0, measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark the retrieval stages on one synthesized knowledge base.
+
+    Args:
+        seeds: Entries to synthesize from
+        size: Knowledge base size
+        queries: Queries to time (default scales down with size)
+        seed: Random seed
+        measure_memory: Also measure index memory; this needs a second,
+            traced build
+
+    Returns:
+        Dictionary with build_ms, index_mb and per-stage latency stats in ms
+    """
+    entries = synthesize_entries(seeds, size, seed)
+    benchmark_queries = make_queries(seeds, queries or queries_for_size(size), seed)
+
+    index = InMemoryIndex()
+    gc.collect()
+    build_ms = _timed(lambda: index.build_index(entries))
+
+    index_mb = None
+    if measure_memory:
+        traced = InMemoryIndex()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            traced.build_index(entries)
+            gc.collect()
+            # Structures retained by the index; the entries themselves existed before
+            index_mb = round(tracemalloc.get_traced_memory()[0] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+        del traced
+
+    preprocessor = index.preprocessor
+    stages: Dict[str, List[float]] = {"preprocess": [], "candidates": [], "rank": [], "search": []}
+    rng = random.Random(seed + 2)
+    fuzzy_pairs = []
+    for _ in range(FUZZY_SAMPLES):
+        entry = entries[rng.randrange(len(entries))]
+        fuzzy_pairs.append((benchmark_queries[rng.randrange(len(benchmark_queries))].text,
+                            entry["question"] if rng.random() < 0.5 else entry["answer"]))
+
+    # First calls compile regexes and fill caches; keep them out of the samples
+    preprocessor.generate_query_variations(benchmark_queries[0].text)
+    index.rank_entries(benchmark_queries[0].text, entries[:50], 5)
+
+    gc.collect()
+    gc.disable()
+    try:
+        for query in benchmark_queries:
+            stages["preprocess"].append(_timed(lambda: (preprocessor.generate_query_variations(query.text),
+                                                        preprocessor.extract_keywords(query.text)),
+                                               CHEAP_STAGE_REPEAT))
+            candidate_ms = _timed(lambda: index.candidate_entries(query.category, query.state),
+                                  CHEAP_STAGE_REPEAT)
+            candidates = index.candidate_entries(query.category, query.state)
+            rank_ms = _timed(lambda: index.rank_entries(query.text, candidates, 5))
+            stages["candidates"].append(candidate_ms)
+            stages["rank"].append(rank_ms)
+            stages["search"].append(candidate_ms + rank_ms)
+        stages["fuzzy_match"] = [_timed(lambda: FuzzyMatcher.fuzzy_match_score(query, text), CHEAP_STAGE_REPEAT)
+                                 for query, text in fuzzy_pairs]
+    finally:
+        gc.enable()
+
+    result = {
+        "size": size,
+        "keywords": len(index.keyword_index),
+        "build_ms": round(build_ms, 3),
+        "index_mb": index_mb,
+        "stages": {name: _stats(samples) for name, samples in stages.items()},
+    }
+    logger.info("Retrieval benchmark finished", size=size, build_ms=result["build_ms"],
+                search_p50_ms=result["stages"]["search"]["p50"])
+    return result
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, queries: Optional[int] = None, seed: int = 0,
+                   data_files: Sequence[Path] = DEFAULT_DATA_FILES, measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark each knowledge base size.
+
+    Returns:
+        Report with environment details and results keyed by size
+    """
+    seeds = load_seed_entries(data_files)
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "seed_entries": len(seeds),
+        "results": {str(size): benchmark_size(seeds, size, queries, seed, measure_memory) for size in sizes},
+    }
+
+
+def _metrics(result: Dict[str, Any]) -> Dict[str, tuple]:
+    """Compared metrics of one size: name -> (value, unit)."""
+    metrics = {"build_ms": (result["build_ms"], "ms")}
+    if result.get("index_mb") is not None:
+        metrics["index_mb"] = (result["index_mb"], "mb")
+    for stage, stats in result["stages"].items():
+        for point in ("p50", "p99"):
+            metrics[f"{stage}.{point}"] = (stats[point], "ms")
+    return metrics
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare a report against a baseline.
+
+    Only sizes present in both are compared.
+
+    Args:
+        baseline: Stored report
+        current: New report
+        threshold: Allowed relative growth, e.g. 0.25 for 25%
+
+    Returns:
+        One row per compared metric with "regressed" set where it grew by
+        more than the threshold and the absolute floor
+    """
+    rows = []
+    for size, result in current["results"].items():
+        if size not in baseline["results"]:
+            continue
+        before = _metrics(baseline["results"][size])
+        for name, (value, unit) in _metrics(result).items():
+            if name not in before:
+                continue
+            base_value = before[name][0]
+            change = (value - base_value) / base_value if base_value else 0.0
+            regressed = change > threshold and value - base_value > ABSOLUTE_FLOOR[unit]
+            rows.append({"size": int(size), "metric": name, "baseline": base_value, "current": value,
+                         "change": round(change, 4), "regressed": regressed})
+    return rows
+
+
+def format_comparison(rows: Sequence[Dict[str, Any]]) -> str:
+    lines = [f"{'size':>7} {'metric':<22} {'baseline':>11} {'current':>11} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        lines.append(f"{row['size']:>7} {row['metric']:<22} {row['baseline']:>11.3f} {row['current']:>11.3f} "
+                     f"{row['change']:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'size':>7} {'build ms':>10} {'index MB':>9} {'stage':<12} {'p50 ms':>9} {'p90 ms':>9} "
+             f"{'p99 ms':>9} {'n':>5}"]
+    for size, result in report["results"].items():
+        index_mb = "n/a" if result["index_mb"] is None else f"{result['index_mb']:.1f}"
+        for i, (stage, stats) in enumerate(result["stages"].items()):
+            head = f"{size:>7} {result['build_ms']:>10.1f} {index_mb:>9}" if i == 0 else " " * 28
+            lines.append(f"{head} {stage:<12} {stats['p50']:>9.3f} {stats['p90']:>9.3f} "
+                         f"{stats['p99']:>9.3f} {stats['samples']:>5}")
+    return "\n".join(lines)
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _check(baseline_path: str, report: Dict[str, Any], threshold: float) -> int:
+    rows = compare_reports(_load(baseline_path), report, threshold)
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%} ({len(rows)} metrics compared)")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Retrieval micro-benchmarks with baseline comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks")
+    run.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                     help="Comma-separated knowledge base sizes")
+    run.add_argument("--queries", type=int, help="Queries timed per size (default scales with size)")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--data", action="append", help="Knowledge base JSON file (repeatable)")
+    run.add_argument("--no-memory", action="store_true", help="Skip the traced build for index memory")
+    run.add_argument("--output", help="Write the report to this file")
+    run.add_argument("--compare", metavar="BASELINE", help="Compare against a baseline report")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    compare = commands.add_parser("compare", help="Compare two reports")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return _check(args.baseline, _load(args.current), args.threshold)
+
+    report = run_benchmarks(
+        sizes=[int(size) for size in args.sizes.split(",")], queries=args.queries, seed=args.seed,
+        data_files=[Path(path) for path in args.data] if args.data else DEFAULT_DATA_FILES,
+        measure_memory=not args.no_memory)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    if args.compare:
+        print()
+        return _check(args.compare, report, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
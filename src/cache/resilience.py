@@ -138,6 +138,19 @@ class CacheCircuitBreaker:
                 raise
             return None
     
+    def allow_request(self) -> bool:
+        """Return True if the circuit currently lets an operation through."""
+        self._check_state()
+        return self.state != CircuitState.OPEN
+
+    def record_success(self) -> None:
+        """Record a successful operation run outside call()/async_call()."""
+        self._on_success()
+
+    def record_failure(self) -> None:
+        """Record a failed operation run outside call()/async_call()."""
+        self._on_failure()
+
     def _check_state(self) -> None:
         """Check and update circuit state."""
         if self.state == CircuitState.OPEN:
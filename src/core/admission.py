@@ -0,0 +1,363 @@
+"""
+FACT System Admission Control
+
+When Groq or the database slows down, every request that arrives keeps
+waiting on it; without a limit they pile up until voice calls time out.
+This module admits requests through a concurrency limit per endpoint that
+adapts to observed latency, and sheds what cannot be served in time so the
+caller gets a fast fallback instead.
+
+Limits follow AIMD: while completions stay under the endpoint's latency
+target the limit grows by about one per round of requests; a slow or timed
+out completion cuts it multiplicatively (at most once per target latency,
+so one burst counts once). Requests over the limit wait in a bounded queue
+ordered by lane, then arrival:
+
+- VOICE: VAPI webhook calls (knowledge searches for a live call)
+- INTERACTIVE: /query
+- ANALYTICS: reporting and training endpoints
+
+A request is shed (admit() returns None) when its lane is outranked by
+requests already waiting anywhere, when the queue is full of equal or
+better requests, or when its deadline passes while queued. Voice deadlines
+come from the VAPI tool timeout, less the time the endpoint currently
+needs to answer, so a queued voice request is shed while there is still
+time to send the fallback answer.
+
+ADMISSION_CONTROL=off admits everything (latency is still tracked);
+VAPI_TIMEOUT_SECONDS sets the tool timeout configured in VAPI (default 20).
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from fastapi import HTTPException
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Environment variables
+ADMISSION_CONTROL_ENV = "ADMISSION_CONTROL"
+VAPI_TIMEOUT_ENV = "VAPI_TIMEOUT_SECONDS"
+
+# VAPI's default tool call timeout
+DEFAULT_VAPI_TIMEOUT = 20.0
+
+# Time kept back from the VAPI timeout to send the fallback answer
+DEADLINE_MARGIN = 1.0
+
+# Weight of the newest completion in the latency average
+LATENCY_SMOOTHING = 0.2
+
+
+class Lane(IntEnum):
+    """Request priority; lower values are served first."""
+    VOICE = 0
+    INTERACTIVE = 1
+    ANALYTICS = 2
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """Limits of one endpoint."""
+    # Completions slower than this shrink the limit
+    target_ms: float
+    initial_limit: int = 20
+    min_limit: int = 1
+    max_limit: int = 200
+    # Requests waiting for a slot
+    max_queue: int = 50
+    # Longest wait for a slot when the caller sets no deadline
+    queue_timeout: float = 5.0
+    # Fraction of the limit kept after a slow completion
+    backoff: float = 0.8
+
+
+POLICIES: Dict[str, EndpointPolicy] = {
+    "vapi_webhook": EndpointPolicy(target_ms=2000, max_queue=100, queue_timeout=DEFAULT_VAPI_TIMEOUT),
+    "query": EndpointPolicy(target_ms=5000, initial_limit=10, queue_timeout=10.0),
+    "analytics": EndpointPolicy(target_ms=1000, initial_limit=5, max_limit=50, max_queue=10),
+}
+
+
+class _Waiter:
+    __slots__ = ("lane", "future")
+
+    def __init__(self, lane: Lane, future: asyncio.Future):
+        self.lane = lane
+        self.future = future
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a lane-ordered, bounded wait queue."""
+
+    def __init__(self, name: str, policy: EndpointPolicy, controller: "AdmissionController"):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Endpoint name
+            policy: Latency target and limits
+            controller: Owner tracking waiters across endpoints
+        """
+        self.name = name
+        self.policy = policy
+        self.controller = controller
+        self.limit = float(policy.initial_limit)
+        self.in_flight = 0
+        self.latency_ms: Optional[float] = None
+        self._queue: List[tuple] = []
+        self._order = itertools.count()
+        self._last_decrease = 0.0
+        self.admitted = 0
+        self.shed = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.policy.min_limit, int(self.limit))
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._queue if not waiter.future.done())
+
+    def expected_service(self) -> float:
+        """Seconds a request currently takes once admitted."""
+        return (self.latency_ms or 0.0) / 1000
+
+    async def acquire(self, lane: Lane, deadline: float) -> bool:
+        """
+        Wait for a slot.
+
+        Args:
+            lane: Priority of the request
+            deadline: time.monotonic() by which the request must have a slot
+
+        Returns:
+            True once admitted, False when shed
+        """
+        if self.in_flight < self.capacity and not self.queued:
+            self.in_flight += 1
+            return True
+        if deadline <= time.monotonic():
+            return False
+        if self.queued >= self.policy.max_queue and not self._evict_below(lane):
+            return False
+
+        if len(self._queue) > 2 * self.policy.max_queue:
+            # Drop entries of waiters that timed out or were evicted
+            self._queue = [entry for entry in self._queue if not entry[2].future.done()]
+            heapq.heapify(self._queue)
+
+        waiter = _Waiter(lane, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (lane, next(self._order), waiter))
+        self.controller._waiting[lane] += 1
+        try:
+            # The slot is handed over by release(), already counted in in_flight
+            return await asyncio.wait_for(asyncio.shield(waiter.future), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            return False
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        finally:
+            self.controller._waiting[lane] -= 1
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter.future.done() and not waiter.future.cancelled() and waiter.future.result():
+            # Granted just as the waiter gave up; pass the slot on
+            self._release_slot()
+        waiter.future.cancel()
+
+    def _evict_below(self, lane: Lane) -> bool:
+        """Shed the newest waiter of a worse lane to make room; False when there is none."""
+        worst = None
+        for entry in self._queue:
+            waiter = entry[2]
+            if not waiter.future.done() and waiter.lane > lane and (worst is None or entry[:2] > worst[:2]):
+                worst = entry
+        if worst is None:
+            return False
+        worst[2].future.set_result(False)
+        return True
+
+    def release(self, latency_ms: float, overloaded: bool = False) -> None:
+        """
+        Give a slot back and adapt the limit.
+
+        Args:
+            latency_ms: How long the admitted request took
+            overloaded: The request timed out downstream
+        """
+        self._adapt(latency_ms, overloaded)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._queue and self.in_flight < self.capacity:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.future.done():
+                self.in_flight += 1
+                waiter.future.set_result(True)
+
+    def _adapt(self, latency_ms: float, overloaded: bool) -> None:
+        policy = self.policy
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += LATENCY_SMOOTHING * (latency_ms - self.latency_ms)
+
+        now = time.monotonic()
+        if overloaded or latency_ms > policy.target_ms:
+            if now - self._last_decrease >= policy.target_ms / 1000:
+                self.limit = max(float(policy.min_limit), self.limit * policy.backoff)
+                self._last_decrease = now
+                logger.info("Admission limit decreased", endpoint=self.name, limit=round(self.limit, 2),
+                            latency_ms=round(latency_ms, 1), overloaded=overloaded)
+        elif self.in_flight * 2 >= self.limit:
+            # Only grow while the limit is actually in use
+            self.limit = min(float(policy.max_limit), self.limit + 1 / self.limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class AdmissionTicket:
+    """A granted slot; release it by leaving the with block."""
+
+    def __init__(self, limiter: Optional[AdaptiveLimiter]):
+        self._limiter = limiter
+        self._started = time.perf_counter()
+
+    def __enter__(self) -> "AdmissionTicket":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._limiter is not None:
+            overloaded = exc_type is not None and issubclass(exc_type, (asyncio.TimeoutError, TimeoutError))
+            self._limiter.release((time.perf_counter() - self._started) * 1000, overloaded)
+            self._limiter = None
+
+
+class AdmissionController:
+    """Adaptive limiters for the endpoints of one server process."""
+
+    def __init__(self, policies: Optional[Dict[str, EndpointPolicy]] = None, enabled: bool = True):
+        """
+        Initialize the controller.
+
+        Args:
+            policies: Policy per endpoint name (defaults to POLICIES)
+            enabled: When False every request is admitted
+        """
+        self.enabled = enabled
+        self.policies = dict(POLICIES if policies is None else policies)
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        self._waiting = {lane: 0 for lane in Lane}
+
+    def limiter(self, endpoint: str) -> AdaptiveLimiter:
+        limiter = self.limiters.get(endpoint)
+        if limiter is None:
+            policy = self.policies.get(endpoint) or EndpointPolicy(target_ms=2000)
+            limiter = self.limiters[endpoint] = AdaptiveLimiter(endpoint, policy, self)
+        return limiter
+
+    def outranked(self, lane: Lane) -> bool:
+        """True while requests of a more important lane are waiting for a slot."""
+        return any(self._waiting[better] for better in Lane if better < lane)
+
+    def voice_deadline(self, endpoint: str, received: Optional[float] = None) -> float:
+        """
+        Latest time a voice request may still start and answer within VAPI's timeout.
+
+        Args:
+            endpoint: Endpoint name, for its current service time
+            received: time.monotonic() when the request arrived (defaults to now)
+        """
+        timeout = float(os.getenv(VAPI_TIMEOUT_ENV, DEFAULT_VAPI_TIMEOUT))
+        started = time.monotonic() if received is None else received
+        return started + timeout - DEADLINE_MARGIN - self.limiter(endpoint).expected_service()
+
+    async def admit(self, endpoint: str, lane: Lane = Lane.INTERACTIVE,
+                    deadline: Optional[float] = None) -> Optional[AdmissionTicket]:
+        """
+        Admit a request or shed it.
+
+        Args:
+            endpoint: Endpoint name (a key of the policies)
+            lane: Priority of the request
+            deadline: time.monotonic() by which it must be admitted (defaults
+                to the endpoint's queue_timeout from now)
+
+        Returns:
+            A ticket to hold while the request is served, or None when shed
+        """
+        limiter = self.limiter(endpoint)
+        if not self.enabled:
+            limiter.in_flight += 1
+            limiter.admitted += 1
+            return AdmissionTicket(limiter)
+
+        if deadline is None:
+            deadline = time.monotonic() + limiter.policy.queue_timeout
+        if self.outranked(lane) or not await limiter.acquire(lane, deadline):
+            limiter.shed += 1
+            logger.warning("Request shed", endpoint=endpoint, lane=lane.name, limit=round(limiter.limit, 2),
+                           in_flight=limiter.in_flight, queued=limiter.queued)
+            return None
+        limiter.admitted += 1
+        return AdmissionTicket(limiter)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "endpoints": {name: limiter.get_stats() for name, limiter in self.limiters.items()},
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the admission controller of this process."""
+    global _controller
+    if _controller is None:
+        enabled = os.getenv(ADMISSION_CONTROL_ENV, "on").strip().lower() not in ("0", "off", "false", "no")
+        _controller = AdmissionController(enabled=enabled)
+    return _controller
+
+
+def require_admission(endpoint: str, lane: Lane) -> Callable[[], AsyncIterator[None]]:
+    """
+    FastAPI dependency holding an admission slot for the whole request.
+
+    Shed requests get 503 with Retry-After, for endpoints without a
+    fallback answer.
+
+    Args:
+        endpoint: Endpoint name
+        lane: Priority of its requests
+    """
+    async def dependency() -> AsyncIterator[None]:
+        ticket = await get_admission_controller().admit(endpoint, lane)
+        if ticket is None:
+            raise HTTPException(status_code=503, detail="Server is busy, please retry shortly",
+                                headers={"Retry-After": "1"})
+        with ticket:
+            yield
+
+    return dependency
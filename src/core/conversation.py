@@ -7,14 +7,16 @@ and maintains conversation state to improve agentic flow continuity.
 
 import time
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 import structlog
 
+from .conversation_store import ConversationStateStore, create_conversation_store
+
 
 logger = structlog.get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """Represents a single conversation turn."""
     timestamp: float
@@ -154,14 +156,35 @@ class ConversationContext:
             suggested_actions.append("Compare companies as requested")
         
         return suggested_actions
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to JSON-compatible dictionary."""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationContext":
+        """Rebuild a context from a dictionary produced by to_dict."""
+        values = dict(data)
+        values["turns"] = [ConversationTurn(**turn) for turn in values.get("turns", [])]
+        return cls(**values)
 
 
 class ConversationManager:
     """Manages conversation contexts and provides enhanced prompting."""
     
-    def __init__(self):
-        """Initialize conversation manager."""
-        self.conversations: Dict[str, ConversationContext] = {}
+    def __init__(self, store: Optional[ConversationStateStore] = None):
+        """
+        Initialize conversation manager.
+        
+        Args:
+            store: Conversation state store; defaults to the shared,
+                TTL-bounded store selected by CONVERSATION_STATE_URL
+        """
+        self.conversations = store if store is not None else create_conversation_store(
+            "core.conversation",
+            encode=ConversationContext.to_dict,
+            decode=ConversationContext.from_dict
+        )
         self.current_conversation_id: Optional[str] = None
     
     def start_conversation(self, conversation_id: Optional[str] = None) -> str:
@@ -169,13 +192,21 @@ class ConversationManager:
         if conversation_id is None:
             conversation_id = f"conv_{int(time.time() * 1000)}"
         
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = ConversationContext(conversation_id)
+        if self.conversations.get(conversation_id) is None:
+            self.conversations.put(conversation_id, ConversationContext(conversation_id))
             logger.info("Started new conversation", conversation_id=conversation_id)
         
         self.current_conversation_id = conversation_id
         return conversation_id
     
+    def end_conversation(self, conversation_id: Optional[str] = None) -> None:
+        """Mark a conversation as finished so its state expires after the grace TTL."""
+        conversation_id = conversation_id or self.current_conversation_id
+        if conversation_id:
+            self.conversations.end(conversation_id)
+        if conversation_id == self.current_conversation_id:
+            self.current_conversation_id = None
+    
     def get_current_context(self) -> Optional[ConversationContext]:
         """Get current conversation context."""
         if self.current_conversation_id:
@@ -190,6 +221,7 @@ class ConversationManager:
         
         # Update topic based on current input
         context.detect_topic(user_input)
+        self.conversations.flush(context.conversation_id)
         
         # Get context summary
         context_summary = context.get_context_summary()
@@ -247,6 +279,7 @@ class ConversationManager:
         context = self.get_current_context()
         if context:
             context.add_turn(user_input, assistant_response, tool_calls, tool_results)
+            self.conversations.flush(context.conversation_id)
     
     def detect_incomplete_response(self, user_input: str, assistant_response: str) -> bool:
         """Detect if the assistant response seems incomplete."""
@@ -0,0 +1,587 @@
+"""
+FACT System Conversation State Store
+
+Bounded, TTL-evicted storage for per-call conversation state. Each store
+keeps a local LRU of live objects in front of an optional shared backend
+(local files or a Redis-compatible server) so several workers can serve the
+same call without sticky sessions. Backend failures degrade to the local
+cache instead of failing the request.
+
+Disk and network backends never run on the caller's thread under the
+store lock: writes are applied in order by a background thread per backend
+(write-behind, latest payload per key), and async handlers read through
+aget()/refresh(), which run the backend read in a worker thread.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import hashlib
+import weakref
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Idle lifetime of an active call and grace period after it ends (seconds)
+DEFAULT_IDLE_TTL = 2 * 60 * 60
+DEFAULT_ENDED_TTL = 5 * 60
+
+
+class StateBackend:
+    """Shared key/value backend holding serialized conversation state."""
+
+    # Calls may wait on disk or network; writes then go through a WriteBehind thread
+    blocking = True
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored payload or None when missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """Store a payload that expires after ttl seconds."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove a payload if present."""
+        raise NotImplementedError
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local backend, mainly useful for tests and single workers."""
+
+    blocking = False
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.time():
+                del self._data[key]
+                return None
+            return item[1]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class FileStateBackend(StateBackend):
+    """
+    Directory-backed store shared by workers on the same host.
+
+    Each key is one small JSON file written atomically via rename, so readers
+    never observe a partially written payload.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                record = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+        if record.get("expires_at", 0) <= time.time():
+            self.delete(key)
+            return None
+        return record.get("value")
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        record = {"key": key, "expires_at": time.time() + ttl, "value": value}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(record, handle)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self) -> int:
+        """Delete expired files; returns the number removed."""
+        removed = 0
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as handle:
+                    expires_at = json.load(handle).get("expires_at", 0)
+            except (FileNotFoundError, ValueError):
+                continue
+            if expires_at <= now:
+                try:
+                    path.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Backend for Redis or any client exposing get/set(ex=)/delete.
+
+    The client is injected so a Redis-compatible stand-in can be used in
+    tests or environments without a Redis server.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(key, value, ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+class WriteBehind:
+    """
+    Background thread applying backend writes in submission order.
+
+    Only the latest payload per key is kept while waiting, and it stays
+    visible through pending() until the backend has it, so a reader in this
+    process never sees an older value than the last write.
+    """
+
+    def __init__(self, backend: StateBackend):
+        self.backend = backend
+        # key -> (payload or None for a delete, ttl, on_error)
+        self._pending: Dict[str, Tuple[Optional[str], float, Callable[[Exception], None]]] = {}
+        self._order: deque = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: str, payload: Optional[str], ttl: float,
+               on_error: Callable[[Exception], None]) -> None:
+        """Queue a write (payload None deletes the key)."""
+        with self._condition:
+            if key not in self._pending:
+                self._order.append(key)
+            self._pending[key] = (payload, ttl, on_error)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="conversation-state-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.drain, 2.0)
+            self._condition.notify_all()
+
+    def pending(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Return (queued, payload) for a key not yet written to the backend."""
+        with self._condition:
+            operation = self._pending.get(key)
+        return (False, None) if operation is None else (True, operation[0])
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is applied; False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._order, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._order)
+                key = self._order[0]
+                operation = self._pending[key]
+            payload, ttl, on_error = operation
+            try:
+                if payload is None:
+                    self.backend.delete(key)
+                else:
+                    self.backend.set(key, payload, ttl)
+            except Exception as e:
+                on_error(e)
+            with self._condition:
+                self._order.popleft()
+                if self._pending.get(key) is operation:
+                    del self._pending[key]
+                else:
+                    # Written again meanwhile; apply the newer payload too
+                    self._order.append(key)
+                self._condition.notify_all()
+
+
+_writers: "weakref.WeakKeyDictionary[StateBackend, WriteBehind]" = weakref.WeakKeyDictionary()
+_writers_lock = threading.Lock()
+
+
+def get_write_behind(backend: StateBackend) -> WriteBehind:
+    """Get the write-behind thread of a backend, shared by all stores on it."""
+    with _writers_lock:
+        writer = _writers.get(backend)
+        if writer is None:
+            writer = _writers[backend] = WriteBehind(backend)
+        return writer
+
+
+def create_state_backend(url: Optional[str]) -> Optional[StateBackend]:
+    """
+    Create a backend from a URL.
+
+    Supported forms are ``memory://``, ``file:///path/to/dir`` and
+    ``redis://host:port/db``. Returns None (local-only state) when the URL is
+    empty or the backend cannot be created.
+    """
+    if not url:
+        return None
+
+    scheme = urlparse(url).scheme
+    try:
+        if scheme == "memory":
+            return MemoryStateBackend()
+        if scheme == "file":
+            return FileStateBackend(urlparse(url).path)
+        if scheme in ("redis", "rediss"):
+            import redis  # Optional dependency
+            return RedisStateBackend(redis.Redis.from_url(url))
+    except Exception as e:
+        logger.warning("Conversation state backend unavailable, using local state",
+                       url_scheme=scheme, error=str(e))
+        return None
+
+    logger.warning("Unknown conversation state backend scheme", url_scheme=scheme)
+    return None
+
+
+class _StateEntry:
+    """Locally cached state object with its expiry bookkeeping."""
+
+    __slots__ = ("value", "expires_at", "fetched_at", "ended")
+
+    def __init__(self, value: Any, expires_at: float, fetched_at: float, ended: bool = False):
+        self.value = value
+        self.expires_at = expires_at
+        self.fetched_at = fetched_at
+        self.ended = ended
+
+
+class ConversationStateStore:
+    """
+    LRU/TTL-bounded per-call state with an optional shared backend.
+
+    Reads are served from the local LRU while an entry is younger than
+    ``local_ttl`` and fall through to the backend afterwards, so a call that
+    moves between workers always sees the latest persisted state. Writes
+    are queued for the backend at once and applied by its write-behind
+    thread; async callers use aget() or refresh() so backend reads happen
+    off the event loop. The lock only guards the local LRU.
+    """
+
+    def __init__(self,
+                 namespace: str,
+                 backend: Optional[StateBackend] = None,
+                 max_entries: int = 10000,
+                 idle_ttl: float = DEFAULT_IDLE_TTL,
+                 ended_ttl: float = DEFAULT_ENDED_TTL,
+                 local_ttl: float = 0.5,
+                 encode: Optional[Callable[[Any], Any]] = None,
+                 decode: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            namespace: Key prefix separating this store in a shared backend
+            backend: Shared backend, or None for process-local state only
+            max_entries: Maximum locally cached calls (least recent evicted)
+            idle_ttl: Seconds an active call is kept after its last write
+            ended_ttl: Seconds a call is kept after it has ended
+            local_ttl: Seconds a local copy is trusted before re-reading the backend
+            encode: Converts a state object into JSON-compatible data
+            decode: Rebuilds a state object from JSON-compatible data
+        """
+        self.namespace = namespace
+        self.backend = backend
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.ended_ttl = ended_ttl
+        self.local_ttl = local_ttl
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda data: data)
+
+        self._entries: "OrderedDict[str, _StateEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.backend_errors = 0
+        self._writer = get_write_behind(backend) if backend is not None and backend.blocking else None
+
+    def _key(self, call_id: str) -> str:
+        return f"{self.namespace}:{call_id}"
+
+    def _backend_failed(self, operation: str, error: Exception) -> None:
+        self.backend_errors += 1
+        logger.warning(f"Conversation state {operation} failed", namespace=self.namespace, error=str(error))
+
+    def _write(self, call_id: str, payload: Optional[str], ttl: float = 0) -> None:
+        """Send a payload (None deletes) to the backend, write-behind when it blocks."""
+        key = self._key(call_id)
+        if self._writer is not None:
+            operation = "delete" if payload is None else "write"
+            self._writer.submit(key, payload, ttl, lambda e: self._backend_failed(operation, e))
+            return
+        try:
+            if payload is None:
+                self.backend.delete(key)
+            else:
+                self.backend.set(key, payload, ttl)
+        except Exception as e:
+            self._backend_failed("delete" if payload is None else "write", e)
+
+    def _remember(self, call_id: str, entry: _StateEntry) -> None:
+        self._entries[call_id] = entry
+        self._entries.move_to_end(call_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, call_id: str, now: float) -> Tuple[Optional[_StateEntry], bool]:
+        """Read a call from the backend; returns (entry, backend_reachable)."""
+        if self.backend is None:
+            return None, True
+        queued, payload = self._writer.pending(self._key(call_id)) if self._writer else (False, None)
+        try:
+            if not queued:
+                payload = self.backend.get(self._key(call_id))
+        except Exception as e:
+            self._backend_failed("read", e)
+            return None, False
+        if payload is None:
+            return None, True
+        try:
+            record = json.loads(payload)
+            entry = _StateEntry(
+                value=self.decode(record["value"]),
+                expires_at=record["expires_at"],
+                fetched_at=now,
+                ended=record.get("ended", False)
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Discarding unreadable conversation state",
+                           namespace=self.namespace, error=str(e))
+            return None, True
+        return entry, True
+
+    def _persist(self, call_id: str, entry: _StateEntry, now: float) -> None:
+        if self.backend is None:
+            return
+        # Serialized under the lock, so the queued payload is a snapshot
+        payload = json.dumps({
+            "value": self.encode(entry.value),
+            "expires_at": entry.expires_at,
+            "ended": entry.ended
+        }, default=str)
+        self._write(call_id, payload, max(entry.expires_at - now, 1))
+
+    def get(self, call_id: str) -> Optional[Any]:
+        """
+        Return the state for a call, or None if unknown or expired.
+
+        May read the backend; on the event loop use aget() instead.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(call_id)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[call_id]
+                self.evictions += 1
+                entry = None
+
+            if entry is not None and (self.backend is None or now - entry.fetched_at < self.local_ttl):
+                self._entries.move_to_end(call_id)
+                self.hits += 1
+                return entry.value
+
+        loaded, reachable = self._load(call_id, now)
+
+        with self._lock:
+            current = self._entries.get(call_id)
+            if current is not None and current is not entry:
+                # Written locally while the backend was read; that is newer
+                self._entries.move_to_end(call_id)
+                self.hits += 1
+                return current.value
+
+            if loaded is not None:
+                self._remember(call_id, loaded)
+                self.hits += 1
+                return loaded.value
+
+            if entry is not None and not reachable:
+                # Backend unreachable: keep serving the local copy
+                entry.fetched_at = now
+                self._entries.move_to_end(call_id)
+                self.hits += 1
+                return entry.value
+
+            self._entries.pop(call_id, None)
+            self.misses += 1
+            return None
+
+    async def aget(self, call_id: str) -> Optional[Any]:
+        """Return the state for a call, reading a blocking backend in a worker thread."""
+        if self._writer is None:
+            return self.get(call_id)
+        return await asyncio.to_thread(self.get, call_id)
+
+    async def refresh(self, call_id: str) -> None:
+        """
+        Bring a call's local copy up to date off the event loop.
+
+        Async handlers call this once per request; synchronous reads during
+        the next ``local_ttl`` seconds are then served locally.
+        """
+        await self.aget(call_id)
+
+    def get_or_create(self, call_id: str, factory: Callable[[], Any]) -> Any:
+        """Return the state for a call, creating and persisting it if missing."""
+        value = self.get(call_id)
+        if value is not None:
+            return value
+        with self._lock:
+            entry = self._entries.get(call_id)
+            if entry is not None:
+                # Created by another thread since get()
+                return entry.value
+            value = factory()
+            self.put(call_id, value)
+            return value
+
+    def put(self, call_id: str, value: Any) -> None:
+        """Store state for a call and write it through to the backend."""
+        now = time.time()
+        with self._lock:
+            previous = self._entries.get(call_id)
+            ended = previous.ended if previous is not None else False
+            ttl = self.ended_ttl if ended else self.idle_ttl
+            entry = _StateEntry(value, now + ttl, now, ended)
+            self._remember(call_id, entry)
+            self._persist(call_id, entry, now)
+
+    def flush(self, call_id: str) -> None:
+        """Persist the locally cached object for a call after in-place changes."""
+        with self._lock:
+            entry = self._entries.get(call_id)
+            if entry is not None:
+                self.put(call_id, entry.value)
+
+    def end(self, call_id: str) -> None:
+        """Mark a call as ended so its state expires after ``ended_ttl``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(call_id)
+        if entry is None:
+            entry = self._load(call_id, now)[0]
+        with self._lock:
+            entry = self._entries.get(call_id) or entry
+            if entry is None:
+                return
+            entry.ended = True
+            entry.expires_at = min(entry.expires_at, now + self.ended_ttl)
+            entry.fetched_at = now
+            self._remember(call_id, entry)
+            self._persist(call_id, entry, now)
+
+    def delete(self, call_id: str) -> None:
+        """Remove state for a call locally and in the backend."""
+        with self._lock:
+            self._entries.pop(call_id, None)
+            if self.backend is not None:
+                self._write(call_id, None)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued backend writes are applied; False on timeout."""
+        return self._writer.drain(timeout) if self._writer is not None else True
+
+    def purge_expired(self) -> int:
+        """Drop expired local entries; returns the number removed."""
+        now = time.time()
+        with self._lock:
+            expired = [cid for cid, entry in self._entries.items() if entry.expires_at <= now]
+            for call_id in expired:
+                del self._entries[call_id]
+            self.evictions += len(expired)
+            return len(expired)
+
+    def __contains__(self, call_id: str) -> bool:
+        return self.get(call_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries.keys()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return store statistics."""
+        return {
+            "namespace": self.namespace,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "local_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "backend_errors": self.backend_errors
+        }
+
+
+# Shared backend selected by CONVERSATION_STATE_URL
+_state_backend: Optional[StateBackend] = None
+_state_backend_initialized = False
+
+
+def get_state_backend() -> Optional[StateBackend]:
+    """Get the process-wide conversation state backend (None = local only)."""
+    global _state_backend, _state_backend_initialized
+    if not _state_backend_initialized:
+        _state_backend = create_state_backend(os.getenv("CONVERSATION_STATE_URL"))
+        _state_backend_initialized = True
+    return _state_backend
+
+
+def create_conversation_store(namespace: str, **kwargs) -> ConversationStateStore:
+    """Create a store on the shared backend, sized from the environment."""
+    kwargs.setdefault("backend", get_state_backend())
+    kwargs.setdefault("max_entries", int(os.getenv("CONVERSATION_STATE_MAX_ENTRIES", "10000")))
+    kwargs.setdefault("idle_ttl", float(os.getenv("CONVERSATION_STATE_IDLE_TTL", DEFAULT_IDLE_TTL)))
+    kwargs.setdefault("ended_ttl", float(os.getenv("CONVERSATION_STATE_ENDED_TTL", DEFAULT_ENDED_TTL)))
+    return ConversationStateStore(namespace, **kwargs)
@@ -462,4 +462,18 @@ async def shutdown_driver():
     global _driver_instance
     if _driver_instance:
         await _driver_instance.shutdown()
-        _driver_instance = None
\ No newline at end of file
+        _driver_instance = None
+
+async def process_user_query(query: str) -> str:
+    """
+    Process user query using the global driver instance.
+    
+    This is a compatibility wrapper for the benchmarking framework.
+    
+    Args:
+        query: User query string
+        
+    Returns:
+        Response string
+    """
+    return await get_driver().process_fact_query(query)
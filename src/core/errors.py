@@ -80,6 +80,11 @@ class DatabaseError(FACTError):
     pass
 
 
+class PoolTimeoutError(DatabaseError):
+    """Raised when no pooled database connection frees up within the acquire timeout."""
+    pass
+
+
 class SecurityError(FACTError):
     """Raised when security violations are detected."""
     pass
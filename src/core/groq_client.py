@@ -6,13 +6,15 @@ Uses Groq's fast inference API as a replacement for Anthropic
 import os
 import json
 import time
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 import structlog
-from groq import Groq
+
+if TYPE_CHECKING:
+    from groq import Groq
 
 logger = structlog.get_logger(__name__)
 
-def create_groq_client(api_key: str) -> Groq:
+def create_groq_client(api_key: str) -> "Groq":
     """
     Create a Groq client instance.
     
@@ -22,6 +24,9 @@ def create_groq_client(api_key: str) -> Groq:
     Returns:
         Configured Groq client
     """
+    # Imported on first use: the SDK is slow to import and the web server
+    # should be listening before anything needs it
+    from groq import Groq
     try:
         client = Groq(api_key=api_key)
         logger.debug("Successfully created Groq client")
@@ -0,0 +1,59 @@
+"""
+FACT System JSON Serialization
+
+This module provides the JSON encoding used on hot response paths. It uses
+orjson when it is installed and falls back to the standard library
+otherwise. It also holds the pre-encoded JSON fragments for knowledge base
+entries, which let search responses be joined from bytes instead of being
+built from models and encoded on every request.
+"""
+
+import json
+from typing import Any, Iterable, Mapping
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+# Fields of a knowledge entry in API responses, in response order
+ENTRY_FIELDS = ("id", "question", "answer", "category", "tags", "state",
+                "priority", "difficulty", "personas", "source")
+
+# Values used when a row has no priority or difficulty
+DEFAULT_PRIORITY = "normal"
+DEFAULT_DIFFICULTY = "basic"
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Args:
+        value: JSON-compatible value (datetimes are encoded as ISO strings)
+
+    Returns:
+        Encoded bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def entry_document(entry: Mapping[str, Any]) -> dict:
+    """The response shape of a knowledge base row (dict, Record or row view)."""
+    document = {name: entry.get(name) for name in ENTRY_FIELDS}
+    document["priority"] = document["priority"] or DEFAULT_PRIORITY
+    document["difficulty"] = document["difficulty"] or DEFAULT_DIFFICULTY
+    return document
+
+
+def entry_fragment(entry: Mapping[str, Any]) -> bytes:
+    """Encoded JSON object of a knowledge base row, ready to splice into a response."""
+    return dumps(entry_document(entry))
+
+
+def join_array(fragments: Iterable[bytes]) -> bytes:
+    """Join encoded JSON values into an encoded JSON array."""
+    return b"[" + b",".join(fragments) + b"]"
@@ -5,17 +5,21 @@ This module provides functionality for uploading custom data to replace
 the sample data in the FACT system database.
 """
 
-import csv
-import json
 import asyncio
 import os
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 import structlog
 
 try:
     from .core.config import get_config
     from .db.connection import DatabaseManager
+    from .db.bulk_ingest import (
+        DEFAULT_INGEST_BATCH, POSTGRES_INGEST_COLUMNS, SQLITE_INGEST_COLUMNS,
+        ProgressCallback, entry_id, ingest_postgres, ingest_postgres_stream,
+        ingest_sqlite, ingest_sqlite_stream
+    )
+    from .upload_stream import DEFAULT_QUEUE_BATCHES, queued_batches, read_chunks
     from .core.errors import DatabaseError, ValidationError
 except ImportError:
     import sys
@@ -26,11 +30,25 @@ except ImportError:
     
     from core.config import get_config
     from db.connection import DatabaseManager
+    from db.bulk_ingest import (
+        DEFAULT_INGEST_BATCH, POSTGRES_INGEST_COLUMNS, SQLITE_INGEST_COLUMNS,
+        ProgressCallback, entry_id, ingest_postgres, ingest_postgres_stream,
+        ingest_sqlite, ingest_sqlite_stream
+    )
+    from upload_stream import DEFAULT_QUEUE_BATCHES, queued_batches, read_chunks
     from core.errors import DatabaseError, ValidationError
 
 logger = structlog.get_logger(__name__)
 
 
+# Knowledge base validation rules, shared by the per-row and batch validators
+KB_REQUIRED_FIELDS = frozenset({"question", "answer", "category"})
+KB_VALID_PRIORITIES = frozenset({"low", "normal", "high", "critical"})
+KB_VALID_DIFFICULTIES = frozenset({"basic", "intermediate", "advanced"})
+KB_MIN_QUESTION_LENGTH = 5
+KB_MIN_ANSWER_LENGTH = 10
+
+
 class DataUploader:
     """
     Handles uploading custom data to the FACT system database.
@@ -69,7 +87,7 @@ class DataUploader:
             raise ValidationError(f"Invalid table name. Must be one of: {valid_tables}")
         
         try:
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 await conn.execute(f"DELETE FROM {table_name}")
                 await conn.commit()
                 
@@ -136,10 +154,8 @@ class DataUploader:
         Raises:
             ValidationError: If data is invalid
         """
-        required_fields = {"question", "answer", "category"}
-        
         # Check required fields
-        missing_fields = required_fields - set(kb_data.keys())
+        missing_fields = set(KB_REQUIRED_FIELDS - set(kb_data.keys()))
         if missing_fields:
             raise ValidationError(f"Missing required fields: {missing_fields}")
         
@@ -158,23 +174,89 @@ class DataUploader:
         }
         
         # Validate constraints
-        valid_priorities = {"low", "normal", "high", "critical"}
-        if validated["priority"] not in valid_priorities:
+        if validated["priority"] not in KB_VALID_PRIORITIES:
             validated["priority"] = "normal"
             
-        valid_difficulties = {"basic", "intermediate", "advanced"}
-        if validated["difficulty"] not in valid_difficulties:
+        if validated["difficulty"] not in KB_VALID_DIFFICULTIES:
             validated["difficulty"] = "basic"
         
         # Validate minimum content length
-        if len(validated["question"]) < 5:
+        if len(validated["question"]) < KB_MIN_QUESTION_LENGTH:
             raise ValidationError("Question must be at least 5 characters long")
         
-        if len(validated["answer"]) < 10:
+        if len(validated["answer"]) < KB_MIN_ANSWER_LENGTH:
             raise ValidationError("Answer must be at least 10 characters long")
         
         return validated
     
+    def validate_knowledge_batch(self, kb_data: List[Dict[str, Any]],
+                                 columns=SQLITE_INGEST_COLUMNS,
+                                 first_row: int = 1) -> Tuple[List[tuple], List[str]]:
+        """
+        Validate and normalize knowledge base entries a column at a time.
+        
+        Applies the same rules as validate_knowledge_base_data, but each
+        field is normalised for the whole batch in one pass and rows come
+        back as tuples ready for executemany/COPY, without an intermediate
+        dict per row. A None value counts as a missing optional field.
+        
+        Args:
+            kb_data: Raw knowledge base entry dictionaries
+            columns: Output column order (SQLITE_INGEST_COLUMNS or POSTGRES_INGEST_COLUMNS)
+            first_row: Row number of kb_data[0], used in error messages
+            
+        Returns:
+            Tuple of (valid rows in column order, error messages)
+        """
+        errors: List[Tuple[int, str]] = []
+        valid = []
+        for i, entry in enumerate(kb_data):
+            missing = KB_REQUIRED_FIELDS - entry.keys()
+            if missing:
+                errors.append((i, f"Missing required fields: {set(missing)}"))
+            else:
+                valid.append(i)
+        entries = [kb_data[i] for i in valid] if errors else kb_data
+        
+        def text(name: str, default: str = "") -> List[str]:
+            values = [entry.get(name) for entry in entries]
+            return [default if value is None else str(value).strip() for value in values]
+        
+        def choice(name: str, allowed: frozenset, default: str) -> List[str]:
+            return [value if value in allowed else default
+                    for value in (value.lower() for value in text(name, default))]
+        
+        normalized = {
+            "question": text("question"),
+            "answer": text("answer"),
+            "category": [value.lower().replace(" ", "_") for value in text("category")],
+            "tags": text("tags"),
+            "metadata": text("metadata"),
+            "state": [value.upper() for value in text("state")],
+            "priority": choice("priority", KB_VALID_PRIORITIES, "normal"),
+            "personas": text("personas"),
+            "source": text("source"),
+            "difficulty": choice("difficulty", KB_VALID_DIFFICULTIES, "basic"),
+        }
+        if "id" in columns:
+            normalized["id"] = [entry_id(entry.get("id")) for entry in entries]
+        
+        # Length rules over whole columns; a row reports its first failure only
+        rejected = set()
+        for row, length in enumerate(map(len, normalized["question"])):
+            if length < KB_MIN_QUESTION_LENGTH:
+                rejected.add(row)
+                errors.append((valid[row], "Question must be at least 5 characters long"))
+        for row, length in enumerate(map(len, normalized["answer"])):
+            if length < KB_MIN_ANSWER_LENGTH and row not in rejected:
+                rejected.add(row)
+                errors.append((valid[row], "Answer must be at least 10 characters long"))
+        
+        rows = list(zip(*(normalized[column] for column in columns)))
+        if rejected:
+            rows = [row for i, row in enumerate(rows) if i not in rejected]
+        return rows, [f"Row {first_row + i}: {message}" for i, message in sorted(errors)]
+    
     def validate_financial_data(self, financial_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate and normalize financial data.
@@ -262,7 +344,7 @@ class DataUploader:
         
         # Insert validated companies
         try:
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 for company in validated_companies:
                     await conn.execute("""
                         INSERT INTO companies (name, symbol, sector, founded_year, employees, market_cap)
@@ -285,114 +367,183 @@ class DataUploader:
             raise DatabaseError(f"Failed to upload companies: {e}")
     
     async def upload_knowledge_base(self, kb_data: List[Dict[str, Any]], 
-                                   clear_existing: bool = False) -> Dict[str, Any]:
+                                   clear_existing: bool = False,
+                                   batch_size: int = DEFAULT_INGEST_BATCH,
+                                   progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """
         Upload knowledge base entries to database.
         
+        All entries are validated before anything is written. PostgreSQL
+        loads go through COPY into a staging table and one upsert; SQLite
+        loads use batched executemany in a single transaction. Clearing
+        existing data happens in the same transaction as the load.
+        
         Args:
             kb_data: List of knowledge base entry dictionaries
             clear_existing: Whether to clear existing knowledge base data first
+            batch_size: Rows per COPY / executemany batch
+            progress: Called with a BatchReport after each batch
             
         Returns:
-            Upload result summary
+            Upload result summary, with ingest throughput under "ingest"
             
         Raises:
             DatabaseError: If upload fails
             ValidationError: If data validation fails
         """
         # Try to use PostgreSQL if available
+        pool = self._postgres_pool()
+        if pool is not None:
+            logger.info("Using PostgreSQL for knowledge base upload")
+            
+            rows, errors = self.validate_knowledge_batch(kb_data, POSTGRES_INGEST_COLUMNS)
+            if errors:
+                raise ValidationError(f"Validation errors: {'; '.join(errors)}")
+            
+            try:
+                report = await ingest_postgres(pool, rows, clear_existing=clear_existing,
+                                               batch_size=batch_size, progress=progress)
+                logger.info("Successfully uploaded to PostgreSQL", count=len(rows))
+                return self._upload_result(report, clear_existing)
+            except Exception as e:
+                logger.warning(f"PostgreSQL upload error: {e}, falling back to SQLite")
+        
+        # Fallback to SQLite; validate everything before touching the table
+        rows, errors = self.validate_knowledge_batch(kb_data, SQLITE_INGEST_COLUMNS)
+        if errors:
+            raise ValidationError(f"Validation errors: {'; '.join(errors)}")
+        
         try:
-            from db.postgres_adapter import postgres_adapter
-            if postgres_adapter and postgres_adapter.initialized:
-                logger.info("Using PostgreSQL for knowledge base upload")
-                
-                # Prepare entries for PostgreSQL
-                postgres_entries = []
-                errors = []
-                
-                for i, entry in enumerate(kb_data):
-                    try:
-                        validated = self.validate_knowledge_base_data(entry)
-                        # Add ID if not present
-                        if 'id' not in entry:
-                            validated['id'] = f"KB_{i+1}_{datetime.now().timestamp()}"
-                        else:
-                            validated['id'] = str(entry['id'])
-                        postgres_entries.append(validated)
-                    except ValidationError as e:
-                        errors.append(f"Row {i+1}: {str(e)}")
-                
-                if errors:
-                    raise ValidationError(f"Validation errors: {'; '.join(errors)}")
-                
-                # Insert via PostgreSQL adapter
-                success = await postgres_adapter.insert_entries(postgres_entries, clear_existing)
-                
-                if success:
-                    logger.info("Successfully uploaded to PostgreSQL", count=len(postgres_entries))
-                    
-                    # Refresh enhanced retriever if available
-                    try:
-                        from retrieval.enhanced_search import EnhancedRetriever
-                        if hasattr(self, '_enhanced_retriever'):
-                            await self._enhanced_retriever.refresh_index()
-                    except:
-                        pass
-                    
-                    return {
-                        "status": "success",
-                        "records_uploaded": len(postgres_entries),
-                        "cleared_existing": clear_existing,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                else:
-                    logger.warning("PostgreSQL upload failed, falling back to SQLite")
-        except ImportError:
-            logger.info("PostgreSQL adapter not available, using SQLite")
+            async with self.db_manager.writer() as conn:
+                report = await ingest_sqlite(conn, rows, clear_existing=clear_existing,
+                                             batch_size=batch_size, progress=progress)
         except Exception as e:
-            logger.warning(f"PostgreSQL upload error: {e}, falling back to SQLite")
-        
-        # Fallback to SQLite
-        if clear_existing:
-            await self.clear_existing_data("knowledge_base")
+            logger.error("Failed to upload knowledge base entries", error=str(e))
+            raise DatabaseError(f"Failed to upload knowledge base entries: {e}")
         
-        validated_entries = []
-        errors = []
+        logger.info("Successfully uploaded knowledge base entries", count=len(rows))
+        return self._upload_result(report, clear_existing)
+    
+    async def upload_knowledge_stream(self, chunks, fmt: str,
+                                      clear_existing: bool = False,
+                                      batch_size: int = DEFAULT_INGEST_BATCH,
+                                      progress: Optional[ProgressCallback] = None,
+                                      max_pending: int = DEFAULT_QUEUE_BATCHES) -> Dict[str, Any]:
+        """
+        Upload knowledge base entries from a JSON or CSV byte stream.
         
-        # Validate all entries first
-        for i, entry in enumerate(kb_data):
-            try:
-                validated = self.validate_knowledge_base_data(entry)
-                validated_entries.append(validated)
-            except ValidationError as e:
-                errors.append(f"Row {i+1}: {str(e)}")
+        Records are parsed incrementally and written batch by batch while
+        the stream is still being read, so memory stays flat whatever the
+        upload size. The load is one transaction: every batch is validated,
+        and if any row is invalid the errors for the whole upload are
+        reported and nothing is committed.
         
-        if errors:
-            raise ValidationError(f"Validation errors: {'; '.join(errors)}")
+        Args:
+            chunks: Async iterable of byte chunks (see upload_stream.read_chunks)
+            fmt: "json" (array of objects) or "csv" (header row first)
+            clear_existing: Whether to clear existing knowledge base data first
+            batch_size: Records per validation / COPY / executemany batch
+            progress: Called with a BatchReport after each batch
+            max_pending: Parsed batches allowed to queue ahead of the writer
+            
+        Returns:
+            Upload result summary, with ingest throughput under "ingest"
+            
+        Raises:
+            DatabaseError: If upload fails
+            ValidationError: If the content or any entry is invalid
+        """
+        pool = self._postgres_pool()
+        columns = POSTGRES_INGEST_COLUMNS if pool is not None else SQLITE_INGEST_COLUMNS
+        errors: List[str] = []
+        
+        async def validated_batches():
+            row_number = 1
+            async for records in queued_batches(chunks, fmt, batch_size, max_pending):
+                rows, batch_errors = self.validate_knowledge_batch(records, columns, row_number)
+                row_number += len(records)
+                errors.extend(batch_errors)
+                # After the first bad row keep validating, but stop writing
+                if not errors:
+                    yield rows
+            if errors:
+                raise ValidationError(f"Validation errors: {'; '.join(errors)}")
         
-        # Insert validated entries
         try:
-            async with self.db_manager.get_connection() as conn:
-                for entry in validated_entries:
-                    await conn.execute("""
-                        INSERT INTO knowledge_base (question, answer, category, tags, metadata, state, priority, personas, source, difficulty)
-                        VALUES (:question, :answer, :category, :tags, :metadata, :state, :priority, :personas, :source, :difficulty)
-                    """, entry)
-                
-                await conn.commit()
-                
-                logger.info("Successfully uploaded knowledge base entries", count=len(validated_entries))
-                
-                return {
-                    "status": "success", 
-                    "records_uploaded": len(validated_entries),
-                    "cleared_existing": clear_existing,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
+            if pool is not None:
+                logger.info("Streaming knowledge base upload into PostgreSQL", format=fmt)
+                report = await ingest_postgres_stream(pool, validated_batches(),
+                                                      clear_existing=clear_existing, progress=progress)
+            else:
+                logger.info("Streaming knowledge base upload into SQLite", format=fmt)
+                async with self.db_manager.writer() as conn:
+                    report = await ingest_sqlite_stream(conn, validated_batches(),
+                                                        clear_existing=clear_existing, progress=progress)
+        except ValidationError:
+            raise
         except Exception as e:
-            logger.error("Failed to upload knowledge base entries", error=str(e))
+            logger.error("Failed to stream knowledge base upload", error=str(e))
             raise DatabaseError(f"Failed to upload knowledge base entries: {e}")
+        
+        logger.info("Successfully streamed knowledge base entries", count=report.rows)
+        return self._upload_result(report, clear_existing)
+    
+    async def load_stream(self, chunks, fmt: str, data_type: str,
+                          clear_existing: bool = False) -> Dict[str, Any]:
+        """
+        Load data from a JSON or CSV byte stream.
+        
+        Knowledge base uploads stream straight into the bulk ingest; the
+        smaller company and financial uploads are collected and passed to
+        their list-based upload methods.
+        
+        Args:
+            chunks: Async iterable of byte chunks
+            fmt: "json" or "csv"
+            data_type: Type of data ('knowledge_base', 'companies', or 'financial_records')
+            clear_existing: Whether to clear existing data first
+            
+        Returns:
+            Upload result summary
+            
+        Raises:
+            ValidationError: If data format is invalid
+        """
+        if data_type == "knowledge_base":
+            return await self.upload_knowledge_stream(chunks, fmt, clear_existing)
+        
+        if data_type == "companies":
+            upload = self.upload_companies
+        elif data_type == "financial_records":
+            upload = self.upload_financial_records
+        else:
+            raise ValidationError(f"Invalid data_type: {data_type}")
+        
+        data = [record async for batch in queued_batches(chunks, fmt, DEFAULT_INGEST_BATCH)
+                for record in batch]
+        logger.info(f"Loaded {len(data)} records from {fmt.upper()} stream")
+        return await upload(data, clear_existing)
+    
+    def _postgres_pool(self):
+        """The PostgreSQL adapter's pool when it is ready, otherwise None."""
+        try:
+            from db.postgres_adapter import postgres_adapter
+        except ImportError:
+            logger.info("PostgreSQL adapter not available, using SQLite")
+            return None
+        if postgres_adapter and postgres_adapter.initialized and postgres_adapter.pool:
+            return postgres_adapter.pool
+        return None
+    
+    @staticmethod
+    def _upload_result(report, clear_existing: bool) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "records_uploaded": report.rows,
+            "cleared_existing": clear_existing,
+            "timestamp": datetime.utcnow().isoformat(),
+            "ingest": report.to_dict()
+        }
     
     async def upload_financial_records(self, financial_data: List[Dict[str, Any]], 
                                      clear_existing: bool = False) -> Dict[str, Any]:
@@ -430,7 +581,7 @@ class DataUploader:
         
         # Insert validated records
         try:
-            async with self.db_manager.get_connection() as conn:
+            async with self.db_manager.writer() as conn:
                 # Insert into both tables for compatibility
                 for record in validated_records:
                     # Insert into financial_records
@@ -481,20 +632,10 @@ class DataUploader:
             raise FileNotFoundError(f"CSV file not found: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                data = list(reader)
-                
-                logger.info(f"Loaded {len(data)} rows from CSV", file_path=file_path)
-                
-                if data_type == "knowledge_base":
-                    return await self.upload_knowledge_base(data, clear_existing)
-                elif data_type == "companies":
-                    return await self.upload_companies(data, clear_existing)
-                elif data_type == "financial_records":
-                    return await self.upload_financial_records(data, clear_existing)
-                else:
-                    raise ValidationError(f"Invalid data_type: {data_type}")
+            with open(file_path, 'rb') as csvfile:
+                result = await self.load_stream(read_chunks(csvfile), "csv", data_type, clear_existing)
+                logger.info("Loaded CSV file", file_path=file_path)
+                return result
                     
         except Exception as e:
             logger.error("Failed to load CSV file", file_path=file_path, error=str(e))
@@ -521,26 +662,11 @@ class DataUploader:
             raise FileNotFoundError(f"JSON file not found: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as jsonfile:
-                data = json.load(jsonfile)
-                
-                if not isinstance(data, list):
-                    raise ValidationError("JSON file must contain an array of objects")
-                
-                logger.info(f"Loaded {len(data)} records from JSON", file_path=file_path)
-                
-                if data_type == "knowledge_base":
-                    return await self.upload_knowledge_base(data, clear_existing)
-                elif data_type == "companies":
-                    return await self.upload_companies(data, clear_existing)
-                elif data_type == "financial_records":
-                    return await self.upload_financial_records(data, clear_existing)
-                else:
-                    raise ValidationError(f"Invalid data_type: {data_type}")
+            with open(file_path, 'rb') as jsonfile:
+                result = await self.load_stream(read_chunks(jsonfile), "json", data_type, clear_existing)
+                logger.info("Loaded JSON file", file_path=file_path)
+                return result
                     
-        except json.JSONDecodeError as e:
-            logger.error("Invalid JSON format", file_path=file_path, error=str(e))
-            raise ValidationError(f"Invalid JSON format: {e}")
         except Exception as e:
             logger.error("Failed to load JSON file", file_path=file_path, error=str(e))
             raise ValidationError(f"Failed to load JSON: {e}")
@@ -0,0 +1,371 @@
+"""
+FACT System Bulk Knowledge Ingest
+
+This module loads validated knowledge_base rows in batches. PostgreSQL rows
+are streamed with binary COPY into a transaction-scoped staging table and
+merged into knowledge_base with one upsert; SQLite rows go through
+executemany in a single transaction, with secondary index and full-text
+maintenance deferred to one rebuild when the load is large relative to
+the table. Every batch reports its size and throughput.
+
+The *_stream variants take an async iterable of batches, so rows can be
+written while the source is still being read; an exception raised by the
+iterable rolls the whole load back.
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+import aiosqlite
+import structlog
+
+try:
+    from .models import FULLTEXT_SCHEMA, FULLTEXT_REBUILD
+except ImportError:
+    from db.models import FULLTEXT_SCHEMA, FULLTEXT_REBUILD
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Rows per executemany call / COPY chunk
+DEFAULT_INGEST_BATCH = 2000
+
+# Below this many rows, deferring index maintenance costs more than it saves
+DEFER_INDEXES_MIN_ROWS = 1000
+
+# Column order of validated rows for the SQLite knowledge_base
+SQLITE_INGEST_COLUMNS = (
+    "question", "answer", "category", "tags", "metadata", "state",
+    "priority", "personas", "source", "difficulty",
+)
+
+# Column order of validated rows for the PostgreSQL knowledge_base (id may be None)
+POSTGRES_INGEST_COLUMNS = (
+    "id", "question", "answer", "category", "state", "tags",
+    "priority", "difficulty", "personas", "source",
+)
+
+# Staging columns are text (the target casts on insert) apart from the key
+_POSTGRES_KEY_TYPE = "integer"
+
+
+@dataclass
+class BatchReport:
+    """Timing for one ingested batch."""
+    batch: int
+    rows: int
+    seconds: float
+    rows_done: int
+    rows_total: Optional[int]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+@dataclass
+class IngestReport:
+    """Summary of a bulk load."""
+    backend: str
+    rows: int = 0
+    seconds: float = 0.0
+    deferred_indexes: bool = False
+    batches: List[BatchReport] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "rows": self.rows,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "batches": len(self.batches),
+            "deferred_indexes": self.deferred_indexes,
+        }
+
+
+ProgressCallback = Callable[[BatchReport], None]
+
+
+def entry_id(value: Any) -> Optional[int]:
+    """Integer knowledge_base id, or None to take the next sequence value."""
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def _chunks(rows: Sequence[tuple], size: int) -> AsyncIterator[Sequence[tuple]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class _BatchClock:
+    """Times batches, logs them and forwards them to the progress callback."""
+
+    def __init__(self, report: IngestReport, total: Optional[int], progress: Optional[ProgressCallback]):
+        self.report = report
+        self.total = total
+        self.progress = progress
+        self.done = 0
+
+    def record(self, rows: int, started: float) -> None:
+        self.done += rows
+        batch = BatchReport(len(self.report.batches) + 1, rows, time.perf_counter() - started,
+                            self.done, self.total)
+        self.report.batches.append(batch)
+        logger.info("Ingested batch",
+                    backend=self.report.backend,
+                    batch=batch.batch,
+                    rows=batch.rows,
+                    progress=f"{batch.rows_done}/{batch.rows_total or '?'}",
+                    rows_per_second=round(batch.rows_per_second))
+        if self.progress is not None:
+            self.progress(batch)
+
+
+async def ingest_sqlite(conn: aiosqlite.Connection, rows: Sequence[tuple],
+                        clear_existing: bool = False,
+                        batch_size: int = DEFAULT_INGEST_BATCH,
+                        progress: Optional[ProgressCallback] = None) -> IngestReport:
+    """
+    Insert knowledge_base rows into SQLite in one transaction.
+
+    When the load is at least DEFER_INDEXES_MIN_ROWS and no smaller than
+    the rows already in the table, the secondary indexes and full-text
+    triggers are dropped for the load and rebuilt once at the end, inside
+    the same transaction.
+
+    Args:
+        conn: Writable connection (DatabaseManager.writer()), no open transaction
+        rows: Tuples in SQLITE_INGEST_COLUMNS order
+        clear_existing: Delete existing rows in the same transaction
+        batch_size: Rows per executemany call
+        progress: Called with a BatchReport after each batch
+
+    Returns:
+        IngestReport with per-batch timings
+
+    Raises:
+        sqlite3.Error: If the load fails; nothing is committed
+    """
+    return await ingest_sqlite_stream(conn, _chunks(rows, batch_size), clear_existing,
+                                      total_rows=len(rows), progress=progress)
+
+
+async def ingest_sqlite_stream(conn: aiosqlite.Connection,
+                               batches: AsyncIterable[Sequence[tuple]],
+                               clear_existing: bool = False,
+                               total_rows: Optional[int] = None,
+                               progress: Optional[ProgressCallback] = None) -> IngestReport:
+    """
+    Insert batches of knowledge_base rows into SQLite as they arrive.
+
+    Each batch is one executemany call; everything commits together once
+    batches is exhausted. Without total_rows the load size is unknown, so
+    index maintenance is deferred only when the table starts out empty.
+
+    Args:
+        conn: Writable connection (DatabaseManager.writer()), no open transaction
+        batches: Lists of tuples in SQLITE_INGEST_COLUMNS order
+        clear_existing: Delete existing rows in the same transaction
+        total_rows: Expected row count, when known
+        progress: Called with a BatchReport after each batch
+
+    Returns:
+        IngestReport with per-batch timings
+
+    Raises:
+        sqlite3.Error: If the load fails; nothing is committed
+    """
+    report = IngestReport("sqlite")
+    clock = _BatchClock(report, total_rows, progress)
+    columns = ", ".join(SQLITE_INGEST_COLUMNS)
+    insert = (f"INSERT INTO knowledge_base ({columns}) "
+              f"VALUES ({', '.join('?' for _ in SQLITE_INGEST_COLUMNS)})")
+    start = time.perf_counter()
+
+    if not conn.in_transaction:
+        await conn.execute("BEGIN IMMEDIATE")
+    try:
+        if clear_existing:
+            existing = 0
+        else:
+            async with conn.execute("SELECT COUNT(*) FROM knowledge_base") as cursor:
+                existing = (await cursor.fetchone())[0]
+
+        if total_rows is None:
+            defer = existing == 0
+        else:
+            defer = total_rows >= DEFER_INDEXES_MIN_ROWS and total_rows >= existing
+
+        index_sql: List[str] = []
+        fulltext = False
+        if defer:
+            index_sql, fulltext = await _drop_secondary_indexes(conn)
+            report.deferred_indexes = True
+
+        if clear_existing:
+            await conn.execute("DELETE FROM knowledge_base")
+
+        async for batch in batches:
+            if not batch:
+                continue
+            started = time.perf_counter()
+            await conn.executemany(insert, batch)
+            clock.record(len(batch), started)
+
+        if report.deferred_indexes:
+            for statement in index_sql:
+                await conn.execute(statement)
+            if fulltext:
+                await _restore_fulltext(conn)
+
+        await conn.commit()
+    except BaseException:
+        await conn.rollback()
+        raise
+
+    report.rows = clock.done
+    report.seconds = time.perf_counter() - start
+    logger.info("SQLite bulk ingest complete", **report.to_dict())
+    return report
+
+
+async def _drop_secondary_indexes(conn: aiosqlite.Connection) -> Tuple[List[str], bool]:
+    """Drop knowledge_base indexes and full-text triggers; returns the index DDL and whether FTS was present."""
+    async with conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'knowledge_base' AND sql IS NOT NULL") as cursor:
+        indexes = await cursor.fetchall()
+    for name, _ in indexes:
+        await conn.execute(f'DROP INDEX "{name}"')
+
+    async with conn.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'trigger' AND tbl_name = 'knowledge_base' AND name LIKE 'knowledge_base_fts_%'") as cursor:
+        triggers = [row[0] for row in await cursor.fetchall()]
+    for name in triggers:
+        await conn.execute(f'DROP TRIGGER "{name}"')
+
+    return [sql for _, sql in indexes], bool(triggers)
+
+
+async def _restore_fulltext(conn: aiosqlite.Connection) -> None:
+    """Recreate the full-text triggers and rebuild the index from knowledge_base."""
+    # executescript() would commit the open transaction, so run statement by statement
+    for statement in _split_statements(FULLTEXT_SCHEMA):
+        await conn.execute(statement)
+    await conn.execute(FULLTEXT_REBUILD)
+
+
+def _split_statements(script: str) -> List[str]:
+    """Split a schema script into complete statements (trigger bodies stay whole)."""
+    statements, current = [], ""
+    for line in script.strip().splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+
+def _merge_sql(columns: Sequence[str]) -> str:
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+    column_list = ", ".join(columns)
+    return (
+        f"INSERT INTO knowledge_base ({column_list}) "
+        f"SELECT DISTINCT ON (id) {column_list} FROM knowledge_base_staging ORDER BY id, seq DESC "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP"
+    )
+
+
+async def ingest_postgres(pool, rows: Sequence[tuple],
+                          columns: Sequence[str] = POSTGRES_INGEST_COLUMNS,
+                          clear_existing: bool = False,
+                          batch_size: int = DEFAULT_INGEST_BATCH,
+                          progress: Optional[ProgressCallback] = None) -> IngestReport:
+    """
+    Load knowledge_base rows into PostgreSQL through a COPY staging table.
+
+    Rows are copied in binary format into a temporary table dropped at
+    commit, rows without an id get one from the knowledge_base sequence,
+    and one INSERT ... ON CONFLICT merges the staging table (last row wins
+    for duplicate ids). The sequence is then moved past the largest id.
+
+    Args:
+        pool: asyncpg pool (or MonitoredPgPool)
+        rows: Tuples in columns order; "id" may be None
+        columns: Column names of the tuples; must include "id"
+        clear_existing: Delete existing rows in the same transaction
+        batch_size: Rows per COPY
+        progress: Called with a BatchReport after each batch
+
+    Returns:
+        IngestReport with per-batch timings
+    """
+    return await ingest_postgres_stream(pool, _chunks(rows, batch_size), columns, clear_existing,
+                                        total_rows=len(rows), progress=progress)
+
+
+async def ingest_postgres_stream(pool, batches: AsyncIterable[Sequence[tuple]],
+                                 columns: Sequence[str] = POSTGRES_INGEST_COLUMNS,
+                                 clear_existing: bool = False,
+                                 total_rows: Optional[int] = None,
+                                 progress: Optional[ProgressCallback] = None) -> IngestReport:
+    """
+    Copy batches of knowledge_base rows into PostgreSQL staging as they arrive.
+
+    Each batch is one binary COPY into the staging table; the merge into
+    knowledge_base runs once batches is exhausted, in the same transaction.
+
+    Args:
+        pool: asyncpg pool (or MonitoredPgPool)
+        batches: Lists of tuples in columns order; "id" may be None
+        columns: Column names of the tuples; must include "id"
+        clear_existing: Delete existing rows in the same transaction
+        total_rows: Expected row count, when known
+        progress: Called with a BatchReport after each batch
+
+    Returns:
+        IngestReport with per-batch timings
+    """
+    if "id" not in columns:
+        raise ValueError("Postgres ingest columns must include id")
+
+    report = IngestReport("postgres")
+    clock = _BatchClock(report, total_rows, progress)
+    staging_columns = ", ".join(
+        f"{column} {_POSTGRES_KEY_TYPE if column == 'id' else 'text'}" for column in columns)
+    sequence = "pg_get_serial_sequence('knowledge_base', 'id')"
+    start = time.perf_counter()
+
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                f"CREATE TEMP TABLE knowledge_base_staging (seq bigserial, {staging_columns}) ON COMMIT DROP")
+
+            async for batch in batches:
+                if not batch:
+                    continue
+                started = time.perf_counter()
+                await conn.copy_records_to_table("knowledge_base_staging", records=batch,
+                                                 columns=list(columns))
+                clock.record(len(batch), started)
+
+            if clear_existing:
+                await conn.execute("DELETE FROM knowledge_base")
+            await conn.execute(f"UPDATE knowledge_base_staging SET id = nextval({sequence}) WHERE id IS NULL")
+            await conn.execute(_merge_sql(columns))
+            await conn.execute(
+                f"SELECT setval({sequence}, GREATEST((SELECT MAX(id) FROM knowledge_base), 1))")
+
+    report.rows = clock.done
+    report.seconds = time.perf_counter() - start
+    logger.info("PostgreSQL bulk ingest complete", **report.to_dict())
+    return report
@@ -0,0 +1,394 @@
+"""
+FACT System Knowledge Base Change Feed
+
+This module reports knowledge_base writes to each worker so it can patch
+its in-memory state instead of reloading the table. SQLite writes are
+recorded by triggers in a versioned change log that readers poll above
+their high-water mark; PostgreSQL writes are announced by a trigger with
+NOTIFY and picked up by a LISTEN connection. Either way a worker receives
+only the changed rows and the ids that were deleted.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set
+import aiosqlite
+import structlog
+
+try:
+    from .models import CHANGE_LOG_SCHEMA, POSTGRES_CHANGE_CHANNEL, POSTGRES_CHANGE_NOTIFY_SCHEMA
+    from .streaming import row_view_type
+except ImportError:
+    from db.models import CHANGE_LOG_SCHEMA, POSTGRES_CHANGE_CHANNEL, POSTGRES_CHANGE_NOTIFY_SCHEMA
+    from db.streaming import row_view_type
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Seconds between SQLite polls / PostgreSQL listener health checks
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Rows read per SQLite poll; larger bursts are applied over several polls
+MAX_CHANGES_PER_POLL = 5000
+
+# Seconds to keep collecting NOTIFY payloads after the first one arrives
+NOTIFY_DEBOUNCE = 0.05
+
+# Columns of changed rows; the same columns the retriever index loads
+SQLITE_CHANGE_COLUMNS = ("id", "question", "answer", "category", "tags", "state", "priority", "difficulty")
+
+_SQLITE_CHANGES_QUERY = f"""
+    SELECT c.version, c.id, c.deleted, {', '.join(f'kb.{column}' for column in SQLITE_CHANGE_COLUMNS)}
+    FROM knowledge_base_changes c
+    LEFT JOIN knowledge_base kb ON kb.id = c.id
+    WHERE c.version > ?
+    ORDER BY c.version
+    LIMIT ?
+"""
+
+# Order-independent digest of the table, compared across processes to detect missed writes
+_POSTGRES_TABLE_FINGERPRINT = """
+    SELECT count(*)::text || ':' || COALESCE(sum(hashtext(kb::text)), 0)::text
+    FROM knowledge_base kb
+"""
+
+_POSTGRES_CHANGED_ROWS = """
+    SELECT id, question, answer, category, state, tags,
+           priority, difficulty, personas, source
+    FROM knowledge_base
+    WHERE id = ANY($1::int[])
+"""
+
+
+@dataclass
+class ChangeSet:
+    """Rows written and ids deleted since the previous change set."""
+    upserts: List[Mapping[str, Any]] = field(default_factory=list)
+    deleted: List[int] = field(default_factory=list)
+    # The feed lost track of changes (TRUNCATE, listener reconnect); reload everything
+    reload: bool = False
+
+    def __len__(self) -> int:
+        return len(self.upserts) + len(self.deleted)
+
+    def __bool__(self) -> bool:
+        return self.reload or len(self) > 0
+
+
+ApplyCallback = Callable[[ChangeSet], Awaitable[None]]
+
+
+class ChangeFeed:
+    """
+    Interface for knowledge_base change notification.
+
+    Call ensure_schema() once, mark() immediately before a full load, then
+    start() with a callback; the callback receives every change committed
+    after the mark, at most one set at a time.
+    """
+
+    name = "none"
+
+    def __init__(self, interval: float = DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self.available = False
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"change_sets": 0, "rows": 0, "reloads": 0, "errors": 0,
+                       "last_apply_ms": 0.0, "last_change_at": None}
+
+    async def ensure_schema(self) -> bool:
+        """Install triggers if needed; returns whether the feed can run."""
+        raise NotImplementedError
+
+    async def mark(self) -> None:
+        """Start tracking from the current state of the table."""
+        raise NotImplementedError
+
+    async def next_changes(self) -> ChangeSet:
+        """Wait for and return the next change set (may be empty)."""
+        raise NotImplementedError
+
+    async def resume(self, pool=None) -> bool:
+        """
+        Reattach in a forked worker after the parent's mark() and load.
+
+        Args:
+            pool: Replacement connection pool when the feed's pool was opened
+                by the parent process
+
+        Returns:
+            True if changes since the parent's mark cannot be replayed and
+            the caller must reload
+        """
+        await self.mark()
+        return True
+
+    def start(self, apply: ApplyCallback) -> None:
+        """Run the feed in a background task, passing change sets to apply."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(apply))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self, apply: ApplyCallback) -> None:
+        logger.info("Knowledge base change feed started", feed=self.name, interval=self.interval)
+        while True:
+            try:
+                changes = await self.next_changes()
+                if not changes:
+                    continue
+                started = time.perf_counter()
+                await apply(changes)
+                self._stats["change_sets"] += 1
+                self._stats["rows"] += len(changes)
+                self._stats["reloads"] += changes.reload
+                self._stats["last_apply_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                self._stats["last_change_at"] = time.time()
+                logger.info("Applied knowledge base changes", feed=self.name,
+                            upserts=len(changes.upserts), deleted=len(changes.deleted),
+                            reload=changes.reload, apply_ms=self._stats["last_apply_ms"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error("Knowledge base change feed error", feed=self.name, error=str(e))
+                await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Feed counters for health reporting."""
+        return {"feed": self.name, "running": self.running, **self._stats}
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def install_sqlite_change_log(db: aiosqlite.Connection) -> bool:
+    """
+    Create the change log table and triggers on an open connection.
+
+    Rows that exist before the log is installed have no entry; readers
+    cover them with their initial full load.
+    """
+    try:
+        await db.executescript(CHANGE_LOG_SCHEMA)
+        await db.commit()
+    except sqlite3.OperationalError as e:
+        logger.warning("SQLite change log unavailable", error=str(e))
+        return False
+    return True
+
+
+class SQLiteChangeFeed(ChangeFeed):
+    """Polls the trigger-maintained change log above a version high-water mark."""
+
+    name = "sqlite_change_log"
+
+    def __init__(self, database_path: str, interval: float = DEFAULT_POLL_INTERVAL,
+                 batch_size: int = MAX_CHANGES_PER_POLL):
+        """
+        Initialize SQLite change feed.
+
+        Args:
+            database_path: Path to the SQLite database holding knowledge_base
+            interval: Seconds between polls
+            batch_size: Maximum change log rows read per poll
+        """
+        super().__init__(interval)
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self.version = 0
+        self._backlog = False
+        self._reader: Optional[aiosqlite.Connection] = None
+        self._view = row_view_type(SQLITE_CHANGE_COLUMNS)
+
+    async def ensure_schema(self) -> bool:
+        if not os.path.exists(self.database_path):
+            # Connecting would create an empty database file
+            logger.warning("SQLite change feed database not found", database_path=self.database_path)
+            self.available = False
+            return False
+        async with aiosqlite.connect(self.database_path) as db:
+            self.available = await install_sqlite_change_log(db)
+        return self.available
+
+    async def _get_reader(self) -> aiosqlite.Connection:
+        if self._reader is None:
+            self._reader = await aiosqlite.connect(f"file:{self.database_path}?mode=ro", uri=True)
+        return self._reader
+
+    async def mark(self) -> None:
+        reader = await self._get_reader()
+        async with reader.execute("SELECT COALESCE(MAX(version), 0) FROM knowledge_base_changes") as cursor:
+            version = (await cursor.fetchone())[0]
+        self.version = max(self.version, version)
+
+    async def resume(self, pool=None) -> bool:
+        # The version high-water mark is plain state, so polling picks up
+        # everything committed since the parent loaded
+        self._reader = None
+        return False
+
+    async def next_changes(self) -> ChangeSet:
+        if not self._backlog:
+            await asyncio.sleep(self.interval)
+        return await self.poll()
+
+    async def poll(self) -> ChangeSet:
+        """Read up to batch_size changes above the high-water mark and advance it."""
+        reader = await self._get_reader()
+        async with reader.execute(_SQLITE_CHANGES_QUERY, (self.version, self.batch_size)) as cursor:
+            rows = await cursor.fetchall()
+
+        changes = ChangeSet()
+        view = self._view
+        for version, entry_id, deleted, *row in rows:
+            if deleted or row[0] is None:
+                changes.deleted.append(entry_id)
+            else:
+                changes.upserts.append(view(row))
+            self.version = version
+        # A full batch means more is waiting; poll again without sleeping
+        self._backlog = len(rows) == self.batch_size
+        return changes
+
+    async def close(self) -> None:
+        await super().close()
+        if self._reader is not None:
+            await self._reader.close()
+            self._reader = None
+
+
+class PostgresChangeFeed(ChangeFeed):
+    """Receives NOTIFY payloads from the knowledge_base trigger on a dedicated LISTEN connection."""
+
+    name = "postgres_notify"
+
+    def __init__(self, pool, dsn: str, interval: float = DEFAULT_POLL_INTERVAL,
+                 debounce: float = NOTIFY_DEBOUNCE):
+        """
+        Initialize PostgreSQL change feed.
+
+        Args:
+            pool: asyncpg pool used to fetch changed rows
+            dsn: Connection string for the LISTEN connection (kept out of the pool)
+            interval: Seconds between listener health checks
+            debounce: Seconds to gather a burst of notifications into one change set
+        """
+        super().__init__(interval)
+        self.pool = pool
+        self.dsn = dsn
+        self.debounce = debounce
+        self._listener = None
+        self._pending: Set[int] = set()
+        self._reload = False
+        self._event = asyncio.Event()
+        self._fingerprint: Optional[str] = None
+
+    async def ensure_schema(self) -> bool:
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await conn.execute(POSTGRES_CHANGE_NOTIFY_SCHEMA)
+                self.available = True
+            except Exception as e:
+                logger.warning("PostgreSQL change notifications unavailable", error=str(e))
+                self.available = False
+        return self.available
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        operation, _, entry_id = payload.partition(":")
+        if operation == "TRUNCATE":
+            self._reload = True
+        else:
+            self._pending.add(int(entry_id))
+        self._event.set()
+
+    async def _listen(self) -> None:
+        import asyncpg
+        self._listener = await asyncpg.connect(self.dsn)
+        await self._listener.add_listener(POSTGRES_CHANGE_CHANNEL, self._on_notify)
+
+    async def mark(self) -> None:
+        # Listen before the caller's full load so nothing committed during it is missed
+        if self._listener is None or self._listener.is_closed():
+            await self._listen()
+        async with self.pool.acquire() as conn:
+            self._fingerprint = await conn.fetchval(_POSTGRES_TABLE_FINGERPRINT)
+        self._pending.clear()
+        self._reload = False
+        self._event.clear()
+
+    async def resume(self, pool=None) -> bool:
+        # Notifications between the parent's mark and our LISTEN went to the
+        # parent; reload only if the table is no longer what the parent loaded
+        if pool is not None:
+            self.pool = pool
+        self._listener = None
+        self._event = asyncio.Event()
+        loaded = self._fingerprint
+        await self.mark()
+        return loaded is None or loaded != self._fingerprint
+
+    async def next_changes(self) -> ChangeSet:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=self.interval)
+        except asyncio.TimeoutError:
+            if self._listener is None or self._listener.is_closed():
+                # Notifications sent while disconnected are lost
+                logger.warning("Change listener disconnected, reconnecting", feed=self.name)
+                await self._listen()
+                return ChangeSet(reload=True)
+            return ChangeSet()
+
+        await asyncio.sleep(self.debounce)
+        self._event.clear()
+        ids, self._pending = self._pending, set()
+        if self._reload:
+            self._reload = False
+            return ChangeSet(reload=True)
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(_POSTGRES_CHANGED_ROWS, list(ids))
+        found = {row["id"] for row in rows}
+        return ChangeSet(upserts=list(rows), deleted=[entry_id for entry_id in ids if entry_id not in found])
+
+    async def close(self) -> None:
+        await super().close()
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.close()
+        self._listener = None
+
+
+def create_change_feed(pool=None, dsn: Optional[str] = None,
+                       database_path: Optional[str] = None,
+                       interval: Optional[float] = None) -> ChangeFeed:
+    """
+    Create the change feed for the active database.
+
+    Args:
+        pool: asyncpg pool; when given with dsn, PostgreSQL LISTEN/NOTIFY is used
+        dsn: PostgreSQL connection string for the LISTEN connection
+        database_path: SQLite database path (defaults to DATABASE_PATH)
+        interval: Poll interval in seconds (defaults to KB_CHANGE_POLL_INTERVAL)
+
+    Returns:
+        Feed instance; call ensure_schema() and mark() before start()
+    """
+    if interval is None:
+        interval = float(os.getenv("KB_CHANGE_POLL_INTERVAL", DEFAULT_POLL_INTERVAL))
+    if pool is not None and dsn:
+        return PostgresChangeFeed(pool, dsn, interval=interval)
+    return SQLiteChangeFeed(database_path or os.getenv("DATABASE_PATH", "data/fact_system.db"),
+                            interval=interval)
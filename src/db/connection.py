@@ -10,13 +10,22 @@ import sqlite3
 import os
 import time
 import asyncio
-from typing import Dict, List, Any, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from contextlib import asynccontextmanager
 import structlog
 
 try:
     # Try relative imports first (when used as package)
-    from ..core.errors import DatabaseError, SecurityError, InvalidSQLError
+    from ..core.errors import DatabaseError, SecurityError, InvalidSQLError, PoolTimeoutError
+    from ..security.pattern_scanner import get_security_scanner
+    from .query_validation import ExplainWorker, ValidationCache, fingerprint_sql, fingerprints
+    from .fulltext import install_sqlite_fulltext
+    from .change_feed import install_sqlite_change_log
+    from .sqlite_profile import SQLiteProfile, connect as connect_sqlite
+    from .pool_health import CheckoutTracker, PoolMetrics, PoolSettings
+    from .streaming import DEFAULT_BATCH_SIZE, QueryStream
     from .models import (
         DATABASE_SCHEMA,
         SAMPLE_COMPANIES,
@@ -34,7 +43,14 @@ except ImportError:
     if src_path not in sys.path:
         sys.path.insert(0, src_path)
     
-    from core.errors import DatabaseError, SecurityError, InvalidSQLError
+    from core.errors import DatabaseError, SecurityError, InvalidSQLError, PoolTimeoutError
+    from security.pattern_scanner import get_security_scanner
+    from db.query_validation import ExplainWorker, ValidationCache, fingerprint_sql, fingerprints
+    from db.fulltext import install_sqlite_fulltext
+    from db.change_feed import install_sqlite_change_log
+    from db.sqlite_profile import SQLiteProfile, connect as connect_sqlite
+    from db.pool_health import CheckoutTracker, PoolMetrics, PoolSettings
+    from db.streaming import DEFAULT_BATCH_SIZE, QueryStream
     from db.models import (
         DATABASE_SCHEMA,
         SAMPLE_COMPANIES,
@@ -48,75 +64,221 @@ except ImportError:
 logger = structlog.get_logger(__name__)
 
 
+# Statements containing these keywords are rejected outright
+SQL_DANGEROUS_KEYWORDS = [
+    "drop", "delete", "update", "insert", "alter", "create",
+    "truncate", "replace", "merge", "exec", "execute",
+    "attach", "detach", "vacuum", "reindex", "analyze"
+]
+
+# Injection patterns checked for every statement except PRAGMA table_info
+SQL_INJECTION_PATTERNS = [
+    r'--',  # SQL comments
+    r'/\*.*?\*/',  # Multi-line comments
+    r';\s*\w+',  # Multiple statements
+    r'\bunion\s+select\b',  # Union injection
+    r'\bor\s+1\s*=\s*1\b',  # Always true conditions
+    r'\band\s+1\s*=\s*1\b',  # Always true conditions
+    r'\bor\s+\'.*?\'\s*=\s*\'.*?\'',  # Suspicious OR with string comparisons
+    r'\'.*?\'\s*or\s*\'.*?\'',  # Injection with OR between quotes
+    r'\\x[0-9a-f]{2}',  # Hex encoding
+]
+
+# Statement templates issued by the system itself; these skip EXPLAIN validation
+SAFE_QUERY_TEMPLATES = [
+    "SELECT 1",
+    "SELECT COUNT(*) FROM knowledge_base",
+    """SELECT name as table_name
+        FROM sqlite_master
+        WHERE type='table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name""",
+]
+
+_sql_scanner = get_security_scanner()
+_sql_scanner.register("sql_keyword", [(keyword, rf'\b{keyword}\b') for keyword in SQL_DANGEROUS_KEYWORDS])
+_sql_scanner.register("sql_statement_injection", SQL_INJECTION_PATTERNS)
+
+
+@dataclass
+class _PooledConnection:
+    """An open pooled connection and its lifecycle timestamps (time.monotonic())."""
+    conn: aiosqlite.Connection
+    created_at: float
+    last_used: float
+    generation: int
+
+
 class AsyncConnectionPool:
     """
     Async connection pool for SQLite database connections.
     
     Provides connection reuse and management to reduce connection overhead.
+    Every connection is opened with the same PRAGMA profile. Connections are
+    pinged on checkout after sitting idle, recycled once they pass their
+    maximum age or idle time, and waits for a free connection are bounded by
+    the acquire timeout. Checkouts are tracked for leak detection and
+    wait-time metrics (see get_stats()).
     """
     
-    def __init__(self, database_path: str, pool_size: int = 10):
+    def __init__(self, database_path: str, pool_size: int = 10,
+                 profile: Optional[SQLiteProfile] = None, read_only: bool = False,
+                 settings: Optional[PoolSettings] = None):
         """
         Initialize connection pool.
         
         Args:
             database_path: Path to SQLite database
             pool_size: Maximum number of connections in pool
+            profile: PRAGMA profile applied to each new connection
+            read_only: Open connections with mode=ro and query_only
+            settings: Lifecycle policy (defaults to PoolSettings.from_env())
         """
         self.database_path = database_path
         self.pool_size = pool_size
-        self.pool: asyncio.Queue = asyncio.Queue(maxsize=pool_size)
+        self.profile = profile or SQLiteProfile()
+        self.read_only = read_only
+        self.settings = settings or PoolSettings.from_env()
+        self.metrics = PoolMetrics()
+        self.tracker = CheckoutTracker("sqlite_readers" if read_only else "sqlite",
+                                       self.settings, self.metrics)
+        # Idle connections, most recently used last
+        self.pool: Deque[_PooledConnection] = deque()
         self.created_connections = 0
-        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(pool_size)
+        self._waiting = 0
+        # Bumped by close_all(); connections from an older generation are closed on return
+        self._generation = 0
         
     async def get_connection(self) -> aiosqlite.Connection:
-        """Get a connection from the pool or create a new one."""
+        """
+        Get a healthy connection from the pool or create a new one.
+        
+        Returns:
+            Connection; hand it back with return_connection()
+            
+        Raises:
+            PoolTimeoutError: If no connection frees up within the acquire timeout
+        """
+        start = time.monotonic()
+        self._waiting += 1
         try:
-            # Try to get existing connection
-            conn = self.pool.get_nowait()
-            logger.debug("Reused pooled connection")
-            return conn
-        except asyncio.QueueEmpty:
-            # Create new connection if pool is empty and we haven't hit limit
-            async with self._lock:
-                if self.created_connections < self.pool_size:
-                    conn = await aiosqlite.connect(self.database_path)
-                    self.created_connections += 1
-                    logger.debug("Created new pooled connection",
-                               total_connections=self.created_connections)
-                    return conn
-                else:
-                    # Wait for a connection to become available
-                    conn = await self.pool.get()
-                    logger.debug("Retrieved connection from pool after wait")
-                    return conn
+            await asyncio.wait_for(self._slots.acquire(), self.settings.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            self.tracker.report_leaks()
+            raise PoolTimeoutError(
+                f"Timed out after {self.settings.acquire_timeout:.1f}s waiting for a database "
+                f"connection; all {self.pool_size} are in use",
+                context=self.get_stats())
+        finally:
+            self._waiting -= 1
+        
+        try:
+            record = await self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        
+        self.metrics.record_wait(time.monotonic() - start, len(self.tracker) + 1)
+        self.tracker.checkout(record.conn, record)
+        return record.conn
     
-    async def return_connection(self, conn: aiosqlite.Connection):
-        """Return a connection to the pool."""
+    async def _checkout(self) -> _PooledConnection:
+        """Reuse the most recent healthy idle connection, or open a new one."""
+        while self.pool:
+            record = self.pool.pop()
+            now = time.monotonic()
+            reason = self.settings.expired(record.created_at, record.last_used, now)
+            if reason is None and now - record.last_used >= self.settings.validate_after:
+                if not await self._is_alive(record.conn):
+                    self.metrics.failed_checks += 1
+                    reason = "failed_check"
+            if reason is None:
+                logger.debug("Reused pooled connection")
+                return record
+            await self._discard(record, reason)
+        
+        conn = await connect_sqlite(self.database_path, self.profile, self.read_only)
+        self.created_connections += 1
+        self.metrics.created += 1
+        logger.debug("Created new pooled connection",
+                   total_connections=self.created_connections)
+        now = time.monotonic()
+        return _PooledConnection(conn, now, now, self._generation)
+    
+    async def _is_alive(self, conn: aiosqlite.Connection) -> bool:
+        try:
+            cursor = await conn.execute("SELECT 1")
+            await cursor.close()
+            return True
+        except Exception as e:
+            logger.warning("Discarding dead pooled connection", error=str(e))
+            return False
+    
+    async def _discard(self, record: _PooledConnection, reason: str) -> None:
+        self.created_connections -= 1
+        if reason != "failed_check":
+            self.metrics.recycled += 1
         try:
-            self.pool.put_nowait(conn)
-            logger.debug("Returned connection to pool")
-        except asyncio.QueueFull:
-            # Pool is full, close the connection
+            await record.conn.close()
+        except Exception as e:
+            logger.debug("Error closing pooled connection", error=str(e))
+        logger.debug("Closed pooled connection", reason=reason,
+                    total_connections=self.created_connections)
+    
+    async def return_connection(self, conn: aiosqlite.Connection, discard: bool = False):
+        """
+        Return a connection to the pool.
+        
+        Args:
+            conn: Connection obtained from get_connection()
+            discard: Close the connection instead of reusing it (e.g. after a driver error)
+        """
+        entry = self.tracker.checkin(conn)
+        if entry is None:
+            # Not ours (or returned twice); close it without touching the slot count
+            logger.warning("Returned connection was not checked out from this pool")
             await conn.close()
-            async with self._lock:
-                self.created_connections -= 1
-            logger.debug("Closed excess connection",
-                        total_connections=self.created_connections)
+            return
+        
+        record: _PooledConnection = entry["record"]
+        try:
+            now = time.monotonic()
+            if record.generation != self._generation:
+                reason = "pool_closed"
+            elif discard:
+                reason = "discarded"
+            else:
+                reason = self.settings.expired(record.created_at, now, now)
+            
+            if reason is None:
+                record.last_used = now
+                self.pool.append(record)
+                logger.debug("Returned connection to pool")
+            else:
+                await self._discard(record, reason)
+        finally:
+            self._slots.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool gauges, counters and checkout wait times; see PoolMetrics.snapshot()."""
+        stats = self.metrics.snapshot(self.pool_size, len(self.tracker), len(self.pool), self._waiting)
+        stats["open"] = self.created_connections
+        return stats
+    
+    def leaks(self) -> List[Dict[str, Any]]:
+        """Checkouts held longer than the leak threshold, with where they were taken."""
+        return self.tracker.leaks()
     
     async def close_all(self):
-        """Close all connections in the pool."""
+        """Close all idle connections; checked-out ones are closed when returned."""
         connections_closed = 0
-        while not self.pool.empty():
-            try:
-                conn = self.pool.get_nowait()
-                await conn.close()
-                connections_closed += 1
-            except asyncio.QueueEmpty:
-                break
-        
-        async with self._lock:
-            self.created_connections = 0
+        self._generation += 1
+        while self.pool:
+            record = self.pool.pop()
+            await record.conn.close()
+            self.created_connections -= 1
+            connections_closed += 1
         
         logger.info("Closed all pooled connections", connections_closed=connections_closed)
 
@@ -126,23 +288,40 @@ class DatabaseManager:
     Manages SQLite database connections and operations for the FACT system.
     
     Provides secure database access with read-only query validation,
-    connection pooling, and performance monitoring.
+    connection pooling, and performance monitoring. Queries run on pooled
+    reader connections (mode=ro by default); writes are serialised through a
+    single writer connection, so with WAL readers never wait on an upload.
     """
     
-    def __init__(self, database_path: str, pool_size: int = 10):
+    def __init__(self, database_path: str, pool_size: int = 10,
+                 profile: Optional[SQLiteProfile] = None,
+                 pool_settings: Optional[PoolSettings] = None):
         """
         Initialize database manager with connection pooling.
         
         Args:
             database_path: Path to SQLite database file
             pool_size: Maximum number of connections in pool
+            profile: SQLite PRAGMA profile (defaults to SQLiteProfile.from_env())
+            pool_settings: Reader pool lifecycle policy (defaults to PoolSettings.from_env())
         """
         self.database_path = database_path
         self.pool_size = pool_size
-        self.connection_pool = AsyncConnectionPool(database_path, pool_size)
+        self.profile = profile or SQLiteProfile.from_env()
+        self.connection_pool = AsyncConnectionPool(database_path, pool_size, self.profile,
+                                                   read_only=self.profile.read_only_readers,
+                                                   settings=pool_settings)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._writer_metrics = PoolMetrics()
+        self._writer_waiting = 0
         self._ensure_directory_exists()
-        self._query_plan_cache = {}  # Cache for validated queries
         self._cache_max_size = 1000
+        # Validated statement fingerprints (literal-normalised), true LRU
+        self._query_plan_cache = ValidationCache(self._cache_max_size)
+        self._safe_templates = fingerprints(SAFE_QUERY_TEMPLATES)
+        self._explain_worker = ExplainWorker(database_path)
+        self.fulltext_available = False
         
     def _ensure_directory_exists(self) -> None:
         """Ensure the database directory exists."""
@@ -159,11 +338,17 @@ class DatabaseManager:
             DatabaseError: If database initialization fails
         """
         try:
-            async with aiosqlite.connect(self.database_path) as db:
+            async with self.writer() as db:
                 # Execute schema creation
                 await db.executescript(DATABASE_SCHEMA)
                 await db.commit()
                 
+                # Full-text index and sync triggers (skipped if FTS5 is missing)
+                self.fulltext_available = await install_sqlite_fulltext(db)
+                
+                # Change log read by each worker's change feed
+                await install_sqlite_change_log(db)
+                
                 # Check if knowledge base data already exists
                 cursor = await db.execute("SELECT COUNT(*) FROM knowledge_base")
                 knowledge_count = (await cursor.fetchone())[0]
@@ -306,26 +491,29 @@ class DatabaseManager:
         except Exception as e:
             logger.error("Database initialization failed", error=str(e))
             raise DatabaseError(f"Failed to initialize database: {e}")
-    def validate_sql_query(self, statement: str) -> None:
+    def register_safe_template(self, statement: str) -> None:
         """
-        Validate SQL query for security and syntax with caching.
+        Mark a statement template as known-safe so it skips EXPLAIN validation.
+        
+        Security checks still run on every statement; only the syntax
+        round-trip is skipped for statements matching the template.
         
         Args:
-            statement: SQL statement to validate
-            
+            statement: Example statement; literals are normalised away
+        """
+        self._safe_templates.add(fingerprint_sql(statement))
+    
+    def clear_validation_cache(self) -> None:
+        """Forget validated fingerprints (call after schema changes)."""
+        self._query_plan_cache.clear()
+    
+    def _check_query_security(self, statement: str) -> None:
+        """
+        Apply the security rules to a statement.
+        
         Raises:
             SecurityError: If statement contains dangerous operations
-            InvalidSQLError: If statement has syntax errors
         """
-        # Generate cache key for query validation
-        import hashlib
-        query_hash = hashlib.md5(statement.encode()).hexdigest()
-        
-        # Check cache first
-        if query_hash in self._query_plan_cache:
-            logger.debug("Query validation cache hit", statement=statement[:100])
-            return
-        
         normalized_statement = statement.lower().strip()
         
         # Security check: allow SELECT statements and safe PRAGMA queries
@@ -335,42 +523,18 @@ class DatabaseManager:
         if not (is_select or is_safe_pragma):
             raise SecurityError("Only SELECT statements and PRAGMA table_info queries are allowed")
         
-        # Enhanced dangerous keyword detection (excluding safe pragma)
-        dangerous_keywords = [
-            "drop", "delete", "update", "insert", "alter", "create",
-            "truncate", "replace", "merge", "exec", "execute",
-            "attach", "detach", "vacuum", "reindex", "analyze"
-        ]
-        
         # For PRAGMA queries, only allow table_info
         if normalized_statement.startswith("pragma") and not normalized_statement.startswith("pragma table_info"):
             raise SecurityError("Only PRAGMA table_info queries are allowed")
         
-        # Check for dangerous keywords with word boundaries
-        import re
-        for keyword in dangerous_keywords:
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, normalized_statement, re.IGNORECASE):
-                raise SecurityError(f"Dangerous SQL keyword detected: {keyword}")
-        
-        # Check for SQL injection patterns
-        # Check for SQL injection patterns (skip for safe PRAGMA queries)
-        if not normalized_statement.startswith("pragma table_info"):
-            injection_patterns = [
-                r'--',  # SQL comments
-                r'/\*.*?\*/',  # Multi-line comments
-                r';\s*\w+',  # Multiple statements
-                r'\bunion\s+select\b',  # Union injection
-                r'\bor\s+1\s*=\s*1\b',  # Always true conditions
-                r'\band\s+1\s*=\s*1\b',  # Always true conditions
-                r'\bor\s+\'.*?\'\s*=\s*\'.*?\'',  # Suspicious OR with string comparisons
-                r'\'.*?\'\s*or\s*\'.*?\'',  # Injection with OR between quotes
-                r'\\x[0-9a-f]{2}',  # Hex encoding
-            ]
-            
-            for pattern in injection_patterns:
-                if re.search(pattern, normalized_statement, re.IGNORECASE):
-                    raise SecurityError(f"Potential SQL injection pattern detected: {pattern} in query: {normalized_statement[:100]}")
+        # Dangerous keywords (word-bounded), then injection patterns (skipped for safe PRAGMA queries)
+        families = ("sql_keyword",) if is_safe_pragma else ("sql_keyword", "sql_statement_injection")
+        match = _sql_scanner.scan(normalized_statement, families)
+        if match is not None:
+            if match.family == "sql_keyword":
+                raise SecurityError(f"Dangerous SQL keyword detected: {match.rule}")
+            raise SecurityError(f"Potential SQL injection pattern detected: {match.pattern} in query: {normalized_statement[:100]}")
+        
         # Limit query complexity
         if len(statement) > 5000:
             raise SecurityError("Query too long - potential DoS attack")
@@ -379,23 +543,76 @@ class DatabaseManager:
         subquery_count = normalized_statement.count('select')
         if subquery_count > 5:
             raise SecurityError("Too many nested subqueries - potential injection attack")
+    
+    def _needs_explain(self, statement: str) -> Optional[str]:
+        """Return the fingerprint to validate, or None if it is cached or a safe template."""
+        fingerprint = fingerprint_sql(statement)
+        if fingerprint in self._safe_templates or fingerprint in self._query_plan_cache:
+            logger.debug("Query validation cache hit", statement=statement[:100])
+            return None
+        return fingerprint
+    
+    def validate_sql_query(self, statement: str,
+                           params: Optional[Tuple[Any, ...]] = None) -> None:
+        """
+        Validate SQL query for security and syntax with caching.
+        
+        Security rules run on every statement. The EXPLAIN syntax check runs
+        once per literal-normalised fingerprint; statements that differ only
+        in literal values share the cached result. Async callers should use
+        validate_sql_query_async, which runs EXPLAIN off the event loop.
+        
+        Args:
+            statement: SQL statement to validate
+            params: Values bound to ? placeholders (needed to compile the plan)
+            
+        Raises:
+            SecurityError: If statement contains dangerous operations
+            InvalidSQLError: If statement has syntax errors
+        """
+        self._check_query_security(statement)
+        
+        fingerprint = self._needs_explain(statement)
+        if fingerprint is None:
+            return
         
         # Basic syntax validation using actual database connection
         try:
-            # Parse SQL to check syntax (without executing)
-            with sqlite3.connect(self.database_path) as conn:
-                conn.execute(f"EXPLAIN QUERY PLAN {statement}")
+            self._explain_worker.explain(statement, params or ())
         except sqlite3.Error as e:
             raise InvalidSQLError(f"SQL syntax error: {e}")
         
-        # Cache successful validation
-        if len(self._query_plan_cache) >= self._cache_max_size:
-            # Simple eviction: remove oldest entries
-            oldest_keys = list(self._query_plan_cache.keys())[:100]
-            for key in oldest_keys:
-                del self._query_plan_cache[key]
+        self._query_plan_cache.add(fingerprint, time.time())
+        logger.debug("SQL query validation passed and cached", statement=statement[:100])
+    
+    async def validate_sql_query_async(self, statement: str,
+                                       params: Optional[Tuple[Any, ...]] = None) -> None:
+        """
+        Validate SQL query without blocking the event loop.
+        
+        Same rules as validate_sql_query; the EXPLAIN round-trip runs on a
+        dedicated validation thread with its own persistent connection.
+        
+        Args:
+            statement: SQL statement to validate
+            params: Values bound to ? placeholders (needed to compile the plan)
+            
+        Raises:
+            SecurityError: If statement contains dangerous operations
+            InvalidSQLError: If statement has syntax errors
+        """
+        self._check_query_security(statement)
+        
+        fingerprint = self._needs_explain(statement)
+        if fingerprint is None:
+            return
         
-        self._query_plan_cache[query_hash] = time.time()
+        try:
+            await self._explain_worker.explain_async(statement, params or ())
+        except sqlite3.Error as e:
+            raise InvalidSQLError(f"SQL syntax error: {e}")
+        
+        self._query_plan_cache.add(fingerprint, time.time())
         logger.debug("SQL query validation passed and cached", statement=statement[:100])
     
     def _is_valid_table_name(self, table_name: str) -> bool:
@@ -430,12 +647,17 @@ class DatabaseManager:
         return True
         logger.debug("SQL query validation passed", statement=statement[:100])
     
-    async def execute_query(self, statement: str) -> QueryResult:
+    async def execute_query(self, statement: str,
+                            params: Optional[Tuple[Any, ...]] = None) -> QueryResult:
         """
         Execute a validated SQL query using connection pool.
         
+        Parameterised statements keep the same text across calls, so they
+        validate once and reuse the connection's prepared statement.
+        
         Args:
             statement: SQL SELECT statement to execute
+            params: Values bound to ? placeholders in statement
             
         Returns:
             QueryResult containing rows, metadata, and timing
@@ -445,8 +667,8 @@ class DatabaseManager:
             SecurityError: If statement violates security rules
             InvalidSQLError: If statement has syntax errors
         """
-        # Validate query first (with caching)
-        self.validate_sql_query(statement)
+        # Validate query first (with caching, off the event loop)
+        await self.validate_sql_query_async(statement, params)
         
         start_time = time.time()
         
@@ -458,7 +680,7 @@ class DatabaseManager:
                 # Enable row factory for dictionary-like access
                 db.row_factory = aiosqlite.Row
                 
-                cursor = await db.execute(statement)
+                cursor = await db.execute(statement, params or ())
                 rows = await cursor.fetchall()
                 
                 # Convert rows to dictionaries
@@ -497,6 +719,8 @@ class DatabaseManager:
                 # Always return connection to pool
                 await self.connection_pool.return_connection(db)
                 
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             end_time = time.time()
             execution_time_ms = (end_time - start_time) * 1000
@@ -508,6 +732,53 @@ class DatabaseManager:
             
             raise DatabaseError(f"Query execution failed: {e}")
     
+    @asynccontextmanager
+    async def stream_query(self, statement: str,
+                           params: Optional[Tuple[Any, ...]] = None,
+                           batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Execute a validated SQL query and stream its rows in batches.
+        
+        Unlike execute_query, rows are never all held at once: each batch is
+        fetched as plain tuples when the consumer asks for it. The pooled
+        reader connection is held until the block exits.
+        
+        Args:
+            statement: SQL SELECT statement to execute
+            params: Values bound to ? placeholders in statement
+            batch_size: Rows fetched per batch
+            
+        Yields:
+            QueryStream: Async iterator of row batches with resolved columns
+            
+        Raises:
+            DatabaseError: If query execution fails
+            SecurityError: If statement violates security rules
+            InvalidSQLError: If statement has syntax errors
+        """
+        await self.validate_sql_query_async(statement, params)
+        
+        db = await self.connection_pool.get_connection()
+        try:
+            try:
+                cursor = await db.execute(statement, params or ())
+            except Exception as e:
+                logger.error("Streaming query failed", statement=statement[:100], error=str(e))
+                raise DatabaseError(f"Query execution failed: {e}")
+            
+            stream = QueryStream(cursor, batch_size)
+            start_time = time.time()
+            try:
+                yield stream
+            finally:
+                await cursor.close()
+                logger.info("Streaming query completed",
+                           statement=statement[:100],
+                           row_count=stream.row_count,
+                           execution_time_ms=(time.time() - start_time) * 1000)
+        finally:
+            await self.connection_pool.return_connection(db)
+    
     async def get_database_info(self) -> Dict[str, Any]:
         """
         Get database metadata and statistics.
@@ -516,7 +787,7 @@ class DatabaseManager:
             Dictionary containing database information
         """
         try:
-            async with aiosqlite.connect(self.database_path) as db:
+            async with self.get_connection() as db:
                 # Get table information
                 cursor = await db.execute("""
                     SELECT name FROM sqlite_master
@@ -553,23 +824,76 @@ class DatabaseManager:
             logger.error("Failed to get database info", error=str(e))
             raise DatabaseError(f"Failed to get database info: {e}")
     
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool metrics.
+        
+        Returns:
+            Reader pool stats and writer lock wait times (see PoolMetrics.snapshot())
+        """
+        writer_in_use = 1 if self._writer_lock.locked() else 0
+        return {
+            "readers": self.connection_pool.get_stats(),
+            "writer": self._writer_metrics.snapshot(1, writer_in_use, 1 - writer_in_use,
+                                                    self._writer_waiting),
+        }
+    
     async def cleanup(self):
         """
         Cleanup database resources including connection pool.
         """
         try:
             await self.connection_pool.close_all()
+            async with self._writer_lock:
+                if self._writer is not None:
+                    await self._writer.close()
+                    self._writer = None
+            self._explain_worker.close()
             logger.info("Database manager cleanup completed")
         except Exception as e:
             logger.error("Database cleanup failed", error=str(e))
     
+    @asynccontextmanager
+    async def writer(self):
+        """
+        Exclusive access to the single writer connection.
+        
+        The writer sets the journal mode (WAL by default) and is shared by
+        schema setup and uploads; callers commit their own transactions.
+        Uncommitted work is rolled back if the block raises.
+        
+        Yields:
+            aiosqlite.Connection: Writable database connection
+        """
+        start = time.monotonic()
+        self._writer_waiting += 1
+        try:
+            await self._writer_lock.acquire()
+        finally:
+            self._writer_waiting -= 1
+        try:
+            self._writer_metrics.record_wait(time.monotonic() - start, 1)
+            if self._writer is None:
+                self._writer = await connect_sqlite(self.database_path, self.profile)
+                self._writer_metrics.created += 1
+            try:
+                yield self._writer
+            except Exception:
+                await self._writer.rollback()
+                raise
+        finally:
+            self._writer_lock.release()
+    
     @asynccontextmanager
     async def get_connection(self):
         """
-        Get an async database connection context manager.
+        Get a pooled, read-only database connection.
+        
+        Writes go through writer(), which serialises them on the single
+        writer connection.
         
         Yields:
-            aiosqlite.Connection: Database connection
+            aiosqlite.Connection: Read-only database connection
         """
         # Use connection pool instead of creating new connections
         conn = await self.connection_pool.get_connection()
@@ -0,0 +1,302 @@
+"""
+FACT System Full-Text Search Backends
+
+This module provides server-side candidate generation for knowledge_base
+lookups. SQLite uses an FTS5 index kept in sync by triggers; PostgreSQL uses
+a weighted tsvector column with a GIN index plus pg_trgm trigram indexes for
+typo tolerance. Both return the best-ranked rows for a query through the same
+interface, so EnhancedRetriever can re-score a small candidate set instead of
+loading the whole knowledge base into every worker.
+"""
+
+import os
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import aiosqlite
+import structlog
+
+try:
+    from .kb_queries import KB_SEARCH_COLUMNS
+    from .models import (
+        FULLTEXT_SCHEMA, FULLTEXT_REBUILD, POSTGRES_FULLTEXT_SCHEMA, POSTGRES_TRIGRAM_SCHEMA
+    )
+except ImportError:
+    from db.kb_queries import KB_SEARCH_COLUMNS
+    from db.models import (
+        FULLTEXT_SCHEMA, FULLTEXT_REBUILD, POSTGRES_FULLTEXT_SCHEMA, POSTGRES_TRIGRAM_SCHEMA
+    )
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Default number of candidates fetched for re-scoring
+DEFAULT_CANDIDATES = 50
+
+# Column weights for bm25(): question, answer, tags
+SQLITE_BM25_WEIGHTS = (10.0, 2.0, 5.0)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "the",
+    "to", "what", "when", "where", "which", "who", "why", "with", "you", "your",
+})
+
+
+def search_terms(query: str, max_terms: int = 12) -> List[str]:
+    """
+    Split a query into index terms.
+
+    Terms are lowercase alphanumeric tokens; stop words are dropped unless
+    the query has nothing else. Only characters that are safe inside FTS5
+    and tsquery expressions survive, so terms can be joined without quoting.
+    """
+    tokens = _TOKEN.findall(query.lower())
+    terms = [token for token in tokens if token not in _STOP_WORDS and len(token) > 1] or tokens
+    return list(dict.fromkeys(terms))[:max_terms]
+
+
+def fts5_expression(terms: List[str]) -> str:
+    """Any-term prefix query for FTS5 MATCH."""
+    return " OR ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery_expression(terms: List[str]) -> str:
+    """Any-term prefix query for to_tsquery()."""
+    return " | ".join(f"{term}:*" for term in terms)
+
+
+class FullTextBackend:
+    """
+    Interface for server-side candidate generation.
+
+    candidates() returns knowledge_base rows as dictionaries with the
+    KB_SEARCH_COLUMNS keys plus a backend-specific relevance "score"
+    (higher is better), best first.
+    """
+
+    name = "none"
+
+    def __init__(self):
+        self.available = False
+
+    async def ensure_schema(self) -> bool:
+        """Create indexes and triggers if needed; returns whether search is available."""
+        raise NotImplementedError
+
+    async def candidates(self, query: str, category: Optional[str] = None,
+                         state: Optional[str] = None,
+                         limit: int = DEFAULT_CANDIDATES) -> List[Dict[str, Any]]:
+        """
+        Fetch the best-ranked rows for a query.
+
+        Args:
+            query: Free-text query
+            category: Optional category filter (case-insensitive)
+            state: Optional state code filter
+            limit: Maximum number of candidates
+
+        Returns:
+            Rows ordered by relevance
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+async def install_sqlite_fulltext(db: aiosqlite.Connection) -> bool:
+    """
+    Create the FTS5 table and sync triggers on an open connection.
+
+    The index is rebuilt from knowledge_base the first time it is created, so
+    existing databases are backfilled. Returns False if SQLite lacks FTS5.
+    """
+    cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE name = 'knowledge_base_fts'")
+    existed = await cursor.fetchone() is not None
+    await cursor.close()
+
+    try:
+        await db.executescript(FULLTEXT_SCHEMA)
+        if not existed:
+            await db.execute(FULLTEXT_REBUILD)
+        await db.commit()
+    except sqlite3.OperationalError as e:
+        logger.warning("SQLite full-text index unavailable", error=str(e))
+        return False
+    return True
+
+
+@lru_cache(maxsize=16)
+def _sqlite_candidate_sql(has_category: bool, has_state: bool) -> str:
+    columns = ", ".join(f"kb.{column}" for column in KB_SEARCH_COLUMNS)
+    weights = ", ".join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+    sql = (f"SELECT {columns}, -bm25(knowledge_base_fts, {weights}) AS score "
+           "FROM knowledge_base_fts JOIN knowledge_base AS kb ON kb.id = knowledge_base_fts.rowid "
+           "WHERE knowledge_base_fts MATCH ?")
+    if has_category:
+        sql += " AND lower(kb.category) = ?"
+    if has_state:
+        sql += " AND kb.state = ?"
+    return sql + " ORDER BY score DESC, kb.id LIMIT ?"
+
+
+class SQLiteFullTextBackend(FullTextBackend):
+    """FTS5 candidate generator with bm25 ranking on a read-only connection."""
+
+    name = "sqlite_fts5"
+
+    def __init__(self, database_path: str):
+        """
+        Initialize SQLite full-text backend.
+
+        Args:
+            database_path: Path to the SQLite database holding knowledge_base
+        """
+        super().__init__()
+        self.database_path = database_path
+        self._reader: Optional[aiosqlite.Connection] = None
+
+    async def ensure_schema(self) -> bool:
+        async with aiosqlite.connect(self.database_path) as db:
+            self.available = await install_sqlite_fulltext(db)
+        logger.info("SQLite full-text backend ready", available=self.available,
+                    database_path=self.database_path)
+        return self.available
+
+    async def _get_reader(self) -> aiosqlite.Connection:
+        if self._reader is None:
+            self._reader = await aiosqlite.connect(f"file:{self.database_path}?mode=ro", uri=True)
+            self._reader.row_factory = aiosqlite.Row
+        return self._reader
+
+    async def candidates(self, query: str, category: Optional[str] = None,
+                         state: Optional[str] = None,
+                         limit: int = DEFAULT_CANDIDATES) -> List[Dict[str, Any]]:
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        params: List[Any] = [fts5_expression(terms)]
+        if category:
+            params.append(category.lower())
+        if state:
+            params.append(state.upper())
+        params.append(limit)
+
+        reader = await self._get_reader()
+        async with reader.execute(_sqlite_candidate_sql(bool(category), bool(state)), params) as cursor:
+            rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            await self._reader.close()
+            self._reader = None
+
+
+@lru_cache(maxsize=16)
+def _postgres_candidate_sql(trigram: bool, has_category: bool, has_state: bool) -> str:
+    position = 2 if trigram else 1
+
+    def placeholder() -> str:
+        nonlocal position
+        position += 1
+        return f"${position}"
+
+    score = "ts_rank_cd(search_vector, q)"
+    match = "search_vector @@ q"
+    if trigram:
+        # $2 is the raw query, compared against question and tags by trigram similarity
+        score += " + similarity(question, $2)"
+        match = f"({match} OR question % $2 OR tags % $2)"
+
+    sql = (f"SELECT {', '.join(KB_SEARCH_COLUMNS)}, {score} AS score "
+           f"FROM knowledge_base, to_tsquery('english', $1) AS q WHERE {match}")
+    if has_category:
+        sql += f" AND lower(category) = {placeholder()}"
+    if has_state:
+        sql += f" AND state = {placeholder()}"
+    return sql + f" ORDER BY score DESC, id LIMIT {placeholder()}"
+
+
+class PostgresFullTextBackend(FullTextBackend):
+    """tsvector/GIN candidate generator with optional pg_trgm fuzzy matching."""
+
+    name = "postgres_tsvector"
+
+    def __init__(self, pool, use_trigram: bool = True):
+        """
+        Initialize PostgreSQL full-text backend.
+
+        Args:
+            pool: asyncpg connection pool
+            use_trigram: Also match by trigram similarity when pg_trgm is installable
+        """
+        super().__init__()
+        self.pool = pool
+        self.use_trigram = use_trigram
+        self.trigram = False
+
+    async def ensure_schema(self) -> bool:
+        async with self.pool.acquire() as conn:
+            try:
+                await conn.execute(POSTGRES_FULLTEXT_SCHEMA)
+                self.available = True
+            except Exception as e:
+                logger.warning("PostgreSQL full-text column unavailable", error=str(e))
+                self.available = False
+                return False
+
+            if self.use_trigram:
+                try:
+                    await conn.execute(POSTGRES_TRIGRAM_SCHEMA)
+                    self.trigram = True
+                except Exception as e:
+                    # CREATE EXTENSION needs privileges some hosts do not grant
+                    logger.warning("pg_trgm unavailable, fuzzy matching disabled", error=str(e))
+                    self.trigram = False
+
+        logger.info("PostgreSQL full-text backend ready", trigram=self.trigram)
+        return self.available
+
+    async def candidates(self, query: str, category: Optional[str] = None,
+                         state: Optional[str] = None,
+                         limit: int = DEFAULT_CANDIDATES) -> List[Dict[str, Any]]:
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        params: List[Any] = [tsquery_expression(terms)]
+        if self.trigram:
+            params.append(query.lower())
+        if category:
+            params.append(category.lower())
+        if state:
+            params.append(state.upper())
+        params.append(limit)
+
+        sql = _postgres_candidate_sql(self.trigram, bool(category), bool(state))
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(sql, *params)
+        return [dict(row) for row in rows]
+
+
+def create_fulltext_backend(pool=None, database_path: Optional[str] = None) -> FullTextBackend:
+    """
+    Create the full-text backend for the active database.
+
+    Args:
+        pool: asyncpg pool; when given, PostgreSQL full-text search is used
+        database_path: SQLite database path (defaults to DATABASE_PATH)
+
+    Returns:
+        Backend instance; call ensure_schema() before searching
+    """
+    if pool is not None:
+        return PostgresFullTextBackend(pool)
+    return SQLiteFullTextBackend(database_path or os.getenv("DATABASE_PATH", "data/fact_system.db"))
@@ -0,0 +1,200 @@
+"""
+FACT System Knowledge Base Query Builder
+
+This module builds parameterised SELECT statements for knowledge_base
+lookups. User input only ever travels as bound parameters, so the statement
+text depends on which filters are present, not on their values. Stable text
+means one validation per template (see query_validation) and one prepare per
+connection: sqlite3 keeps a per-connection statement cache keyed by SQL text,
+and asyncpg does the same for Postgres.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+SQLITE = "sqlite"
+POSTGRES = "postgres"
+
+# Columns the /knowledge/search response model needs
+KB_SEARCH_COLUMNS = (
+    "id", "question", "answer", "category", "tags", "state",
+    "priority", "difficulty", "personas", "source",
+)
+
+# Columns the voice webhook answer needs
+KB_ANSWER_COLUMNS = ("id", "question", "answer", "category", "state", "priority")
+
+KB_COLUMNS = frozenset(KB_SEARCH_COLUMNS) | {"metadata", "created_at", "updated_at"}
+
+# Hard cap on rows any builder query may return
+MAX_RESULT_ROWS = 1000
+
+PRIORITY_ORDER = (
+    "CASE priority WHEN 'critical' THEN 1 WHEN 'high' THEN 2 "
+    "WHEN 'normal' THEN 3 ELSE 4 END"
+)
+
+LIKE_ESCAPE = "!"
+
+
+def escape_like(term: str, escape: str = LIKE_ESCAPE) -> str:
+    """Escape LIKE wildcards so the term matches literally."""
+    return (term.replace(escape, escape + escape)
+                .replace("%", escape + "%")
+                .replace("_", escape + "_"))
+
+
+@dataclass(frozen=True)
+class BuiltQuery:
+    """A statement template and the values bound to it."""
+    sql: str
+    params: Tuple[Any, ...]
+
+
+@lru_cache(maxsize=256)
+def _render(dialect: str,
+            columns: Tuple[str, ...],
+            match_fields: Tuple[str, ...],
+            filters: Tuple[str, ...],
+            rank_field: Optional[str],
+            order: Optional[str]) -> str:
+    """Render a statement template; identical shapes return the identical string."""
+    position = 0
+
+    def placeholder() -> str:
+        nonlocal position
+        position += 1
+        return f"${position}" if dialect == POSTGRES else "?"
+
+    term = placeholder() if match_fields and dialect == POSTGRES else None
+    operator = "ILIKE" if dialect == POSTGRES else "LIKE"
+
+    def like(field: str) -> str:
+        # Postgres reuses one numbered parameter; SQLite binds the term per use
+        return f"{field} {operator} {term or placeholder()} ESCAPE '{LIKE_ESCAPE}'"
+
+    clauses = []
+    if match_fields:
+        clauses.append("(" + " OR ".join(like(field) for field in match_fields) + ")")
+    for column in filters:
+        clauses.append(f"{column} = {placeholder()}")
+
+    ordering = []
+    if rank_field:
+        ordering.append(f"CASE WHEN {like(rank_field)} THEN 1 ELSE 2 END")
+    if order:
+        ordering.append(order)
+
+    sql = f"SELECT {', '.join(columns)} FROM knowledge_base"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if ordering:
+        sql += " ORDER BY " + ", ".join(ordering)
+    return sql + f" LIMIT {placeholder()}"
+
+
+class KnowledgeQuery:
+    """
+    Fluent builder for knowledge_base SELECTs.
+
+    Example:
+        query = (KnowledgeQuery(KB_ANSWER_COLUMNS)
+                 .matching("bond", ("question", "answer"))
+                 .where("state", "GA")
+                 .order_by_priority()
+                 .limit(3)
+                 .build())
+        result = await database_manager.execute_query(query.sql, query.params)
+    """
+
+    def __init__(self, columns: Sequence[str] = KB_SEARCH_COLUMNS):
+        """
+        Initialize query builder.
+
+        Args:
+            columns: Columns to select; only what the caller will read
+
+        Raises:
+            ValueError: If a column is not part of knowledge_base
+        """
+        self._columns = self._check_columns(columns)
+        self._match_fields: Tuple[str, ...] = ()
+        self._match_term: Optional[str] = None
+        self._rank_field: Optional[str] = None
+        self._filters: List[Tuple[str, Any]] = []
+        self._order: Optional[str] = None
+        self._limit = MAX_RESULT_ROWS
+
+    @staticmethod
+    def _check_columns(columns: Sequence[str]) -> Tuple[str, ...]:
+        unknown = [column for column in columns if column not in KB_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown knowledge_base columns: {unknown}")
+        return tuple(columns)
+
+    def matching(self, text: Optional[str],
+                 fields: Sequence[str] = ("question", "answer")) -> "KnowledgeQuery":
+        """Substring match (case-insensitive) on any of fields; empty text adds nothing."""
+        if text:
+            self._match_fields = self._check_columns(fields)
+            self._match_term = f"%{escape_like(text)}%"
+        return self
+
+    def rank_matches_in(self, field: str) -> "KnowledgeQuery":
+        """Order rows whose field matches the search text first."""
+        self._rank_field = self._check_columns((field,))[0]
+        return self
+
+    def where(self, column: str, value: Any) -> "KnowledgeQuery":
+        """Equality filter; None or empty values add nothing."""
+        if value is not None and value != "":
+            self._check_columns((column,))
+            self._filters.append((column, value))
+        return self
+
+    def order_by_priority(self) -> "KnowledgeQuery":
+        """Critical, high, normal, then everything else; ties by id."""
+        self._order = f"{PRIORITY_ORDER}, id"
+        return self
+
+    def order_by(self, *columns: str) -> "KnowledgeQuery":
+        self._order = ", ".join(self._check_columns(columns))
+        return self
+
+    def limit(self, count: int) -> "KnowledgeQuery":
+        """Row limit, clamped to 1..MAX_RESULT_ROWS."""
+        self._limit = max(1, min(int(count), MAX_RESULT_ROWS))
+        return self
+
+    def build(self, dialect: str = SQLITE) -> BuiltQuery:
+        """
+        Render the statement for a database dialect.
+
+        Args:
+            dialect: SQLITE (? placeholders) or POSTGRES ($n placeholders)
+
+        Returns:
+            BuiltQuery with the template and its parameters in order
+        """
+        if dialect not in (SQLITE, POSTGRES):
+            raise ValueError(f"Unsupported dialect: {dialect}")
+
+        rank_field = self._rank_field if self._match_fields else None
+        sql = _render(dialect, self._columns, self._match_fields,
+                      tuple(column for column, _ in self._filters), rank_field, self._order)
+
+        params: List[Any] = []
+        if dialect == POSTGRES:
+            if self._match_fields:
+                params.append(self._match_term)
+            params.extend(value for _, value in self._filters)
+        else:
+            params.extend([self._match_term] * len(self._match_fields))
+            params.extend(value for _, value in self._filters)
+            if rank_field:
+                params.append(self._match_term)
+        params.append(self._limit)
+        return BuiltQuery(sql, tuple(params))
+
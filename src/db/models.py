@@ -149,6 +149,123 @@ CREATE INDEX IF NOT EXISTS idx_benchmarks_test_name ON benchmarks(test_name);
 CREATE INDEX IF NOT EXISTS idx_benchmarks_test_date ON benchmarks(test_date);
 """
 
+# Full-text index for SQLite (requires FTS5). External-content table: the
+# text lives only in knowledge_base and triggers keep the index in sync.
+FULLTEXT_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_base_fts USING fts5(
+    question, answer, tags,
+    content='knowledge_base', content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_fts_ai AFTER INSERT ON knowledge_base BEGIN
+    INSERT INTO knowledge_base_fts(rowid, question, answer, tags)
+    VALUES (new.id, new.question, new.answer, new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_fts_ad AFTER DELETE ON knowledge_base BEGIN
+    INSERT INTO knowledge_base_fts(knowledge_base_fts, rowid, question, answer, tags)
+    VALUES ('delete', old.id, old.question, old.answer, old.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_fts_au AFTER UPDATE OF question, answer, tags ON knowledge_base BEGIN
+    INSERT INTO knowledge_base_fts(knowledge_base_fts, rowid, question, answer, tags)
+    VALUES ('delete', old.id, old.question, old.answer, old.tags);
+    INSERT INTO knowledge_base_fts(rowid, question, answer, tags)
+    VALUES (new.id, new.question, new.answer, new.tags);
+END;
+"""
+
+# Repopulate the FTS5 index from knowledge_base (after creating it on existing data)
+FULLTEXT_REBUILD = "INSERT INTO knowledge_base_fts(knowledge_base_fts) VALUES ('rebuild')"
+
+# Change log for SQLite change-data-capture. One row per knowledge_base id
+# holding the version of its latest write (deletes leave a tombstone), so
+# readers can poll for versions above their high-water mark. SQLite has a
+# single writer, so versions become visible in order.
+CHANGE_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge_base_changes (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_knowledge_base_changes_version ON knowledge_base_changes(version);
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_cdc_ai AFTER INSERT ON knowledge_base BEGIN
+    INSERT OR REPLACE INTO knowledge_base_changes (id, version, deleted)
+    VALUES (new.id, (SELECT COALESCE(MAX(version), 0) + 1 FROM knowledge_base_changes), 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_cdc_au AFTER UPDATE ON knowledge_base BEGIN
+    INSERT OR REPLACE INTO knowledge_base_changes (id, version, deleted)
+    VALUES (new.id, (SELECT COALESCE(MAX(version), 0) + 1 FROM knowledge_base_changes), 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_cdc_ad AFTER DELETE ON knowledge_base BEGIN
+    INSERT OR REPLACE INTO knowledge_base_changes (id, version, deleted)
+    VALUES (old.id, (SELECT COALESCE(MAX(version), 0) + 1 FROM knowledge_base_changes), 1);
+END;
+"""
+
+# PostgreSQL change notifications: every row write sends "<op>:<id>" on the
+# channel, TRUNCATE sends "TRUNCATE:0". Installed under an advisory lock so
+# workers starting together do not race on the DDL.
+POSTGRES_CHANGE_CHANNEL = "knowledge_base_changes"
+
+POSTGRES_CHANGE_NOTIFY_SCHEMA = """
+SELECT pg_advisory_xact_lock(hashtext('knowledge_base_notify'));
+
+CREATE OR REPLACE FUNCTION knowledge_base_notify() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('knowledge_base_changes', 'TRUNCATE:0');
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('knowledge_base_changes', 'DELETE:' || OLD.id);
+    ELSE
+        PERFORM pg_notify('knowledge_base_changes', TG_OP || ':' || NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'knowledge_base_notify_row') THEN
+        CREATE TRIGGER knowledge_base_notify_row
+            AFTER INSERT OR UPDATE OR DELETE ON knowledge_base
+            FOR EACH ROW EXECUTE FUNCTION knowledge_base_notify();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'knowledge_base_notify_truncate') THEN
+        CREATE TRIGGER knowledge_base_notify_truncate
+            AFTER TRUNCATE ON knowledge_base
+            FOR EACH STATEMENT EXECUTE FUNCTION knowledge_base_notify();
+    END IF;
+END
+$$;
+"""
+
+# Full-text search for PostgreSQL: a weighted tsvector generated column with a
+# GIN index, plus pg_trgm trigram indexes for typo-tolerant matching
+POSTGRES_FULLTEXT_SCHEMA = """
+ALTER TABLE knowledge_base ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(question, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(answer, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_kb_search_vector ON knowledge_base USING gin(search_vector);
+"""
+
+POSTGRES_TRIGRAM_SCHEMA = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_kb_question_trgm ON knowledge_base USING gin(question gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_kb_tags_trgm ON knowledge_base USING gin(tags gin_trgm_ops);
+"""
+
 # Sample data for AI voice agent knowledge base
 SAMPLE_KNOWLEDGE_BASE = [
     {
@@ -0,0 +1,382 @@
+"""
+FACT System Connection Pool Health
+
+This module provides the lifecycle policy shared by the SQLite and
+PostgreSQL connection pools: liveness checks on checkout, maximum age and
+idle recycling, bounded acquire waits, leak detection for connections that
+are never returned, and checkout wait-time and utilisation metrics.
+"""
+
+import os
+import time
+import asyncio
+import contextlib
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+import structlog
+
+try:
+    from ..core.errors import PoolTimeoutError
+except ImportError:
+    from core.errors import PoolTimeoutError
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Recent checkout waits kept for percentile reporting
+WAIT_SAMPLE_SIZE = 1024
+
+# Frames from these modules are skipped when recording where a connection was taken
+_POOL_FRAMES = (os.path.abspath(__file__), contextlib.__file__, os.path.dirname(asyncio.__file__) + os.sep)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """
+    Lifecycle policy for a connection pool.
+
+    Attributes:
+        acquire_timeout: Seconds to wait for a free connection before PoolTimeoutError
+        max_lifetime: Seconds after which a connection is closed instead of reused (0 disables)
+        max_idle: Seconds a connection may sit unused before it is closed (0 disables)
+        validate_after: Idle seconds after which a connection is pinged on checkout
+        leak_threshold: Seconds a checkout may be held before it is reported as leaked (0 disables)
+    """
+    acquire_timeout: float = 10.0
+    max_lifetime: float = 1800.0
+    max_idle: float = 300.0
+    validate_after: float = 1.0
+    leak_threshold: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Build settings from DB_POOL_* environment variables, falling back to defaults."""
+        defaults = cls()
+        return cls(
+            acquire_timeout=float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", defaults.acquire_timeout)),
+            max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", defaults.max_lifetime)),
+            max_idle=float(os.getenv("DB_POOL_MAX_IDLE", defaults.max_idle)),
+            validate_after=float(os.getenv("DB_POOL_VALIDATE_AFTER", defaults.validate_after)),
+            leak_threshold=float(os.getenv("DB_POOL_LEAK_THRESHOLD", defaults.leak_threshold)),
+        )
+
+    def expired(self, created_at: float, last_used: float, now: float) -> Optional[str]:
+        """Reason a connection should be recycled, or None if it can be reused."""
+        if self.max_lifetime and now - created_at >= self.max_lifetime:
+            return "max_lifetime"
+        if self.max_idle and now - last_used >= self.max_idle:
+            return "max_idle"
+        return None
+
+
+class PoolMetrics:
+    """Counters and checkout wait times for one pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.failed_checks = 0
+        self.timeouts = 0
+        self.leaks = 0
+        self.peak_in_use = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def record_wait(self, seconds: float, in_use: int) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self.peak_in_use = max(self.peak_in_use, in_use)
+        self._waits.append(seconds)
+
+    def snapshot(self, size: int, in_use: int, idle: int, waiting: int) -> Dict[str, Any]:
+        """
+        Current pool metrics.
+
+        Args:
+            size: Maximum connections
+            in_use: Connections checked out
+            idle: Open connections waiting in the pool
+            waiting: Callers blocked on acquire
+
+        Returns:
+            Dictionary of gauges, counters and wait-time percentiles (ms)
+        """
+        waits = sorted(self._waits)
+
+        def percentile(fraction: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(len(waits) * fraction))] * 1000
+
+        return {
+            "size": size,
+            "in_use": in_use,
+            "idle": idle,
+            "waiting": waiting,
+            "utilisation": round(in_use / size, 3) if size else 0.0,
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "created": self.created,
+            "recycled": self.recycled,
+            "failed_checks": self.failed_checks,
+            "timeouts": self.timeouts,
+            "leaks": self.leaks,
+            "wait_ms": {
+                "avg": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": self.max_wait * 1000,
+            },
+        }
+
+
+def _caller() -> List[str]:
+    """Short stack of the code that took a connection, without pool internals."""
+    frames = [frame for frame in traceback.extract_stack(limit=12)[:-2]
+              if not frame.filename.startswith(_POOL_FRAMES)]
+    return [f"{frame.filename}:{frame.lineno} in {frame.name}" for frame in frames[-4:]]
+
+
+class CheckoutTracker:
+    """
+    Tracks checked-out connections to find ones that are never returned.
+
+    Each checkout records when and where the connection was taken. A
+    checkout held longer than the leak threshold is logged once with its
+    origin; it is still returned normally if the holder eventually releases it.
+    """
+
+    def __init__(self, pool_name: str, settings: PoolSettings, metrics: PoolMetrics):
+        self.pool_name = pool_name
+        self.settings = settings
+        self.metrics = metrics
+        self._checkouts: Dict[int, Dict[str, Any]] = {}
+        self._last_scan = 0.0
+
+    def __len__(self) -> int:
+        return len(self._checkouts)
+
+    def checkout(self, conn: Any, record: Any = None) -> None:
+        now = time.monotonic()
+        self._checkouts[id(conn)] = {
+            "record": record,
+            "since": now,
+            "origin": _caller() if self.settings.leak_threshold else [],
+            "reported": False,
+        }
+        # Scan at most once a second so busy pools pay nothing per checkout
+        if self.settings.leak_threshold and now - self._last_scan >= 1.0:
+            self._last_scan = now
+            self.report_leaks(now)
+
+    def checkin(self, conn: Any) -> Optional[Dict[str, Any]]:
+        """Forget a checkout; returns its entry, or None if the connection was not checked out."""
+        return self._checkouts.pop(id(conn), None)
+
+    def leaks(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Checkouts held longer than the leak threshold."""
+        if not self.settings.leak_threshold:
+            return []
+        now = now or time.monotonic()
+        return [
+            {"held_seconds": round(now - entry["since"], 1), "origin": entry["origin"]}
+            for entry in self._checkouts.values()
+            if now - entry["since"] >= self.settings.leak_threshold
+        ]
+
+    def report_leaks(self, now: Optional[float] = None) -> int:
+        """Log checkouts that crossed the leak threshold since the last scan."""
+        if not self.settings.leak_threshold:
+            return 0
+        now = now or time.monotonic()
+        reported = 0
+        for entry in self._checkouts.values():
+            if not entry["reported"] and now - entry["since"] >= self.settings.leak_threshold:
+                entry["reported"] = True
+                reported += 1
+                self.metrics.leaks += 1
+                logger.warning("Possible connection leak",
+                               pool=self.pool_name,
+                               held_seconds=round(now - entry["since"], 1),
+                               origin=entry["origin"])
+        return reported
+
+
+class _PgAcquireContext:
+    """Result of MonitoredPgPool.acquire(): awaitable or usable with async with."""
+
+    def __init__(self, pool: "MonitoredPgPool", timeout: Optional[float]):
+        self._pool = pool
+        self._timeout = timeout
+        self._conn = None
+
+    def __await__(self):
+        return self._pool._acquire(self._timeout).__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._pool._acquire(self._timeout)
+        return self._conn
+
+    async def __aexit__(self, *exc_info):
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+
+class MonitoredPgPool:
+    """
+    asyncpg pool wrapper applying PoolSettings.
+
+    asyncpg already closes idle connections (max_inactive_connection_lifetime)
+    and reconnects closed ones. This wrapper adds a liveness ping on checkout,
+    a maximum connection age, a bounded acquire wait that raises
+    PoolTimeoutError, leak detection and wait-time metrics. Connections are
+    keyed by server PID, which is stable for the life of a connection.
+    Everything else is delegated to the wrapped pool.
+    """
+
+    def __init__(self, settings: Optional[PoolSettings] = None, name: str = "postgres"):
+        """
+        Initialize the wrapper; attach a pool with bind() or use create_monitored_pool().
+
+        Args:
+            settings: Lifecycle policy (defaults to PoolSettings.from_env())
+            name: Pool name used in logs
+        """
+        self.settings = settings or PoolSettings.from_env()
+        self.name = name
+        self.metrics = PoolMetrics()
+        self.tracker = CheckoutTracker(name, self.settings, self.metrics)
+        self._pool = None
+        self._created_at: Dict[int, float] = {}
+        self._last_used: Dict[int, float] = {}
+        self._waiting = 0
+
+    def bind(self, pool) -> "MonitoredPgPool":
+        self._pool = pool
+        return self
+
+    async def on_connect(self, conn) -> None:
+        """asyncpg init callback: remember when each physical connection was opened."""
+        self._created_at[conn.get_server_pid()] = time.monotonic()
+        self.metrics.created += 1
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined here (get_size, execute, fetch, ...)
+        return getattr(self._pool, name)
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _PgAcquireContext:
+        return _PgAcquireContext(self, timeout)
+
+    async def _is_alive(self, conn) -> bool:
+        try:
+            await conn.fetchval("SELECT 1", timeout=min(self.settings.acquire_timeout, 5.0))
+            return True
+        except Exception as e:
+            logger.warning("Discarding dead pooled connection", pool=self.name, error=str(e))
+            return False
+
+    async def _acquire(self, timeout: Optional[float]):
+        timeout = self.settings.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        self._waiting += 1
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    conn = await self._pool.acquire(timeout=remaining)
+                except asyncio.TimeoutError:
+                    self.metrics.timeouts += 1
+                    self.tracker.report_leaks()
+                    raise PoolTimeoutError(
+                        f"Timed out after {timeout:.1f}s waiting for a connection from the {self.name} pool",
+                        context=self.get_stats())
+
+                now = time.monotonic()
+                pid = conn.get_server_pid()
+                last_used = self._last_used.get(pid, now)
+                if now - last_used < self.settings.validate_after or await self._is_alive(conn):
+                    break
+                self.metrics.failed_checks += 1
+                self._forget(pid)
+                # Terminating a pooled connection hands its slot back; the pool reconnects it
+                conn.terminate()
+        finally:
+            self._waiting -= 1
+
+        self.metrics.record_wait(time.monotonic() - start, len(self.tracker) + 1)
+        self.tracker.checkout(conn, pid)
+        return conn
+
+    async def release(self, conn, *, timeout: Optional[float] = None) -> None:
+        entry = self.tracker.checkin(conn)
+        pid = entry["record"] if entry else None
+        now = time.monotonic()
+        created_at = self._created_at.get(pid)
+
+        if (pid is not None and created_at is not None and self.settings.max_lifetime
+                and now - created_at >= self.settings.max_lifetime and not conn.is_closed()):
+            self.metrics.recycled += 1
+            self._forget(pid)
+            try:
+                await conn.close(timeout=5.0)
+            except Exception:
+                conn.terminate()
+            return
+
+        if pid is not None:
+            self._last_used[pid] = now
+        await self._pool.release(conn, timeout=timeout)
+
+    def _forget(self, pid: Optional[int]) -> None:
+        self._created_at.pop(pid, None)
+        self._last_used.pop(pid, None)
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool gauges and counters; see PoolMetrics.snapshot()."""
+        size = self._pool.get_max_size() if self._pool is not None else 0
+        idle = self._pool.get_idle_size() if self._pool is not None else 0
+        return self.metrics.snapshot(size, len(self.tracker), idle, self._waiting)
+
+
+async def create_monitored_pool(dsn: str, settings: Optional[PoolSettings] = None,
+                                name: str = "postgres",
+                                init: Optional[Callable] = None,
+                                **pool_kwargs) -> MonitoredPgPool:
+    """
+    Create an asyncpg pool wrapped in MonitoredPgPool.
+
+    Args:
+        dsn: PostgreSQL connection string
+        settings: Lifecycle policy (defaults to PoolSettings.from_env())
+        name: Pool name used in logs
+        init: Optional per-connection init callback, run after age tracking
+        **pool_kwargs: Passed to asyncpg.create_pool (min_size, max_size, ...)
+
+    Returns:
+        Monitored pool; use it wherever an asyncpg pool is expected
+    """
+    import asyncpg
+
+    monitored = MonitoredPgPool(settings, name)
+
+    async def on_connect(conn):
+        await monitored.on_connect(conn)
+        if init is not None:
+            await init(conn)
+
+    pool_kwargs.setdefault("max_inactive_connection_lifetime", monitored.settings.max_idle)
+    pool = await asyncpg.create_pool(dsn, init=on_connect, **pool_kwargs)
+    return monitored.bind(pool)
@@ -7,11 +7,30 @@ import os
 import json
 import asyncio
 import structlog
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime
 
+try:
+    from .fulltext import PostgresFullTextBackend
+    from .pool_health import create_monitored_pool
+    from .bulk_ingest import POSTGRES_INGEST_COLUMNS, entry_id, ingest_postgres
+except ImportError:
+    from db.fulltext import PostgresFullTextBackend
+    from db.pool_health import create_monitored_pool
+    from db.bulk_ingest import POSTGRES_INGEST_COLUMNS, entry_id, ingest_postgres
+
 logger = structlog.get_logger(__name__)
 
+# Rows fetched per round trip when streaming the knowledge base
+STREAM_BATCH_SIZE = 500
+
+ALL_ENTRIES_QUERY = """
+SELECT id, question, answer, category, state, tags, 
+       priority, difficulty, personas, source
+FROM knowledge_base
+ORDER BY priority, id
+"""
+
 # Try to import PostgreSQL libraries
 try:
     import asyncpg
@@ -36,6 +55,7 @@ class PostgresAdapter:
         """Initialize PostgreSQL adapter."""
         self.connection_string = os.getenv("DATABASE_URL")
         self.pool = None
+        self.fulltext: Optional[PostgresFullTextBackend] = None
         self.initialized = False
         
     async def initialize(self):
@@ -63,9 +83,10 @@ class PostgresAdapter:
             return False
     
     async def _init_asyncpg(self):
-        """Initialize asyncpg connection pool."""
-        self.pool = await asyncpg.create_pool(
+        """Initialize asyncpg connection pool with health checks and metrics."""
+        self.pool = await create_monitored_pool(
             self.connection_string,
+            name="postgres_adapter",
             min_size=1,
             max_size=10,
             command_timeout=60
@@ -98,18 +119,15 @@ class PostgresAdapter:
         CREATE INDEX IF NOT EXISTS idx_kb_category ON knowledge_base(category);
         CREATE INDEX IF NOT EXISTS idx_kb_state ON knowledge_base(state);
         CREATE INDEX IF NOT EXISTS idx_kb_priority ON knowledge_base(priority);
-        
-        -- Full text search index for better search performance
-        CREATE INDEX IF NOT EXISTS idx_kb_question_gin ON knowledge_base 
-        USING gin(to_tsvector('english', question));
-        
-        CREATE INDEX IF NOT EXISTS idx_kb_answer_gin ON knowledge_base 
-        USING gin(to_tsvector('english', answer));
         """
         
         if ASYNCPG_AVAILABLE and self.pool:
             async with self.pool.acquire() as conn:
                 await conn.execute(create_table_sql)
+            
+            # Full-text search: weighted tsvector column (GIN) and trigram indexes
+            self.fulltext = PostgresFullTextBackend(self.pool)
+            await self.fulltext.ensure_schema()
         else:
             conn = psycopg2.connect(self.connection_string)
             cursor = conn.cursor()
@@ -127,26 +145,20 @@ class PostgresAdapter:
         if not self.initialized:
             logger.warning("PostgreSQL adapter not initialized")
             return []
-            
-        query = """
-        SELECT id, question, answer, category, state, tags, 
-               priority, difficulty, personas, source
-        FROM knowledge_base
-        ORDER BY priority, id
-        """
         
         try:
             if ASYNCPG_AVAILABLE and self.pool:
-                logger.info("Using asyncpg to get entries")
-                async with self.pool.acquire() as conn:
-                    rows = await conn.fetch(query)
-                    logger.info(f"Retrieved {len(rows)} rows via asyncpg")
-                    return [dict(row) for row in rows]
+                # Copy each batch as it arrives instead of holding Records and dicts side by side
+                entries = []
+                async for batch in self.iter_entries():
+                    entries.extend(dict(row) for row in batch)
+                logger.info(f"Retrieved {len(entries)} rows via asyncpg")
+                return entries
             else:
                 logger.info(f"Using psycopg2 to get entries, connection_string exists: {bool(self.connection_string)}")
                 conn = psycopg2.connect(self.connection_string)
                 cursor = conn.cursor(cursor_factory=RealDictCursor)
-                cursor.execute(query)
+                cursor.execute(ALL_ENTRIES_QUERY)
                 rows = cursor.fetchall()
                 logger.info(f"Retrieved {len(rows)} rows via psycopg2")
                 cursor.close()
@@ -160,12 +172,61 @@ class PostgresAdapter:
             logger.error(f"Failed to get entries: {e}", exc_info=True)
             return []
     
+    async def iter_entries(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[List[Any]]:
+        """
+        Stream all knowledge base entries in batches through a server-side cursor.
+        
+        Rows are asyncpg Records, which support row["column"], get() and
+        dict(row). The pooled connection is held until iteration finishes.
+        
+        Args:
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Lists of Records ordered by priority and id
+        """
+        if not (self.initialized and ASYNCPG_AVAILABLE and self.pool):
+            return
+        
+        async with self.pool.acquire() as conn:
+            # Cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(ALL_ENTRIES_QUERY)
+                while True:
+                    batch = await cursor.fetch(batch_size)
+                    if not batch:
+                        break
+                    yield batch
+    
+    async def count_entries(self) -> int:
+        """Number of knowledge base entries (0 if unavailable)."""
+        if not (self.initialized and ASYNCPG_AVAILABLE and self.pool):
+            return len(await self.get_all_entries())
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval("SELECT COUNT(*) FROM knowledge_base")
+        except Exception as e:
+            logger.error(f"Failed to count entries: {e}")
+            return 0
+    
     async def insert_entries(self, entries: List[Dict[str, Any]], clear_existing: bool = False):
         """Insert knowledge base entries."""
         if not self.initialized:
             return False
             
         try:
+            if ASYNCPG_AVAILABLE and self.pool:
+                # COPY into staging and merge; the clear shares the transaction
+                defaults = {'question': '', 'answer': '', 'priority': 'normal', 'difficulty': 'basic'}
+                records = [
+                    (entry_id(entry.get('id')),) + tuple(entry.get(column, defaults.get(column))
+                                                        for column in POSTGRES_INGEST_COLUMNS[1:])
+                    for entry in entries
+                ]
+                await ingest_postgres(self.pool, records, clear_existing=clear_existing)
+                logger.info(f"Inserted {len(entries)} entries into PostgreSQL")
+                return True
+            
             if clear_existing:
                 await self.clear_all_entries()
             
@@ -186,47 +247,30 @@ class PostgresAdapter:
                 updated_at = CURRENT_TIMESTAMP
             """
             
-            if ASYNCPG_AVAILABLE and self.pool:
-                async with self.pool.acquire() as conn:
-                    for entry in entries:
-                        await conn.execute(
-                            insert_query,
-                            entry.get('id'),  # Include ID field
-                            entry.get('question', ''),
-                            entry.get('answer', ''),
-                            entry.get('category'),
-                            entry.get('state'),
-                            entry.get('tags'),
-                            entry.get('priority', 'normal'),
-                            entry.get('difficulty', 'basic'),
-                            entry.get('personas'),
-                            entry.get('source')
-                        )
-            else:
-                conn = psycopg2.connect(self.connection_string)
-                cursor = conn.cursor()
-                for entry in entries:
-                    cursor.execute(
-                        insert_query.replace('$1', '%s').replace('$2', '%s').replace('$3', '%s')
-                                   .replace('$4', '%s').replace('$5', '%s').replace('$6', '%s')
-                                   .replace('$7', '%s').replace('$8', '%s').replace('$9', '%s')
-                                   .replace('$10', '%s'),
-                        (
-                            entry.get('id'),  # Include ID field
-                            entry.get('question', ''),
-                            entry.get('answer', ''),
-                            entry.get('category'),
-                            entry.get('state'),
-                            entry.get('tags'),
-                            entry.get('priority', 'normal'),
-                            entry.get('difficulty', 'basic'),
-                            entry.get('personas'),
-                            entry.get('source')
-                        )
+            conn = psycopg2.connect(self.connection_string)
+            cursor = conn.cursor()
+            for entry in entries:
+                cursor.execute(
+                    insert_query.replace('$1', '%s').replace('$2', '%s').replace('$3', '%s')
+                               .replace('$4', '%s').replace('$5', '%s').replace('$6', '%s')
+                               .replace('$7', '%s').replace('$8', '%s').replace('$9', '%s')
+                               .replace('$10', '%s'),
+                    (
+                        entry.get('id'),  # Include ID field
+                        entry.get('question', ''),
+                        entry.get('answer', ''),
+                        entry.get('category'),
+                        entry.get('state'),
+                        entry.get('tags'),
+                        entry.get('priority', 'normal'),
+                        entry.get('difficulty', 'basic'),
+                        entry.get('personas'),
+                        entry.get('source')
                     )
-                conn.commit()
-                cursor.close()
-                conn.close()
+                )
+            conn.commit()
+            cursor.close()
+            conn.close()
                 
             logger.info(f"Inserted {len(entries)} entries into PostgreSQL")
             return True
@@ -261,6 +305,14 @@ class PostgresAdapter:
         """Search knowledge base with full-text search."""
         if not self.initialized:
             return []
+        
+        if self.fulltext and self.fulltext.available:
+            try:
+                return await self.fulltext.candidates(query, limit=limit)
+            except Exception as e:
+                # A missing tsv column, index or pg_trgm must not empty every
+                # search; fall back to the unindexed query below
+                logger.error(f"Full-text search failed, using fallback query: {e}")
             
         search_query = """
         SELECT id, question, answer, category, state, tags, 
@@ -298,11 +350,21 @@ class PostgresAdapter:
             logger.error(f"Failed to search entries: {e}")
             return []
     
+    def get_pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Connection pool metrics, or None without an asyncpg pool."""
+        if self.pool is None:
+            return None
+        return self.pool.get_stats()
+    
     async def close(self):
         """Close database connections."""
         if ASYNCPG_AVAILABLE and self.pool:
             await self.pool.close()
             logger.info("PostgreSQL connection pool closed")
+        # A later initialize() opens a fresh pool
+        self.pool = None
+        self.fulltext = None
+        self.initialized = False
 
 
 # Global instance
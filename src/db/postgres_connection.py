@@ -11,6 +11,17 @@ from typing import Dict, List, Any, Optional
 from contextlib import asynccontextmanager
 import structlog
 
+try:
+    from .kb_queries import KnowledgeQuery, POSTGRES
+    from .fulltext import PostgresFullTextBackend
+    from .pool_health import create_monitored_pool
+    from .bulk_ingest import ingest_postgres
+except ImportError:
+    from db.kb_queries import KnowledgeQuery, POSTGRES
+    from db.fulltext import PostgresFullTextBackend
+    from db.pool_health import create_monitored_pool
+    from db.bulk_ingest import ingest_postgres
+
 logger = structlog.get_logger(__name__)
 
 class PostgreSQLManager:
@@ -19,6 +30,10 @@ class PostgreSQLManager:
     Designed for Railway deployment with connection pooling.
     """
     
+    # Column order of bulk_insert_knowledge records
+    BULK_INSERT_COLUMNS = ('id', 'question', 'answer', 'category', 'tags', 'metadata',
+                           'state', 'priority', 'personas', 'source', 'difficulty')
+    
     def __init__(self, database_url: Optional[str] = None):
         """
         Initialize PostgreSQL manager.
@@ -45,6 +60,7 @@ class PostgreSQLManager:
                 raise ValueError("DATABASE_URL environment variable not set")
         
         self.pool = None
+        self.fulltext: Optional[PostgresFullTextBackend] = None
         self._initialized = False
         
     async def initialize(self):
@@ -53,9 +69,10 @@ class PostgreSQLManager:
             return
             
         try:
-            # Create connection pool
-            self.pool = await asyncpg.create_pool(
+            # Create connection pool (liveness checks, max age, acquire timeout, metrics)
+            self.pool = await create_monitored_pool(
                 self.database_url,
+                name="postgresql_manager",
                 min_size=2,
                 max_size=10,
                 max_queries=50000,
@@ -98,6 +115,10 @@ class PostgreSQLManager:
                 result = await conn.fetchval("SELECT COUNT(*) FROM knowledge_base")
                 logger.info(f"PostgreSQL initialized with {result} knowledge base entries")
             
+            # tsvector/GIN and trigram indexes for search_knowledge
+            self.fulltext = PostgresFullTextBackend(self.pool)
+            await self.fulltext.ensure_schema()
+            
             self._initialized = True
             logger.info("PostgreSQL connection pool initialized")
             
@@ -151,29 +172,22 @@ class PostgreSQLManager:
         Returns:
             List of knowledge entries
         """
-        query = "SELECT * FROM knowledge_base WHERE 1=1"
-        params = []
-        param_count = 0
-        
-        if category:
-            param_count += 1
-            query += f" AND category = ${param_count}"
-            params.append(category)
+        query = (KnowledgeQuery()
+                 .where("category", category)
+                 .where("state", state)
+                 .order_by("id")
+                 .limit(limit)
+                 .build(POSTGRES))
         
-        if state:
-            param_count += 1
-            query += f" AND state = ${param_count}"
-            params.append(state)
-        
-        query += f" LIMIT ${param_count + 1}"
-        params.append(limit)
-        
-        return await self.execute_query(query, *params)
+        return await self.execute_query(query.sql, *query.params)
     
     async def search_knowledge(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Search knowledge base using full text search.
         
+        Uses the tsvector/trigram indexes when available, otherwise a
+        substring scan.
+        
         Args:
             search_term: Term to search for
             limit: Maximum number of results
@@ -181,20 +195,20 @@ class PostgreSQLManager:
         Returns:
             List of matching knowledge entries
         """
-        query = """
-            SELECT * FROM knowledge_base
-            WHERE question ILIKE $1 OR answer ILIKE $1
-            ORDER BY 
-                CASE 
-                    WHEN question ILIKE $1 THEN 1
-                    ELSE 2
-                END,
-                priority DESC
-            LIMIT $2
-        """
+        if not self._initialized:
+            await self.initialize()
         
-        search_pattern = f"%{search_term}%"
-        return await self.execute_query(query, search_pattern, limit)
+        if self.fulltext and self.fulltext.available:
+            return await self.fulltext.candidates(search_term, limit=limit)
+        
+        query = (KnowledgeQuery()
+                 .matching(search_term, ("question", "answer"))
+                 .rank_matches_in("question")
+                 .order_by_priority()
+                 .limit(limit)
+                 .build(POSTGRES))
+        
+        return await self.execute_query(query.sql, *query.params)
     
     async def get_statistics(self) -> Dict[str, Any]:
         """
@@ -289,36 +303,33 @@ class PostgreSQLManager:
         if not entries:
             return 0
         
-        async with self.pool.acquire() as conn:
-            # Prepare data for bulk insert
-            records = [
-                (
-                    entry.get('question'),
-                    entry.get('answer'),
-                    entry.get('category'),
-                    entry.get('tags'),
-                    entry.get('metadata'),
-                    entry.get('state'),
-                    entry.get('priority', 'normal'),
-                    entry.get('personas'),
-                    entry.get('source'),
-                    entry.get('difficulty', 'basic')
-                )
-                for entry in entries
-            ]
-            
-            # Use COPY for efficient bulk insert
-            result = await conn.copy_records_to_table(
-                'knowledge_base',
-                records=records,
-                columns=['question', 'answer', 'category', 'tags', 'metadata', 
-                        'state', 'priority', 'personas', 'source', 'difficulty']
+        # New rows (id None) take ids from the sequence during the staging merge
+        records = [
+            (
+                None,
+                entry.get('question'),
+                entry.get('answer'),
+                entry.get('category'),
+                entry.get('tags'),
+                entry.get('metadata'),
+                entry.get('state'),
+                entry.get('priority', 'normal'),
+                entry.get('personas'),
+                entry.get('source'),
+                entry.get('difficulty', 'basic')
             )
-            
-            # Parse result to get count
-            count = int(result.split()[-1]) if result else len(records)
-            logger.info(f"Bulk inserted {count} knowledge entries")
-            return count
+            for entry in entries
+        ]
+        
+        report = await ingest_postgres(self.pool, records, columns=self.BULK_INSERT_COLUMNS)
+        logger.info(f"Bulk inserted {report.rows} knowledge entries")
+        return report.rows
+    
+    def get_pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Connection pool metrics, or None before initialize()."""
+        if self.pool is None:
+            return None
+        return self.pool.get_stats()
     
     async def cleanup(self):
         """Close all database connections."""
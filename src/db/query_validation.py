@@ -0,0 +1,138 @@
+"""
+FACT System SQL Validation Support
+
+This module provides statement fingerprinting, an LRU cache of syntax
+validation results keyed by fingerprint, and a dedicated worker thread that
+runs EXPLAIN QUERY PLAN on a persistent connection so async callers never
+block the event loop on SQLite.
+"""
+
+import asyncio
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Sequence
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+_SQL_LITERAL = re.compile(
+    r"""
+      (?P<string>'(?:[^']|'')*')                                   # string literal
+    | (?P<ident>"(?:[^"]|"")*")                                    # quoted identifier
+    | (?P<number>\b(?:0x[0-9a-f]+|\d+(?:\.\d+)?(?:e[+-]?\d+)?)\b)  # numeric literal
+    | (?P<space>\s+)
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def _normalise_token(match: "re.Match[str]") -> str:
+    kind = match.lastgroup
+    if kind in ("string", "number"):
+        return "?"
+    if kind == "space":
+        return " "
+    return match.group(0)
+
+
+def fingerprint_sql(statement: str) -> str:
+    """
+    Reduce a statement to its template.
+
+    String and numeric literals become ?, whitespace is collapsed, keywords
+    are lowercased and IN lists of any length collapse to (?), so statements
+    that differ only in literal values share one fingerprint.
+    """
+    normalised = _SQL_LITERAL.sub(_normalise_token, statement.strip()).lower()
+    return _PLACEHOLDER_LIST.sub("(?)", normalised)
+
+
+class ValidationCache:
+    """True LRU of validated statement fingerprints."""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, fingerprint: str) -> bool:
+        with self._lock:
+            if fingerprint in self._entries:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, fingerprint: str, validated_at: float) -> None:
+        with self._lock:
+            self._entries[fingerprint] = validated_at
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses}
+
+
+class ExplainWorker:
+    """
+    Runs EXPLAIN QUERY PLAN on a dedicated thread with one persistent connection.
+
+    The connection is opened lazily inside the worker thread and set to
+    query_only, so validation cannot modify the database.
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.database_path, check_same_thread=False)
+            self._connection.execute("PRAGMA query_only = ON")
+        return self._connection
+
+    def explain(self, statement: str, params: Sequence[Any] = ()) -> None:
+        """Compile the statement without running it; raises sqlite3.Error on bad SQL."""
+        with self._lock:
+            self._get_connection().execute(f"EXPLAIN QUERY PLAN {statement}", params).fetchall()
+
+    async def explain_async(self, statement: str, params: Sequence[Any] = ()) -> None:
+        """Run explain() on the worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sql-validate")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.explain, statement, params)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def fingerprints(statements: Iterable[str]) -> set:
+    """Fingerprint a collection of statement templates."""
+    return {fingerprint_sql(statement) for statement in statements}
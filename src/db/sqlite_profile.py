@@ -0,0 +1,110 @@
+"""
+FACT System SQLite Connection Profile
+
+This module defines the PRAGMA profile applied to every SQLite connection
+the system opens. The database runs in WAL mode so readers never block on a
+writer; readers are opened with mode=ro and query_only, and writes go
+through one dedicated writer connection.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+import aiosqlite
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """
+    Connection settings for SQLite.
+
+    Attributes:
+        journal_mode: Journal mode set by the writer (persistent in the file)
+        synchronous: Durability level; NORMAL is safe in WAL mode
+        mmap_size: Bytes of the file to memory-map for reads (0 disables)
+        cache_size_kib: Page cache per connection in KiB
+        temp_store: Where temporary tables and indexes live
+        busy_timeout_ms: How long to wait on a lock before SQLITE_BUSY
+        cached_statements: Prepared statements kept per connection
+        read_only_readers: Open pooled query connections with mode=ro
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+    cached_statements: int = 256
+    read_only_readers: bool = True
+
+    @classmethod
+    def from_env(cls) -> "SQLiteProfile":
+        """Build a profile from SQLITE_* environment variables, falling back to defaults."""
+        defaults = cls()
+        return cls(
+            journal_mode=os.getenv("SQLITE_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("SQLITE_SYNCHRONOUS", defaults.synchronous),
+            mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", defaults.mmap_size)),
+            cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", defaults.cache_size_kib)),
+            temp_store=os.getenv("SQLITE_TEMP_STORE", defaults.temp_store),
+            busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms)),
+            cached_statements=int(os.getenv("SQLITE_CACHED_STATEMENTS", defaults.cached_statements)),
+            read_only_readers=os.getenv("SQLITE_READ_ONLY_READERS", "true").lower() == "true",
+        )
+
+    def pragmas(self, read_only: bool) -> List[str]:
+        """PRAGMA statements for a new connection."""
+        statements = [
+            f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            # Negative cache_size is in KiB rather than pages
+            f"PRAGMA cache_size = {-int(self.cache_size_kib)}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+        if read_only:
+            statements.append("PRAGMA query_only = ON")
+        else:
+            statements.insert(0, f"PRAGMA journal_mode = {self.journal_mode}")
+        return statements
+
+
+DEFAULT_PROFILE = SQLiteProfile()
+
+# Plain aiosqlite.connect() behaviour, for comparisons and opting out
+UNTUNED_PROFILE = SQLiteProfile(journal_mode="DELETE", synchronous="FULL", mmap_size=0,
+                                cache_size_kib=2000, temp_store="DEFAULT", busy_timeout_ms=5000,
+                                cached_statements=128, read_only_readers=False)
+
+
+async def connect(database_path: str, profile: SQLiteProfile = DEFAULT_PROFILE,
+                  read_only: bool = False) -> aiosqlite.Connection:
+    """
+    Open an aiosqlite connection with the profile applied.
+
+    Args:
+        database_path: Path to the SQLite database file
+        profile: PRAGMA profile to apply
+        read_only: Open with mode=ro (the file must already exist)
+
+    Returns:
+        Configured connection
+    """
+    if read_only:
+        uri = f"{Path(database_path).resolve().as_uri()}?mode=ro"
+        conn = await aiosqlite.connect(uri, uri=True, cached_statements=profile.cached_statements)
+    else:
+        conn = await aiosqlite.connect(database_path, cached_statements=profile.cached_statements)
+
+    try:
+        for statement in profile.pragmas(read_only):
+            await conn.execute(statement)
+    except Exception:
+        await conn.close()
+        raise
+    return conn
@@ -0,0 +1,111 @@
+"""
+FACT System Streaming Query Results
+
+This module provides batch-at-a-time iteration over large result sets.
+Rows stay as the driver's tuples; the column list is resolved once per
+query and RowView gives name-based access without building a dict per row.
+"""
+
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple, Type
+import aiosqlite
+
+
+# Rows fetched per round trip to the SQLite worker thread
+DEFAULT_BATCH_SIZE = 500
+
+
+class RowView(tuple):
+    """
+    Read-only row with access by position or column name.
+
+    Subclasses made by row_view_type() carry the column map, so a row costs
+    no more than the tuple the driver already returned. Supports
+    row["name"], row.get(), keys(), items() and dict(row).
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self._fields, self)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+    def __repr__(self) -> str:
+        return f"RowView({self.as_dict()!r})"
+
+
+@lru_cache(maxsize=128)
+def row_view_type(columns: Tuple[str, ...]) -> Type[RowView]:
+    """RowView subclass for a column list (cached, so each shape is built once)."""
+    return type("RowView", (RowView,), {
+        "__slots__": (),
+        "_fields": columns,
+        "_index": {name: position for position, name in enumerate(columns)},
+    })
+
+
+class QueryStream:
+    """
+    Batches of rows from an executing SQLite cursor.
+
+    Iterate directly for lists of plain tuples, or use views() for lists of
+    RowView. Obtain one from DatabaseManager.stream_query(), which owns the
+    connection and closes the cursor.
+    """
+
+    def __init__(self, cursor: aiosqlite.Cursor, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialize stream over an executed cursor.
+
+        Args:
+            cursor: Cursor returned by execute()
+            batch_size: Rows per batch
+        """
+        self._cursor = cursor
+        # Plain tuples, whatever row_factory the pooled connection carries
+        self._cursor.row_factory = None
+        self.batch_size = max(1, batch_size)
+        self.columns: Tuple[str, ...] = tuple(column[0] for column in cursor.description or ())
+        self.row_count = 0
+
+    async def __aiter__(self) -> AsyncIterator[List[tuple]]:
+        while True:
+            batch = await self._cursor.fetchmany(self.batch_size)
+            if not batch:
+                return
+            self.row_count += len(batch)
+            yield batch
+
+    async def views(self) -> AsyncIterator[List[RowView]]:
+        """Batches of RowView sharing this query's column map."""
+        view = row_view_type(self.columns)
+        async for batch in self:
+            yield [view(row) for row in batch]
+
+    async def dicts(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Batches of dictionaries, for consumers that need mutable rows."""
+        columns = self.columns
+        async for batch in self:
+            yield [dict(zip(columns, row)) for row in batch]
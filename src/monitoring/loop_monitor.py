@@ -0,0 +1,273 @@
+"""
+FACT System Event Loop Monitor
+
+This module measures event-loop lag and catches callbacks that block the
+loop. A monitor task sleeps for a fixed interval and records how late it
+wakes up; the overshoot is the time the loop spent running something else
+without yielding, so its percentiles show how long every other request in
+the worker had to wait.
+
+With blocking detection on (LOOP_BLOCK_DETECT=1, or DEBUG_MODE=true), a
+watchdog thread also checks that the monitor task woke up on time. When
+the loop is stuck for longer than the threshold, the watchdog captures the
+loop thread's stack while the offending call is still running, so the
+report points at the synchronous call itself (a Groq request, a
+sqlite3.connect, a json.load) rather than at whatever runs next.
+
+fail_on_blocking() wraps the same machinery for tests: it raises
+BlockingCallError when anything inside it blocked the loop.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Environment variables
+LOOP_BLOCK_DETECT_ENV = "LOOP_BLOCK_DETECT"
+LOOP_BLOCK_THRESHOLD_ENV = "LOOP_BLOCK_THRESHOLD_MS"
+
+# Seconds between monitor wake-ups
+DEFAULT_INTERVAL = 0.1
+
+DEFAULT_BLOCK_THRESHOLD_MS = 100.0
+
+# Lag samples kept for percentiles (one minute at the default interval)
+DEFAULT_WINDOW = 600
+
+# Blocked-call reports kept
+MAX_REPORTS = 50
+
+MAX_STACK_FRAMES = 40
+
+
+class BlockingCallError(AssertionError):
+    """Raised by fail_on_blocking() when the event loop was blocked."""
+
+    def __init__(self, reports: List["BlockedCall"]):
+        self.reports = reports
+        details = "\n\n".join(report.describe() for report in reports)
+        super().__init__(f"Event loop blocked {len(reports)} time(s):\n\n{details}")
+
+
+@dataclass
+class BlockedCall:
+    """One stretch of time the event loop did not yield."""
+    detected_at: float
+    stack: List[str]
+    blocked_ms: float = 0.0
+    location: str = ""
+
+    def describe(self) -> str:
+        return f"blocked {self.blocked_ms:.0f} ms at {self.location}\n" + "".join(self.stack)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "detected_at": self.detected_at,
+            "blocked_ms": round(self.blocked_ms, 3),
+            "location": self.location,
+            "stack": self.stack,
+        }
+
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _percentile(ordered: List[float], point: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(round(point * len(ordered) / 100, 9)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LoopMonitor:
+    """Event-loop lag statistics and blocked-call detection for one loop."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, window: int = DEFAULT_WINDOW,
+                 detect_blocking: bool = False,
+                 block_threshold_ms: float = DEFAULT_BLOCK_THRESHOLD_MS):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between lag measurements
+            window: Number of recent lag samples used for percentiles
+            detect_blocking: Run the watchdog thread that captures stacks
+            block_threshold_ms: Lag above which the loop counts as blocked
+        """
+        self.interval = interval
+        self.detect_blocking = detect_blocking
+        self.block_threshold_ms = block_threshold_ms
+        self._lags: Deque[float] = deque(maxlen=window)
+        self.reports: Deque[BlockedCall] = deque(maxlen=MAX_REPORTS)
+        self.blocked_count = 0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread: Optional[int] = None
+        # Written by the loop, read by the watchdog
+        self._deadline = 0.0
+        self._pending: Optional[BlockedCall] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._deadline = time.perf_counter() + self.interval
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.detect_blocking:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info("Event loop monitor started", interval=self.interval,
+                    detect_blocking=self.detect_blocking, block_threshold_ms=self.block_threshold_ms)
+
+    async def stop(self) -> None:
+        """Stop monitoring; statistics and reports are kept."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        watchdog, self._watchdog = self._watchdog, None
+        if watchdog is not None:
+            self._stop.set()
+            watchdog.join()
+        if self._pending is not None:
+            self._finish(self._pending, (time.perf_counter() - self._deadline) * 1000)
+
+    async def _run(self) -> None:
+        # The first deadline is set by start(), so a stall right after it counts
+        while True:
+            await asyncio.sleep(max(0.0, self._deadline - time.perf_counter()))
+            self._record(max(0.0, (time.perf_counter() - self._deadline) * 1000))
+            self._deadline = time.perf_counter() + self.interval
+
+    def _record(self, lag_ms: float) -> None:
+        self._lags.append(lag_ms)
+        if lag_ms > self.max_lag_ms:
+            self.max_lag_ms = lag_ms
+        pending, self._pending = self._pending, None
+        if lag_ms <= self.block_threshold_ms:
+            return
+        if pending is None:
+            # Ended between watchdog checks, or no watchdog running
+            pending = BlockedCall(detected_at=time.time(), stack=[], location="unknown")
+        self._finish(pending, lag_ms)
+
+    def _finish(self, report: BlockedCall, lag_ms: float) -> None:
+        self._pending = None
+        report.blocked_ms = lag_ms
+        self.blocked_count += 1
+        self.reports.append(report)
+        logger.warning("Event loop blocked", blocked_ms=round(lag_ms, 1), location=report.location,
+                       stack="".join(report.stack) or None)
+
+    def _watch(self) -> None:
+        check = max(0.005, self.block_threshold_ms / 4000)
+        threshold = self.block_threshold_ms / 1000
+        reported_deadline = None
+        while not self._stop.wait(check):
+            deadline = self._deadline
+            if deadline == reported_deadline or time.perf_counter() - deadline <= threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)[-MAX_STACK_FRAMES:]
+            innermost = traceback.extract_stack(frame, limit=1)[-1]
+            location = f"{innermost.filename}:{innermost.lineno} in {innermost.name}"
+            if self._deadline == deadline:
+                self._pending = BlockedCall(detected_at=time.time(), stack=stack, location=location)
+            reported_deadline = deadline
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag percentiles over the recent window, in milliseconds."""
+        ordered = sorted(self._lags)
+        return {
+            "loop_lag_ms_p50": round(_percentile(ordered, 50), 3),
+            "loop_lag_ms_p99": round(_percentile(ordered, 99), 3),
+            "loop_lag_ms_max": round(self.max_lag_ms, 3),
+            "loop_blocked": self.blocked_count,
+        }
+
+    def recent_blocks(self) -> List[Dict[str, Any]]:
+        return [report.to_dict() for report in self.reports]
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    """The event loop monitor of this process, once start_loop_monitor() ran."""
+    return _monitor
+
+
+def start_loop_monitor() -> LoopMonitor:
+    """
+    Start monitoring the running loop of this server process.
+
+    Lag is always measured; stack capture is on with LOOP_BLOCK_DETECT or
+    DEBUG_MODE, using LOOP_BLOCK_THRESHOLD_MS (default 100).
+
+    Returns:
+        The running monitor
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor(
+            detect_blocking=_flag(os.getenv(LOOP_BLOCK_DETECT_ENV)) or _flag(os.getenv("DEBUG_MODE")),
+            block_threshold_ms=float(os.getenv(LOOP_BLOCK_THRESHOLD_ENV, DEFAULT_BLOCK_THRESHOLD_MS)),
+        )
+    _monitor.start()
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    if _monitor is not None:
+        await _monitor.stop()
+
+
+@asynccontextmanager
+async def fail_on_blocking(threshold_ms: float = 50.0) -> AsyncIterator[LoopMonitor]:
+    """
+    Fail when code run inside the block stalls the event loop.
+
+    Args:
+        threshold_ms: Longest tolerated stretch without yielding
+
+    Raises:
+        BlockingCallError: Listing each stall with the stack that caused it
+    """
+    monitor = LoopMonitor(interval=min(DEFAULT_INTERVAL, threshold_ms / 2000),
+                          detect_blocking=True, block_threshold_ms=threshold_ms)
+    monitor.start()
+    try:
+        yield monitor
+        # Let the monitor wake once more to time a stall that just ended
+        await asyncio.sleep(monitor.interval * 2)
+    finally:
+        await monitor.stop()
+    if monitor.reports:
+        raise BlockingCallError(list(monitor.reports))
@@ -0,0 +1,119 @@
+"""
+FACT System Query Log Recorder
+
+This module records incoming search and query requests as JSON lines, one
+per request, with the arrival time, method, path and JSON body. The file is
+the input format of the replay load-testing harness
+(benchmarking.replay.load_query_log), so production traffic can be
+replayed against a test server with its original inter-arrival times.
+
+Recording is off unless QUERY_LOG_PATH is set. Bodies are written as sent,
+so only enable it where storing caller queries is acceptable.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional, Sequence
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Environment variable naming the log file
+QUERY_LOG_ENV = "QUERY_LOG_PATH"
+
+# Path prefixes recorded by default
+DEFAULT_RECORDED_PATHS = ("/knowledge/search", "/query", "/vapi/webhook", "/vapi-enhanced/webhook")
+
+# Bodies larger than this are not recorded
+MAX_RECORDED_BODY = 64 * 1024
+
+
+class QueryLogRecorder:
+    """Appends replayable request records to a JSON lines file."""
+
+    def __init__(self, path: str, paths: Sequence[str] = DEFAULT_RECORDED_PATHS):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Log file, appended to (shared by pre-forked workers)
+            paths: Path prefixes to record
+        """
+        self.path = path
+        self.paths = tuple(paths)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+
+    def wants(self, method: str, path: str) -> bool:
+        return method == "POST" and path.startswith(self.paths)
+
+    def record(self, method: str, path: str, body: bytes, status: int, timestamp: float) -> None:
+        """Write one request; bodies that are not JSON are skipped."""
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return
+        line = json.dumps({"timestamp": round(timestamp, 6), "method": method, "path": path,
+                           "body": payload, "status": status}, separators=(",", ":"))
+        with self._lock:
+            # One write per line keeps lines from different workers whole
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class QueryLogMiddleware:
+    """ASGI middleware passing recorded requests to a QueryLogRecorder."""
+
+    def __init__(self, app, recorder: Optional[QueryLogRecorder]):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        recorder = self.recorder
+        if recorder is None or scope["type"] != "http" or not recorder.wants(scope["method"], scope["path"]):
+            return await self.app(scope, receive, send)
+
+        arrived = time.time()
+        chunks = []
+        size = 0
+        status = 500
+
+        async def receive_wrapper():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= MAX_RECORDED_BODY:
+                    chunks.append(body)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if size <= MAX_RECORDED_BODY:
+                try:
+                    recorder.record(scope["method"], scope["path"], b"".join(chunks), status, arrived)
+                except OSError as e:
+                    logger.warning("Failed to record query log entry", error=str(e))
+
+
+def create_query_log_recorder() -> Optional[QueryLogRecorder]:
+    """Recorder for QUERY_LOG_PATH, or None when recording is off."""
+    path = os.getenv(QUERY_LOG_ENV)
+    if not path:
+        return None
+    logger.info("Recording replayable query log", path=path)
+    return QueryLogRecorder(path)
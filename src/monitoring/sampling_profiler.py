@@ -0,0 +1,218 @@
+"""
+FACT System Sampling Profiler
+
+This module samples the Python stacks of every thread in the process from
+a background thread and counts them in collapsed-stack format ("frame;
+frame;frame count" per line), which flamegraph.pl, speedscope and most
+flame graph viewers read directly.
+
+Sampling only reads sys._current_frames(), so the cost is a few
+microseconds per thread per sample and nothing is added to the code being
+measured. Counts are kept in one-second buckets, so a continuously running
+profiler can report any recent window without waiting.
+
+Stacks whose innermost frame is waiting (event loop selectors, thread and
+queue waits) are dropped by default, so the output shows where CPU time
+goes rather than where threads sleep.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Tuple
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Environment variables
+PROFILER_CONTINUOUS_ENV = "PROFILER_CONTINUOUS"
+PROFILER_HZ_ENV = "PROFILER_HZ"
+
+DEFAULT_HZ = 100.0
+MAX_HZ = 1000.0
+
+# Seconds of history a continuous profiler keeps
+DEFAULT_RETENTION = 300
+
+MAX_STACK_DEPTH = 128
+
+# Innermost frames (file name, function) of threads that are waiting, not running
+IDLE_LEAVES = frozenset({
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("base_events.py", "_run_once"),
+    ("connection.py", "_poll"),
+})
+
+_SRC_PREFIX = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_SRC_PREFIX):
+        return filename[len(_SRC_PREFIX):]
+    marker = "site-packages" + os.sep
+    position = filename.rfind(marker)
+    if position != -1:
+        return filename[position + len(marker):]
+    return os.path.basename(filename)
+
+
+class SamplingProfiler:
+    """Samples all thread stacks of this process at a fixed rate."""
+
+    def __init__(self, hz: float = DEFAULT_HZ, retention: int = DEFAULT_RETENTION,
+                 include_idle: bool = False):
+        """
+        Initialize the profiler.
+
+        Args:
+            hz: Samples per second (at most MAX_HZ)
+            retention: Seconds of one-second buckets kept
+            include_idle: Keep stacks of threads that are waiting
+        """
+        if not 0 < hz <= MAX_HZ:
+            raise ValueError(f"hz must be in (0, {MAX_HZ:g}]")
+        self.hz = hz
+        self.include_idle = include_idle
+        self._buckets: Deque[Tuple[int, Counter]] = deque(maxlen=max(1, retention))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Frame labels by code object, built once per function
+        self._labels: Dict[object, str] = {}
+        self.samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info("Sampling profiler started", hz=self.hz)
+
+    def stop(self) -> None:
+        """Stop sampling; collected counts are kept."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        own_id = threading.get_ident()
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            self.sample(skip_thread=own_id)
+            next_sample += interval
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                # Fell behind (e.g. waiting for the GIL); don't burst to catch up
+                next_sample = time.monotonic()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def sample(self, skip_thread: Optional[int] = None) -> None:
+        """Record the current stack of every thread once."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, "thread"))
+            stacks.append(";".join(reversed(frames)))
+
+        second = int(time.time())
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append((second, Counter()))
+            bucket = self._buckets[-1][1]
+            for stack in stacks:
+                bucket[stack] += 1
+            self.samples += 1
+
+    def counts(self, seconds: Optional[float] = None, since: Optional[float] = None) -> Counter:
+        """
+        Stack counts over a recent window.
+
+        Args:
+            seconds: Only the last this many seconds
+            since: Only buckets from this epoch time on
+
+        Returns:
+            Collapsed stack -> sample count
+        """
+        now = time.time()
+        start = since if since is not None else (now - seconds if seconds is not None else 0)
+        total: Counter = Counter()
+        with self._lock:
+            for second, bucket in self._buckets:
+                if second >= int(start):
+                    total.update(bucket)
+        return total
+
+    def collapsed(self, seconds: Optional[float] = None, since: Optional[float] = None) -> str:
+        """Stack counts as collapsed-stack text, heaviest stacks first."""
+        return format_collapsed(self.counts(seconds, since))
+
+
+def format_collapsed(counts: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+_continuous: Optional[SamplingProfiler] = None
+
+
+def get_continuous_profiler() -> Optional[SamplingProfiler]:
+    """The always-on profiler of this process, if PROFILER_CONTINUOUS started one."""
+    return _continuous
+
+
+def start_continuous_profiler() -> Optional[SamplingProfiler]:
+    """
+    Start the always-on profiler when PROFILER_CONTINUOUS is set.
+
+    Called from each server process after it starts (after the fork, under
+    the pre-fork master), since threads don't survive fork.
+
+    Returns:
+        The running profiler, or None when continuous profiling is off
+    """
+    global _continuous
+    if (os.getenv(PROFILER_CONTINUOUS_ENV) or "").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _continuous is None:
+        _continuous = SamplingProfiler(hz=float(os.getenv(PROFILER_HZ_ENV, DEFAULT_HZ)))
+    _continuous.start()
+    return _continuous
+
+
+def stop_continuous_profiler() -> None:
+    if _continuous is not None:
+        _continuous.stop()
@@ -0,0 +1,254 @@
+"""
+FACT System Per-Worker Request Metrics
+
+This module counts HTTP requests in each server process and aggregates the
+counts across pre-forked workers. Every worker periodically writes a small
+JSON snapshot into a directory shared with its siblings (created by the
+pre-fork master); any worker can then answer for the whole server by
+summing the snapshots of the workers that are still alive.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Environment variable naming the shared snapshot directory
+METRICS_DIR_ENV = "FACT_WORKER_METRICS_DIR"
+
+# Seconds between snapshot writes
+DEFAULT_PUBLISH_INTERVAL = 2.0
+
+_SUMMED = ("requests", "client_errors", "server_errors", "in_flight", "latency_ms_total",
+           "cache_hits", "cache_misses", "loop_blocked")
+
+# Per-worker event loop lag; the server-wide figure is the worst worker's
+_WORST = ("loop_lag_ms_p50", "loop_lag_ms_p99", "loop_lag_ms_max")
+
+
+class WorkerMetrics:
+    """Request counters for one server process."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize worker metrics.
+
+        Args:
+            directory: Snapshot directory (defaults to FACT_WORKER_METRICS_DIR
+                when it is set, i.e. under the pre-fork master)
+        """
+        self._directory = directory
+        self._cache_source: Optional[Callable[[], Tuple[int, int]]] = None
+        self._loop_source: Optional[Callable[[], Dict[str, Any]]] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero the counters, e.g. in a freshly forked worker."""
+        self.started_at = time.time()
+        self.requests = 0
+        self.client_errors = 0
+        self.server_errors = 0
+        self.in_flight = 0
+        self.latency_ms_total = 0.0
+        self.latency_ms_max = 0.0
+
+    def set_cache_source(self, source: Optional[Callable[[], Tuple[int, int]]]) -> None:
+        """
+        Report result cache lookups with the request counters.
+
+        Args:
+            source: Returns this process's (hits, misses) so far
+        """
+        self._cache_source = source
+
+    def set_loop_source(self, source: Optional[Callable[[], Dict[str, Any]]]) -> None:
+        """
+        Report event loop lag with the request counters.
+
+        Args:
+            source: Returns this process's loop_lag_ms_* percentiles and
+                loop_blocked count
+        """
+        self._loop_source = source
+
+    @property
+    def directory(self) -> Optional[str]:
+        return self._directory or os.getenv(METRICS_DIR_ENV)
+
+    def record(self, status: int, elapsed_ms: float) -> None:
+        """Count one finished request."""
+        self.requests += 1
+        if status >= 500:
+            self.server_errors += 1
+        elif status >= 400:
+            self.client_errors += 1
+        self.latency_ms_total += elapsed_ms
+        if elapsed_ms > self.latency_ms_max:
+            self.latency_ms_max = elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters for this process."""
+        hits, misses = self._cache_source() if self._cache_source else (0, 0)
+        snapshot = {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "requests": self.requests,
+            "client_errors": self.client_errors,
+            "server_errors": self.server_errors,
+            "in_flight": self.in_flight,
+            "latency_ms_total": round(self.latency_ms_total, 3),
+            "latency_ms_max": round(self.latency_ms_max, 3),
+            "cache_hits": hits,
+            "cache_misses": misses,
+        }
+        if self._loop_source:
+            snapshot.update(self._loop_source())
+        return snapshot
+
+    def publish(self) -> None:
+        """Write this worker's snapshot to the shared directory, if there is one."""
+        directory = self.directory
+        if not directory:
+            return
+        path = snapshot_path(directory, os.getpid())
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(self.snapshot(), handle)
+        # Readers never see a partially written file
+        os.replace(temporary, path)
+
+    async def run_publisher(self, interval: float = DEFAULT_PUBLISH_INTERVAL) -> None:
+        """Publish snapshots until cancelled, removing the file on the way out."""
+        try:
+            while True:
+                try:
+                    self.publish()
+                except OSError as e:
+                    logger.warning("Failed to publish worker metrics", error=str(e))
+                await asyncio.sleep(interval)
+        finally:
+            self.unpublish()
+
+    def unpublish(self) -> None:
+        directory = self.directory
+        if directory:
+            try:
+                os.remove(snapshot_path(directory, os.getpid()))
+            except FileNotFoundError:
+                pass
+
+    def aggregate(self) -> Dict[str, Any]:
+        """
+        Totals across all live workers sharing the snapshot directory.
+
+        The calling worker's own counters are always current; siblings are
+        as fresh as their last publish.
+
+        Returns:
+            Dictionary with "totals" and per-worker "workers" snapshots
+        """
+        own = self.snapshot()
+        workers = [own]
+        directory = self.directory
+        if directory:
+            workers += [snapshot for snapshot in read_snapshots(directory)
+                        if snapshot["pid"] != own["pid"]]
+        return {"worker_count": len(workers), "totals": combine(workers),
+                "workers": sorted(workers, key=lambda snapshot: snapshot["pid"])}
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording the status and latency of every HTTP request."""
+
+    def __init__(self, app, metrics: WorkerMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = self.metrics
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.record(status, (time.perf_counter() - started) * 1000)
+
+
+def snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"worker-{pid}.json")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_snapshots(directory: str) -> List[Dict[str, Any]]:
+    """Snapshots of live workers in a directory; stale files of dead workers are skipped."""
+    snapshots = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return snapshots
+    for name in names:
+        if not (name.startswith("worker-") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if _alive(snapshot.get("pid", 0)):
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def combine(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum counters across worker snapshots."""
+    totals: Dict[str, Any] = {key: 0 for key in _SUMMED}
+    for key in ("latency_ms_max",) + _WORST:
+        totals[key] = 0.0
+    for snapshot in snapshots:
+        for key in _SUMMED:
+            totals[key] += snapshot.get(key, 0)
+        for key in ("latency_ms_max",) + _WORST:
+            totals[key] = max(totals[key], snapshot.get(key, 0.0))
+    requests = totals["requests"]
+    totals["latency_ms_avg"] = round(totals["latency_ms_total"] / requests, 3) if requests else 0.0
+    totals["latency_ms_total"] = round(totals["latency_ms_total"], 3)
+    lookups = totals["cache_hits"] + totals["cache_misses"]
+    totals["cache_hit_rate"] = round(totals["cache_hits"] / lookups, 4) if lookups else 0.0
+    return totals
+
+
+# Global instance for this process
+_worker_metrics = WorkerMetrics()
+
+
+def get_worker_metrics() -> WorkerMetrics:
+    """Get the request metrics of this process."""
+    return _worker_metrics
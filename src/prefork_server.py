@@ -0,0 +1,467 @@
+"""
+FACT System Pre-Fork Server
+
+This module runs the web application in several worker processes that share
+one listening socket. The master builds the knowledge index once, before
+forking, so every worker starts with the same index pages shared
+copy-on-write instead of loading its own copy. The master then supervises:
+it replaces workers that die, performs a rolling restart on SIGHUP (reload
+the index, start a replacement, retire the old worker once the new one is
+serving), and drains all workers gracefully on SIGTERM/SIGINT.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import random
+import select
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+import structlog
+import uvicorn
+
+try:
+    from .core.errors import ConfigurationError
+    from .monitoring.worker_metrics import METRICS_DIR_ENV, get_worker_metrics, snapshot_path
+except ImportError:
+    from core.errors import ConfigurationError
+    from monitoring.worker_metrics import METRICS_DIR_ENV, get_worker_metrics, snapshot_path
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Seconds a worker gets to finish in-flight requests after SIGTERM
+DEFAULT_GRACEFUL_TIMEOUT = 30.0
+
+# Seconds a new worker gets to finish application startup
+WORKER_START_TIMEOUT = 120.0
+
+# Workers that die sooner than this are restarted after RESPAWN_DELAY
+MIN_WORKER_LIFETIME = 5.0
+RESPAWN_DELAY = 1.0
+
+# Seconds between master supervision passes
+SUPERVISE_INTERVAL = 0.5
+
+LOOP_CHOICES = ("auto", "asyncio", "uvloop")
+HTTP_CHOICES = ("auto", "h11", "httptools")
+
+
+def resolve_workers(value) -> int:
+    """
+    Worker count from a setting.
+
+    Args:
+        value: Positive integer, or "auto"/0 for one worker per CPU core
+
+    Returns:
+        Number of worker processes
+
+    Raises:
+        ConfigurationError: If the value is not a count
+    """
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("", "auto"):
+            value = 0
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ConfigurationError(f"Invalid worker count: {value!r}")
+    if count < 0:
+        raise ConfigurationError(f"Invalid worker count: {value!r}")
+    return count or os.cpu_count() or 1
+
+
+def _resolve_choice(value: str, choices, module: str, setting: str) -> str:
+    value = (value or "auto").strip().lower()
+    if value not in choices:
+        raise ConfigurationError(f"Invalid {setting}: {value!r} (expected one of {', '.join(choices)})")
+    if value == module:
+        try:
+            __import__(module)
+        except ImportError:
+            logger.warning(f"{module} requested but not installed, using the default", setting=setting)
+            return "auto"
+    return value
+
+
+def resolve_loop(value: str) -> str:
+    """Event loop for uvicorn: "auto" picks uvloop when installed."""
+    return _resolve_choice(value, LOOP_CHOICES, "uvloop", "event loop")
+
+
+def resolve_http(value: str) -> str:
+    """HTTP parser for uvicorn: "auto" picks httptools when installed."""
+    return _resolve_choice(value, HTTP_CHOICES, "httptools", "HTTP implementation")
+
+
+def parse_access_log(value) -> float:
+    """
+    Access log sampling rate from a setting.
+
+    Args:
+        value: "on", "off", or the fraction of requests to log (e.g. "0.01")
+
+    Returns:
+        Rate between 0 (off) and 1 (every request)
+
+    Raises:
+        ConfigurationError: If the value is neither a switch nor a fraction
+    """
+    text = str(value).strip().lower()
+    if text in ("on", "true", "yes"):
+        return 1.0
+    if text in ("off", "false", "no"):
+        return 0.0
+    try:
+        rate = float(text)
+    except ValueError:
+        raise ConfigurationError(f"Invalid access log setting: {value!r}")
+    if not 0.0 <= rate <= 1.0:
+        raise ConfigurationError(f"Access log sample rate must be between 0 and 1: {value!r}")
+    return rate
+
+
+class AccessLogSampler(logging.Filter):
+    """Passes a random fraction of uvicorn access log records, and every 5xx."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: (client_addr, method, path, http_version, status_code)
+        args = record.args
+        if isinstance(args, tuple) and len(args) == 5 and isinstance(args[4], int) and args[4] >= 500:
+            return True
+        return random.random() < self.rate
+
+
+def install_access_log_sampling(rate: float) -> None:
+    """Replace any access log sampler on the uvicorn.access logger."""
+    access_logger = logging.getLogger("uvicorn.access")
+    for existing in [f for f in access_logger.filters if isinstance(f, AccessLogSampler)]:
+        access_logger.removeFilter(existing)
+    if 0.0 < rate < 1.0:
+        access_logger.addFilter(AccessLogSampler(rate))
+
+
+@dataclass
+class ServingOptions:
+    """How the web server is run."""
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # Worker processes; 1 runs a single uvicorn server without a master
+    workers: int = 1
+    loop: str = "auto"
+    http: str = "auto"
+    # Fraction of requests written to the access log (0 disables it)
+    access_log_rate: float = 1.0
+    graceful_timeout: float = DEFAULT_GRACEFUL_TIMEOUT
+    backlog: int = 2048
+    log_level: str = "info"
+
+    @classmethod
+    def from_env(cls, host: str = "0.0.0.0", port: Optional[int] = None) -> "ServingOptions":
+        """
+        Options from the environment.
+
+        Reads PORT, WEB_WORKERS ("auto" = CPU cores), WEB_LOOP, WEB_HTTP,
+        WEB_ACCESS_LOG (on/off/sample fraction) and WEB_GRACEFUL_TIMEOUT.
+
+        Raises:
+            ConfigurationError: If a setting is invalid
+        """
+        return cls(
+            host=host,
+            port=port if port is not None else int(os.environ.get("PORT", 8000)),
+            workers=resolve_workers(os.getenv("WEB_WORKERS", "1")),
+            loop=resolve_loop(os.getenv("WEB_LOOP", "auto")),
+            http=resolve_http(os.getenv("WEB_HTTP", "auto")),
+            access_log_rate=parse_access_log(os.getenv("WEB_ACCESS_LOG", "on")),
+            graceful_timeout=float(os.getenv("WEB_GRACEFUL_TIMEOUT", DEFAULT_GRACEFUL_TIMEOUT)),
+        )
+
+    def uvicorn_config(self, app) -> uvicorn.Config:
+        """uvicorn configuration for one server process."""
+        config = uvicorn.Config(
+            app=app,
+            host=self.host,
+            port=self.port,
+            loop=self.loop,
+            http=self.http,
+            log_level=self.log_level,
+            access_log=self.access_log_rate > 0,
+            use_colors=True,
+            backlog=self.backlog,
+            timeout_graceful_shutdown=int(self.graceful_timeout),
+        )
+        # Config() has just (re)configured logging; add the sampler after it
+        install_access_log_sampling(self.access_log_rate)
+        return config
+
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server that tells the master once application startup has finished."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self._ready_fd: Optional[int] = ready_fd
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started and self._ready_fd is not None:
+            os.write(self._ready_fd, b"1")
+            os.close(self._ready_fd)
+            self._ready_fd = None
+
+
+class PreforkServer:
+    """Master process forking uvicorn workers over one shared socket."""
+
+    def __init__(self, app, options: ServingOptions,
+                 preload: Optional[Callable[[], Awaitable[None]]] = None):
+        """
+        Initialize pre-fork server.
+
+        Args:
+            app: ASGI application served by every worker
+            options: Serving options; options.workers processes are forked
+            preload: Coroutine function run in the master before forking (and
+                again before each rolling restart) to build shared state. It
+                must close its connections: sockets and threads do not
+                survive fork
+        """
+        self.app = app
+        self.options = options
+        self.preload = preload
+        self.workers: Dict[int, int] = {}  # pid -> slot
+        self._started_at: Dict[int, float] = {}
+        self._ready_pipes: Dict[int, int] = {}
+        self._retiring: Set[int] = set()
+        self._socket: Optional[socket.socket] = None
+        self._metrics_dir: Optional[str] = None
+        self._stopping = False
+        self._restart_requested = False
+
+    def run(self) -> int:
+        """
+        Preload, fork the workers and supervise them until stopped.
+
+        Returns:
+            Process exit code
+        """
+        logger.info("Starting pre-fork server", workers=self.options.workers,
+                    host=self.options.host, port=self.options.port,
+                    loop=self.options.loop, http=self.options.http)
+        self._preload()
+        self._socket = self._bind()
+        self._metrics_dir = tempfile.mkdtemp(prefix="fact-workers-")
+        os.environ[METRICS_DIR_ENV] = self._metrics_dir
+        self._install_signals()
+        try:
+            pids = [self._spawn(slot) for slot in range(self.options.workers)]
+            for pid in pids:
+                self._wait_ready(pid)
+            self._supervise()
+        finally:
+            self._shutdown()
+        return 0
+
+    def _preload(self) -> None:
+        gc.unfreeze()
+        if self.preload is not None:
+            started = time.perf_counter()
+            try:
+                asyncio.run(self.preload())
+                logger.info("Pre-fork preload complete",
+                            seconds=round(time.perf_counter() - started, 2))
+            except Exception as e:
+                logger.error("Pre-fork preload failed, workers will load their own state", error=str(e))
+        # Park everything allocated so far in the permanent generation so the
+        # collector never writes to it; otherwise each worker's first GC pass
+        # would copy the shared pages
+        gc.collect()
+        gc.freeze()
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.options.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.options.host, self.options.port))
+        sock.listen(self.options.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def _install_signals(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_restart(self, signum, frame) -> None:
+        self._restart_requested = True
+
+    def _spawn(self, slot: int) -> int:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                os.close(ready_r)
+                code = self._run_worker(slot, ready_w)
+            except BaseException as e:
+                logger.error("Worker crashed", slot=slot, error=str(e))
+            finally:
+                os._exit(code)
+
+        os.close(ready_w)
+        self.workers[pid] = slot
+        self._started_at[pid] = time.monotonic()
+        self._ready_pipes[pid] = ready_r
+        logger.info("Worker started", pid=pid, slot=slot)
+        return pid
+
+    def _run_worker(self, slot: int, ready_fd: int) -> int:
+        # uvicorn installs its own SIGTERM/SIGINT handlers; SIGHUP is for the master
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        for fd in self._ready_pipes.values():
+            os.close(fd)
+        random.seed()
+        os.environ["FACT_WORKER_SLOT"] = str(slot)
+        get_worker_metrics().reset()
+
+        server = _WorkerServer(self.options.uvicorn_config(self.app), ready_fd)
+        server.run(sockets=[self._socket])
+        return 0 if server.started else 1
+
+    def _wait_ready(self, pid: int, timeout: float = WORKER_START_TIMEOUT) -> bool:
+        fd = self._ready_pipes.pop(pid, None)
+        if fd is None:
+            return False
+        try:
+            readable, _, _ = select.select([fd], [], [], timeout)
+            ready = bool(readable) and os.read(fd, 1) == b"1"
+        finally:
+            os.close(fd)
+        if ready:
+            logger.info("Worker ready", pid=pid, slot=self.workers.get(pid))
+        else:
+            logger.error("Worker did not start", pid=pid, slot=self.workers.get(pid))
+        return ready
+
+    def _supervise(self) -> None:
+        while not self._stopping:
+            if self._restart_requested:
+                self._restart_requested = False
+                self._rolling_restart()
+            self._reap()
+            time.sleep(SUPERVISE_INTERVAL)
+
+    def _forget(self, pid: int) -> Optional[int]:
+        slot = self.workers.pop(pid, None)
+        self._started_at.pop(pid, None)
+        fd = self._ready_pipes.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+        if self._metrics_dir:
+            try:
+                os.remove(snapshot_path(self._metrics_dir, pid))
+            except FileNotFoundError:
+                pass
+        return slot
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            lifetime = time.monotonic() - self._started_at.get(pid, 0.0)
+            slot = self._forget(pid)
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                continue
+            if slot is None or self._stopping:
+                continue
+            logger.warning("Worker exited, replacing it", pid=pid, slot=slot,
+                           exit_code=os.waitstatus_to_exitcode(status))
+            if lifetime < MIN_WORKER_LIFETIME:
+                # Don't spin if workers die during startup
+                time.sleep(RESPAWN_DELAY)
+            self._spawn(slot)
+
+    def _rolling_restart(self) -> None:
+        """Reload shared state, then replace workers one at a time."""
+        old = dict(self.workers)
+        logger.info("Rolling restart", workers=len(old))
+        self._preload()
+        for pid, slot in old.items():
+            if self._stopping:
+                return
+            if pid not in self.workers:
+                continue  # Exited on its own and was already replaced
+            replacement = self._spawn(slot)
+            if not self._wait_ready(replacement):
+                logger.error("Rolling restart aborted, keeping remaining workers", slot=slot)
+                self._terminate([replacement])
+                return
+            self._retiring.add(pid)
+            self._terminate([pid])
+        logger.info("Rolling restart complete", workers=len(self.workers))
+
+    def _terminate(self, pids: List[int]) -> None:
+        """SIGTERM the workers, wait for them to drain, then SIGKILL stragglers."""
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.options.graceful_timeout + 5
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+                    self._retiring.discard(pid)
+                    self._forget(pid)
+            if remaining:
+                time.sleep(0.05)
+        for pid in remaining:
+            logger.warning("Worker did not stop in time, killing it", pid=pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self._retiring.discard(pid)
+            self._forget(pid)
+
+    def _shutdown(self) -> None:
+        self._stopping = True
+        logger.info("Stopping pre-fork server", workers=len(self.workers))
+        self._terminate(list(self.workers))
+        if self._socket is not None:
+            self._socket.close()
+        if self._metrics_dir:
+            shutil.rmtree(self._metrics_dir, ignore_errors=True)
+            os.environ.pop(METRICS_DIR_ENV, None)
+        logger.info("Pre-fork server stopped")
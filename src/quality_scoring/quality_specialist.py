@@ -479,16 +479,30 @@ class QualitySpecialist:
         
         return coverage
     
-    def select_top_entries(self, entries: List[KnowledgeEntry], target_count: int = 200) -> List[KnowledgeEntry]:
-        """Select top entries with balanced persona coverage"""
+    def select_top_entries(self, entries: List[KnowledgeEntry], target_count: int = 200,
+                           processes: Optional[int] = 1) -> List[KnowledgeEntry]:
+        """Select top entries with balanced persona coverage
+
+        processes > 1 (or None for one per CPU) scores the entries in forked
+        processes; the selection is the same.
+        """
         # Score all entries
-        for entry in entries:
-            entry.quality_metrics = self.score_entry({
-                'question': entry.question,
-                'answer': entry.answer,
-                'category': entry.category,
-                'tags': entry.tags
-            })
+        fields = [{
+            'question': entry.question,
+            'answer': entry.answer,
+            'category': entry.category,
+            'tags': entry.tags
+        } for entry in entries]
+        if processes == 1:
+            scores = [self.score_entry(entry_fields) for entry_fields in fields]
+        else:
+            try:
+                from ..retrieval.scoring_pool import map_in_processes
+            except ImportError:
+                from retrieval.scoring_pool import map_in_processes
+            scores = map_in_processes(self.score_entry, fields, processes=processes)
+        for entry, metrics in zip(entries, scores):
+            entry.quality_metrics = metrics
             entry.deployment_ready = entry.quality_metrics.total_score >= 7.0
         
         # Sort by quality score
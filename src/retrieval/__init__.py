@@ -9,11 +9,15 @@ from .enhanced_search import (
     FuzzyMatcher,
     InMemoryIndex
 )
+from .scoring_pool import ScoringPool, create_scoring_pool, map_in_processes
 
 __all__ = [
     'EnhancedRetriever',
     'SearchResult',
     'QueryPreprocessor',
     'FuzzyMatcher',
-    'InMemoryIndex'
+    'InMemoryIndex',
+    'ScoringPool',
+    'create_scoring_pool',
+    'map_in_processes'
 ]
\ No newline at end of file
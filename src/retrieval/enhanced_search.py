@@ -9,18 +9,34 @@ strategies for high precision.
 import re
 import json
 import hashlib
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import AsyncIterator, Dict, List, Any, Mapping, Optional, Sequence, Tuple, Set
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import asyncio
 from collections import defaultdict, Counter
-import numpy as np
 import structlog
 from difflib import SequenceMatcher
 from functools import lru_cache
 
+try:
+    from ..db.streaming import QueryStream, row_view_type
+    from ..db.change_feed import ChangeFeed, ChangeSet
+    from ..core.serialization import entry_fragment
+    from .scoring_pool import ScoringPool
+except ImportError:
+    from db.streaming import QueryStream, row_view_type
+    from db.change_feed import ChangeFeed, ChangeSet
+    from core.serialization import entry_fragment
+    from retrieval.scoring_pool import ScoringPool
+
 logger = structlog.get_logger(__name__)
 
+# Columns loaded into the in-memory index
+INDEX_QUERY = """
+    SELECT id, question, answer, category, tags, state, priority, difficulty
+    FROM knowledge_base
+"""
+
 
 @dataclass
 class SearchResult:
@@ -35,6 +51,32 @@ class SearchResult:
     confidence: float
     retrieval_time_ms: float
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Entry encoded in the API response shape (see core.serialization)
+    fragment: Optional[bytes] = field(default=None, repr=False)
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """One query of a batch search."""
+    query: str
+    category: Optional[str] = None
+    state: Optional[str] = None
+    limit: int = 5
+    
+    def normalized(self) -> "SearchQuery":
+        """
+        Canonical form used to deduplicate a batch.
+        
+        Scoring lowercases the query and splits it on whitespace, and
+        filters ignore case, so queries differing only in case or spacing
+        return the same results.
+        """
+        return SearchQuery(
+            " ".join(self.query.lower().split()),
+            self.category.lower() if self.category else None,
+            self.state.upper() if self.state else None,
+            self.limit
+        )
 
 
 class QueryPreprocessor:
@@ -249,6 +291,15 @@ class FuzzyMatcher:
         return score if score >= threshold else 0.0
 
 
+def _discard(index: Dict[str, Set[int]], key: str, entry_id: int) -> None:
+    """Remove an id from an inverted-index posting, dropping the key once empty."""
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(entry_id)
+        if not ids:
+            del index[key]
+
+
 class InMemoryIndex:
     """
     In-memory index for ultra-fast retrieval.
@@ -262,6 +313,7 @@ class InMemoryIndex:
         self.category_index = defaultdict(set)  # category -> set of entry IDs
         self.state_index = defaultdict(set)  # state -> set of entry IDs
         self.id_to_index = {}  # entry ID -> index in entries list
+        self.fragments = {}  # entry ID -> entry encoded as a JSON response fragment
         self.preprocessor = QueryPreprocessor()
         self.fuzzy_matcher = FuzzyMatcher()
         self._initialized = False
@@ -270,15 +322,49 @@ class InMemoryIndex:
         """Build in-memory index from entries."""
         logger.info(f"Building in-memory index for {len(entries)} entries")
         
-        self.entries = entries
+        self._reset()
+        self._add_entries(entries)
+        self._initialized = True
+        logger.info(f"Index built with {len(self.keyword_index)} unique keywords")
+    
+    async def build_index_from_batches(self, batches: AsyncIterator[Sequence[Mapping[str, Any]]]) -> int:
+        """
+        Build in-memory index from streamed batches of rows.
+        
+        Rows are kept as given (row views or Records work as well as dicts),
+        so the index holds the only copy of the data. Yields to the event
+        loop between batches.
+        
+        Args:
+            batches: Async iterator of row batches
+            
+        Returns:
+            Number of entries indexed
+        """
+        self._reset()
+        async for batch in batches:
+            self._add_entries(batch)
+            await asyncio.sleep(0)
+        self._initialized = True
+        logger.info(f"Index built from stream with {len(self.entries)} entries and "
+                    f"{len(self.keyword_index)} unique keywords")
+        return len(self.entries)
+    
+    def _reset(self):
+        self.entries = []
         self.keyword_index.clear()
         self.category_index.clear()
         self.state_index.clear()
         self.id_to_index.clear()
-        
-        for idx, entry in enumerate(entries):
+        self.fragments.clear()
+    
+    def _add_entries(self, entries: Sequence[Mapping[str, Any]]):
+        for entry in entries:
             entry_id = entry['id']
-            self.id_to_index[entry_id] = idx
+            self.id_to_index[entry_id] = len(self.entries)
+            self.entries.append(entry)
+            # Encoded once here so responses are joined from bytes
+            self.fragments[entry_id] = entry_fragment(entry)
             
             # Index by category
             if entry.get('category'):
@@ -289,14 +375,61 @@ class InMemoryIndex:
                 self.state_index[entry['state'].upper()].add(entry_id)
             
             # Extract and index keywords
-            text = f"{entry.get('question', '')} {entry.get('answer', '')} {entry.get('tags', '')}"
-            keywords = self.preprocessor.extract_keywords(text)
-            
-            for keyword in keywords:
+            for keyword in self._entry_keywords(entry):
                 self.keyword_index[keyword].add(entry_id)
+    
+    def _entry_keywords(self, entry: Mapping[str, Any]) -> List[str]:
+        text = f"{entry.get('question', '')} {entry.get('answer', '')} {entry.get('tags', '')}"
+        return self.preprocessor.extract_keywords(text)
+    
+    def upsert_entries(self, entries: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Add or replace entries by id without rebuilding the index.
         
-        self._initialized = True
-        logger.info(f"Index built with {len(self.keyword_index)} unique keywords")
+        Args:
+            entries: Rows with the INDEX_QUERY columns
+            
+        Returns:
+            Number of entries written
+        """
+        self.remove_entries([entry['id'] for entry in entries])
+        self._add_entries(entries)
+        return len(entries)
+    
+    def remove_entries(self, entry_ids: Sequence[int]) -> int:
+        """
+        Remove entries by id; unknown ids are ignored.
+        
+        The last entry moves into the freed slot, so removal costs the same
+        whatever the index size.
+        
+        Args:
+            entry_ids: Ids to remove
+            
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for entry_id in entry_ids:
+            position = self.id_to_index.pop(entry_id, None)
+            if position is None:
+                continue
+            entry = self.entries[position]
+            del self.fragments[entry_id]
+            
+            if entry.get('category'):
+                _discard(self.category_index, entry['category'].lower(), entry_id)
+            if entry.get('state'):
+                _discard(self.state_index, entry['state'].upper(), entry_id)
+            for keyword in self._entry_keywords(entry):
+                _discard(self.keyword_index, keyword, entry_id)
+            
+            last = self.entries.pop()
+            if position < len(self.entries):
+                self.entries[position] = last
+                self.id_to_index[last['id']] = position
+            removed += 1
+        return removed
     
     def search(self, query: str, category: Optional[str] = None,
                state: Optional[str] = None, limit: int = 5) -> List[SearchResult]:
@@ -310,7 +443,81 @@ class InMemoryIndex:
         
         import time
         start_time = time.time()
+        return self.rank_entries(query, self.candidate_entries(category, state), limit, start_time)
+    
+    def candidate_positions(self, category: Optional[str] = None,
+                            state: Optional[str] = None) -> Sequence[int]:
+        """Positions in entries of the entries passing the category and state filters."""
+        if not self._initialized:
+            return []
+        if not category and not state:
+            return range(len(self.entries))
+        candidate_ids = set(range(len(self.entries)))
+        
+        if category:
+            category_ids = {self.id_to_index[id_] for id_ in self.category_index.get(category.lower(), set())}
+            candidate_ids &= category_ids
+        
+        if state:
+            state_ids = {self.id_to_index[id_] for id_ in self.state_index.get(state.upper(), set())}
+            candidate_ids &= state_ids
+        
+        return list(candidate_ids)
+    
+    def candidate_entries(self, category: Optional[str] = None,
+                          state: Optional[str] = None) -> List[Mapping[str, Any]]:
+        """Entries passing the category and state filters."""
+        return [self.entries[idx] for idx in self.candidate_positions(category, state)]
+    
+    def rank_entries(self, query: str, entries: List[Dict[str, Any]], limit: int = 5,
+                     start_time: Optional[float] = None) -> List[SearchResult]:
+        """
+        Score and rank a candidate set of entries against a query.
+        
+        Used by search() for in-memory candidates and by EnhancedRetriever
+        for candidates generated server-side by a full-text backend.
+        """
+        import time
+        if start_time is None:
+            start_time = time.time()
+        
+        prepared = self._prepare_query(query)
+        by_id = {}
+        for entry in entries:
+            by_id[entry['id']] = entry
+        scored = self._score(query, prepared, entries)
+        return self._results(prepared, scored, by_id.__getitem__, limit, start_time)
+    
+    def score_entries(self, query: str, entries: Sequence[Mapping[str, Any]]) -> List[Tuple[Any, float, str]]:
+        """
+        Score entries against a query without building results.
         
+        Run by scoring pool processes on their share of the candidates.
+        
+        Returns:
+            (entry id, score, match type) for each entry scoring above the
+            cut-off, in the order given
+        """
+        return self._score(query, self._prepare_query(query), entries)
+    
+    def rank_scored(self, query: str, scored: List[Tuple[Any, float, str]], limit: int = 5,
+                    start_time: Optional[float] = None) -> List[SearchResult]:
+        """
+        Build ranked results from score_entries() output for indexed entries.
+        
+        Given the scores of all candidates in candidate order, the results
+        are the same as rank_entries() over those candidates.
+        """
+        import time
+        if start_time is None:
+            start_time = time.time()
+        entries, id_to_index = self.entries, self.id_to_index
+        # Entries removed while the scores were computed elsewhere drop out
+        scored = [item for item in scored if item[0] in id_to_index]
+        return self._results(self._prepare_query(query), scored,
+                             lambda entry_id: entries[id_to_index[entry_id]], limit, start_time)
+    
+    def _prepare_query(self, query: str) -> Tuple[List[str], List[str], Optional[str]]:
         # Generate query variations
         query_variations = self.preprocessor.generate_query_variations(query)
         query_keywords = self.preprocessor.extract_keywords(query)
@@ -323,13 +530,6 @@ class InMemoryIndex:
                     if word not in query_keywords:
                         query_keywords.append(word)
         
-        # Score each entry
-        scores = defaultdict(float)
-        match_types = {}
-        
-        # Get candidate entries based on filters
-        candidate_ids = set(range(len(self.entries)))
-        
         # Check if query mentions a state
         query_lower = query.lower()
         mentioned_state = None
@@ -343,23 +543,20 @@ class InMemoryIndex:
                 mentioned_state = state_code
                 break
         
-        if category:
-            category_ids = {self.id_to_index[id_] for id_ in self.category_index.get(category.lower(), set())}
-            candidate_ids &= category_ids
-        
-        if state:
-            state_ids = {self.id_to_index[id_] for id_ in self.state_index.get(state.upper(), set())}
-            candidate_ids &= state_ids
+        return query_variations, query_keywords, mentioned_state
+    
+    def _score(self, query: str, prepared: Tuple[List[str], List[str], Optional[str]],
+               entries: Sequence[Mapping[str, Any]]) -> List[Tuple[Any, float, str]]:
+        query_variations, query_keywords, mentioned_state = prepared
+        scored = []
         
         # Score each candidate
-        for idx in candidate_ids:
-            entry = self.entries[idx]
+        for entry in entries:
             entry_id = entry['id']
             
             # Check exact match
             if query.lower() == entry.get('question', '').lower():
-                scores[entry_id] = 1.0
-                match_types[entry_id] = 'exact'
+                scored.append((entry_id, 1.0, 'exact'))
                 continue
             
             # Fuzzy matching on question
@@ -394,13 +591,28 @@ class InMemoryIndex:
                 total_score *= 1.5
             
             if total_score > 0.1:  # Very low threshold to catch more results
-                scores[entry_id] = total_score
                 if question_score > 0.7:
-                    match_types[entry_id] = 'fuzzy'
+                    match_type = 'fuzzy'
                 elif keyword_score > 0.5:
-                    match_types[entry_id] = 'keyword'
+                    match_type = 'keyword'
                 else:
-                    match_types[entry_id] = 'partial'
+                    match_type = 'partial'
+                scored.append((entry_id, total_score, match_type))
+        
+        return scored
+    
+    def _results(self, prepared: Tuple[List[str], List[str], Optional[str]],
+                 scored: List[Tuple[Any, float, str]], entry_for, limit: int,
+                 start_time: float) -> List[SearchResult]:
+        import time
+        query_variations, query_keywords, _ = prepared
+        
+        # Later scores for the same id replace earlier ones, as in a dict
+        scores = {}
+        match_types = {}
+        for entry_id, score, match_type in scored:
+            scores[entry_id] = score
+            match_types[entry_id] = match_type
         
         # Sort by score and create results
         # Return more results if scores are close
@@ -416,8 +628,7 @@ class InMemoryIndex:
         elapsed_ms = (time.time() - start_time) * 1000
         
         for entry_id, score in sorted_entries:
-            idx = self.id_to_index[entry_id]
-            entry = self.entries[idx]
+            entry = entry_for(entry_id)
             
             results.append(SearchResult(
                 id=entry_id,
@@ -432,7 +643,9 @@ class InMemoryIndex:
                 metadata={
                     'keywords_matched': len([k for k in query_keywords if k in entry.get('question', '').lower()]),
                     'query_variations_used': len(query_variations)
-                }
+                },
+                # Server-side candidates are not in the index; encode them now
+                fragment=self.fragments.get(entry_id) or entry_fragment(entry)
             ))
         
         return results
@@ -468,118 +681,182 @@ class EnhancedRetriever:
     Optimized for voice agent use cases with <20MB knowledge bases.
     """
     
-    def __init__(self, db_manager=None):
-        """Initialize the enhanced retriever."""
+    def __init__(self, db_manager=None, candidate_backend=None, candidate_pool_size: int = 50,
+                 change_feed: Optional[ChangeFeed] = None, scoring_pool: Optional[ScoringPool] = None):
+        """
+        Initialize the enhanced retriever.
+        
+        Args:
+            db_manager: Optional DatabaseManager to load entries from
+            candidate_backend: Optional full-text backend (db.fulltext). When it is
+                available, candidates are fetched server-side per query and only
+                those are scored, so the full knowledge base is never loaded
+            candidate_pool_size: Minimum candidates fetched per query for re-scoring
+            change_feed: Optional change feed (db.change_feed). When given, writes to
+                knowledge_base are applied to the index as they happen
+            scoring_pool: Optional ScoringPool. When given, in-memory searches over
+                many candidates are scored in its processes, off the event loop
+        """
         self.db_manager = db_manager
+        self.candidate_backend = candidate_backend
+        self.candidate_pool_size = candidate_pool_size
+        self.change_feed = change_feed
+        self.scoring_pool = scoring_pool
+        # Bumped whenever the knowledge base changes; results computed under an
+        # older generation are not cached
+        self.cache_generation = 0
         self.in_memory_index = InMemoryIndex()
         self.preprocessor = QueryPreprocessor()
         self.fuzzy_matcher = FuzzyMatcher()
         self._cache = {}  # Simple query cache
         self._cache_ttl = timedelta(minutes=5)
         self._last_cache_clear = datetime.now()
+        # Result cache lookups, reported by /metrics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+    async def initialize(self, start_feed: bool = True):
+        """
+        Load knowledge base into memory for fast retrieval.
+        
+        Args:
+            start_feed: Start applying change feed updates once loaded. A pre-fork
+                master passes False and each worker calls resume() instead
+        """
+        feed = self.change_feed
+        if feed is not None and not feed.running:
+            # Mark before loading so writes made during the load are replayed
+            try:
+                if feed.available or await feed.ensure_schema():
+                    await feed.mark()
+                else:
+                    feed = None
+            except Exception as e:
+                logger.warning(f"Knowledge base change feed unavailable: {e}")
+                feed = None
+        
+        await self._load()
+        
+        if start_feed and feed is not None and not feed.running:
+            feed.start(self.apply_changes)
+    
+    async def resume(self, pool=None):
+        """
+        Take over an index loaded by another process (a pre-fork master).
+        
+        The index itself is inherited as is; only the change feed is
+        reconnected, reloading only if it cannot replay what changed since
+        the master's load.
         
-    async def initialize(self):
-        """Load knowledge base into memory for fast retrieval."""
+        Args:
+            pool: Connection pool opened by this process, for feeds that query
+                through one
+        """
+        feed = self.change_feed
+        if feed is None or not feed.available or feed.running:
+            return
+        try:
+            if await feed.resume(pool):
+                logger.info("Knowledge base changed since pre-fork load, reloading")
+                await self._load()
+                self._invalidate_cache()
+        except Exception as e:
+            logger.warning(f"Knowledge base change feed unavailable: {e}")
+            return
+        feed.start(self.apply_changes)
+    
+    async def _load(self):
         try:
             logger.info("Enhanced retriever initialize() called")
             
-            # Try PostgreSQL first if available
+            # Server-side candidate generation replaces the full in-memory load
+            if self.candidate_backend is not None:
+                if await self.candidate_backend.ensure_schema():
+                    logger.info("Enhanced retriever using server-side candidates",
+                                backend=self.candidate_backend.name)
+                    return
+                logger.warning("Full-text backend unavailable, loading knowledge base into memory")
+            
+            # Try PostgreSQL first if available (checked before importing
+            # the adapter so SQLite deployments never load asyncpg)
             try:
-                from db.postgres_adapter import postgres_adapter
-                # Check if PostgreSQL is available via environment variable
                 import os
                 if os.getenv("DATABASE_URL"):
+                    from db.postgres_adapter import postgres_adapter
                     logger.info("DATABASE_URL detected, using PostgreSQL")
                     if not postgres_adapter.initialized:
                         logger.info("Initializing PostgreSQL adapter")
                         await postgres_adapter.initialize()
                     logger.info("Loading from PostgreSQL")
-                    entries = await postgres_adapter.get_all_entries()
+                    # Index Records batch by batch as the server-side cursor delivers them
+                    count = await self.in_memory_index.build_index_from_batches(postgres_adapter.iter_entries())
                     
-                    if entries:
-                        # Build in-memory index
-                        self.in_memory_index.build_index(entries)
-                        logger.info(f"Enhanced retriever initialized with {len(entries)} entries from PostgreSQL")
+                    if count:
+                        logger.info(f"Enhanced retriever initialized with {count} entries from PostgreSQL")
                         return
             except ImportError:
                 pass
+            except Exception as e:
+                # Drop the partly streamed index and load from SQLite instead
+                logger.warning(f"PostgreSQL load failed, falling back to SQLite: {e}")
+                self.in_memory_index._reset()
             
-            # Load all entries from database
+            # Stream all entries from database straight into the index
             if self.db_manager:
                 logger.info("Using db_manager for connection")
-                async with self.db_manager.get_connection() as conn:
-                    cursor = await conn.execute("""
-                        SELECT id, question, answer, category, tags, state, priority, difficulty
-                        FROM knowledge_base
-                    """)
-                    rows = await cursor.fetchall()
+                async with self.db_manager.stream_query(INDEX_QUERY) as stream:
+                    count = await self.in_memory_index.build_index_from_batches(stream.views())
             else:
                 logger.info("No db_manager, using direct connection")
                 # Direct SQLite connection if no db_manager
+                import os
+                # Use fact_system.db which has the knowledge base data
+                db_path = os.getenv("DATABASE_PATH", "data/fact_system.db")
+                
+                # Check if database file exists
+                if not os.path.exists(db_path):
+                    logger.warning(f"Database file not found at {db_path}")
+                    # Try without data/ prefix for Railway
+                    db_path = "fact_system.db"
+                    logger.info(f"Trying alternative path: {db_path}")
+                
                 try:
                     import aiosqlite
-                    import os
-                    # Use fact_system.db which has the knowledge base data
-                    db_path = os.getenv("DATABASE_PATH", "data/fact_system.db")
                     logger.info(f"Trying aiosqlite with path: {db_path}")
-                    
-                    # Check if database file exists
-                    if not os.path.exists(db_path):
-                        logger.warning(f"Database file not found at {db_path}")
-                        # Try without data/ prefix for Railway
-                        db_path = "fact_system.db"
-                        logger.info(f"Trying alternative path: {db_path}")
-                    
                     async with aiosqlite.connect(db_path) as conn:
-                        cursor = await conn.execute("""
-                            SELECT id, question, answer, category, tags, state, priority, difficulty
-                            FROM knowledge_base
-                        """)
-                        rows = await cursor.fetchall()
-                        logger.info(f"Loaded {len(rows)} rows with aiosqlite")
+                        async with conn.execute(INDEX_QUERY) as cursor:
+                            count = await self.in_memory_index.build_index_from_batches(
+                                QueryStream(cursor).views())
                 except ImportError as e:
                     logger.warning(f"aiosqlite not available: {e}")
                     # Fallback to sync sqlite if aiosqlite not available
                     import sqlite3
-                    import os
-                    db_path = os.getenv("DATABASE_PATH", "data/fact_system.db")
-                    
-                    # Check if database file exists
-                    if not os.path.exists(db_path):
-                        db_path = "fact_system.db"
-                        logger.info(f"Using alternative path: {db_path}")
-                    
                     logger.info(f"Using sync sqlite3 with path: {db_path}")
                     conn = sqlite3.connect(db_path)
-                    cursor = conn.execute("""
-                        SELECT id, question, answer, category, tags, state, priority, difficulty
-                        FROM knowledge_base
-                    """)
-                    rows = cursor.fetchall()
-                    conn.close()
-                    logger.info(f"Loaded {len(rows)} rows with sqlite3")
-                
-                entries = []
-                for row in rows:
-                    entries.append({
-                        'id': row[0],
-                        'question': row[1],
-                        'answer': row[2],
-                        'category': row[3],
-                        'tags': row[4],
-                        'state': row[5],
-                        'priority': row[6],
-                        'difficulty': row[7]
-                    })
+                    try:
+                        cursor = conn.execute(INDEX_QUERY)
+                        view = row_view_type(tuple(column[0] for column in cursor.description))
+                        self.in_memory_index.build_index([view(row) for row in cursor])
+                        count = len(self.in_memory_index.entries)
+                    finally:
+                        conn.close()
                 
-                # Build in-memory index
-                self.in_memory_index.build_index(entries)
-                logger.info(f"Enhanced retriever initialized with {len(entries)} entries")
+            logger.info(f"Enhanced retriever initialized with {count} entries")
                 
         except Exception as e:
             logger.error(f"Failed to initialize enhanced retriever: {e}")
             raise
     
+    @property
+    def uses_server_candidates(self) -> bool:
+        """True when searches draw candidates from the database full-text index."""
+        return self.candidate_backend is not None and self.candidate_backend.available
+    
+    @property
+    def tracks_changes(self) -> bool:
+        """True when a running change feed keeps the index current without refresh_index()."""
+        return self.change_feed is not None and self.change_feed.running
+    
     def _get_cache_key(self, query: str, **kwargs) -> str:
         """Generate cache key for query."""
         params = json.dumps(kwargs, sort_keys=True)
@@ -609,25 +886,107 @@ class EnhancedRetriever:
         - High precision for common variations
         - Graceful degradation for edge cases
         """
+        generation = self.cache_generation
+        
         # Check cache
         if use_cache:
             self._clear_expired_cache()
             cache_key = self._get_cache_key(query, category=category, state=state, limit=limit)
             if cache_key in self._cache:
                 timestamp, results = self._cache[cache_key]
+                self.cache_hits += 1
                 logger.debug(f"Cache hit for query: {query[:50]}")
                 return results
+            self.cache_misses += 1
         
-        # Perform search using in-memory index
-        results = self.in_memory_index.search(query, category, state, limit)
+        if self.uses_server_candidates:
+            # Score only the rows the full-text index ranks highest
+            candidates = await self.candidate_backend.candidates(
+                query, category=category, state=state,
+                limit=max(limit * 10, self.candidate_pool_size)
+            )
+            results = self.in_memory_index.rank_entries(query, candidates, limit)
+        else:
+            # Perform search using in-memory index
+            results = await self._rank_positions(
+                query, self.in_memory_index.candidate_positions(category, state), limit)
         
-        # Cache results
-        if use_cache and results:
+        # Cache results unless the knowledge base changed while searching
+        if use_cache and results and generation == self.cache_generation:
             cache_key = self._get_cache_key(query, category=category, state=state, limit=limit)
             self._cache[cache_key] = (datetime.now(), results)
         
         return results
     
+    async def _rank_positions(self, query: str, positions: Sequence[int], limit: int) -> List[SearchResult]:
+        """Rank indexed candidates, in the scoring pool when there are enough of them."""
+        pool = self.scoring_pool
+        if pool is not None and pool.handles(len(positions)):
+            return await pool.rank(self.in_memory_index, query, positions, limit,
+                                   generation=self.cache_generation)
+        index = self.in_memory_index
+        return index.rank_entries(query, [index.entries[position] for position in positions], limit)
+    
+    async def search_many(self, queries: Sequence[SearchQuery],
+                          use_cache: bool = True) -> List[List[SearchResult]]:
+        """
+        Search for several queries at once.
+        
+        Queries are deduplicated after normalization, so each distinct
+        query is scored once, and queries with the same filters share one
+        candidate set. Yields to the event loop between queries so a large
+        batch doesn't stall other requests.
+        
+        Args:
+            queries: Queries with their filters and limits
+            use_cache: Read and fill the result cache
+            
+        Returns:
+            Results for each query, in the order given
+        """
+        keys = [query.normalized() for query in queries]
+        found: Dict[SearchQuery, List[SearchResult]] = {}
+        # (category, state) -> positions of filtered entries, valid for one cache generation
+        candidate_sets: Dict[Tuple[Optional[str], Optional[str]], Sequence[int]] = {}
+        candidates_generation = self.cache_generation
+        if use_cache:
+            self._clear_expired_cache()
+        
+        for key in keys:
+            if key in found:
+                continue
+            cache_key = self._get_cache_key(key.query, category=key.category, state=key.state, limit=key.limit)
+            if use_cache:
+                if cache_key in self._cache:
+                    self.cache_hits += 1
+                    found[key] = self._cache[cache_key][1]
+                    continue
+                self.cache_misses += 1
+            
+            generation = self.cache_generation
+            if self.uses_server_candidates:
+                candidates = await self.candidate_backend.candidates(
+                    key.query, category=key.category, state=key.state,
+                    limit=max(key.limit * 10, self.candidate_pool_size)
+                )
+                results = self.in_memory_index.rank_entries(key.query, candidates, key.limit)
+            else:
+                if generation != candidates_generation:
+                    # The index changed since the candidate sets were built
+                    candidate_sets.clear()
+                    candidates_generation = generation
+                filters = (key.category, key.state)
+                if filters not in candidate_sets:
+                    candidate_sets[filters] = self.in_memory_index.candidate_positions(key.category, key.state)
+                results = await self._rank_positions(key.query, candidate_sets[filters], key.limit)
+            found[key] = results
+            
+            if use_cache and results and generation == self.cache_generation:
+                self._cache[cache_key] = (datetime.now(), results)
+            await asyncio.sleep(0)
+        
+        return [found[key] for key in keys]
+    
     async def get_similar_questions(self, question: str, limit: int = 3) -> List[Dict[str, Any]]:
         """Find similar questions for suggestion/autocomplete."""
         results = await self.search(question, limit=limit)
@@ -643,8 +1002,39 @@ class EnhancedRetriever:
     async def refresh_index(self):
         """Refresh the in-memory index with latest data."""
         await self.initialize()
-        self._cache.clear()
+        self._invalidate_cache()
         logger.info("Enhanced retriever index refreshed")
+    
+    async def apply_changes(self, changes: ChangeSet):
+        """
+        Apply a change set from the change feed.
+        
+        Changed rows are patched into the in-memory index (server-side
+        candidates need no patching) and the result cache generation is
+        bumped; a reload change set falls back to a full refresh.
+        
+        Args:
+            changes: Rows written and ids deleted since the last change set
+        """
+        if changes.reload:
+            await self._load()
+        elif not self.uses_server_candidates:
+            self.in_memory_index.remove_entries(changes.deleted)
+            self.in_memory_index.upsert_entries(changes.upserts)
+        self._invalidate_cache()
+    
+    def _invalidate_cache(self):
+        self.cache_generation += 1
+        self._cache.clear()
+    
+    async def close(self):
+        """Stop the change feed, the scoring pool and the candidate backend's connections."""
+        if self.scoring_pool is not None:
+            self.scoring_pool.close()
+        if self.change_feed is not None:
+            await self.change_feed.close()
+        if self.candidate_backend is not None:
+            await self.candidate_backend.close()
 
 
 # Convenience function for testing
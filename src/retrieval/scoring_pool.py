@@ -0,0 +1,248 @@
+"""
+Process Pool Scoring for FACT Enhanced Search
+
+Fuzzy scoring runs SequenceMatcher over every candidate's question and
+answer in pure Python, holding the GIL for the whole search: on a few
+thousand entries one search stalls every other coroutine of the worker for
+hundreds of milliseconds. A ScoringPool moves that work to child processes.
+
+The children are forked from the server process once its index is built,
+so they share the index pages copy-on-write instead of receiving a copy;
+only the query, a slice of candidate positions and the (id, score, match
+type) tuples that pass the cut-off cross the process boundary. A search
+over many candidates is split into one slice per process and the slices
+are scored in parallel. When the index changes, new searches go to
+processes forked from the updated index; the old processes are shut down
+once the searches still using them finish. If a child dies, the broken
+pool is replaced on the next search and the interrupted search is scored
+inline.
+
+Slices queue behind a bounded number of slots, so a burst of searches
+waits its turn in the event loop (back-pressure) instead of piling work
+into the executor's unbounded queue.
+
+SEARCH_EXECUTOR=process enables the pool; SEARCH_PROCESSES sets its size
+(per server worker) and SEARCH_POOL_MIN_CANDIDATES the smallest candidate
+set worth sending out.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Environment variables
+SEARCH_EXECUTOR_ENV = "SEARCH_EXECUTOR"
+SEARCH_PROCESSES_ENV = "SEARCH_PROCESSES"
+SEARCH_POOL_MIN_CANDIDATES_ENV = "SEARCH_POOL_MIN_CANDIDATES"
+
+# Below this many candidates, scoring inline beats the round trip
+DEFAULT_MIN_CANDIDATES = 200
+
+# Smallest slice of candidates sent to one process
+MIN_SLICE = 100
+
+# Indexes visible to forked children, by pool token
+_indexes: Dict[int, Any] = {}
+_tokens = itertools.count(1)
+
+
+def _score_slice(token: int, query: str, positions: Sequence[int]) -> List[Tuple[Any, float, str]]:
+    """Score a slice of the inherited index; runs in a pool process."""
+    index = _indexes[token]
+    entries = index.entries
+    return index.score_entries(query, [entries[position] for position in positions])
+
+
+def _slices(positions: Sequence[int], count: int) -> List[Sequence[int]]:
+    size = max(MIN_SLICE, -(-len(positions) // count))
+    return [positions[start:start + size] for start in range(0, len(positions), size)]
+
+
+class _Workers:
+    """Processes forked from one version of the index."""
+
+    def __init__(self, executor: ProcessPoolExecutor, token: int, key: Tuple[int, int], max_pending: int):
+        self.executor = executor
+        self.token = token
+        # (pid of the forking process, index generation)
+        self.key = key
+        self.slots = asyncio.Semaphore(max_pending)
+        # Searches scoring in these processes
+        self.users = 0
+        self.retired = False
+
+
+class ScoringPool:
+    """Scores in-memory index searches in forked child processes."""
+
+    def __init__(self, processes: Optional[int] = None, min_candidates: int = DEFAULT_MIN_CANDIDATES,
+                 max_pending: Optional[int] = None):
+        """
+        Initialize the pool; processes are forked on first use.
+
+        Args:
+            processes: Child processes (defaults to the CPU count)
+            min_candidates: Smallest candidate set scored in the pool
+            max_pending: Slices queued or running at once (defaults to twice
+                the process count)
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.min_candidates = min_candidates
+        self.max_pending = max_pending or self.processes * 2
+        self._workers: Optional[_Workers] = None
+        self.searches = 0
+        self.slices = 0
+        self.forks = 0
+        self.broken = 0
+
+    def handles(self, candidate_count: int) -> bool:
+        """True when a search over this many candidates should go to the pool."""
+        return candidate_count >= self.min_candidates
+
+    def _workers_for(self, index, generation: int) -> _Workers:
+        # A process inherits its parent's pool object but not its children
+        key = (os.getpid(), generation)
+        workers = self._workers
+        if workers is None or workers.key != key or _indexes.get(workers.token) is not index:
+            if workers is not None:
+                self._retire(workers)
+            token = next(_tokens)
+            _indexes[token] = index
+            # All children fork on first submit, from the index as it is now
+            executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("fork"))
+            workers = self._workers = _Workers(executor, token, key, self.max_pending)
+            self.forks += 1
+            logger.info("Scoring pool started", processes=self.processes,
+                        entries=len(index.entries), generation=generation)
+        return workers
+
+    def _retire(self, workers: _Workers) -> None:
+        """Stop sending searches to these processes; shut them down once idle."""
+        workers.retired = True
+        if self._workers is workers:
+            self._workers = None
+        if workers.users == 0:
+            self._shutdown(workers)
+
+    @staticmethod
+    def _shutdown(workers: _Workers) -> None:
+        if workers.key[0] == os.getpid():
+            workers.executor.shutdown(wait=False)
+        _indexes.pop(workers.token, None)
+
+    async def rank(self, index, query: str, positions: Sequence[int], limit: int = 5,
+                   generation: int = 0):
+        """
+        Rank candidates of an in-memory index in the pool.
+
+        Args:
+            index: Built InMemoryIndex
+            query: Search query
+            positions: Candidate positions in index.entries
+            limit: Maximum number of results
+            generation: Index version; a new one forks fresh processes
+
+        Returns:
+            The same SearchResults as index.rank_entries() over the candidates
+        """
+        import time
+        start_time = time.time()
+        workers = self._workers_for(index, generation)
+        executor, token, slots = workers.executor, workers.token, workers.slots
+        entries = index.entries
+        # The index may change while the slices are scored; keep the candidates for inline scoring
+        candidates = [entries[position] for position in positions]
+        loop = asyncio.get_running_loop()
+
+        async def score(positions_slice):
+            async with slots:
+                return await loop.run_in_executor(executor, _score_slice, token, query, positions_slice)
+
+        parts = _slices(positions, self.processes)
+        workers.users += 1
+        try:
+            scored = await asyncio.gather(*(score(part) for part in parts))
+        except BrokenProcessPool:
+            # A child died (e.g. killed for memory); fork new ones on the next search
+            self.broken += 1
+            logger.warning("Scoring pool broken; scoring inline", generation=generation)
+            self._retire(workers)
+            return index.rank_entries(query, candidates, limit, start_time)
+        finally:
+            workers.users -= 1
+            if workers.retired and workers.users == 0:
+                self._shutdown(workers)
+        self.searches += 1
+        self.slices += len(parts)
+        return index.rank_scored(query, [item for part in scored for item in part], limit, start_time)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "min_candidates": self.min_candidates,
+            "max_pending": self.max_pending,
+            "running": self._workers is not None,
+            "searches": self.searches,
+            "slices": self.slices,
+            "forks": self.forks,
+            "broken": self.broken,
+        }
+
+    def close(self) -> None:
+        """Shut the child processes down once their searches finish."""
+        if self._workers is not None:
+            self._retire(self._workers)
+
+
+def create_scoring_pool() -> Optional[ScoringPool]:
+    """
+    Build the scoring pool configured by the environment.
+
+    Returns:
+        A ScoringPool when SEARCH_EXECUTOR=process, otherwise None
+    """
+    if os.getenv(SEARCH_EXECUTOR_ENV, "inline").lower() != "process":
+        return None
+    if "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning("Process scoring needs fork; scoring inline")
+        return None
+    processes = int(os.getenv(SEARCH_PROCESSES_ENV, "0")) or None
+    min_candidates = int(os.getenv(SEARCH_POOL_MIN_CANDIDATES_ENV, DEFAULT_MIN_CANDIDATES))
+    return ScoringPool(processes=processes, min_candidates=min_candidates)
+
+
+def map_in_processes(function: Callable[[Any], Any], items: Iterable[Any],
+                     processes: Optional[int] = None, chunksize: Optional[int] = None) -> List[Any]:
+    """
+    Apply a function to items across forked processes, keeping order.
+
+    For bulk scoring jobs outside the server; the function and its results
+    must be picklable (module-level functions or bound methods of picklable
+    objects).
+
+    Args:
+        function: Called once per item
+        items: Inputs
+        processes: Child processes (defaults to the CPU count)
+        chunksize: Items sent per round trip (defaults to an even split
+            into four chunks per process)
+
+    Returns:
+        Results in the order of items
+    """
+    items = list(items)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(items) < 2:
+        return [function(item) for item in items]
+    chunksize = chunksize or max(1, len(items) // (processes * 4))
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork")) as executor:
+        return list(executor.map(function, items, chunksize=chunksize))
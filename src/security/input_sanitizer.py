@@ -14,6 +14,7 @@ import structlog
 try:
     # Try relative imports first (when used as package)
     from ..core.errors import SecurityError, ValidationError
+    from .pattern_scanner import SecurityScanner
 except ImportError:
     # Fall back to absolute imports (when run as script)
     import sys
@@ -24,11 +25,23 @@ except ImportError:
         sys.path.insert(0, src_path)
     
     from core.errors import SecurityError, ValidationError
+    from security.pattern_scanner import SecurityScanner
 
 
 logger = structlog.get_logger(__name__)
 
 
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+_DICT_KEY = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+# Error raised for each injection rule family, in check order
+INJECTION_FAMILIES = (
+    ("sql_injection", "Potential SQL injection detected"),
+    ("command_injection", "Potential command injection detected"),
+    ("path_traversal", "Potential path traversal attack detected"),
+)
+
+
 class InputSanitizer:
     """
     Comprehensive input sanitization for security protection.
@@ -97,6 +110,15 @@ class InputSanitizer:
             r'..%5c',
         ]
         
+        # Each family compiles to one alternation; the string is scanned once per family
+        self.scanner = SecurityScanner()
+        self.scanner.register("xss", self.xss_patterns, re.IGNORECASE | re.DOTALL)
+        self.scanner.register("sql_injection", self.sql_injection_patterns)
+        self.scanner.register("command_injection", self.command_injection_patterns)
+        self.scanner.register("path_traversal", self.path_traversal_patterns)
+        self._injection_families = tuple(family for family, _ in INJECTION_FAMILIES)
+        self._injection_messages = dict(INJECTION_FAMILIES)
+        
         # Maximum safe lengths
         self.max_lengths = {
             'string': 10000,
@@ -142,8 +164,7 @@ class InputSanitizer:
             raise SecurityError("Null bytes not allowed in input")
         
         # Check for control characters (except common whitespace)
-        control_chars = re.findall(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', value)
-        if control_chars:
+        if _CONTROL_CHARS.search(value):
             raise SecurityError("Control characters not allowed in input")
         
         # XSS protection
@@ -265,30 +286,17 @@ class InputSanitizer:
     
     def _check_xss_patterns(self, value: str) -> None:
         """Check for XSS attack patterns."""
-        value_lower = value.lower()
-        
-        for pattern in self.xss_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE | re.DOTALL):
-                raise SecurityError(f"Potential XSS attack detected")
+        match = self.scanner.scan(value, ("xss",))
+        if match is not None:
+            logger.debug("XSS rule matched", rule=match.rule)
+            raise SecurityError("Potential XSS attack detected")
     
     def _check_injection_patterns(self, value: str) -> None:
-        """Check for various injection attack patterns."""
-        value_lower = value.lower()
-        
-        # SQL injection check
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                raise SecurityError("Potential SQL injection detected")
-        
-        # Command injection check
-        for pattern in self.command_injection_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                raise SecurityError("Potential command injection detected")
-        
-        # Path traversal check
-        for pattern in self.path_traversal_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                raise SecurityError("Potential path traversal attack detected")
+        """Check for SQL injection, command injection and path traversal patterns."""
+        match = self.scanner.scan(value, self._injection_families)
+        if match is not None:
+            logger.debug("Injection rule matched", family=match.family, rule=match.rule)
+            raise SecurityError(self._injection_messages[match.family])
     
     def _sanitize_url(self, url: str) -> str:
         """Sanitize URL input."""
@@ -361,7 +369,7 @@ class InputSanitizer:
             raise ValidationError("Dictionary key too long")
         
         # Allow only alphanumeric characters, underscores, and hyphens
-        if not re.match(r'^[a-zA-Z0-9_-]+$', key):
+        if not _DICT_KEY.match(key):
             raise SecurityError("Invalid characters in dictionary key")
         
         return key
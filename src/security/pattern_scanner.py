@@ -0,0 +1,245 @@
+"""
+FACT System Security Pattern Scanner
+
+This module provides a shared scanning engine for security rule families
+(XSS, SQL injection, command injection, path traversal, SQL validation).
+Each family is compiled once into a single alternation regex with one named
+group per rule, so a string is scanned once per family instead of once per
+rule, and the caller learns exactly which rule fired. A literal prefilter
+(one substring every rule needs) skips the regex for clean text, and
+verdicts for repeated inputs are memoised in a bounded LRU.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+# A rule is either a bare pattern (named after itself) or a (name, pattern) pair
+RuleSpec = Union[str, Tuple[str, str]]
+
+
+@dataclass(frozen=True)
+class ScanMatch:
+    """The rule that fired for a scanned string."""
+    family: str
+    rule: str
+    pattern: str
+    start: int
+    end: int
+
+
+_QUANTIFIERS = "*+?{"
+_OPTIONAL_QUANTIFIERS = ("*", "?", "{0")
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Conservatively extract literal runs that must appear in any match.
+
+    Only top-level literal characters are collected; groups, classes,
+    escapes like \\s and optional quantifiers end a run. Patterns with a
+    top-level alternation yield no literals.
+    """
+    runs: List[str] = []
+    current: List[str] = []
+    depth = 0
+    index = 0
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    while index < len(pattern):
+        char = pattern[index]
+        literal: Optional[str] = None
+        if char == "\\" and index + 1 < len(pattern):
+            escaped = pattern[index + 1]
+            index += 2
+            if depth == 0 and not escaped.isalnum():
+                literal = escaped
+        elif char == "[":
+            # Skip the whole character class
+            index += 1
+            if index < len(pattern) and pattern[index] == "]":
+                index += 1
+            while index < len(pattern) and pattern[index] != "]":
+                index += 2 if pattern[index] == "\\" else 1
+            index += 1
+        elif char == "(":
+            depth += 1
+            index += 1
+        elif char == ")":
+            depth -= 1
+            index += 1
+        elif char == "|" and depth == 0:
+            return []
+        elif char == "{":
+            # Skip a counted quantifier such as {2} or {1,3}
+            closing = pattern.find("}", index)
+            index = closing + 1 if closing != -1 else len(pattern)
+        elif char in "*+?.^$|":
+            index += 1
+        else:
+            index += 1
+            if depth == 0:
+                literal = char
+
+        following = pattern[index:index + 2]
+        if literal is None or depth > 0:
+            flush()
+            continue
+        if following.startswith(_OPTIONAL_QUANTIFIERS):
+            flush()
+        elif following[:1] in _QUANTIFIERS:
+            current.append(literal)
+            flush()
+        else:
+            current.append(literal)
+    flush()
+    return runs
+
+
+def _best_literal(literals: List[str]) -> Optional[str]:
+    """Prefer literals with punctuation (rare in prose), then the longest."""
+    if not literals:
+        return None
+    return max(literals, key=lambda lit: (any(not c.isalnum() and not c.isspace() for c in lit), len(lit)))
+
+
+class RuleFamily:
+    """One compiled alternation covering every rule in a family."""
+
+    __slots__ = ("name", "rules", "regex", "casefold", "triggers")
+
+    def __init__(self, name: str, rules: Sequence[RuleSpec], flags: int = re.IGNORECASE):
+        self.name = name
+        self.rules: List[Tuple[str, str]] = [
+            (rule, rule) if isinstance(rule, str) else (rule[0], rule[1]) for rule in rules
+        ]
+        # Case-insensitive families with lowercase-only patterns match against
+        # text lowercased once per scan, which is faster than IGNORECASE
+        self.casefold = bool(flags & re.IGNORECASE) and not any(
+            c.isupper() for _, pattern in self.rules for c in re.sub(r"\\.", "", pattern)
+        )
+        if self.casefold:
+            flags &= ~re.IGNORECASE
+        alternatives = [f"(?P<r{index}>{pattern})" for index, (_, pattern) in enumerate(self.rules)]
+        self.regex = re.compile("|".join(alternatives), flags) if alternatives else None
+
+        # Every rule must contribute a trigger literal for the prefilter to be sound
+        triggers = [_best_literal(required_literals(pattern)) for _, pattern in self.rules]
+        self.triggers: Optional[Tuple[str, ...]] = None
+        if triggers and all(triggers) and self.casefold:
+            self.triggers = tuple(sorted(set(triggers)))
+
+    def search(self, text: str, lowered: Optional[str] = None) -> Optional[ScanMatch]:
+        if self.regex is None:
+            return None
+        if self.casefold:
+            text = lowered if lowered is not None else text.lower()
+        if self.triggers is not None and not any(trigger in text for trigger in self.triggers):
+            return None
+        match = self.regex.search(text)
+        if match is None:
+            return None
+        # The outer named group closes last, so lastgroup identifies the rule
+        index = int(match.lastgroup[1:])
+        name, pattern = self.rules[index]
+        return ScanMatch(self.name, name, pattern, match.start(), match.end())
+
+
+class SecurityScanner:
+    """
+    Scans strings against ordered rule families with memoised verdicts.
+
+    Families are checked in the order requested and the first family with a
+    match wins, mirroring the original one-regex-at-a-time checks.
+    """
+
+    def __init__(self, memo_size: int = 4096, memo_max_length: int = 4096):
+        """
+        Initialize security scanner.
+
+        Args:
+            memo_size: Maximum number of memoised verdicts
+            memo_max_length: Strings longer than this are scanned but not memoised
+        """
+        self.memo_size = memo_size
+        self.memo_max_length = memo_max_length
+        self._families: Dict[str, RuleFamily] = {}
+        self._memo: "OrderedDict[Tuple[Tuple[str, ...], str], Optional[ScanMatch]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"scans": 0, "memo_hits": 0}
+
+    def register(self, family: str, rules: Sequence[RuleSpec], flags: int = re.IGNORECASE) -> None:
+        """Compile (or replace) a rule family."""
+        compiled = RuleFamily(family, rules, flags)
+        with self._lock:
+            self._families[family] = compiled
+            self._memo.clear()
+
+    def has_family(self, family: str) -> bool:
+        return family in self._families
+
+    def scan(self, text: str, families: Iterable[str]) -> Optional[ScanMatch]:
+        """
+        Return the first rule that matches text, or None if it is clean.
+
+        Args:
+            text: String to scan
+            families: Family names to check, in priority order
+        """
+        families = tuple(families)
+        key = (families, text)
+        memoise = len(text) <= self.memo_max_length
+
+        with self._lock:
+            self.stats["scans"] += 1
+            if memoise and key in self._memo:
+                self._memo.move_to_end(key)
+                self.stats["memo_hits"] += 1
+                return self._memo[key]
+
+        verdict = None
+        lowered = text.lower()
+        for family in families:
+            verdict = self._families[family].search(text, lowered)
+            if verdict is not None:
+                break
+
+        if memoise:
+            with self._lock:
+                self._memo[key] = verdict
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return verdict
+
+    def clear_memo(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "memoised": len(self._memo), "families": len(self._families)}
+
+
+# Global scanner shared by the input sanitizer and SQL validation
+_scanner: Optional[SecurityScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_security_scanner() -> SecurityScanner:
+    """Get the global security scanner."""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = SecurityScanner()
+    return _scanner
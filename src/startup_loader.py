@@ -147,7 +147,3 @@ def load_knowledge_base_on_startup():
         
     except Exception as e:
         logger.error(f"Failed to load knowledge base on startup: {e}")
-
-# Run on module import
-if os.getenv("RAILWAY_ENVIRONMENT"):
-    load_knowledge_base_on_startup()
\ No newline at end of file
@@ -8,12 +8,21 @@ and access controls to prevent unauthorized file access.
 import os
 import json
 import time
-from typing import Dict, Any, List, Optional
+import itertools
+from typing import Dict, Any, AsyncIterator, List, Optional
 from pathlib import Path
 import structlog
 
 from tools.decorators import Tool
 from ...core.errors import ToolExecutionError, SecurityError, ValidationError
+from .file_index import (
+    DEFAULT_CHUNK_SIZE,
+    describe_entry,
+    line_index_cache,
+    read_bytes,
+    scan_directory,
+    stream_chunks,
+)
 
 
 logger = structlog.get_logger(__name__)
@@ -31,6 +40,10 @@ ALLOWED_BASE_PATHS = [
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_DIRECTORY_DEPTH = 10
+DEFAULT_PAGE_SIZE = 500
+
+# Encodings where every line ends in a single 0x0A byte, so the byte-level line index applies
+_LINE_INDEX_ENCODINGS = {"utf-8", "ascii", "latin-1"}
 
 
 @Tool(
@@ -55,6 +68,25 @@ MAX_DIRECTORY_DEPTH = 10
             "default": 0,
             "minimum": 0,
             "maximum": 10000
+        },
+        "start_line": {
+            "type": "integer",
+            "description": "First line to read (0-based)",
+            "default": 0,
+            "minimum": 0
+        },
+        "offset": {
+            "type": "integer",
+            "description": "Byte offset to start reading from (used with length)",
+            "default": 0,
+            "minimum": 0
+        },
+        "length": {
+            "type": "integer",
+            "description": "Number of bytes to read from offset (0 = line mode)",
+            "default": 0,
+            "minimum": 0,
+            "maximum": MAX_FILE_SIZE
         }
     },
     requires_auth=False,
@@ -62,14 +94,25 @@ MAX_DIRECTORY_DEPTH = 10
 )
 def read_file_tool(file_path: str, 
                   encoding: str = "utf-8",
-                  max_lines: int = 0) -> Dict[str, Any]:
+                  max_lines: int = 0,
+                  start_line: int = 0,
+                  offset: int = 0,
+                  length: int = 0) -> Dict[str, Any]:
     """
     Read contents of a file with security validation.
     
+    Line ranges (start_line/max_lines) and byte ranges (offset/length) are
+    served from a memory map using a cached line-offset index, so files
+    larger than MAX_FILE_SIZE can be inspected as long as the requested
+    slice fits within it.
+    
     Args:
         file_path: Path to file to read
         encoding: File encoding
         max_lines: Maximum lines to read (0 = all)
+        start_line: First line to read (0-based)
+        offset: Byte offset for byte-range reads
+        length: Bytes to read from offset (0 = line mode)
         
     Returns:
         File content and metadata
@@ -97,31 +140,54 @@ def read_file_tool(file_path: str,
                 "file_path": file_path
             }
         
-        # Check file size
         file_size = validated_path.stat().st_size
-        if file_size > MAX_FILE_SIZE:
+        ranged = length > 0 or max_lines > 0 or start_line > 0
+        
+        # Whole-file reads are bounded by the file size; ranged reads by the slice size
+        if not ranged and file_size > MAX_FILE_SIZE:
             return {
                 "success": False,
-                "error": f"File too large: {file_size} bytes (max: {MAX_FILE_SIZE})",
+                "error": f"File too large: {file_size} bytes (max: {MAX_FILE_SIZE}); use start_line/max_lines or offset/length",
                 "file_path": file_path,
                 "file_size": file_size
             }
         
         # Read file content
         start_time = time.time()
-        
-        with open(validated_path, 'r', encoding=encoding) as file:
-            if max_lines > 0:
-                lines = []
-                for i, line in enumerate(file):
-                    if i >= max_lines:
-                        break
-                    lines.append(line.rstrip('\n\r'))
-                content = '\n'.join(lines)
-                truncated = True
-            else:
-                content = file.read()
-                truncated = False
+        line_count = None
+        
+        if length > 0:
+            raw = read_bytes(validated_path, offset, min(length, MAX_FILE_SIZE))
+            # A byte range may split a multi-byte character at either end
+            content = raw.decode(encoding, errors="replace")
+            truncated = offset + len(raw) < file_size
+        elif ranged and encoding in _LINE_INDEX_ENCODINGS:
+            index = line_index_cache.get(validated_path)
+            start, end = index.byte_range(start_line, max_lines)
+            if end - start > MAX_FILE_SIZE:
+                return {
+                    "success": False,
+                    "error": f"Requested range too large: {end - start} bytes (max: {MAX_FILE_SIZE})",
+                    "file_path": file_path,
+                    "file_size": file_size
+                }
+            text = read_bytes(validated_path, start, end - start).decode(encoding)
+            if text.endswith('\n'):
+                text = text[:-1]
+            content = '\n'.join(line.rstrip('\r') for line in text.split('\n'))
+            truncated = end < file_size
+            line_count = index.line_count
+        elif ranged:
+            # Encodings whose newlines are not single 0x0A bytes fall back to text iteration
+            with open(validated_path, 'r', encoding=encoding) as file:
+                lines = [line.rstrip('\n\r') for line in itertools.islice(
+                    file, start_line, start_line + max_lines if max_lines > 0 else None)]
+                truncated = file.readline() != ''
+            content = '\n'.join(lines)
+        else:
+            # Same newline translation as reading in text mode
+            content = read_bytes(validated_path).decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+            truncated = False
         
         read_time = (time.time() - start_time) * 1000
         
@@ -138,6 +204,9 @@ def read_file_tool(file_path: str,
             "encoding": encoding,
             "truncated": truncated,
             "max_lines_applied": max_lines if max_lines > 0 else None,
+            "start_line": start_line if length == 0 else None,
+            "byte_offset": offset if length > 0 else None,
+            "total_line_count": line_count,
             "last_modified": stat.st_mtime,
             "read_time_ms": read_time
         }
@@ -197,6 +266,19 @@ def read_file_tool(file_path: str,
             "description": "Filter by file extensions (e.g., ['.txt', '.json'])",
             "items": {"type": "string"},
             "default": []
+        },
+        "page_size": {
+            "type": "integer",
+            "description": "Maximum number of entries to return",
+            "default": DEFAULT_PAGE_SIZE,
+            "minimum": 1,
+            "maximum": 10000
+        },
+        "page_offset": {
+            "type": "integer",
+            "description": "Index of the first entry to return (use next_page_offset from a previous page)",
+            "default": 0,
+            "minimum": 0
         }
     },
     requires_auth=False,
@@ -205,15 +287,22 @@ def read_file_tool(file_path: str,
 def list_directory_tool(directory_path: str = "",
                        include_hidden: bool = False,
                        recursive: bool = False,
-                       file_types: List[str] = None) -> Dict[str, Any]:
+                       file_types: List[str] = None,
+                       page_size: int = DEFAULT_PAGE_SIZE,
+                       page_offset: int = 0) -> Dict[str, Any]:
     """
     List contents of a directory with security validation.
     
+    Entries are collected with os.scandir and only the returned page is
+    stat'ed, so large directories are listed a page at a time.
+    
     Args:
         directory_path: Path to directory to list
         include_hidden: Include hidden files
         recursive: List recursively
         file_types: Filter by file extensions
+        page_size: Maximum entries to return
+        page_offset: Index of the first entry to return
         
     Returns:
         Directory listing with metadata
@@ -238,7 +327,6 @@ def list_directory_tool(directory_path: str = "",
         
         # List directory contents
         start_time = time.time()
-        entries = []
         
         if file_types is None:
             file_types = []
@@ -247,60 +335,7 @@ def list_directory_tool(directory_path: str = "",
         file_types = [ext.lower() if ext.startswith('.') else f'.{ext.lower()}' for ext in file_types]
         
         try:
-            if recursive:
-                for root, dirs, files in os.walk(validated_path):
-                    # Skip hidden directories if not requested
-                    if not include_hidden:
-                        dirs[:] = [d for d in dirs if not d.startswith('.')]
-                    
-                    root_path = Path(root)
-                    
-                    # Process directories
-                    for dir_name in dirs:
-                        if not include_hidden and dir_name.startswith('.'):
-                            continue
-                        
-                        dir_path = root_path / dir_name
-                        relative_path = dir_path.relative_to(validated_path)
-                        
-                        entry = _create_directory_entry(dir_path, str(relative_path), "directory")
-                        if entry:
-                            entries.append(entry)
-                    
-                    # Process files
-                    for file_name in files:
-                        if not include_hidden and file_name.startswith('.'):
-                            continue
-                        
-                        file_path = root_path / file_name
-                        relative_path = file_path.relative_to(validated_path)
-                        
-                        # Filter by file types if specified
-                        if file_types:
-                            file_ext = file_path.suffix.lower()
-                            if file_ext not in file_types:
-                                continue
-                        
-                        entry = _create_directory_entry(file_path, str(relative_path), "file")
-                        if entry:
-                            entries.append(entry)
-            else:
-                # Non-recursive listing
-                for item in validated_path.iterdir():
-                    if not include_hidden and item.name.startswith('.'):
-                        continue
-                    
-                    # Filter by file types if specified
-                    if file_types and item.is_file():
-                        file_ext = item.suffix.lower()
-                        if file_ext not in file_types:
-                            continue
-                    
-                    entry_type = "directory" if item.is_dir() else "file"
-                    entry = _create_directory_entry(item, item.name, entry_type)
-                    if entry:
-                        entries.append(entry)
-        
+            scanned = scan_directory(validated_path, include_hidden, recursive, file_types)
         except PermissionError as e:
             return {
                 "success": False,
@@ -308,24 +343,32 @@ def list_directory_tool(directory_path: str = "",
                 "directory_path": directory_path
             }
         
-        list_time = (time.time() - start_time) * 1000
+        # Only the requested page is stat'ed (directories first, then by name)
+        page_size = max(1, page_size)
+        page = scanned[page_offset:page_offset + page_size]
+        entries = [describe_entry(item) for item in page]
+        next_offset = page_offset + len(page)
+        has_more = next_offset < len(scanned)
         
-        # Sort entries by type (directories first) then by name
-        entries.sort(key=lambda x: (x["type"] != "directory", x["name"].lower()))
+        list_time = (time.time() - start_time) * 1000
         
         # Calculate statistics
-        file_count = sum(1 for entry in entries if entry["type"] == "file")
-        dir_count = sum(1 for entry in entries if entry["type"] == "directory")
+        file_count = sum(1 for item in scanned if not item.is_dir)
+        dir_count = len(scanned) - file_count
         total_size = sum(entry.get("size_bytes", 0) for entry in entries if entry["type"] == "file")
         
         result = {
             "success": True,
             "directory_path": directory_path,
             "entries": entries,
-            "total_count": len(entries),
+            "total_count": len(scanned),
             "file_count": file_count,
             "directory_count": dir_count,
             "total_size_bytes": total_size,
+            "page_offset": page_offset,
+            "page_size": page_size,
+            "has_more": has_more,
+            "next_page_offset": next_offset if has_more else None,
             "include_hidden": include_hidden,
             "recursive": recursive,
             "file_types_filter": file_types,
@@ -448,6 +491,46 @@ def get_file_info_tool(path: str) -> Dict[str, Any]:
         }
 
 
+async def stream_file(file_path: str,
+                      offset: int = 0,
+                      length: Optional[int] = None,
+                      start_line: int = 0,
+                      max_lines: int = 0,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Stream a file, or a byte or line range of it, as raw byte chunks.
+    
+    Applies the same path validation as read_file_tool but has no size limit,
+    since the content is never held in memory at once.
+    
+    Args:
+        file_path: Path to file to stream
+        offset: Byte offset to start from (ignored when a line range is given)
+        length: Number of bytes to stream (None = to end of file)
+        start_line: First line to stream (0-based)
+        max_lines: Number of lines to stream (0 = to end of file)
+        chunk_size: Maximum chunk size in bytes
+        
+    Yields:
+        Byte chunks of the requested range
+        
+    Raises:
+        SecurityError: If file path is not allowed
+        ToolExecutionError: If the path is not a readable file
+    """
+    validated_path = _validate_file_path_security(file_path, operation="read")
+    if not validated_path.is_file():
+        raise ToolExecutionError(f"Path is not a file: {file_path}")
+    
+    if start_line > 0 or max_lines > 0:
+        index = line_index_cache.get(validated_path)
+        offset, end = index.byte_range(start_line, max_lines)
+        length = end - offset
+    
+    async for chunk in stream_chunks(validated_path, offset, length, chunk_size):
+        yield chunk
+
+
 def _validate_file_path_security(file_path: str, operation: str = "read") -> Path:
     """
     Validate file path for security constraints.
@@ -525,44 +608,3 @@ def _validate_file_path_security(file_path: str, operation: str = "read") -> Pat
 def _validate_directory_path_security(directory_path: str) -> Path:
     """Validate directory path for security constraints."""
     return _validate_file_path_security(directory_path, operation="list")
-
-
-def _create_directory_entry(path: Path, relative_path: str, entry_type: str) -> Optional[Dict[str, Any]]:
-    """
-    Create directory entry with metadata.
-    
-    Args:
-        path: Full path to the item
-        relative_path: Relative path for display
-        entry_type: Type of entry ("file" or "directory")
-        
-    Returns:
-        Directory entry dictionary or None if error
-    """
-    try:
-        stat = path.stat()
-        
-        entry = {
-            "name": path.name,
-            "path": relative_path,
-            "type": entry_type,
-            "modified": stat.st_mtime,
-            "permissions": oct(stat.st_mode)[-3:]
-        }
-        
-        if entry_type == "file":
-            entry["size_bytes"] = stat.st_size
-            entry["extension"] = path.suffix
-        
-        return entry
-        
-    except (OSError, PermissionError) as e:
-        logger.warning("Failed to get entry metadata",
-                      path=str(path),
-                      error=str(e))
-        return {
-            "name": path.name,
-            "path": relative_path,
-            "type": entry_type,
-            "error": "Access denied"
-        }
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+FACT System File Range Reader
+
+This module provides memory-mapped byte-range and line-range reads for the
+file system connector. A line-offset index is built once per file version
+(path, mtime, size) and cached, so reading lines 90,000-90,100 of a large
+log or CSV file touches only those pages instead of the whole file. It also
+provides an async chunk streamer and a paged os.scandir directory scanner.
+"""
+
+import asyncio
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+LINE_INDEX_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class FileVersion:
+    """Identity of a file's contents for cache validation."""
+    path: str
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def of(cls, path: Path) -> "FileVersion":
+        stat = path.stat()
+        return cls(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+class LineOffsetIndex:
+    """
+    Byte offsets of the start of every line in a file.
+
+    offsets[i] is the byte offset of line i (0-based); a final sentinel equal
+    to the file size marks the end of the last line.
+    """
+
+    __slots__ = ("version", "offsets")
+
+    def __init__(self, version: FileVersion, offsets: array):
+        self.version = version
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, path: Path, version: Optional[FileVersion] = None) -> "LineOffsetIndex":
+        """Scan a file once and record where each line starts."""
+        version = version or FileVersion.of(path)
+        offsets = array("Q", [0])
+        if version.size:
+            with open(path, "rb") as handle, \
+                    mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                find = view.find
+                position = find(b"\n")
+                while position != -1:
+                    offsets.append(position + 1)
+                    position = find(b"\n", position + 1)
+        # A trailing newline does not start another line
+        if offsets[-1] != version.size:
+            offsets.append(version.size)
+        elif len(offsets) == 1:
+            offsets.append(0)
+        return cls(version, offsets)
+
+    @property
+    def line_count(self) -> int:
+        return 0 if self.version.size == 0 else len(self.offsets) - 1
+
+    def byte_range(self, start_line: int, max_lines: int = 0) -> Tuple[int, int]:
+        """Return the (start, end) byte span covering the requested lines."""
+        total = self.line_count
+        start_line = min(max(start_line, 0), total)
+        end_line = total if max_lines <= 0 else min(start_line + max_lines, total)
+        return self.offsets[start_line], self.offsets[end_line]
+
+
+class LineIndexCache:
+    """LRU cache of line indexes keyed by path and validated by (mtime, size)."""
+
+    def __init__(self, max_entries: int = LINE_INDEX_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, LineOffsetIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> LineOffsetIndex:
+        version = FileVersion.of(path)
+        with self._lock:
+            index = self._entries.get(version.path)
+            if index is not None and index.version == version:
+                self._entries.move_to_end(version.path)
+                self.hits += 1
+                return index
+
+        index = LineOffsetIndex.build(path, version)
+        with self._lock:
+            self.misses += 1
+            self._entries[version.path] = index
+            self._entries.move_to_end(version.path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global line index cache
+line_index_cache = LineIndexCache()
+
+
+def read_bytes(path: Path, offset: int = 0, length: Optional[int] = None) -> bytes:
+    """Read a byte range through a read-only memory map."""
+    size = path.stat().st_size
+    start = min(max(offset, 0), size)
+    end = size if length is None else min(start + max(length, 0), size)
+    if start >= end:
+        return b""
+    with open(path, "rb") as handle, \
+            mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        return view[start:end]
+
+
+def read_lines(path: Path,
+               start_line: int = 0,
+               max_lines: int = 0,
+               cache: Optional[LineIndexCache] = None) -> Tuple[bytes, LineOffsetIndex]:
+    """
+    Read a line range using the cached line-offset index.
+
+    Args:
+        path: File to read
+        start_line: First line to return (0-based)
+        max_lines: Number of lines to return (0 = to end of file)
+        cache: Index cache to use (defaults to the global cache)
+
+    Returns:
+        Tuple of (raw bytes of the lines, line index)
+    """
+    index = (cache or line_index_cache).get(path)
+    start, end = index.byte_range(start_line, max_lines)
+    return read_bytes(path, start, end - start), index
+
+
+async def stream_chunks(path: Path,
+                        offset: int = 0,
+                        length: Optional[int] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Stream a byte range of a file as chunks without loading it into memory.
+
+    Each chunk is read in a worker thread so the event loop is not blocked on
+    disk I/O.
+    """
+    size = path.stat().st_size
+    position = min(max(offset, 0), size)
+    end = size if length is None else min(position + max(length, 0), size)
+
+    handle = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(handle.seek, position)
+        while position < end:
+            chunk = await asyncio.to_thread(handle.read, min(chunk_size, end - position))
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+@dataclass
+class ScanEntry:
+    """Directory entry collected by scandir without a stat call."""
+    relative_path: str
+    entry: os.DirEntry
+    is_dir: bool
+
+
+def scan_directory(root: Path,
+                   include_hidden: bool = False,
+                   recursive: bool = False,
+                   file_types: Optional[List[str]] = None) -> List[ScanEntry]:
+    """
+    Collect directory entries with os.scandir, sorted directories first.
+
+    Type checks use the d_type returned by scandir, so no entry is stat'ed
+    here; metadata is fetched later only for the page being returned.
+    Subdirectories that cannot be read are skipped; an unreadable root
+    raises.
+    """
+    results: List[ScanEntry] = []
+    pending = [(root, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            iterator = os.scandir(directory)
+        except OSError as e:
+            if directory is root:
+                raise
+            logger.warning("Skipping unreadable directory", path=str(directory), error=str(e))
+            continue
+        with iterator:
+            for entry in iterator:
+                if not include_hidden and entry.name.startswith("."):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                relative = f"{prefix}{entry.name}"
+                if is_dir:
+                    results.append(ScanEntry(relative, entry, True))
+                    if recursive and not entry.is_symlink():
+                        pending.append((Path(entry.path), f"{relative}/"))
+                    continue
+                if file_types and os.path.splitext(entry.name)[1].lower() not in file_types:
+                    continue
+                results.append(ScanEntry(relative, entry, False))
+
+    results.sort(key=lambda item: (not item.is_dir, os.path.basename(item.relative_path).lower()))
+    return results
+
+
+def describe_entry(item: ScanEntry) -> Dict[str, object]:
+    """Build the listing metadata for one entry using the DirEntry stat cache."""
+    entry_type = "directory" if item.is_dir else "file"
+    try:
+        stat = item.entry.stat()
+    except OSError as e:
+        logger.warning("Failed to get entry metadata", path=item.entry.path, error=str(e))
+        return {"name": item.entry.name, "path": item.relative_path, "type": entry_type,
+                "error": "Access denied"}
+
+    result: Dict[str, object] = {
+        "name": item.entry.name,
+        "path": item.relative_path,
+        "type": entry_type,
+        "modified": stat.st_mtime,
+        "permissions": oct(stat.st_mode)[-3:]
+    }
+    if not item.is_dir:
+        result["size_bytes"] = stat.st_size
+        result["extension"] = os.path.splitext(item.entry.name)[1]
+    return result
@@ -22,6 +22,7 @@ except ImportError:
 
 from tools.decorators import Tool
 from ...core.errors import ToolExecutionError, SecurityError, ValidationError
+from .http_client import get_http_client
 
 
 logger = structlog.get_logger(__name__)
@@ -65,6 +66,11 @@ logger = structlog.get_logger(__name__)
             "type": "boolean",
             "description": "Whether to follow HTTP redirects",
             "default": True
+        },
+        "use_cache": {
+            "type": "boolean",
+            "description": "Serve GET requests from the HTTP cache when Cache-Control allows",
+            "default": True
         }
     },
     requires_auth=False,
@@ -75,10 +81,14 @@ async def http_request_tool(url: str,
                            headers: Dict[str, str] = None,
                            data: Dict[str, Any] = None,
                            timeout: int = 30,
-                           follow_redirects: bool = True) -> Dict[str, Any]:
+                           follow_redirects: bool = True,
+                           use_cache: bool = True) -> Dict[str, Any]:
     """
     Make HTTP requests to external APIs.
     
+    Requests go through the shared HTTP client, so connections, DNS
+    lookups and TLS sessions are reused across calls.
+    
     Args:
         url: URL to request
         method: HTTP method
@@ -86,6 +96,7 @@ async def http_request_tool(url: str,
         data: Request body data
         timeout: Request timeout
         follow_redirects: Whether to follow redirects
+        use_cache: Whether cacheable GET responses may be reused
         
     Returns:
         HTTP response data
@@ -124,81 +135,58 @@ async def http_request_tool(url: str,
                    method=method,
                    timeout=timeout)
         
-        # Create HTTP session
-        connector = aiohttp.TCPConnector(
-            limit=10,
-            limit_per_host=5,
-            ttl_dns_cache=300,
-            use_dns_cache=True
+        response = await get_http_client().request(
+            method,
+            url,
+            headers=request_headers,
+            json_data=data if method in ["POST", "PUT"] and data else None,
+            timeout=timeout,
+            allow_redirects=follow_redirects,
+            use_cache=use_cache
         )
+        response_time = (time.time() - start_time) * 1000
+        
+        # Decode response content
+        response_text = response.text()
+        try:
+            response_data = json.loads(response_text)
+        except json.JSONDecodeError:
+            response_data = response_text
+        
+        # Prepare result
+        result = {
+            "request_id": request_id,
+            "url": url,
+            "method": method,
+            "status_code": response.status,
+            "headers": response.headers,
+            "response_time_ms": response_time,
+            "content_length": len(str(response_data)),
+            "content_type": response.content_type,
+            "from_cache": response.from_cache,
+            "data": response_data
+        }
+        
+        # Check for HTTP errors
+        if response.status >= 400:
+            result["success"] = False
+            result["error"] = f"HTTP {response.status} error"
+            logger.warning("HTTP request returned error status",
+                         request_id=request_id,
+                         status_code=response.status,
+                         url=url)
+        else:
+            result["success"] = True
+        
+        logger.info("HTTP request completed",
+                   request_id=request_id,
+                   status_code=response.status,
+                   response_time_ms=response_time,
+                   content_length=result["content_length"],
+                   from_cache=response.from_cache)
+        
+        return result
         
-        async with aiohttp.ClientSession(
-            connector=connector,
-            timeout=aiohttp.ClientTimeout(total=timeout),
-            headers={"User-Agent": request_headers["User-Agent"]}
-        ) as session:
-            
-            # Prepare request kwargs
-            request_kwargs = {
-                "headers": request_headers,
-                "allow_redirects": follow_redirects
-            }
-            
-            # Add data for POST/PUT requests
-            if method in ["POST", "PUT"] and data:
-                request_kwargs["json"] = data
-            
-            # Make request
-            async with session.request(method, url, **request_kwargs) as response:
-                response_time = (time.time() - start_time) * 1000
-                
-                # Read response content
-                try:
-                    if response.content_type and "application/json" in response.content_type:
-                        response_data = await response.json()
-                    else:
-                        response_text = await response.text()
-                        # Try to parse as JSON, fallback to text
-                        try:
-                            response_data = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            response_data = response_text
-                except Exception as e:
-                    logger.warning("Failed to parse response content", error=str(e))
-                    response_data = await response.text()
-                
-                # Prepare result
-                result = {
-                    "request_id": request_id,
-                    "url": url,
-                    "method": method,
-                    "status_code": response.status,
-                    "headers": dict(response.headers),
-                    "response_time_ms": response_time,
-                    "content_length": len(str(response_data)),
-                    "content_type": response.content_type,
-                    "data": response_data
-                }
-                
-                # Check for HTTP errors
-                if response.status >= 400:
-                    result["success"] = False
-                    result["error"] = f"HTTP {response.status} error"
-                    logger.warning("HTTP request returned error status",
-                                 request_id=request_id,
-                                 status_code=response.status,
-                                 url=url)
-                else:
-                    result["success"] = True
-                
-                logger.info("HTTP request completed",
-                           request_id=request_id,
-                           status_code=response.status,
-                           response_time_ms=response_time,
-                           content_length=result["content_length"])
-                
-                return result
-                
     except asyncio.TimeoutError:
         response_time = (time.time() - start_time) * 1000
         logger.error("HTTP request timed out",
@@ -278,7 +266,9 @@ async def url_health_check_tool(url: str, timeout: int = 10) -> Dict[str, Any]:
             url=url,
             method="GET",  # Some servers don't support HEAD
             timeout=timeout,
-            headers={"Accept": "text/html,application/json,*/*"}
+            headers={"Accept": "text/html,application/json,*/*"},
+            # A health check must reach the endpoint
+            use_cache=False
         )
         
         response_time = (time.time() - start_time) * 1000
@@ -0,0 +1,357 @@
+"""
+FACT System Shared HTTP Client
+
+This module provides a process-wide HTTP client service for the HTTP
+connector tools. It keeps one pooled aiohttp session per event loop so DNS
+caching, keep-alive and TLS session reuse survive across tool calls, and
+optionally caches GET responses according to Cache-Control with ETag /
+Last-Modified revalidation.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+import structlog
+
+try:
+    import aiohttp
+    HTTP_AVAILABLE = True
+except ImportError:
+    HTTP_AVAILABLE = False
+    aiohttp = None
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Request headers that make a response specific to the caller
+CREDENTIAL_HEADERS = frozenset({"authorization", "cookie"})
+
+
+@dataclass
+class HTTPClientConfig:
+    """Configuration for the shared HTTP client."""
+    total_connections: int = 100
+    connections_per_host: int = 10
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 30.0
+    user_agent: str = "FACT-System/1.0"
+    cache_enabled: bool = True
+    cache_max_entries: int = 256
+    cache_max_body_bytes: int = 1024 * 1024
+
+
+@dataclass
+class HTTPResponse:
+    """Fully read HTTP response."""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    content_type: Optional[str] = None
+    charset: Optional[str] = None
+    from_cache: bool = False
+    revalidated: bool = False
+
+    def text(self) -> str:
+        """Decode the body using the declared charset (UTF-8 by default)."""
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+
+@dataclass
+class _CachedResponse:
+    """Cached response with its freshness metadata."""
+    response: HTTPResponse
+    stored_at: float
+    max_age: Optional[float]
+    must_revalidate: bool
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, now: float) -> bool:
+        if self.must_revalidate or self.max_age is None:
+            return False
+        return now - self.stored_at < self.max_age
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a directive dictionary."""
+    directives: Dict[str, Optional[str]] = {}
+    if not value:
+        return directives
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+class HTTPResponseCache:
+    """Bounded LRU cache of GET responses honouring Cache-Control."""
+
+    def __init__(self, max_entries: int = 256, max_body_bytes: int = 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries: "OrderedDict[Tuple[str, str], _CachedResponse]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[_CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: Tuple[str, str], response: HTTPResponse,
+              authorized: bool = False) -> bool:
+        """
+        Store a response if its headers allow it.
+
+        Returns:
+            True if the response was cached
+        """
+        if response.status != 200 or len(response.body) > self.max_body_bytes:
+            return False
+
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        directives = _parse_cache_control(headers.get("cache-control"))
+        if "no-store" in directives:
+            return False
+        if authorized and "public" not in directives:
+            return False
+
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+
+        max_age: Optional[float] = None
+        if "max-age" in directives:
+            try:
+                max_age = float(directives["max-age"] or 0)
+            except ValueError:
+                max_age = None
+        elif "expires" in headers:
+            try:
+                expires = parsedate_to_datetime(headers["expires"]).timestamp()
+                max_age = max(0.0, expires - time.time())
+            except (TypeError, ValueError):
+                max_age = 0.0
+
+        # Nothing to serve from cache and nothing to revalidate with
+        if max_age is None and not etag and not last_modified:
+            return False
+
+        self._entries[key] = _CachedResponse(
+            response=response,
+            stored_at=time.time(),
+            max_age=max_age,
+            must_revalidate="no-cache" in directives,
+            etag=etag,
+            last_modified=last_modified
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def refresh(self, key: Tuple[str, str], headers: Dict[str, str]) -> Optional[HTTPResponse]:
+        """Update a cached entry after a 304 and return the cached response."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        headers = {name.lower(): value for name, value in headers.items()}
+        directives = _parse_cache_control(headers.get("cache-control"))
+        if "max-age" in directives:
+            try:
+                entry.max_age = float(directives["max-age"] or 0)
+            except ValueError:
+                pass
+        entry.etag = headers.get("etag", entry.etag)
+        entry.stored_at = time.time()
+        return entry.response
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class HTTPClientService:
+    """
+    Process-wide HTTP client with one pooled session per event loop.
+
+    Sessions are created lazily on first use in each loop and reused for
+    every subsequent request, so connection pools, DNS cache and TLS
+    sessions are shared across tool invocations.
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None):
+        self.config = config or HTTPClientConfig()
+        self.cache = HTTPResponseCache(
+            max_entries=self.config.cache_max_entries,
+            max_body_bytes=self.config.cache_max_body_bytes
+        )
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self.stats = {
+            "requests": 0,
+            "network_requests": 0,
+            "cache_hits": 0,
+            "revalidations": 0,
+            "sessions_created": 0
+        }
+
+    def _create_session(self) -> "aiohttp.ClientSession":
+        connector = aiohttp.TCPConnector(
+            limit=self.config.total_connections,
+            limit_per_host=self.config.connections_per_host,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.config.keepalive_timeout
+        )
+        self.stats["sessions_created"] += 1
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": self.config.user_agent}
+        )
+
+    def get_session(self) -> "aiohttp.ClientSession":
+        """Return the pooled session for the running event loop."""
+        if not HTTP_AVAILABLE:
+            raise RuntimeError("aiohttp library not available. Install with: pip install aiohttp")
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+        return session
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      headers: Optional[Dict[str, str]] = None,
+                      json_data: Any = None,
+                      timeout: float = 30,
+                      allow_redirects: bool = True,
+                      use_cache: bool = True) -> HTTPResponse:
+        """
+        Perform a request on the shared session.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            headers: Request headers
+            json_data: JSON body for POST/PUT requests
+            timeout: Total timeout in seconds
+            allow_redirects: Whether to follow redirects
+            use_cache: Whether GET responses may be served from or stored in the cache
+
+        Returns:
+            HTTPResponse with the body fully read
+        """
+        self.stats["requests"] += 1
+        request_headers = dict(headers or {})
+        # The cache key ignores credentials, so requests carrying them bypass it
+        cacheable = (use_cache and self.config.cache_enabled and method.upper() == "GET"
+                     and not any(name.lower() in CREDENTIAL_HEADERS for name in request_headers))
+        cache_key = (url, request_headers.get("Accept", ""))
+        cached = self.cache.get(cache_key) if cacheable else None
+
+        if cached is not None:
+            if cached.is_fresh(time.time()):
+                self.stats["cache_hits"] += 1
+                return _copy_response(cached.response, from_cache=True)
+            if cached.etag:
+                request_headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request_headers["If-Modified-Since"] = cached.last_modified
+
+        session = self.get_session()
+        self.stats["network_requests"] += 1
+        request_kwargs: Dict[str, Any] = {
+            "headers": request_headers,
+            "allow_redirects": allow_redirects,
+            "timeout": aiohttp.ClientTimeout(total=timeout)
+        }
+        if json_data is not None:
+            request_kwargs["json"] = json_data
+
+        async with session.request(method, url, **request_kwargs) as response:
+            if response.status == 304 and cached is not None:
+                refreshed = self.cache.refresh(cache_key, dict(response.headers))
+                if refreshed is not None:
+                    self.stats["revalidations"] += 1
+                    return _copy_response(refreshed, from_cache=True, revalidated=True)
+                result = None
+            else:
+                result = HTTPResponse(
+                    status=response.status,
+                    headers=dict(response.headers),
+                    body=await response.read(),
+                    content_type=response.content_type,
+                    charset=response.charset
+                )
+
+        if result is None:
+            # Evicted while revalidating: the 304 has no body to serve, so fetch in full
+            logger.debug("Cached response evicted during revalidation", url=url)
+            return await self.request(method, url, headers=headers, json_data=json_data, timeout=timeout,
+                                      allow_redirects=allow_redirects, use_cache=False)
+
+        if cacheable:
+            self.cache.store(cache_key, result)
+        return result
+
+    async def close(self) -> None:
+        """Close every pooled session; sessions of other live loops are closed on their loop."""
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for loop, session in list(self._sessions.items()):
+            if session.closed:
+                continue
+            if loop is current_loop:
+                await session.close()
+            elif not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+        self._sessions.clear()
+        logger.info("HTTP client sessions closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return client statistics."""
+        return {**self.stats, "cached_responses": len(self.cache), "open_sessions": len(self._sessions)}
+
+
+def _copy_response(response: HTTPResponse, **overrides: Any) -> HTTPResponse:
+    values = {
+        "status": response.status,
+        "headers": dict(response.headers),
+        "body": response.body,
+        "content_type": response.content_type,
+        "charset": response.charset
+    }
+    values.update(overrides)
+    return HTTPResponse(**values)
+
+
+# Global HTTP client instance
+_http_client: Optional[HTTPClientService] = None
+
+
+def get_http_client() -> HTTPClientService:
+    """Get or create the global HTTP client service."""
+    global _http_client
+    if _http_client is None:
+        _http_client = HTTPClientService()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the global HTTP client's sessions (call on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.close()
+        _http_client = None
@@ -12,7 +12,6 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 import structlog
 from collections import defaultdict, Counter
-import numpy as np
 
 logger = structlog.get_logger(__name__)
 
@@ -0,0 +1,386 @@
+"""
+FACT System Streaming Upload Parsing
+
+This module turns a byte stream (an uploaded file or a raw request body)
+into batches of record dictionaries without holding the whole upload in
+memory. JSON uploads are parsed element by element out of the top-level
+array; CSV uploads are split at record boundaries (quoted newlines kept)
+and parsed with the csv module. A producer task fills a bounded queue so
+reading and parsing overlap with the database writes, and a slow writer
+pushes back on the reader instead of letting batches pile up.
+"""
+
+import asyncio
+import codecs
+import csv
+import inspect
+import io
+import json
+import re
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+from starlette.datastructures import UploadFile
+import structlog
+
+try:
+    from .core.errors import ValidationError
+except ImportError:
+    from core.errors import ValidationError
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Bytes read from the source per chunk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Parsed batches allowed to wait for the writer
+DEFAULT_QUEUE_BATCHES = 2
+
+# Largest single record held while waiting for the rest of it
+MAX_RECORD_CHARS = 4 * 1024 * 1024
+
+# Upload bytes kept in memory before spooling to disk (as for multipart files)
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+# Longest wait for the next chunk of a request body
+UPLOAD_IDLE_TIMEOUT = 30.0
+
+UPLOAD_FORMATS = ("json", "csv")
+
+_WHITESPACE = re.compile(r"\s*")
+_CSV_BOUNDARY = re.compile(r'"|\r\n|\r|\n')
+
+
+class JSONArrayParser:
+    """
+    Incremental parser for a JSON array of objects.
+
+    feed() takes decoded text in arbitrary pieces and returns the objects
+    completed so far; only the unfinished element is kept between calls.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        # start -> first -> (item <-> next) -> done
+        self._state = "start"
+        self.records = 0
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Parse another piece of the document.
+
+        Args:
+            text: Next piece of decoded JSON text
+
+        Returns:
+            Objects completed by this piece
+
+        Raises:
+            ValidationError: If the document is not an array of objects
+        """
+        buffer = self._buffer = self._buffer[self._pos:] + text
+        pos = self._pos = 0
+        records = []
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValidationError("JSON file must contain an array of objects")
+                self._state = "first"
+                pos += 1
+            elif self._state == "next":
+                if char == ",":
+                    self._state = "item"
+                elif char == "]":
+                    self._state = "done"
+                else:
+                    raise ValidationError(
+                        f"Invalid JSON format: expected ',' or ']' after record {self.records}")
+                pos += 1
+            elif self._state == "done":
+                raise ValidationError("Invalid JSON format: extra data after the array")
+            elif self._state == "first" and char == "]":
+                self._state = "done"
+                pos += 1
+            elif char != "{":
+                raise ValidationError("JSON file must contain an array of objects")
+            else:
+                try:
+                    record, pos = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Most likely cut off mid-record; wait for more text
+                    if len(buffer) - pos > MAX_RECORD_CHARS:
+                        raise ValidationError(
+                            f"Invalid JSON format: record {self.records + 1} is malformed or too large")
+                    break
+                records.append(record)
+                self.records += 1
+                self._state = "next"
+            self._pos = pos
+
+        return records
+
+    def close(self) -> None:
+        """
+        Check that the document ended with the closing bracket.
+
+        Raises:
+            ValidationError: If the document is truncated or malformed
+        """
+        if self._state == "done":
+            return
+        remainder = self._buffer[self._pos:].strip()
+        if remainder:
+            try:
+                self._decoder.raw_decode(remainder)
+            except json.JSONDecodeError as e:
+                raise ValidationError(f"Invalid JSON format: {e}")
+        raise ValidationError("Invalid JSON format: unexpected end of data")
+
+
+class CSVRecordParser:
+    """
+    Incremental CSV parser yielding one dictionary per record.
+
+    Text is cut at the last line break outside quotes, so records whose
+    quoted fields span lines are never split. The first record is the
+    header; rows map to it the way csv.DictReader does.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._scanned = 0
+        self._in_quotes = False
+        self._fields: Optional[List[str]] = None
+        self.records = 0
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Parse another piece of the file.
+
+        Args:
+            text: Next piece of decoded CSV text
+
+        Returns:
+            Records completed by this piece
+
+        Raises:
+            ValidationError: If a record cannot be parsed or never ends
+        """
+        buffer = self._buffer = self._buffer + text
+        cut = 0
+        scanned = len(buffer)
+        in_quotes = self._in_quotes
+
+        for match in _CSV_BOUNDARY.finditer(buffer, self._scanned):
+            token = match.group()
+            if token == '"':
+                in_quotes = not in_quotes
+            elif not in_quotes:
+                if token == "\r" and match.end() == len(buffer):
+                    # May be the first half of \r\n
+                    scanned = match.start()
+                    break
+                cut = match.end()
+
+        self._in_quotes = in_quotes
+        if not cut:
+            self._scanned = scanned
+            if len(buffer) > MAX_RECORD_CHARS:
+                raise ValidationError(
+                    f"Invalid CSV: record {self.records + 1} is malformed or too large")
+            return []
+
+        self._buffer = buffer[cut:]
+        self._scanned = scanned - cut
+        return self._parse(buffer[:cut])
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Parse the final record when the file does not end with a newline.
+
+        Returns:
+            The remaining records
+
+        Raises:
+            ValidationError: If a quoted field is left open
+        """
+        if self._in_quotes:
+            raise ValidationError("Invalid CSV: unterminated quoted field")
+        remainder, self._buffer = self._buffer, ""
+        return self._parse(remainder) if remainder.strip() else []
+
+    def _parse(self, text: str) -> List[Dict[str, Any]]:
+        records = []
+        try:
+            for row in csv.reader(io.StringIO(text, newline="")):
+                if not row:
+                    continue
+                if self._fields is None:
+                    self._fields = row
+                    continue
+                record = dict(zip(self._fields, row))
+                if len(row) > len(self._fields):
+                    record[None] = row[len(self._fields):]
+                elif len(row) < len(self._fields):
+                    for name in self._fields[len(row):]:
+                        record[name] = None
+                records.append(record)
+        except csv.Error as e:
+            raise ValidationError(f"Invalid CSV near record {self.records + len(records) + 1}: {e}")
+        self.records += len(records)
+        return records
+
+
+async def read_chunks(source, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Read a file-like object in chunks.
+
+    Args:
+        source: Object with read(size), sync (open file) or async (UploadFile)
+        chunk_size: Bytes per read
+
+    Yields:
+        Non-empty byte chunks
+    """
+    while True:
+        chunk = source.read(chunk_size)
+        if inspect.isawaitable(chunk):
+            chunk = await chunk
+        if not chunk:
+            return
+        yield chunk
+
+
+async def spool_chunks(chunks: AsyncIterable[bytes],
+                       idle_timeout: Optional[float] = UPLOAD_IDLE_TIMEOUT) -> UploadFile:
+    """
+    Receive a byte stream into a spooled temporary file.
+
+    A raw request body arrives at the client's pace; receiving it in full
+    before the upload opens its transaction keeps a slow or stalled client
+    from holding the database write lock. Bodies over SPOOL_MAX_MEMORY go
+    to disk, written off the event loop.
+
+    Args:
+        chunks: Byte chunks of the body
+        idle_timeout: Seconds to wait for each chunk (None waits forever)
+
+    Returns:
+        The body as an UploadFile positioned at the start; the caller closes it
+
+    Raises:
+        asyncio.TimeoutError: If no chunk arrives within idle_timeout
+    """
+    upload = UploadFile(SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY))
+    iterator = chunks.__aiter__()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), idle_timeout)
+            except StopAsyncIteration:
+                break
+            await upload.write(chunk)
+        await upload.seek(0)
+    except BaseException:
+        await upload.close()
+        raise
+    return upload
+
+
+async def iter_records(chunks: AsyncIterable[bytes], fmt: str) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Parse a UTF-8 byte stream into lists of records, one list per chunk.
+
+    Args:
+        chunks: Byte chunks of the upload
+        fmt: "json" or "csv"
+
+    Yields:
+        Records completed by each chunk (possibly empty lists)
+
+    Raises:
+        ValidationError: If the format is unknown or the content is invalid
+    """
+    if fmt not in UPLOAD_FORMATS:
+        raise ValidationError(f"Unsupported upload format: {fmt}")
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    parser = JSONArrayParser() if fmt == "json" else CSVRecordParser()
+    try:
+        async for chunk in chunks:
+            yield parser.feed(decoder.decode(chunk))
+        tail = parser.feed(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        raise ValidationError(f"Upload is not valid UTF-8: {e}")
+
+    closing = parser.close()
+    yield tail + (closing or [])
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_DONE = object()
+
+
+async def queued_batches(chunks: AsyncIterable[bytes], fmt: str, batch_size: int,
+                         max_pending: int = DEFAULT_QUEUE_BATCHES) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Record batches parsed by a background task through a bounded queue.
+
+    The producer reads and parses ahead of the consumer by at most
+    max_pending batches. Parse errors surface from this iterator; closing
+    it early cancels the producer.
+
+    Args:
+        chunks: Byte chunks of the upload
+        fmt: "json" or "csv"
+        batch_size: Records per batch (the last batch may be shorter)
+        max_pending: Queue bound in batches
+
+    Yields:
+        Lists of record dictionaries
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+
+    async def produce() -> None:
+        try:
+            pending: List[Dict[str, Any]] = []
+            async for records in iter_records(chunks, fmt):
+                pending.extend(records)
+                while len(pending) >= batch_size:
+                    await queue.put(pending[:batch_size])
+                    pending = pending[batch_size:]
+            if pending:
+                await queue.put(pending)
+            await queue.put(_DONE)
+        except Exception as e:
+            await queue.put(_Failed(e))
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
@@ -10,54 +10,49 @@ import asyncio
 from typing import Dict, Any, Optional, List
 from contextlib import asynccontextmanager
 from datetime import datetime
+import time
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import structlog
-import tempfile
 import json
 
 from core.driver import get_driver as get_fact_driver, shutdown_driver
 from core.config import get_config
 from core.errors import FACTError, ConfigurationError, ValidationError
 from data_upload import DataUploader
-
-# Load knowledge base on startup for Railway
-try:
-    import startup_loader
-except ImportError:
-    pass  # Startup loader not available
-
-# Initialize PostgreSQL if available
-try:
-    from db.postgres_adapter import postgres_adapter
-    POSTGRES_AVAILABLE = True
-except ImportError:
-    POSTGRES_AVAILABLE = False
-    postgres_adapter = None
-
-# Import the knowledge API router
-try:
-    from api.knowledge_api import router as knowledge_router
-    KNOWLEDGE_API_AVAILABLE = True
-except ImportError:
-    KNOWLEDGE_API_AVAILABLE = False
-    logger = structlog.get_logger(__name__)
-    logger.warning("Knowledge API module not available")
-
-# Import the VAPI webhook router
-try:
-    from api.vapi_webhook import router as vapi_router
-    VAPI_WEBHOOK_AVAILABLE = True
-except ImportError:
-    VAPI_WEBHOOK_AVAILABLE = False
-    logger = structlog.get_logger(__name__)
-    logger.warning("VAPI webhook module not available")
+from upload_stream import UPLOAD_IDLE_TIMEOUT, read_chunks, spool_chunks
+from db.kb_queries import KnowledgeQuery, KB_SEARCH_COLUMNS
+from db.fulltext import create_fulltext_backend
+from db.change_feed import create_change_feed
+from db.connection import DatabaseManager
+from monitoring.worker_metrics import RequestMetricsMiddleware, get_worker_metrics
+from monitoring.query_log import QueryLogMiddleware, create_query_log_recorder
+from monitoring.sampling_profiler import start_continuous_profiler, stop_continuous_profiler
+from monitoring.loop_monitor import get_loop_monitor, start_loop_monitor, stop_loop_monitor
+from prefork_server import PreforkServer, ServingOptions, resolve_workers
+from api.router_registry import include_routers, loaded
+from api.responses import FastJSONResponse, RawJSONResponse
+from core.serialization import dumps, entry_fragment, join_array
+from core.admission import Lane, get_admission_controller
+
+# Initialize PostgreSQL if available. The adapter (and asyncpg) is only
+# imported when a database URL is configured.
+POSTGRES_AVAILABLE = False
+postgres_adapter = None
+if os.getenv("DATABASE_URL"):
+    try:
+        from db.postgres_adapter import postgres_adapter
+        POSTGRES_AVAILABLE = True
+    except ImportError:
+        pass
 
 # Import the enhanced retriever
 try:
-    from retrieval.enhanced_search import EnhancedRetriever
+    from retrieval.enhanced_search import EnhancedRetriever, SearchQuery
+    from retrieval.scoring_pool import create_scoring_pool
     ENHANCED_SEARCH_AVAILABLE = True
 except ImportError:
     ENHANCED_SEARCH_AVAILABLE = False
@@ -112,6 +107,25 @@ class KnowledgeSearchResponse(BaseModel):
     timestamp: str = Field(..., description="Response timestamp")
 
 
+# Most searches accepted by one /knowledge/search/batch request
+MAX_BATCH_SEARCHES = 100
+
+
+class KnowledgeBatchSearchRequest(BaseModel):
+    """Request model for batch knowledge base search."""
+    searches: List[KnowledgeSearchRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SEARCHES, description="Searches to run"
+    )
+
+
+class KnowledgeBatchSearchResponse(BaseModel):
+    """Response model for batch knowledge base search."""
+    results: List[KnowledgeSearchResponse] = Field(..., description="Results of each search, in request order")
+    total_searches: int = Field(..., description="Number of searches requested")
+    unique_searches: int = Field(..., description="Number of distinct searches run after deduplication")
+    timestamp: str = Field(..., description="Response timestamp")
+
+
 class HealthResponse(BaseModel):
     """Response model for health check."""
     status: str = Field(..., description="Service status")
@@ -159,18 +173,121 @@ from shared_state import get_enhanced_retriever, set_enhanced_retriever, get_dri
 _driver = None
 # Global enhanced retriever instance
 _enhanced_retriever = None
+# Retriever whose index the pre-fork master built; inherited by each worker
+_preloaded_retriever = None
+
+
+def _retriever_cache_counts():
+    """Result cache (hits, misses) of this process's retriever, for worker metrics."""
+    retriever = _enhanced_retriever
+    if retriever is None:
+        return 0, 0
+    return retriever.cache_hits, retriever.cache_misses
+
+
+def _loop_lag_stats():
+    """Event loop lag percentiles of this process, for worker metrics."""
+    monitor = get_loop_monitor()
+    return monitor.stats() if monitor else {}
+
+
+def _use_postgres() -> bool:
+    return bool(os.getenv("DATABASE_URL")) and bool(postgres_adapter) and postgres_adapter.initialized
+
+
+def _create_retriever() -> "EnhancedRetriever":
+    """Build the enhanced retriever configured by the environment."""
+    # Initialize with None - the retriever will load data directly from database.
+    # RETRIEVER_CANDIDATES=server fetches candidates from the full-text
+    # index per query instead of loading every entry into this worker.
+    candidate_backend = None
+    if os.getenv("RETRIEVER_CANDIDATES", "memory").lower() == "server":
+        pool = postgres_adapter.pool if postgres_adapter and postgres_adapter.initialized else None
+        candidate_backend = create_fulltext_backend(pool=pool)
+    # Writes from any worker reach this one through the change feed
+    # (LISTEN/NOTIFY on PostgreSQL, change log polling on SQLite)
+    change_feed = None
+    if os.getenv("KB_CHANGE_FEED", "on").lower() != "off":
+        use_postgres = _use_postgres()
+        change_feed = create_change_feed(
+            pool=postgres_adapter.pool if use_postgres else None,
+            dsn=postgres_adapter.connection_string if use_postgres else None,
+            database_path=os.getenv("DATABASE_PATH", "data/fact_system.db")
+        )
+    # SEARCH_EXECUTOR=process scores large in-memory searches in forked processes
+    return EnhancedRetriever(None, candidate_backend=candidate_backend, change_feed=change_feed,
+                             scoring_pool=create_scoring_pool())
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+async def _load_startup_data():
+    """Load the Railway knowledge base data, off the event loop."""
+    try:
+        from startup_loader import load_knowledge_base_on_startup
+    except ImportError:
+        return  # Startup loader not available
+    await asyncio.to_thread(load_knowledge_base_on_startup)
+
+
+async def preload_for_workers():
     """
-    Lifespan context manager for FastAPI.
-    Handles startup and shutdown events.
+    Prepare shared state in the pre-fork master.
+    
+    Seeds the database once, so workers starting together don't race to
+    insert the sample data, then loads the knowledge index. Workers forked
+    afterwards inherit the index, sharing its pages copy-on-write, and only
+    reconnect the change feed. All connections opened here are closed
+    again: they cannot be used across fork.
     """
+    global _preloaded_retriever
+    _preloaded_retriever = None
+    await _load_startup_data()
+    try:
+        manager = DatabaseManager(get_config().database_path)
+        try:
+            await manager.initialize_database()
+        finally:
+            await manager.cleanup()
+    except Exception as e:
+        logger.warning(f"Pre-fork database initialization failed: {e}")
+    
+    if not ENHANCED_SEARCH_AVAILABLE:
+        return
+    if os.getenv("RETRIEVER_CANDIDATES", "memory").lower() == "server":
+        return  # Nothing to share; candidates come from the database per query
+    
+    if POSTGRES_AVAILABLE and postgres_adapter and os.getenv("DATABASE_URL"):
+        await postgres_adapter.initialize()
+    retriever = _create_retriever()
+    try:
+        await retriever.initialize(start_feed=False)
+        _preloaded_retriever = retriever
+        logger.info(f"Preloaded {len(retriever.in_memory_index.entries)} knowledge base entries for workers")
+    finally:
+        await retriever.close()
+        if postgres_adapter and postgres_adapter.initialized:
+            await postgres_adapter.close()
+
+
+# Startup progress reported by /ready
+_startup = {
+    "started_at": time.time(),
+    "warmup_seconds": None,
+    "driver_initialized": False,
+    "index_warm": False,
+    "error": None,
+}
+_warmup_task: Optional[asyncio.Task] = None
+
+
+async def _warm_up():
+    """Initialize the database, driver and knowledge index."""
     global _driver, _enhanced_retriever
+    started = time.perf_counter()
     
-    # Startup
-    logger.info("Starting FACT web server")
+    # Load knowledge base on startup for Railway (done by the pre-fork master
+    # when the index was preloaded)
+    if _preloaded_retriever is None:
+        await _load_startup_data()
     
     # Initialize PostgreSQL if available
     if POSTGRES_AVAILABLE and postgres_adapter:
@@ -180,8 +297,8 @@ async def lifespan(app: FastAPI):
                 logger.info("PostgreSQL initialized successfully")
                 
                 # Load initial data if needed
-                entries = await postgres_adapter.get_all_entries()
-                if len(entries) < 4:
+                entry_count = await postgres_adapter.count_entries()
+                if entry_count < 4:
                     logger.info("Loading initial knowledge base data...")
                     # This will be handled by startup_loader or upload endpoint
             else:
@@ -191,19 +308,29 @@ async def lifespan(app: FastAPI):
     
     try:
         config = get_config()
-        _driver = get_fact_driver(config)  # Not async, just get the driver
-        await _driver.initialize()  # Initialize it asynchronously
+        driver = get_fact_driver(config)  # Not async, just get the driver
+        await driver.initialize()  # Initialize it asynchronously
+        # Published only once usable; until then endpoints answer 503
+        _driver = driver
         set_driver(_driver)  # Store in shared state
+        _startup["driver_initialized"] = True
         logger.info("FACT system initialized successfully")
         
         # Initialize enhanced retriever if available
         if ENHANCED_SEARCH_AVAILABLE:
             try:
-                logger.info("Starting enhanced retriever initialization...")
-                # Initialize with None - the retriever will load data directly from database
-                _enhanced_retriever = EnhancedRetriever(None)
-                logger.info("Enhanced retriever created, calling initialize...")
-                await _enhanced_retriever.initialize()
+                if _preloaded_retriever is not None:
+                    # Forked worker: keep the master's index, reconnect its change feed
+                    logger.info("Resuming enhanced retriever preloaded by the master")
+                    retriever = _preloaded_retriever
+                    await retriever.resume(pool=postgres_adapter.pool if _use_postgres() else None)
+                else:
+                    logger.info("Starting enhanced retriever initialization...")
+                    retriever = _create_retriever()
+                    logger.info("Enhanced retriever created, calling initialize...")
+                    await retriever.initialize()
+                _enhanced_retriever = retriever
+                _startup["index_warm"] = True
                 logger.info("Enhanced retriever initialized successfully")
                 # Set in shared state so other modules can access it
                 set_enhanced_retriever(_enhanced_retriever)
@@ -215,14 +342,65 @@ async def lifespan(app: FastAPI):
             logger.warning("Enhanced search module not available")
     except Exception as e:
         logger.error(f"Failed to initialize FACT system: {e}")
+        _startup["error"] = str(e)
         # Don't prevent startup, allow health checks to report unhealthy
     
+    _startup["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("Warm-up complete", seconds=_startup["warmup_seconds"],
+                index_warm=_startup["index_warm"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan context manager for FastAPI.
+    Handles startup and shutdown events.
+    
+    Warm-up runs in the background so the port is bound immediately;
+    /ready reports when it has finished. STARTUP_WARMUP=blocking waits for
+    it before accepting connections instead.
+    """
+    global _warmup_task
+    
+    # Startup
+    logger.info("Starting FACT web server")
+    _warmup_task = asyncio.create_task(_warm_up())
+    if os.getenv("STARTUP_WARMUP", "background").lower() == "blocking":
+        await _warmup_task
+    
+    # Under the pre-fork master, share request counts with sibling workers
+    metrics_publisher = None
+    if get_worker_metrics().directory:
+        metrics_publisher = asyncio.create_task(get_worker_metrics().run_publisher())
+    
+    # Always-on stack sampling for /debug/profile, when PROFILER_CONTINUOUS is set
+    start_continuous_profiler()
+    
+    # Event loop lag, plus stacks of blocking calls with LOOP_BLOCK_DETECT
+    start_loop_monitor()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down FACT web server")
+    stop_continuous_profiler()
+    await stop_loop_monitor()
+    for task in (metrics_publisher, _warmup_task):
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    if _enhanced_retriever:
+        await _enhanced_retriever.close()
     if _driver:
         await shutdown_driver()
+    try:
+        from tools.connectors.http_client import close_http_client
+        await close_http_client()
+    except Exception as e:
+        logger.warning(f"HTTP client shutdown failed: {e}")
     logger.info("FACT web server shutdown complete")
 
 
@@ -231,7 +409,8 @@ app = FastAPI(
     title="FACT System API",
     description="Fast-Access Cached Tools system for intelligent query processing",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware for web clients
@@ -253,87 +432,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include the knowledge API router if available
-if KNOWLEDGE_API_AVAILABLE:
-    app.include_router(knowledge_router)
-    logger.info("Knowledge API endpoints loaded")
+# Per-process request counts, aggregated across workers by /metrics/workers
+get_worker_metrics().set_cache_source(_retriever_cache_counts)
+get_worker_metrics().set_loop_source(_loop_lag_stats)
+app.add_middleware(RequestMetricsMiddleware, metrics=get_worker_metrics())
 
-# Include the VAPI webhook router if available
-if VAPI_WEBHOOK_AVAILABLE:
-    app.include_router(vapi_router)
-    logger.info("VAPI webhook endpoints loaded")
-    
-    # Also include simple webhook for testing
-    try:
-        from api.vapi_webhook_simple import router as vapi_simple_router
-        app.include_router(vapi_simple_router)
-        logger.info("VAPI simple webhook endpoints loaded")
-    except ImportError:
-        logger.warning("VAPI simple webhook module not available")
-    
-    # Include enhanced webhook with scoring
-    try:
-        from api.vapi_enhanced_webhook import router as vapi_enhanced_router
-        app.include_router(vapi_enhanced_router)
-        logger.info("VAPI enhanced webhook with scoring loaded")
-    except ImportError:
-        logger.warning("VAPI enhanced webhook module not available")
-    
-    # Include debug webhook
-    try:
-        from api.vapi_debug_webhook import router as vapi_debug_router
-        app.include_router(vapi_debug_router)
-        logger.info("VAPI debug webhook loaded")
-    except ImportError:
-        logger.warning("VAPI debug webhook module not available")
-    
-    # Include fixed webhook for new VAPI structure
-    try:
-        from api.vapi_webhook_fix import router as vapi_fixed_router
-        app.include_router(vapi_fixed_router)
-        logger.info("VAPI fixed webhook loaded")
-    except ImportError:
-        logger.warning("VAPI fixed webhook module not available")
+# Replayable log of search and query requests, when QUERY_LOG_PATH is set
+app.add_middleware(QueryLogMiddleware, recorder=create_query_log_recorder())
 
-# Include the training API router
-try:
-    from api.training_api import router as training_router
-    app.include_router(training_router)
-    logger.info("Training API endpoints loaded")
-except ImportError:
-    logger.warning("Training API module not available")
-
-# Include debug endpoint
-try:
-    from api.debug_endpoint import router as debug_router
-    app.include_router(debug_router)
-    logger.info("Debug endpoints loaded")
-except ImportError:
-    logger.warning("Debug module not available")
-
-# Include Groq test endpoint
-try:
-    from api.test_groq import router as test_groq_router
-    app.include_router(test_groq_router)
-    logger.info("Groq test endpoint loaded")
-except ImportError:
-    logger.warning("Groq test module not available")
-
-# Include debug query endpoint
-try:
-    from api.debug_query import router as debug_query_router
-    app.include_router(debug_query_router)
-    logger.info("Debug query endpoint loaded")
-except ImportError:
-    logger.warning("Debug query module not available")
-
-# Include direct Groq test endpoint
-try:
-    from api.test_direct_groq import router as test_direct_groq_router
-    app.include_router(test_direct_groq_router)
-    logger.info("Direct Groq test endpoint loaded")
-except ImportError:
-    logger.warning("Direct Groq test module not available")
+# Include the enabled API routers; debug/test routers need ENABLE_DEBUG_ROUTES
+ROUTER_STATUS = include_routers(app)
 
 
 @app.get("/", response_model=HealthResponse)
@@ -370,7 +478,21 @@ async def health():
             metrics['enhanced_retriever'] = _enhanced_retriever is not None
             if _enhanced_retriever:
                 metrics['enhanced_retriever_entries'] = len(_enhanced_retriever.in_memory_index.entries) if hasattr(_enhanced_retriever, 'in_memory_index') else 0
-        
+
+            # Connection pool utilisation and checkout wait times
+            db_pools = {}
+            if getattr(_driver, 'database_manager', None):
+                db_pools['sqlite'] = _driver.database_manager.get_pool_stats()
+            if postgres_adapter and postgres_adapter.initialized:
+                db_pools['postgres'] = postgres_adapter.get_pool_stats()
+            metrics['db_pools'] = db_pools
+            
+            if _enhanced_retriever and _enhanced_retriever.change_feed:
+                metrics['kb_change_feed'] = _enhanced_retriever.change_feed.get_stats()
+            if _enhanced_retriever and _enhanced_retriever.scoring_pool:
+                metrics['scoring_pool'] = _enhanced_retriever.scoring_pool.get_stats()
+            metrics['admission'] = get_admission_controller().get_stats()
+
         return HealthResponse(
             status="healthy",
             initialized=_driver._initialized,
@@ -389,6 +511,38 @@ async def health():
         )
 
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness check.
+    
+    Answering at all means the server is listening; the status code says
+    whether warm-up has finished: 200 once the driver is initialized and
+    the knowledge index is loaded (when enhanced search is available), 503
+    while warming up or after a failed warm-up.
+    """
+    warming = _warmup_task is None or not _warmup_task.done()
+    index_ready = _startup["index_warm"] or not ENHANCED_SEARCH_AVAILABLE
+    if warming:
+        status = "warming"
+    elif _startup["driver_initialized"] and index_ready:
+        status = "ready"
+    else:
+        status = "failed"
+    body = {
+        "status": status,
+        "listening": True,
+        "driver_initialized": _startup["driver_initialized"],
+        "index_warm": _startup["index_warm"],
+        "index_entries": len(_enhanced_retriever.in_memory_index.entries) if _enhanced_retriever else 0,
+        "uptime_seconds": round(time.time() - _startup["started_at"], 3),
+        "warmup_seconds": _startup["warmup_seconds"],
+        "error": _startup["error"],
+        "routers": loaded(ROUTER_STATUS),
+    }
+    return JSONResponse(body, status_code=200 if status == "ready" else 503)
+
+
 @app.post("/query", response_model=QueryResponse)
 async def process_query(request: QueryRequest, background_tasks: BackgroundTasks):
     """
@@ -415,11 +569,21 @@ async def process_query(request: QueryRequest, background_tasks: BackgroundTasks
     query_id = f"web_{int(datetime.utcnow().timestamp() * 1000)}"
     timestamp = datetime.utcnow().isoformat()
     
+    # Wait for a slot within this worker's adaptive concurrency limit
+    ticket = await get_admission_controller().admit("query", Lane.INTERACTIVE)
+    if ticket is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    
     try:
         logger.info(f"Processing web query: {query_id}")
         
         # Process the query
-        response = await _driver.process_fact_query(request.query)
+        with ticket:
+            response = await _driver.process_fact_query(request.query)
         
         # Check if response was cached (simplified check)
         cached = "cache hit" in response.lower() if isinstance(response, str) else False
@@ -472,6 +636,17 @@ async def get_metrics():
         )
 
 
+@app.get("/metrics/workers", response_model=Dict[str, Any])
+async def get_worker_request_metrics():
+    """
+    Get request metrics summed across all server worker processes.
+    
+    Returns:
+        Totals plus one snapshot per live worker
+    """
+    return get_worker_metrics().aggregate()
+
+
 @app.post("/initialize")
 async def initialize_system():
     """
@@ -509,6 +684,25 @@ async def initialize_system():
         )
 
 
+def _data_uploader() -> DataUploader:
+    """
+    DataUploader on the driver's database manager.
+    
+    Every upload shares that manager's single writer connection, so
+    concurrent uploads are serialised and no request leaves a writer
+    connection of its own open.
+    
+    Raises:
+        HTTPException: If the FACT system is not initialized yet
+    """
+    if _driver is None or getattr(_driver, "database_manager", None) is None:
+        raise HTTPException(
+            status_code=503,
+            detail="FACT system not initialized. Please try again later."
+        )
+    return DataUploader(_driver.database_manager)
+
+
 @app.post("/upload-data", response_model=DataUploadResponse)
 async def upload_data(request: DataUploadRequest):
     """
@@ -516,9 +710,8 @@ async def upload_data(request: DataUploadRequest):
     
     Supports uploading companies, financial records, or knowledge base data.
     """
+    uploader = _data_uploader()
     try:
-        uploader = DataUploader()
-        
         if request.data_type == "companies":
             result = await uploader.upload_companies(
                 request.data, 
@@ -534,9 +727,10 @@ async def upload_data(request: DataUploadRequest):
                 request.data,
                 clear_existing=request.clear_existing
             )
-            # Refresh enhanced retriever after knowledge base upload
+            # Refresh enhanced retriever after knowledge base upload, unless
+            # its change feed is already applying the new rows
             global _enhanced_retriever
-            if _enhanced_retriever:
+            if _enhanced_retriever and not _enhanced_retriever.tracks_changes:
                 try:
                     await _enhanced_retriever.refresh_index()
                     logger.info("Enhanced retriever index refreshed after upload")
@@ -597,41 +791,21 @@ async def upload_file(
             detail="File must be CSV or JSON format"
         )
     
+    uploader = _data_uploader()
     try:
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Parse straight from the spooled upload; knowledge base rows are
+        # written in batches as they are parsed
+        fmt = "csv" if filename.endswith('.csv') else "json"
+        result = await uploader.load_stream(read_chunks(file), fmt, data_type, clear_existing)
+        
+        return {
+            "status": result["status"],
+            "records_uploaded": result.get("companies_uploaded", result.get("records_uploaded", 0)),
+            "cleared_existing": result["cleared_existing"],
+            "filename": file.filename,
+            "timestamp": result["timestamp"]
+        }
         
-        try:
-            uploader = DataUploader()
-            
-            if filename.endswith('.csv'):
-                result = await uploader.load_from_csv(
-                    temp_file_path, 
-                    data_type, 
-                    clear_existing
-                )
-            else:  # JSON
-                result = await uploader.load_from_json(
-                    temp_file_path, 
-                    data_type, 
-                    clear_existing
-                )
-            
-            return {
-                "status": result["status"],
-                "records_uploaded": result.get("companies_uploaded", result.get("records_uploaded", 0)),
-                "cleared_existing": result["cleared_existing"],
-                "filename": file.filename,
-                "timestamp": result["timestamp"]
-            }
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_file_path)
-            
     except ValidationError as e:
         logger.error(f"File upload validation error: {e}")
         raise HTTPException(
@@ -646,6 +820,64 @@ async def upload_file(
         )
 
 
+@app.post("/upload-stream")
+async def upload_stream(
+    request: Request,
+    format: str,
+    clear_existing: bool = False
+):
+    """
+    Stream a knowledge base upload from the raw request body.
+    
+    The body is a JSON array of entries or a CSV file with a header row,
+    sent as-is (not multipart). It is spooled to a temporary file first,
+    so the database write lock is only taken once the whole body has
+    arrived; rows are then validated and written in batches and the load
+    commits only if every row is valid. A body that stalls for
+    UPLOAD_IDLE_TIMEOUT seconds gets 408.
+    
+    Args:
+        format: 'json' or 'csv'
+        clear_existing: Whether to clear existing data first
+    """
+    if format not in ("json", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'csv'")
+    
+    uploader = _data_uploader()
+    try:
+        body = await spool_chunks(request.stream(), idle_timeout=UPLOAD_IDLE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("Stream upload stalled", idle_timeout=UPLOAD_IDLE_TIMEOUT)
+        raise HTTPException(status_code=408, detail="Upload body stalled")
+    
+    try:
+        result = await uploader.upload_knowledge_stream(read_chunks(body), format, clear_existing)
+        
+        if _enhanced_retriever and not _enhanced_retriever.tracks_changes:
+            try:
+                await _enhanced_retriever.refresh_index()
+                logger.info("Enhanced retriever index refreshed after upload")
+            except Exception as e:
+                logger.warning(f"Failed to refresh enhanced retriever: {e}")
+        
+        return {
+            "status": result["status"],
+            "records_uploaded": result["records_uploaded"],
+            "cleared_existing": result["cleared_existing"],
+            "ingest": result["ingest"],
+            "timestamp": result["timestamp"]
+        }
+        
+    except ValidationError as e:
+        logger.error(f"Stream upload validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Stream upload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Stream upload failed: {str(e)}")
+    finally:
+        await body.close()
+
+
 @app.get("/data-template/{data_type}", response_model=DataTemplateResponse)
 async def get_data_template(data_type: str):
     """
@@ -654,8 +886,8 @@ async def get_data_template(data_type: str):
     Args:
         data_type: Type of template ('companies', 'financial_records', or 'knowledge_base')
     """
+    uploader = _data_uploader()
     try:
-        uploader = DataUploader()
         template = await uploader.get_upload_template(data_type)
         
         return DataTemplateResponse(**template)
@@ -690,9 +922,8 @@ async def clear_data(data_type: str):
             detail=f"Invalid data_type. Must be one of: {valid_types}"
         )
     
+    uploader = _data_uploader()
     try:
-        uploader = DataUploader()
-        
         if data_type == "all":
             # Clear all data tables
             await uploader.clear_existing_data("financial_records")
@@ -720,6 +951,40 @@ async def clear_data(data_type: str):
         )
 
 
+def _knowledge_search_body(fragments: List[bytes], query: str, timestamp: str) -> bytes:
+    """
+    Encode a KnowledgeSearchResponse from encoded entry fragments.
+    
+    The entries come from the database through trusted code, so the body
+    is joined from bytes rather than built from KnowledgeEntry models and
+    validated again against the response model.
+    """
+    return b"".join((
+        b'{"results":', join_array(fragments),
+        b',"total_count":', str(len(fragments)).encode(),
+        b',"query":', dumps(query),
+        b',"timestamp":', dumps(timestamp),
+        b"}",
+    ))
+
+
+async def _sql_search_fragments(request: KnowledgeSearchRequest) -> List[bytes]:
+    """Search the knowledge base table directly, for when the enhanced retriever is unavailable."""
+    # Parameterised template: one validation and one prepare per connection
+    query = (KnowledgeQuery(KB_SEARCH_COLUMNS)
+             .matching(request.query, ("question", "answer", "tags"))
+             .where("category", request.category)
+             .where("state", request.state.upper() if request.state else None)
+             .where("difficulty", request.difficulty.lower() if request.difficulty else None)
+             .order_by_priority()
+             .limit(request.limit)  # Capped at MAX_RESULT_ROWS for larger knowledge bases
+             .build())
+    
+    # Execute query
+    db_result = await _driver.database_manager.execute_query(query.sql, query.params)
+    return [entry_fragment(row) for row in db_result.rows]
+
+
 @app.post("/knowledge/search", response_model=KnowledgeSearchResponse)
 async def search_knowledge_base(request: KnowledgeSearchRequest):
     """
@@ -745,100 +1010,81 @@ async def search_knowledge_base(request: KnowledgeSearchRequest):
                 state=request.state,
                 limit=request.limit
             )
-            
-            # Convert search results to response format
-            results = []
-            for sr in search_results:
-                results.append(KnowledgeEntry(
-                    id=sr.id,
-                    question=sr.question,
-                    answer=sr.answer,
-                    category=sr.category,
-                    tags=sr.metadata.get("tags"),
-                    state=sr.state,
-                    priority=sr.metadata.get("priority", "normal"),
-                    difficulty=sr.metadata.get("difficulty", "basic"),
-                    personas=sr.metadata.get("personas"),
-                    source=sr.metadata.get("source"),
-                    metadata={
-                        "score": sr.score,
-                        "confidence": sr.confidence,
-                        "match_type": sr.match_type,
-                        "retrieval_time_ms": sr.retrieval_time_ms
-                    }
-                ))
-            
-            return KnowledgeSearchResponse(
-                results=results,
-                total_count=len(results),
-                query=request.query,
-                timestamp=datetime.utcnow().isoformat()
-            )
-        
-        # Fall back to SQL search if enhanced retriever not available
-        # Build SQL query with filters
-        query_parts = ["SELECT * FROM knowledge_base WHERE 1=1"]
-        
-        # Add text search on question and answer fields
-        if request.query:
-            query_parts.append("AND (question LIKE '%{}%' OR answer LIKE '%{}%' OR tags LIKE '%{}%')".format(
-                request.query.replace("'", "''"),  # Basic SQL injection prevention
-                request.query.replace("'", "''"),
-                request.query.replace("'", "''")
-            ))
-        
-        # Add category filter
-        if request.category:
-            safe_category = request.category.replace("'", "''")
-            query_parts.append(f"AND category = '{safe_category}'")
-        
-        # Add state filter
-        if request.state:
-            safe_state = request.state.upper().replace("'", "''")
-            query_parts.append(f"AND state = '{safe_state}'")
-        
-        # Add difficulty filter
-        if request.difficulty:
-            safe_difficulty = request.difficulty.lower().replace("'", "''")
-            query_parts.append(f"AND difficulty = '{safe_difficulty}'")
+            fragments = [sr.fragment for sr in search_results]
+        else:
+            # Fall back to SQL search if enhanced retriever not available
+            fragments = await _sql_search_fragments(request)
         
-        # Order by priority and limit results
-        query_parts.append("ORDER BY CASE priority WHEN 'critical' THEN 1 WHEN 'high' THEN 2 WHEN 'normal' THEN 3 ELSE 4 END, id")
-        query_parts.append(f"LIMIT {min(request.limit, 1000)}")  # Cap at 1000 results for larger knowledge bases
+        return RawJSONResponse(_knowledge_search_body(fragments, request.query, datetime.utcnow().isoformat()))
         
-        sql_query = " ".join(query_parts)
+    except Exception as e:
+        logger.error(f"Knowledge base search failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Knowledge base search failed: {str(e)}"
+        )
+
+
+def _batch_key(search: KnowledgeSearchRequest) -> tuple:
+    """Searches differing only in case or spacing share a key (as in SearchQuery.normalized)."""
+    return (" ".join(search.query.lower().split()), (search.category or "").lower(),
+            (search.state or "").upper(), search.limit, (search.difficulty or "").lower())
+
+
+@app.post("/knowledge/search/batch", response_model=KnowledgeBatchSearchResponse)
+async def search_knowledge_base_batch(request: KnowledgeBatchSearchRequest):
+    """
+    Run many knowledge base searches in one request.
+    
+    Searches that differ only in case or spacing are run once, and the
+    enhanced retriever scores the distinct ones in a single pass sharing
+    filtered candidate sets. Results are returned in request order, each
+    shaped like a /knowledge/search response.
+    """
+    try:
+        global _driver, _enhanced_retriever
+        if _driver is None:
+            raise HTTPException(
+                status_code=503,
+                detail="FACT system not initialized"
+            )
         
-        # Execute query
-        db_result = await _driver.database_manager.execute_query(sql_query)
+        searches = request.searches
+        keys = [_batch_key(search) for search in searches]
+        fragments: Dict[tuple, List[bytes]] = {}
         
-        # Convert to response format
-        results = []
-        for row in db_result.rows:
-            results.append(KnowledgeEntry(
-                id=row["id"],
-                question=row["question"],
-                answer=row["answer"],
-                category=row["category"],
-                tags=row.get("tags"),
-                state=row.get("state"),
-                priority=row["priority"],
-                difficulty=row["difficulty"],
-                personas=row.get("personas"),
-                source=row.get("source")
-            ))
+        if _enhanced_retriever:
+            unique = {key: search for key, search in zip(keys, searches) if search.query}
+            batches = await _enhanced_retriever.search_many([
+                SearchQuery(search.query, search.category, search.state, search.limit)
+                for search in unique.values()
+            ])
+            for key, search_results in zip(unique, batches):
+                fragments[key] = [sr.fragment for sr in search_results]
         
-        return KnowledgeSearchResponse(
-            results=results,
-            total_count=len(results),
-            query=request.query,
-            timestamp=datetime.utcnow().isoformat()
-        )
+        for key, search in zip(keys, searches):
+            if key not in fragments:
+                fragments[key] = await _sql_search_fragments(search)
         
+        timestamp = datetime.utcnow().isoformat()
+        body = b"".join((
+            b'{"results":',
+            join_array(_knowledge_search_body(fragments[key], search.query, timestamp)
+                       for key, search in zip(keys, searches)),
+            b',"total_searches":', str(len(searches)).encode(),
+            b',"unique_searches":', str(len(fragments)).encode(),
+            b',"timestamp":', dumps(timestamp),
+            b"}",
+        ))
+        return RawJSONResponse(body)
+    
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Knowledge base search failed: {e}")
+        logger.error(f"Batch knowledge base search failed: {e}")
         raise HTTPException(
             status_code=500,
-            detail=f"Knowledge base search failed: {str(e)}"
+            detail=f"Batch knowledge base search failed: {str(e)}"
         )
 
 
@@ -1007,31 +1253,36 @@ async def get_knowledge_stats():
         )
 
 
-def start_server(host: str = "0.0.0.0", port: int = None):
+def start_server(host: str = "0.0.0.0", port: int = None, workers: Optional[int] = None):
     """
     Start the FastAPI server.
     
+    With more than one worker (WEB_WORKERS, "auto" for one per core) a
+    pre-fork master builds the knowledge index, forks the workers onto a
+    shared socket and supervises them: SIGHUP performs a rolling restart,
+    SIGTERM drains every worker. WEB_LOOP/WEB_HTTP select uvloop/httptools
+    and WEB_ACCESS_LOG turns access logging on, off or to a sample rate.
+    
     Args:
         host: Host to bind to (default: 0.0.0.0 for all interfaces)
         port: Port to listen on (default: from PORT env var or 8000)
+        workers: Worker processes (default: from WEB_WORKERS or 1)
     """
-    # Get port from environment or use default
-    if port is None:
-        port = int(os.environ.get("PORT", 8000))
+    options = ServingOptions.from_env(host=host, port=port)
+    if workers is not None:
+        options.workers = resolve_workers(workers)
     
-    logger.info(f"Starting FACT web server on {host}:{port}")
+    logger.info(f"Starting FACT web server on {options.host}:{options.port} "
+                f"with {options.workers} worker(s)")
     
-    # Configure uvicorn
-    config = uvicorn.Config(
-        app=app,
-        host=host,
-        port=port,
-        log_level="info",
-        access_log=True,
-        use_colors=True
-    )
+    if options.workers > 1:
+        # A worker signals the master only once it can serve, so rolling
+        # restarts never swap in a cold worker
+        os.environ.setdefault("STARTUP_WARMUP", "blocking")
+        PreforkServer(app, options, preload=preload_for_workers).run()
+        return
     
-    server = uvicorn.Server(config)
+    server = uvicorn.Server(options.uvicorn_config(app))
     server.run()
 
 
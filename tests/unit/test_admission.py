@@ -0,0 +1,301 @@
+"""
+Unit tests for admission control.
+Tests adaptive (AIMD) concurrency limits, lane-ordered bounded queues with
+deadlines, cross-endpoint priority, and fallback answers for shed VAPI
+calls.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from core import admission
+from core.admission import AdmissionController, EndpointPolicy, Lane
+from api import vapi_enhanced_webhook, vapi_webhook
+import web_server
+
+
+def controller(**policy):
+    defaults = dict(target_ms=100, initial_limit=1, max_queue=5, queue_timeout=1.0)
+    defaults.update(policy)
+    return AdmissionController({"search": EndpointPolicy(**defaults),
+                                "reports": EndpointPolicy(**dict(defaults, initial_limit=5))})
+
+
+async def hold(ticket, seconds=0.0):
+    await asyncio.sleep(seconds)
+    with ticket:
+        pass
+
+
+class TestQueueing:
+    """Test suite for lane-ordered queues."""
+
+    @pytest.mark.asyncio
+    async def test_better_lanes_go_first(self):
+        """TEST: Queued requests get freed slots by lane, then arrival"""
+        admission_control = controller()
+        first = await admission_control.admit("search", Lane.VOICE)
+        order = []
+
+        async def request(name, lane):
+            ticket = await admission_control.admit("search", lane)
+            order.append(name)
+            with ticket:
+                await asyncio.sleep(0)
+
+        waiting = [asyncio.create_task(request("analytics", Lane.ANALYTICS)),
+                   asyncio.create_task(request("interactive", Lane.INTERACTIVE))]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.create_task(request("voice", Lane.VOICE)))
+        await asyncio.sleep(0)
+        await hold(first)
+        await asyncio.gather(*waiting)
+
+        assert order == ["voice", "interactive", "analytics"]
+        assert admission_control.limiter("search").in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_sheds_waiter(self):
+        """TEST: A request still queued at its deadline is shed and its place freed"""
+        admission_control = controller()
+        first = await admission_control.admit("search", Lane.VOICE)
+
+        started = time.monotonic()
+        shed = await admission_control.admit("search", Lane.VOICE, deadline=started + 0.05)
+        expired = await admission_control.admit("search", Lane.VOICE, deadline=started - 1)
+        await hold(first)
+
+        limiter = admission_control.limiter("search")
+        assert shed is None and expired is None
+        assert 0.04 < time.monotonic() - started < 0.5
+        assert (limiter.shed, limiter.queued, limiter.in_flight) == (2, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_full_queue_evicts_worse_lane(self):
+        """TEST: With the queue full, a better lane displaces the newest worse waiter; equals are shed"""
+        admission_control = controller(max_queue=2)
+        first = await admission_control.admit("search", Lane.VOICE)
+        early = asyncio.create_task(admission_control.admit("search", Lane.INTERACTIVE))
+        late = asyncio.create_task(admission_control.admit("search", Lane.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        voice = asyncio.create_task(admission_control.admit("search", Lane.VOICE))
+        await asyncio.sleep(0)
+        rejected = await admission_control.admit("search", Lane.INTERACTIVE)
+        assert await late is None and rejected is None
+
+        await hold(first)
+        await hold(await voice)
+        await hold(await early)
+        assert admission_control.limiter("search").in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_lower_lanes_yield_across_endpoints(self):
+        """TEST: Analytics requests are shed while voice requests wait on another endpoint"""
+        admission_control = controller()
+        first = await admission_control.admit("search", Lane.VOICE)
+        waiting = asyncio.create_task(admission_control.admit("search", Lane.VOICE))
+        await asyncio.sleep(0)
+
+        during = await admission_control.admit("reports", Lane.ANALYTICS)
+        await hold(first)
+        await hold(await waiting)
+        after = await admission_control.admit("reports", Lane.ANALYTICS)
+
+        assert during is None and after is not None
+        assert admission_control.get_stats()["endpoints"]["reports"]["shed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_admits_everything(self):
+        """TEST: With admission control off every request is admitted"""
+        admission_control = AdmissionController({"search": EndpointPolicy(target_ms=100, initial_limit=1)},
+                                                enabled=False)
+        tickets = [await admission_control.admit("search", Lane.ANALYTICS) for _ in range(5)]
+
+        assert all(tickets) and admission_control.limiter("search").in_flight == 5
+
+
+class TestAdaptiveLimit:
+    """Test suite for AIMD limit adaptation."""
+
+    @pytest.mark.asyncio
+    async def test_limit_adapts_to_latency(self):
+        """TEST: Slow completions cut the limit once per target window; fast busy ones grow it"""
+        admission_control = controller(initial_limit=10, min_limit=2, max_limit=12)
+        limiter = admission_control.limiter("search")
+
+        for _ in range(5):
+            limiter.in_flight += 1
+            limiter.release(latency_ms=500)
+        assert limiter.limit == pytest.approx(8.0)
+
+        limiter._last_decrease -= 1
+        limiter.in_flight += 1
+        limiter.release(latency_ms=50, overloaded=True)
+        assert limiter.limit == pytest.approx(6.4)
+
+        limiter.in_flight = 6
+        for _ in range(200):
+            limiter._adapt(latency_ms=20, overloaded=False)
+        assert limiter.limit == 12.0
+
+        limiter.in_flight = 0
+        limiter.limit = 5.0
+        limiter._adapt(latency_ms=20, overloaded=False)
+        assert limiter.limit == 5.0
+
+    @pytest.mark.asyncio
+    async def test_timeouts_count_as_overload(self):
+        """TEST: A request failing with a timeout shrinks the limit even when it was quick"""
+        admission_control = controller(initial_limit=10)
+        ticket = await admission_control.admit("search", Lane.VOICE)
+
+        with pytest.raises(asyncio.TimeoutError):
+            with ticket:
+                raise asyncio.TimeoutError()
+
+        assert admission_control.limiter("search").limit == pytest.approx(8.0)
+
+    def test_voice_deadline(self, monkeypatch):
+        """TEST: Voice deadlines leave the endpoint's service time and a margin inside the VAPI timeout"""
+        monkeypatch.setenv("VAPI_TIMEOUT_SECONDS", "10")
+        admission_control = controller()
+        admission_control.limiter("search").latency_ms = 3000
+
+        assert admission_control.voice_deadline("search", received=100.0) == pytest.approx(
+            100.0 + 10 - admission.DEADLINE_MARGIN - 3)
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """A controller whose single VAPI slot is taken, with no time left to queue."""
+    monkeypatch.setenv("VAPI_TIMEOUT_SECONDS", "0.5")
+    admission_control = AdmissionController({"vapi_webhook": EndpointPolicy(target_ms=100, initial_limit=1),
+                                             "query": EndpointPolicy(target_ms=100, initial_limit=1,
+                                                                     queue_timeout=0.01)})
+    monkeypatch.setattr(admission, "_controller", admission_control)
+    admission_control.limiter("vapi_webhook").in_flight = 1
+    admission_control.limiter("query").in_flight = 1
+    return admission_control
+
+
+class TestShedResponses:
+    """Test suite for responses to shed requests."""
+
+    @pytest.mark.asyncio
+    async def test_vapi_webhook_returns_default_answer(self, saturated):
+        """TEST: A shed searchKnowledge call gets the default search answer immediately"""
+        app = FastAPI()
+        app.include_router(vapi_webhook.router)
+        app.dependency_overrides[vapi_webhook.verify_vapi_request] = lambda: True
+        body = {"message": {"type": "function-call",
+                            "functionCall": {"name": "searchKnowledge",
+                                             "parameters": {"query": "georgia bond", "state": "GA"}}},
+                "call": {"id": "call-1"}}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            response = await client.post("/vapi/webhook", json=body)
+            elapsed = time.perf_counter() - started
+
+        result = response.json()
+        assert response.status_code == 200 and elapsed < 0.2
+        assert result["result"] == dict(vapi_webhook._default_answer(None, "GA"), shed=True)
+        assert result["metadata"]["shed"] is True
+
+    @pytest.mark.asyncio
+    async def test_enhanced_tool_calls_return_default_answers(self, saturated):
+        """TEST: Every tool call of a shed message gets a default answer under its tool call id"""
+        app = FastAPI()
+        app.include_router(vapi_enhanced_webhook.router)
+        app.dependency_overrides[vapi_webhook.verify_vapi_request] = lambda: True
+        calls = [{"id": "t1", "type": "function",
+                  "function": {"name": "searchKnowledge", "arguments": {"query": "exam", "state": "FL"}}},
+                 {"id": "t2", "type": "function", "function": {"name": "detectPersona", "arguments": {}}}]
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/vapi-enhanced/webhook",
+                                         json={"message": {"type": "tool-calls", "toolCalls": calls}})
+
+        results = response.json()["results"]
+        assert [r["toolCallId"] for r in results] == ["t1", "t2"]
+        assert results[0]["result"]["state"] == "FL" and all(r["result"]["shed"] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_query_returns_503(self, saturated, monkeypatch):
+        """TEST: A shed /query gets 503 with Retry-After instead of waiting"""
+        class Driver:
+            _initialized = True
+
+            async def process_fact_query(self, query):
+                return "answer"
+
+        monkeypatch.setattr(web_server, "_driver", Driver())
+        app = FastAPI()
+        app.post("/query")(web_server.process_query)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            shed = await client.post("/query", json={"query": "license cost"})
+            saturated.limiter("query").in_flight = 0
+            served = await client.post("/query", json={"query": "license cost"})
+
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+        assert served.status_code == 200 and served.json()["response"] == "answer"
+
+
+class TestAdmissionPerformance:
+    """Test suite for behaviour against a degrading backend."""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_answers_within_timeout_under_overload(self):
+        """BENCHMARK: Callers answered within a 1 s timeout when a backend slows with concurrency"""
+        timeout = 1.0
+
+        async def run(enabled):
+            admission_control = AdmissionController(
+                {"voice": EndpointPolicy(target_ms=200, initial_limit=20, max_queue=40)}, enabled=enabled)
+            active = {"now": 0}
+            outcomes = []
+
+            async def call():
+                received = time.monotonic()
+                ticket = await admission_control.admit("voice", Lane.VOICE, received + timeout * 0.6)
+                if ticket is None:
+                    outcomes.append(("fallback", time.monotonic() - received))
+                    return
+                with ticket:
+                    active["now"] += 1
+                    done = 0.0
+                    while done < 1:
+                        # A shared backend: capacity is split across requests and
+                        # lost to contention as concurrency grows
+                        await asyncio.sleep(0.01)
+                        done += 0.01 / (0.02 * active["now"] * (1 + active["now"] / 20))
+                    active["now"] -= 1
+                outcomes.append(("answer", time.monotonic() - received))
+
+            for _ in range(4):
+                await asyncio.gather(*(call() for _ in range(60)))
+            in_time = sum(1 for _, elapsed in outcomes if elapsed <= timeout)
+            answers = sum(1 for kind, elapsed in outcomes if kind == "answer" and elapsed <= timeout)
+            return in_time, answers, len(outcomes), admission_control.limiter("voice").limit
+
+        unlimited = await run(False)
+        limited = await run(True)
+
+        print(f"\nwithout admission control: {unlimited[0]}/{unlimited[2]} callers answered within "
+              f"{timeout:.0f} s ({unlimited[1]} knowledge answers)")
+        print(f"with admission control:    {limited[0]}/{limited[2]} callers answered within "
+              f"{timeout:.0f} s ({limited[1]} knowledge answers, rest fallback); final limit {limited[3]:.1f}")
+        assert limited[0] > unlimited[0] * 2 and limited[1] > 0
@@ -0,0 +1,233 @@
+"""
+Unit tests for Arcade gateway routing and client retries.
+Uses a fake Arcade client to exercise latency-aware method ordering,
+hedged requests, per-tool circuit breakers and deadline-bounded backoff.
+"""
+
+import asyncio
+import random
+import time
+import pytest
+
+from src.arcade.client import ArcadeClient
+from src.arcade.errors import ArcadeTimeoutError
+from src.arcade.gateway import ArcadeGateway
+from src.arcade.routing import ExecutionRouter
+from src.cache.resilience import CircuitBreakerConfig
+from src.core.errors import ToolExecutionError
+
+
+class FakeArcadeClient:
+    """Gateway-facing fake: each call pops a (delay, error) script entry."""
+
+    def __init__(self, script=None, default=(0.0, None)):
+        self.script = list(script or [])
+        self.default = default
+        self.calls = 0
+        self.cancelled = 0
+
+    async def execute_tool(self, tool_name, arguments, timeout=None, user_id=None):
+        self.calls += 1
+        delay, error = self.script.pop(0) if self.script else self.default
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if error:
+            raise error
+        return {"success": True, "data": {"call": self.calls}}
+
+
+class FakeTools:
+    """arcadepy-compatible `tools` namespace for ArcadeClient."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def execute(self, request):
+        self.calls += 1
+        delay, error = self.script.pop(0) if self.script else (0.0, None)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return {"success": True, "data": "ok"}
+
+
+class FakeArcadeSDK:
+    def __init__(self, script):
+        self.tools = FakeTools(script)
+
+
+def make_router(**kwargs):
+    kwargs.setdefault("min_samples", 3)
+    kwargs.setdefault("explore_rate", 0.0)
+    kwargs.setdefault("rng", random.Random(0))
+    return ExecutionRouter(**kwargs)
+
+
+class TestExecutionRouter:
+    """Test suite for latency/error-aware ordering."""
+
+    def test_keeps_preference_until_sampled(self):
+        """TEST: Configured order holds until every method has data"""
+        router = make_router()
+        for _ in range(5):
+            router.record("t", "local", 500.0, True)
+
+        assert router.order("t", ["local", "arcade"]) == ["local", "arcade"]
+
+    def test_prefers_faster_method(self):
+        """TEST: The lower EWMA latency method is tried first"""
+        router = make_router()
+        for _ in range(5):
+            router.record("t", "local", 500.0, True)
+            router.record("t", "arcade", 50.0, True)
+
+        assert router.order("t", ["local", "arcade"]) == ["arcade", "local"]
+
+    def test_error_rate_penalises_method(self):
+        """TEST: A fast but failing method ranks below a reliable one"""
+        router = make_router(breaker_config=CircuitBreakerConfig(failure_threshold=100))
+        for i in range(10):
+            router.record("t", "arcade", 20.0, i % 2 == 0)
+            router.record("t", "local", 200.0, True)
+
+        assert router.order("t", ["arcade", "local"]) == ["local", "arcade"]
+
+    def test_open_circuit_drops_method_per_tool(self):
+        """TEST: Circuits are tracked per tool"""
+        router = make_router(breaker_config=CircuitBreakerConfig(failure_threshold=2, recovery_timeout=60))
+        router.record("a", "arcade", 10.0, False)
+        router.record("a", "arcade", 10.0, False)
+
+        assert router.order("a", ["arcade", "local"]) == ["local"]
+        assert router.order("b", ["arcade", "local"]) == ["arcade", "local"]
+
+    def test_hedge_delay_uses_p95(self):
+        """TEST: Hedging waits for the p95 of recent latencies"""
+        router = make_router()
+        for latency in range(1, 101):
+            router.record("t", "arcade", float(latency), True)
+
+        assert router.hedge_delay("t", "arcade") == pytest.approx(0.095, abs=0.002)
+
+
+class TestArcadeGateway:
+    """Test suite for gateway execution with the fake client."""
+
+    @pytest.mark.asyncio
+    async def test_idempotent_tool_is_hedged(self):
+        """TEST: A slow primary is raced by a hedge and the loser is cancelled"""
+        router = make_router(min_hedge_delay_ms=1)
+        for _ in range(5):
+            router.record("search", "arcade", 10.0, True)
+        fake = FakeArcadeClient(script=[(1.0, None), (0.0, None)])
+        gateway = ArcadeGateway(fake, prefer_arcade=True, router=router, idempotent_tools=["search"])
+
+        start = time.perf_counter()
+        result = await gateway.execute_tool("search", {}, timeout=5)
+        await asyncio.sleep(0)
+
+        assert time.perf_counter() - start < 0.5
+        assert result["execution_method"] == "arcade"
+        assert gateway.stats["hedged_requests"] == 1
+        assert gateway.stats["hedge_wins"] == 1
+        assert fake.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_tool_is_not_hedged(self):
+        """TEST: Tools not marked idempotent never get a duplicate request"""
+        router = make_router(min_hedge_delay_ms=1)
+        for _ in range(5):
+            router.record("write", "arcade", 10.0, True)
+        fake = FakeArcadeClient(script=[(0.1, None)])
+        gateway = ArcadeGateway(fake, prefer_arcade=True, router=router)
+
+        await gateway.execute_tool("write", {}, timeout=5)
+
+        assert fake.calls == 1
+        assert gateway.stats["hedged_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_shared_across_methods(self):
+        """TEST: A slow Arcade call cannot overrun the deadline shared by all methods"""
+        fake = FakeArcadeClient(default=(5.0, None))
+        gateway = ArcadeGateway(fake, prefer_arcade=True, router=make_router())
+
+        async def local_tool():
+            return {"value": 1}
+
+        start = time.perf_counter()
+        with pytest.raises(ToolExecutionError):
+            await gateway.execute_tool("t", {}, local_function=local_tool, timeout=0.2)
+
+        assert time.perf_counter() - start < 1.0
+        assert gateway.router.stats("t", "arcade").error_rate > 0
+
+    @pytest.mark.asyncio
+    async def test_routes_to_faster_method_after_learning(self):
+        """TEST: Observed latency moves a faster Arcade ahead of slow local execution"""
+        router = make_router()
+        fake = FakeArcadeClient(default=(0.0, None))
+        gateway = ArcadeGateway(fake, router=router)
+
+        async def slow_local():
+            await asyncio.sleep(0.02)
+            return {"value": 1}
+
+        for _ in range(3):
+            router.record("t", "arcade", 1.0, True)
+        for _ in range(3):
+            await gateway.execute_tool("t", {}, local_function=slow_local)
+
+        result = await gateway.execute_tool("t", {}, local_function=slow_local)
+        assert result["execution_method"] == "arcade"
+
+
+class TestArcadeClientRetry:
+    """Test suite for deadline-bounded, jittered retries."""
+
+    @pytest.mark.asyncio
+    async def test_retries_after_transient_error(self):
+        """TEST: Transient failures are retried with a short jittered backoff"""
+        sdk = FakeArcadeSDK([(0.0, RuntimeError("boom")), (0.0, None)])
+        client = ArcadeClient(client=sdk, backoff_base=0.01, backoff_cap=0.02)
+
+        result = await client.execute_tool("t", {}, timeout=2)
+
+        assert result["success"]
+        assert sdk.tools.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_attempt_is_retried_within_deadline(self):
+        """TEST: attempt_timeout stops one slow attempt consuming the whole budget"""
+        sdk = FakeArcadeSDK([(5.0, None), (0.0, None)])
+        client = ArcadeClient(client=sdk, attempt_timeout=0.1, backoff_base=0.01)
+
+        result = await client.execute_tool("t", {}, timeout=2)
+
+        assert result["success"]
+        assert sdk.tools.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_backoff_never_exceeds_deadline(self):
+        """TEST: Retries stop when the backoff would pass the deadline"""
+        sdk = FakeArcadeSDK([(0.0, RuntimeError("boom"))] * 10)
+        client = ArcadeClient(client=sdk, max_retries=10, backoff_base=1.0, backoff_cap=1.0)
+
+        start = time.perf_counter()
+        with pytest.raises(Exception):
+            await client.execute_tool("t", {}, timeout=0.3)
+
+        assert time.perf_counter() - start < 0.35
+
+    @pytest.mark.asyncio
+    async def test_deadline_surfaces_as_timeout(self):
+        """TEST: Exhausting the deadline raises ArcadeTimeoutError"""
+        sdk = FakeArcadeSDK([(5.0, None)])
+        client = ArcadeClient(client=sdk, max_retries=0)
+
+        with pytest.raises(ArcadeTimeoutError):
+            await client.execute_tool("t", {}, timeout=0.1)
@@ -0,0 +1,231 @@
+"""
+Unit tests for batch knowledge search.
+Tests query normalization and deduplication in EnhancedRetriever.search_many(),
+the /knowledge/search/batch endpoint, and concurrent processing of the
+tool calls in one VAPI message.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from api import vapi_enhanced_webhook
+from api.responses import FastJSONResponse
+from retrieval.enhanced_search import EnhancedRetriever, SearchQuery
+import web_server
+from web_server import KnowledgeBatchSearchResponse, MAX_BATCH_SEARCHES
+
+TOPICS = ["exam", "bond", "license", "insurance", "renewal", "reciprocity", "fees", "experience"]
+STATES = ["GA", "FL", "TX", "CA"]
+
+
+def make_entries(count):
+    return [{
+        "id": i + 1,
+        "question": f"What are the {TOPICS[i % 8]} requirements in {STATES[i % 4]} for case {i}?",
+        "answer": f"Case {i}: {STATES[i % 4]} {TOPICS[i % 8]} rules need an application and fees.",
+        "category": TOPICS[i % 8],
+        "tags": TOPICS[i % 8],
+        "state": STATES[i % 4],
+        "priority": "normal",
+        "difficulty": "basic",
+    } for i in range(count)]
+
+
+def make_retriever(count=200):
+    retriever = EnhancedRetriever(None)
+    retriever.in_memory_index.build_index(make_entries(count))
+    return retriever
+
+
+class CountingBackend:
+    """Full-text backend stand-in serving candidates from a list."""
+
+    available = True
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.queries = []
+
+    async def candidates(self, query, category=None, state=None, limit=50):
+        self.queries.append(query)
+        return [e for e in self.entries if not state or e["state"] == state][:limit]
+
+
+class TestSearchMany:
+    """Test suite for EnhancedRetriever.search_many()."""
+
+    def test_normalized(self):
+        """TEST: Case and spacing are normalized for deduplication; limits are kept"""
+        assert SearchQuery("  Georgia   EXAM fees ", "Exam", "ga", 3).normalized() == \
+            SearchQuery("georgia exam fees", "exam", "GA", 3)
+
+    @pytest.mark.asyncio
+    async def test_matches_single_searches_in_order(self):
+        """TEST: Each query gets what search() returns for it, in the order given"""
+        retriever = make_retriever()
+        queries = [SearchQuery("bond requirements", state="FL"), SearchQuery("exam fees", category="exam", limit=3),
+                   SearchQuery("renewal in texas")]
+
+        batch = await retriever.search_many(queries, use_cache=False)
+
+        for query, results in zip(queries, batch):
+            single = await retriever.search(query.query, query.category, query.state, query.limit, use_cache=False)
+            assert [r.id for r in results] == [r.id for r in single]
+            assert [r.score for r in results] == pytest.approx([r.score for r in single])
+
+    @pytest.mark.asyncio
+    async def test_deduplicates_and_shares_candidates(self, monkeypatch):
+        """TEST: Duplicate queries are scored once and queries with equal filters share candidates"""
+        retriever = make_retriever()
+        index = retriever.in_memory_index
+        calls = {"rank": 0, "candidates": 0}
+        rank, candidates = index.rank_entries, index.candidate_positions
+
+        def counting_rank(*args, **kwargs):
+            calls["rank"] += 1
+            return rank(*args, **kwargs)
+
+        def counting_candidates(*args, **kwargs):
+            calls["candidates"] += 1
+            return candidates(*args, **kwargs)
+
+        monkeypatch.setattr(index, "rank_entries", counting_rank)
+        monkeypatch.setattr(index, "candidate_positions", counting_candidates)
+
+        batch = await retriever.search_many([
+            SearchQuery("Bond requirements", state="fl"), SearchQuery("bond  requirements", state="FL"),
+            SearchQuery("exam fees", state="FL"), SearchQuery("exam fees"),
+        ])
+
+        assert calls == {"rank": 3, "candidates": 2}
+        assert batch[0] is batch[1]
+        assert len(retriever._cache) == 3
+
+    @pytest.mark.asyncio
+    async def test_server_candidates_fetched_once_per_query(self):
+        """TEST: With a full-text backend, each distinct query fetches candidates once"""
+        backend = CountingBackend(make_entries(50))
+        retriever = EnhancedRetriever(candidate_backend=backend)
+
+        batch = await retriever.search_many([SearchQuery("exam fees"), SearchQuery("EXAM FEES"),
+                                             SearchQuery("bond", state="GA")])
+
+        assert backend.queries == ["exam fees", "bond"]
+        assert batch[0] and all(r.state == "GA" for r in batch[2])
+
+
+@pytest.fixture
+def batch_app(monkeypatch):
+    monkeypatch.setattr(web_server, "_driver", object())
+    monkeypatch.setattr(web_server, "_enhanced_retriever", make_retriever())
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.post("/knowledge/search/batch", response_model=KnowledgeBatchSearchResponse)(
+        web_server.search_knowledge_base_batch)
+    return app
+
+
+class TestBatchEndpoint:
+    """Test suite for /knowledge/search/batch."""
+
+    @pytest.mark.asyncio
+    async def test_batch_endpoint(self, batch_app):
+        """TEST: Results come back per search in request order, with duplicate searches run once"""
+        searches = [{"query": "bond requirements", "state": "FL", "limit": 2},
+                    {"query": "exam fees", "limit": 3},
+                    {"query": "Bond Requirements", "state": "fl", "limit": 2}]
+        transport = httpx.ASGITransport(app=batch_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/knowledge/search/batch", json={"searches": searches})
+            too_many = await client.post("/knowledge/search/batch",
+                                         json={"searches": [{"query": "x"}] * (MAX_BATCH_SEARCHES + 1)})
+
+        assert response.status_code == 200
+        body = KnowledgeBatchSearchResponse(**response.json())
+        assert (body.total_searches, body.unique_searches) == (3, 2)
+        assert [item.query for item in body.results] == [s["query"] for s in searches]
+        assert [e.id for e in body.results[0].results] == [e.id for e in body.results[2].results]
+        assert all(e.state == "FL" for e in body.results[0].results)
+        assert too_many.status_code == 422
+
+
+class TestToolCalls:
+    """Test suite for concurrent VAPI tool call processing."""
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_run_together(self, monkeypatch):
+        """TEST: Searches go through one batch, other calls run concurrently, failures stay isolated"""
+        batches = []
+        running = {"now": 0, "peak": 0}
+
+        async def search_many(searches):
+            batches.append([s["query"] for s in searches])
+            return [{"answer": s["query"]} for s in searches]
+
+        async def process(name, parameters, call_id):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            if name == "broken":
+                raise RuntimeError("boom")
+            return {"function": name}
+
+        monkeypatch.setattr(vapi_enhanced_webhook, "search_knowledge_many", search_many)
+        monkeypatch.setattr(vapi_enhanced_webhook, "process_function_call", process)
+
+        results = await vapi_enhanced_webhook.process_function_calls([
+            ("searchKnowledge", {"query": "georgia exam"}), ("detectPersona", {"text": "hi"}),
+            ("broken", {}), ("searchKnowledge", {"query": "florida bond"}),
+        ], "call-1")
+
+        assert batches == [["georgia exam", "florida bond"]]
+        assert running["peak"] == 2
+        assert results[0] == {"answer": "georgia exam"} and results[3] == {"answer": "florida bond"}
+        assert results[1] == {"function": "detectPersona"}
+        assert "boom" in results[2]["error"]
+
+
+    @pytest.mark.asyncio
+    async def test_search_knowledge_many(self, monkeypatch):
+        """TEST: Batched VAPI searches use the shared retriever and answer every search"""
+        import shared_state
+        from api import vapi_webhook
+        monkeypatch.setattr(shared_state, "_enhanced_retriever", make_retriever())
+
+        results = await vapi_webhook.search_knowledge_many([
+            {"query": "bond requirements", "state": "FL"}, {"query": "qqq", "state": "NV"}])
+
+        assert (results[0]["source"], results[0]["state"]) == ("knowledge_base", "FL")
+        assert (results[1]["source"], results[1]["state"]) == ("default", "NV")
+
+
+class TestBatchSearchPerformance:
+    """Test suite for batch search throughput."""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_search_many_vs_sequential(self):
+        """BENCHMARK: 80 queries (half repeats in other case/spacing) via search() vs search_many()"""
+        retriever = make_retriever(500)
+        distinct = [SearchQuery(f"{TOPICS[i % 8]} requirements case {i}", state=STATES[i % 4]) for i in range(40)]
+        queries = distinct + [SearchQuery(q.query.upper() + " ", q.category, q.state.lower()) for q in distinct]
+
+        started = time.perf_counter()
+        for q in queries:
+            await retriever.search(q.query, q.category, q.state, q.limit, use_cache=False)
+        sequential_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        await retriever.search_many(queries, use_cache=False)
+        batch_ms = (time.perf_counter() - started) * 1000
+
+        print(f"\n{len(queries)} queries over 500 entries: sequential {sequential_ms:.0f} ms, "
+              f"search_many {batch_ms:.0f} ms ({sequential_ms / batch_ms:.1f}x)")
+        assert batch_ms < sequential_ms
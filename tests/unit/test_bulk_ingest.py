@@ -0,0 +1,242 @@
+"""
+Unit tests for bulk knowledge ingest.
+Tests batch validation, SQLite executemany loads with deferred index and
+full-text maintenance, transactional clear and rollback, progress reports,
+the PostgreSQL merge statement, and benchmarks against per-row inserts.
+"""
+
+import sqlite3
+import time
+import pytest
+import pytest_asyncio
+
+from src.core.errors import ValidationError
+from src.data_upload import DataUploader
+from src.db.bulk_ingest import (
+    POSTGRES_INGEST_COLUMNS, SQLITE_INGEST_COLUMNS, _merge_sql, entry_id, ingest_sqlite
+)
+from src.db.connection import DatabaseManager
+from src.db.fulltext import SQLiteFullTextBackend
+from src.db.models import DATABASE_SCHEMA, FULLTEXT_SCHEMA
+
+
+def make_entries(count, start=0):
+    return [
+        {
+            "question": f"How long is the Georgia exam {i}?",
+            "answer": f"The Georgia exam {i} takes about three hours to finish.",
+            "category": "Exam Prep",
+            "state": "ga",
+            "tags": "georgia,exam",
+            "priority": "HIGH" if i % 2 else "urgent",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def make_database(path, count=0):
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executescript(FULLTEXT_SCHEMA)
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, state) VALUES (?, ?, ?, ?)",
+            [(f"Existing question {i}", f"Existing answer {i} text", "general", "TX")
+             for i in range(count)])
+
+
+def schema_objects(path):
+    with sqlite3.connect(path) as conn:
+        return sorted(conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE tbl_name = 'knowledge_base' "
+            "AND type IN ('index', 'trigger') AND sql IS NOT NULL").fetchall())
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = str(tmp_path / "fact.db")
+    make_database(path, 5)
+    manager = DatabaseManager(path, pool_size=2)
+    yield path, manager
+    await manager.cleanup()
+
+
+@pytest.fixture
+def uploader(tmp_path):
+    return DataUploader(DatabaseManager(str(tmp_path / "unused.db")))
+
+
+class TestBatchValidation:
+    """Test suite for DataUploader.validate_knowledge_batch."""
+
+    def test_matches_per_row_rules(self, uploader):
+        """TEST: Batch validation normalises exactly like validate_knowledge_base_data"""
+        entries = make_entries(3) + [{"question": "Bond amount?", "answer": "It is $10,000 in GA.",
+                                      "category": "bonds", "tags": None, "difficulty": "Advanced"}]
+
+        rows, errors = uploader.validate_knowledge_batch(entries)
+
+        assert errors == []
+        expected = []
+        for entry in entries:
+            validated = uploader.validate_knowledge_base_data(
+                {k: v for k, v in entry.items() if v is not None})
+            expected.append(tuple(validated[column] for column in SQLITE_INGEST_COLUMNS))
+        assert rows == expected
+        assert rows[0][SQLITE_INGEST_COLUMNS.index("priority")] == "normal"
+        assert rows[1][SQLITE_INGEST_COLUMNS.index("category")] == "exam_prep"
+
+    def test_reports_every_bad_row(self, uploader):
+        """TEST: Errors are collected for all rows, in row order, with their row numbers"""
+        entries = make_entries(4)
+        entries[1]["answer"] = "short"
+        del entries[2]["category"]
+        entries[3]["question"] = "Why"
+
+        rows, errors = uploader.validate_knowledge_batch(entries)
+
+        assert len(rows) == 1
+        assert errors[0] == "Row 2: Answer must be at least 10 characters long"
+        assert errors[1].startswith("Row 3: Missing required fields")
+        assert errors[2] == "Row 4: Question must be at least 5 characters long"
+
+    def test_postgres_ids(self, uploader):
+        """TEST: Postgres rows carry integer ids, or None to take the next sequence value"""
+        entries = make_entries(3)
+        entries[0]["id"] = "42"
+        entries[1]["id"] = "KB_2"
+
+        rows, _ = uploader.validate_knowledge_batch(entries, POSTGRES_INGEST_COLUMNS)
+
+        assert [row[0] for row in rows] == [42, None, None]
+        assert entry_id(7) == 7 and entry_id(None) is None
+
+
+class TestSQLiteIngest:
+    """Test suite for ingest_sqlite and the SQLite upload path."""
+
+    @pytest.mark.asyncio
+    async def test_upload_appends_and_reports(self, database):
+        """TEST: upload_knowledge_base loads every row and reports batch throughput"""
+        path, manager = database
+        reports = []
+
+        result = await DataUploader(manager).upload_knowledge_base(
+            make_entries(250), batch_size=100, progress=reports.append)
+
+        assert result["records_uploaded"] == 250
+        assert result["ingest"]["backend"] == "sqlite"
+        assert result["ingest"]["batches"] == 3
+        assert not result["ingest"]["deferred_indexes"]
+        assert [r.rows_done for r in reports] == [100, 200, 250]
+        assert all(r.rows_total == 250 and r.rows_per_second > 0 for r in reports)
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM knowledge_base").fetchone()[0] == 255
+
+    @pytest.mark.asyncio
+    async def test_deferred_indexes_are_restored(self, database):
+        """TEST: A large load drops and rebuilds indexes and FTS triggers, and search still works"""
+        path, manager = database
+        before = schema_objects(path)
+
+        async with manager.writer() as conn:
+            rows, _ = DataUploader(manager).validate_knowledge_batch(make_entries(1500))
+            report = await ingest_sqlite(conn, rows, batch_size=500)
+
+        assert report.deferred_indexes
+        assert schema_objects(path) == before
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+            # Triggers are live again after the load
+            conn.execute("INSERT INTO knowledge_base (question, answer, category) "
+                         "VALUES ('Zebra licence fee?', 'Zebra licences cost nothing.', 'fees')")
+
+        backend = SQLiteFullTextBackend(path)
+        try:
+            hits = await backend.candidates("georgia exam 1499", limit=3)
+            assert hits[0]["question"] == "How long is the Georgia exam 1499?"
+            assert [hit["category"] for hit in await backend.candidates("zebra")] == ["fees"]
+        finally:
+            await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_clear_existing_is_atomic(self, database):
+        """TEST: A failed load with clear_existing leaves the original rows in place"""
+        path, manager = database
+        rows, _ = DataUploader(manager).validate_knowledge_batch(make_entries(10))
+        rows[7] = rows[7][:2] + (None,) + rows[7][3:]  # category is NOT NULL
+
+        with pytest.raises(sqlite3.IntegrityError):
+            async with manager.writer() as conn:
+                await ingest_sqlite(conn, rows, clear_existing=True, batch_size=5)
+
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM knowledge_base").fetchone()[0] == 5
+
+        result = await DataUploader(manager).upload_knowledge_base(make_entries(10), clear_existing=True)
+        assert result["cleared_existing"]
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM knowledge_base").fetchone()[0] == 10
+
+    @pytest.mark.asyncio
+    async def test_validation_failure_writes_nothing(self, database):
+        """TEST: One invalid row rejects the upload before any rows are written"""
+        path, manager = database
+        entries = make_entries(20)
+        entries[13]["answer"] = ""
+
+        with pytest.raises(ValidationError, match="Row 14"):
+            await DataUploader(manager).upload_knowledge_base(entries, clear_existing=True)
+
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM knowledge_base").fetchone()[0] == 5
+
+
+class TestPostgresMerge:
+    """The staging-table merge statement."""
+
+    def test_merge_sql(self):
+        """TEST: Merge keeps the last staged row per id and upserts every non-key column"""
+        sql = _merge_sql(POSTGRES_INGEST_COLUMNS)
+
+        assert "SELECT DISTINCT ON (id)" in sql
+        assert "ORDER BY id, seq DESC" in sql
+        assert "ON CONFLICT (id) DO UPDATE SET" in sql
+        assert "id = EXCLUDED.id" not in sql
+        for column in POSTGRES_INGEST_COLUMNS[1:]:
+            assert f"{column} = EXCLUDED.{column}" in sql
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_ingest_vs_per_row(tmp_path):
+    """BENCHMARK: Loading 20k entries with per-row validate+insert vs the bulk pipeline"""
+    entries = make_entries(20000)
+
+    per_row_path = str(tmp_path / "per_row.db")
+    make_database(per_row_path)
+    manager = DatabaseManager(per_row_path, pool_size=1)
+    uploader = DataUploader(manager)
+    start = time.perf_counter()
+    async with manager.writer() as conn:
+        for entry in entries:
+            await conn.execute(
+                "INSERT INTO knowledge_base (question, answer, category, tags, metadata, state, "
+                "priority, personas, source, difficulty) VALUES (:question, :answer, :category, "
+                ":tags, :metadata, :state, :priority, :personas, :source, :difficulty)",
+                uploader.validate_knowledge_base_data(entry))
+        await conn.commit()
+    per_row = time.perf_counter() - start
+    await manager.cleanup()
+
+    bulk_path = str(tmp_path / "bulk.db")
+    make_database(bulk_path)
+    manager = DatabaseManager(bulk_path, pool_size=1)
+    start = time.perf_counter()
+    result = await DataUploader(manager).upload_knowledge_base(entries)
+    bulk = time.perf_counter() - start
+    await manager.cleanup()
+
+    print(f"\nper-row: {per_row:.2f}s ({len(entries) / per_row:.0f} rows/s)"
+          f"\nbulk:    {bulk:.2f}s ({result['ingest']['rows_per_second']:.0f} rows/s)")
+    assert result["records_uploaded"] == len(entries)
+    assert bulk < per_row / 2
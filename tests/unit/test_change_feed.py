@@ -0,0 +1,260 @@
+"""
+Unit tests for knowledge base change data capture.
+Tests the SQLite change log and high-water-mark polling, PostgreSQL NOTIFY
+handling, incremental index maintenance in EnhancedRetriever, result cache
+invalidation, and benchmarks applying changes against a full reload.
+"""
+
+import asyncio
+import sqlite3
+import time
+import pytest
+import pytest_asyncio
+
+from src.db.change_feed import ChangeSet, PostgresChangeFeed, SQLiteChangeFeed
+from src.db.connection import DatabaseManager
+from src.db.models import DATABASE_SCHEMA, FULLTEXT_SCHEMA
+from src.retrieval.enhanced_search import EnhancedRetriever, InMemoryIndex, INDEX_QUERY
+
+
+def make_database(path, count):
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executescript(FULLTEXT_SCHEMA)
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, tags, state) VALUES (?, ?, ?, ?, ?)",
+            [(f"Georgia question {i}", f"Answer {i} about bonds and exams", "licensing", "georgia", "GA")
+             for i in range(count)])
+
+
+def write(path, *statements):
+    with sqlite3.connect(path) as conn:
+        for statement in statements:
+            conn.execute(*statement) if isinstance(statement, tuple) else conn.execute(statement)
+
+
+def index_state(index):
+    entries = {entry["id"]: dict(entry) for entry in index.entries}
+    assert all(index.entries[position]["id"] == entry_id for entry_id, position in index.id_to_index.items())
+    return entries, dict(index.keyword_index), dict(index.category_index), dict(index.state_index)
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = str(tmp_path / "fact.db")
+    make_database(path, 50)
+    feed = SQLiteChangeFeed(path, interval=0.05)
+    manager = DatabaseManager(path, pool_size=2)
+    retriever = EnhancedRetriever(manager, change_feed=feed)
+    yield path, feed, retriever
+    await retriever.close()
+    await manager.cleanup()
+
+
+class TestSQLiteChangeLog:
+    """Test suite for the trigger-maintained change log."""
+
+    @pytest.mark.asyncio
+    async def test_poll_reports_writes_above_mark(self, database):
+        """TEST: Inserts, updates and deletes after mark() arrive once, in one change set"""
+        path, feed, _ = database
+        assert await feed.ensure_schema()
+        await feed.mark()
+
+        write(path,
+              "INSERT INTO knowledge_base (question, answer, category) VALUES ('New q?', 'New answer text', 'fees')",
+              "UPDATE knowledge_base SET answer = 'Updated answer text' WHERE id = 3",
+              "DELETE FROM knowledge_base WHERE id = 7")
+        changes = await feed.poll()
+
+        assert sorted(row["id"] for row in changes.upserts) == [3, 51]
+        assert changes.deleted == [7]
+        assert {row["id"]: row["answer"] for row in changes.upserts}[3] == "Updated answer text"
+        assert not await feed.poll()
+
+    @pytest.mark.asyncio
+    async def test_backlog_drained_in_batches(self, database):
+        """TEST: Bursts larger than batch_size are read over consecutive polls, skipping the sleep"""
+        path, feed, _ = database
+        feed.batch_size = 20
+        await feed.ensure_schema()
+        await feed.mark()
+        write(path, "UPDATE knowledge_base SET priority = 'high'")
+
+        sizes = []
+        while True:
+            changes = await feed.next_changes()
+            if not changes:
+                break
+            sizes.append(len(changes))
+        assert sizes == [20, 20, 10]
+
+    @pytest.mark.asyncio
+    async def test_repeated_writes_collapse(self, database):
+        """TEST: A row written many times between polls is reported once, in its final state"""
+        path, feed, _ = database
+        await feed.ensure_schema()
+        await feed.mark()
+        for i in range(5):
+            write(path, ("UPDATE knowledge_base SET tags = ? WHERE id = 1", (f"tag{i}",)))
+
+        changes = await feed.poll()
+        assert [(row["id"], row["tags"]) for row in changes.upserts] == [(1, "tag4")]
+
+    @pytest.mark.asyncio
+    async def test_missing_database_not_created(self, tmp_path):
+        """TEST: A feed for a missing database reports unavailable instead of creating the file"""
+        path = tmp_path / "missing.db"
+        assert not await SQLiteChangeFeed(str(path)).ensure_schema()
+        assert not path.exists()
+
+
+class TestIncrementalIndex:
+    """Test suite for applying change sets to the retriever."""
+
+    @pytest.mark.asyncio
+    async def test_applied_changes_match_full_rebuild(self, database):
+        """TEST: After applying changes the index equals one rebuilt from the table"""
+        path, feed, retriever = database
+        await retriever.initialize()
+        await feed.close()  # Drive the feed by hand
+
+        write(path,
+              "INSERT INTO knowledge_base (question, answer, category, state) "
+              "VALUES ('Zebra licence fee?', 'Zebra licences cost nothing', 'fees', 'TX')",
+              "UPDATE knowledge_base SET category = 'bonds', state = 'FL', question = 'Florida bond?' WHERE id = 2",
+              "DELETE FROM knowledge_base WHERE id IN (1, 25, 50)")
+        await retriever.apply_changes(await feed.poll())
+
+        with sqlite3.connect(path) as conn:
+            conn.row_factory = sqlite3.Row
+            expected = InMemoryIndex()
+            expected.build_index([dict(row) for row in conn.execute(INDEX_QUERY)])
+        assert index_state(retriever.in_memory_index) == index_state(expected)
+        assert (await retriever.search("zebra licence", use_cache=False))[0].question == "Zebra licence fee?"
+        assert [r.id for r in await retriever.search("Florida bond", state="FL", use_cache=False)] == [2]
+
+    @pytest.mark.asyncio
+    async def test_background_feed_updates_search(self, database):
+        """TEST: With the feed running, a write is searchable within the poll interval"""
+        path, feed, retriever = database
+        await retriever.initialize()
+        assert retriever.tracks_changes
+
+        write(path, "INSERT INTO knowledge_base (question, answer, category) "
+                    "VALUES ('Quokka permit cost?', 'Quokka permits are free', 'fees')")
+        deadline = time.monotonic() + 2
+        while not await retriever.search("quokka permit", use_cache=False):
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.02)
+        assert feed.get_stats()["change_sets"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_changes_invalidate_cached_results(self, database):
+        """TEST: Applying changes bumps the cache generation and drops cached results"""
+        path, feed, retriever = database
+        await retriever.initialize()
+        await feed.close()
+
+        assert await retriever.search("walrus") == []
+        generation = retriever.cache_generation
+        write(path, "UPDATE knowledge_base SET answer = 'Walrus permits are free' WHERE id = 41")
+        await retriever.apply_changes(await feed.poll())
+
+        assert retriever.cache_generation == generation + 1
+        assert [r.id for r in await retriever.search("walrus")] == [41]
+
+    @pytest.mark.asyncio
+    async def test_reload_change_set(self, database):
+        """TEST: A reload change set rebuilds the whole index"""
+        path, feed, retriever = database
+        await retriever.initialize()
+        await feed.close()
+        write(path, "DELETE FROM knowledge_base WHERE id > 10")
+
+        await retriever.apply_changes(ChangeSet(reload=True))
+        assert len(retriever.in_memory_index.entries) == 10
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, query, ids):
+        return [row for row in self.rows if row["id"] in ids]
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def acquire(self):
+        pool = self
+
+        class Context:
+            async def __aenter__(self):
+                return FakeConnection(pool.rows)
+
+            async def __aexit__(self, *exc):
+                return False
+        return Context()
+
+
+class FakeListener:
+    def is_closed(self):
+        return False
+
+
+class TestPostgresChangeFeed:
+    """Test suite for NOTIFY payload handling."""
+
+    @pytest.mark.asyncio
+    async def test_notifications_become_change_sets(self):
+        """TEST: A burst of notifications is fetched as one set; missing ids are deletes"""
+        feed = PostgresChangeFeed(FakePool([{"id": 1, "question": "q"}, {"id": 2, "question": "r"}]),
+                                  "postgresql://unused", interval=0.1, debounce=0.01)
+        feed._listener = FakeListener()
+
+        for payload in ("INSERT:1", "UPDATE:2", "UPDATE:1", "DELETE:9"):
+            feed._on_notify(None, 1, "knowledge_base_changes", payload)
+        changes = await feed.next_changes()
+
+        assert sorted(row["id"] for row in changes.upserts) == [1, 2]
+        assert changes.deleted == [9]
+        assert not await feed.next_changes()
+
+    @pytest.mark.asyncio
+    async def test_truncate_requests_reload(self):
+        """TEST: TRUNCATE turns into a reload change set"""
+        feed = PostgresChangeFeed(FakePool([]), "postgresql://unused", interval=0.1, debounce=0.01)
+        feed._listener = FakeListener()
+        feed._on_notify(None, 1, "knowledge_base_changes", "TRUNCATE:0")
+
+        assert (await feed.next_changes()).reload
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_apply_changes_vs_refresh(tmp_path):
+    """BENCHMARK: Applying 100 changed rows vs refresh_index() on a 20k-entry knowledge base"""
+    path = str(tmp_path / "fact.db")
+    make_database(path, 20000)
+    feed = SQLiteChangeFeed(path)
+    manager = DatabaseManager(path, pool_size=2)
+    retriever = EnhancedRetriever(manager, change_feed=feed)
+    await retriever.initialize()
+    await feed.close()
+
+    write(path, "UPDATE knowledge_base SET answer = answer || ' revised' WHERE id % 200 = 0")
+    start = time.perf_counter()
+    await retriever.apply_changes(await feed.poll())
+    incremental = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await retriever.refresh_index()
+    full = time.perf_counter() - start
+    await retriever.close()
+    await manager.cleanup()
+
+    print(f"\napply 100 changes: {incremental * 1000:.1f} ms\nfull refresh:      {full * 1000:.1f} ms")
+    assert incremental < full / 10
@@ -0,0 +1,267 @@
+"""
+Unit tests for the bounded conversation state store.
+Tests LRU/TTL eviction, shared backends, read-through caching and the
+scorer/manager integrations that keep call state across workers.
+"""
+
+import threading
+import time
+import pytest
+
+from src.core.conversation_store import (
+    ConversationStateStore,
+    MemoryStateBackend,
+    FileStateBackend,
+    RedisStateBackend,
+    create_state_backend,
+)
+from src.core.conversation import ConversationManager, ConversationContext
+from src.monitoring.loop_monitor import fail_on_blocking
+from src.api.vapi_conversation_scoring import (
+    ConversationScorer,
+    ConversationRecord,
+    PersonaType,
+)
+
+
+class FakeRedis:
+    """Minimal Redis-compatible stand-in."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        item = self.data.get(key)
+        if item is None or item[0] <= time.time():
+            return None
+        return item[1].encode("utf-8")
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (time.time() + (ex or 3600), value)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class SlowRedis(FakeRedis):
+    """FakeRedis with a network round trip on every call."""
+
+    def __init__(self, delay=0.2):
+        super().__init__()
+        self.delay = delay
+        self.writes = []
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return super().get(key)
+
+    def set(self, key, value, ex=None):
+        time.sleep(self.delay)
+        self.writes.append(value)
+        super().set(key, value, ex)
+
+
+def scorer_store(backend, **kwargs):
+    return ConversationStateStore(
+        "vapi.scoring",
+        backend=backend,
+        encode=ConversationRecord.to_dict,
+        decode=ConversationRecord.from_dict,
+        **kwargs
+    )
+
+
+class TestConversationStateStore:
+    """Test suite for local LRU/TTL behaviour."""
+
+    def test_lru_bound_evicts_least_recently_used(self):
+        """TEST: Local cache never exceeds max_entries"""
+        store = ConversationStateStore("test", max_entries=2)
+
+        store.put("a", {"n": 1})
+        store.put("b", {"n": 2})
+        store.get("a")
+        store.put("c", {"n": 3})
+
+        assert store.get("b") is None
+        assert store.get("a") == {"n": 1}
+        assert len(store) == 2
+        assert store.get_stats()["evictions"] == 1
+
+    def test_idle_ttl_expires_entries(self):
+        """TEST: Entries expire after the idle TTL"""
+        store = ConversationStateStore("test", idle_ttl=0.05)
+
+        store.put("call", {"n": 1})
+        time.sleep(0.1)
+
+        assert store.get("call") is None
+
+    def test_end_shortens_ttl(self):
+        """TEST: Ending a call switches it to the ended grace TTL"""
+        store = ConversationStateStore("test", idle_ttl=60, ended_ttl=0.05)
+
+        store.put("call", {"n": 1})
+        store.end("call")
+        assert store.get("call") == {"n": 1}
+
+        time.sleep(0.1)
+        assert store.get("call") is None
+
+    def test_get_or_create_returns_same_object(self):
+        """TEST: Repeated lookups return the live object"""
+        store = ConversationStateStore("test")
+
+        first = store.get_or_create("call", dict)
+        first["x"] = 1
+
+        assert store.get_or_create("call", dict) is first
+
+
+class TestSharedBackends:
+    """State written by one worker is visible to another."""
+
+    @pytest.mark.parametrize("make_backend", [
+        lambda tmp: MemoryStateBackend(),
+        lambda tmp: FileStateBackend(str(tmp)),
+        lambda tmp: RedisStateBackend(FakeRedis()),
+    ])
+    def test_state_moves_between_workers(self, tmp_path, make_backend):
+        """TEST: Two stores on one backend share persona and trust history"""
+        backend = make_backend(tmp_path)
+        worker_a = ConversationScorer(store=scorer_store(backend, local_ttl=0))
+        worker_b = ConversationScorer(store=scorer_store(backend, local_ttl=0))
+
+        worker_a.detect_persona("call-1", "I need this done quickly, it's urgent, deadline is close")
+        worker_a.process_trust_event("call-1", "positive", "Shows interest")
+
+        metrics = worker_b.get_or_create_conversation("call-1")
+        summary = worker_b.get_conversation_summary("call-1")
+
+        assert metrics.persona_type == PersonaType.URGENT_OPERATOR
+        assert metrics.trust_score == pytest.approx(47.5)
+        assert summary["events"][0]["description"] == "Shows interest"
+
+    def test_read_through_cache_serves_fresh_local_copy(self):
+        """TEST: Reads within local_ttl do not hit the backend"""
+        backend = MemoryStateBackend()
+        store = ConversationStateStore("test", backend=backend, local_ttl=60)
+        store.put("call", {"n": 1})
+
+        backend.delete("test:call")
+
+        assert store.get("call") == {"n": 1}
+
+    def test_backend_failure_falls_back_to_local_state(self):
+        """TEST: An unreachable backend degrades to the local copy"""
+        class BrokenBackend(MemoryStateBackend):
+            def get(self, key):
+                raise OSError("backend down")
+
+        store = ConversationStateStore("test", backend=BrokenBackend(), local_ttl=0)
+        store.put("call", {"n": 1})
+
+        assert store.get("call") == {"n": 1}
+        assert store.get_stats()["backend_errors"] >= 1
+
+    def test_writes_do_not_wait_for_backend(self):
+        """TEST: Writes to a slow backend are applied behind the caller, in order, latest last"""
+        client = SlowRedis()
+        store = ConversationStateStore("test", backend=RedisStateBackend(client), local_ttl=0)
+
+        started = time.perf_counter()
+        for n in range(5):
+            store.put("call", {"n": n})
+        elapsed = time.perf_counter() - started
+
+        other = ConversationStateStore("test", backend=store.backend, local_ttl=0)
+        assert elapsed < 0.1
+        assert other.get("call") == {"n": 4}
+        assert store.drain(timeout=5)
+        assert len(client.writes) <= 3 and '"n": 4' in client.writes[-1]
+        assert client.get("test:call") is not None
+
+    def test_backend_read_does_not_hold_lock(self):
+        """TEST: A slow backend read for one call does not delay local reads of another"""
+        store = ConversationStateStore("test", backend=RedisStateBackend(SlowRedis(delay=0.3)), local_ttl=60)
+        store.put("local", {"n": 1})
+        reader = threading.Thread(target=store.get, args=("remote",))
+        reader.start()
+        time.sleep(0.05)
+
+        started = time.perf_counter()
+        value = store.get("local")
+        elapsed = time.perf_counter() - started
+        reader.join()
+
+        assert value == {"n": 1} and elapsed < 0.1
+
+    @pytest.mark.asyncio
+    async def test_async_reads_leave_loop_free(self):
+        """TEST: aget() and refresh() read a slow backend without blocking the event loop"""
+        backend = RedisStateBackend(SlowRedis())
+        writer = ConversationStateStore("test", backend=backend)
+        writer.put("call", {"n": 1})
+        writer.drain(timeout=5)
+        store = ConversationStateStore("test", backend=backend, local_ttl=60)
+
+        async with fail_on_blocking(threshold_ms=100):
+            value = await store.aget("call")
+            await store.refresh("other")
+            store.put("call", {"n": 2})
+
+        assert value == {"n": 1} and store.get("call") == {"n": 2}
+
+    def test_create_state_backend_from_url(self, tmp_path):
+        """TEST: Backend URLs select the matching implementation"""
+        assert create_state_backend(None) is None
+        assert isinstance(create_state_backend("memory://"), MemoryStateBackend)
+        assert isinstance(create_state_backend(f"file://{tmp_path}"), FileStateBackend)
+        assert create_state_backend("bogus://x") is None
+
+
+class TestConversationIntegrations:
+    """Scorer and manager keep working on the bounded store."""
+
+    def test_scorer_reset_and_end(self):
+        """TEST: Reset drops state and end schedules eviction"""
+        scorer = ConversationScorer(store=scorer_store(None, ended_ttl=0.05))
+
+        scorer.process_trust_event("call", "positive", "makes sense")
+        scorer.end_conversation("call")
+        time.sleep(0.1)
+        assert scorer.get_or_create_conversation("call").trust_score == 45.0
+
+        scorer.process_trust_event("call", "negative", "not sure")
+        scorer.reset_conversation("call")
+        assert scorer.get_or_create_conversation("call").trust_score == 45.0
+
+    def test_events_are_bounded(self):
+        """TEST: Trust event history is capped per call"""
+        scorer = ConversationScorer(store=scorer_store(None))
+
+        for _ in range(200):
+            scorer.process_trust_event("call", "neutral", "noise")
+
+        assert len(scorer.store.get("call").events) <= 50
+
+    def test_conversation_manager_round_trips_through_backend(self):
+        """TEST: Conversation contexts survive a shared backend round trip"""
+        backend = MemoryStateBackend()
+
+        def make_manager():
+            return ConversationManager(store=ConversationStateStore(
+                "core.conversation", backend=backend, local_ttl=0,
+                encode=ConversationContext.to_dict, decode=ConversationContext.from_dict
+            ))
+
+        first = make_manager()
+        first.start_conversation("conv-1")
+        first.add_turn("Show revenue", "Revenue was up 10%")
+
+        second = make_manager()
+        second.start_conversation("conv-1")
+        context = second.get_current_context()
+
+        assert len(context.turns) == 1
+        assert context.turns[0].assistant_response == "Revenue was up 10%"
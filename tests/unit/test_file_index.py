@@ -0,0 +1,137 @@
+"""
+Unit tests for the file connector's ranged reads.
+Tests the line-offset index and its (mtime, size) cache, memory-mapped byte
+and line ranges, async chunk streaming and paged scandir listings.
+"""
+
+import os
+import pytest
+
+from src.tools.connectors.file_index import (
+    LineIndexCache,
+    LineOffsetIndex,
+    read_bytes,
+    read_lines,
+    scan_directory,
+    describe_entry,
+    stream_chunks,
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"".join(f"line {i}\n".encode() for i in range(1000)))
+    return path
+
+
+class TestLineOffsetIndex:
+    """Test suite for line index construction."""
+
+    @pytest.mark.parametrize("content, expected", [
+        (b"", 0),
+        (b"\n", 1),
+        (b"a\nb", 2),
+        (b"a\nb\n", 2),
+        (b"a\r\nb\r\n\n", 3),
+    ])
+    def test_line_count(self, tmp_path, content, expected):
+        """TEST: Line counts match splitlines, with or without a trailing newline"""
+        path = tmp_path / "f.txt"
+        path.write_bytes(content)
+
+        assert LineOffsetIndex.build(path).line_count == expected
+
+    def test_byte_range_clamps_to_file(self, log_file):
+        """TEST: Ranges past the end are clamped"""
+        index = LineOffsetIndex.build(log_file)
+
+        start, end = index.byte_range(995, 100)
+
+        assert log_file.read_bytes()[start:end].count(b"\n") == 5
+
+
+class TestRangedReads:
+    """Test suite for memory-mapped reads."""
+
+    def test_read_lines_returns_requested_slice(self, log_file):
+        """TEST: A line range returns exactly those lines"""
+        raw, index = read_lines(log_file, start_line=500, max_lines=3, cache=LineIndexCache())
+
+        assert raw == b"line 500\nline 501\nline 502\n"
+        assert index.line_count == 1000
+
+    def test_read_bytes_range(self, log_file):
+        """TEST: Byte ranges are sliced from the mapped file"""
+        assert read_bytes(log_file, 0, 6) == b"line 0"
+        assert read_bytes(log_file, 10 ** 9, 10) == b""
+
+    def test_index_cache_invalidates_on_change(self, log_file):
+        """TEST: The cached index is reused until the file changes"""
+        cache = LineIndexCache()
+        first = cache.get(log_file)
+        assert cache.get(log_file) is first
+        assert cache.hits == 1
+
+        with open(log_file, "ab") as handle:
+            handle.write(b"extra\n")
+        os.utime(log_file, ns=(0, first.version.mtime_ns + 1))
+
+        refreshed = cache.get(log_file)
+        assert refreshed is not first
+        assert refreshed.line_count == 1001
+
+    @pytest.mark.asyncio
+    async def test_stream_chunks_reassembles_range(self, log_file):
+        """TEST: Streamed chunks concatenate to the requested byte range"""
+        expected = log_file.read_bytes()[100:5000]
+
+        chunks = [chunk async for chunk in stream_chunks(log_file, 100, 4900, chunk_size=1024)]
+
+        assert b"".join(chunks) == expected
+        assert max(len(chunk) for chunk in chunks) <= 1024
+
+
+class TestScanDirectory:
+    """Test suite for scandir listings."""
+
+    def test_sorted_filtered_recursive_listing(self, tmp_path):
+        """TEST: Directories come first, hidden and filtered files are skipped"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "nested.json").write_text("{}")
+        (tmp_path / "b.txt").write_text("b")
+        (tmp_path / "a.json").write_text("a")
+        (tmp_path / ".hidden.json").write_text("h")
+
+        scanned = scan_directory(tmp_path, recursive=True, file_types=[".json"])
+
+        assert [item.relative_path for item in scanned] == ["sub", "a.json", "sub/nested.json"]
+
+    def test_unreadable_subdirectory_is_skipped(self, tmp_path, monkeypatch):
+        """TEST: A recursive scan skips subtrees it may not read; an unreadable root still raises"""
+        (tmp_path / "locked").mkdir()
+        (tmp_path / "locked" / "secret.txt").write_text("s")
+        (tmp_path / "open").mkdir()
+        (tmp_path / "open" / "a.txt").write_text("a")
+        scandir = os.scandir
+
+        def guarded_scandir(path):
+            if os.path.basename(path) == "locked":
+                raise PermissionError(13, "Permission denied", str(path))
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", guarded_scandir)
+        scanned = scan_directory(tmp_path, recursive=True)
+
+        assert [item.relative_path for item in scanned] == ["locked", "open", "open/a.txt"]
+        with pytest.raises(PermissionError):
+            scan_directory(tmp_path / "locked")
+
+    def test_describe_entry_metadata(self, tmp_path):
+        """TEST: Entry metadata includes size for files"""
+        (tmp_path / "a.txt").write_text("hello")
+
+        entry = describe_entry(scan_directory(tmp_path)[0])
+
+        assert entry["size_bytes"] == 5
+        assert entry["extension"] == ".txt"
@@ -0,0 +1,198 @@
+"""
+Unit tests for the full-text search backends.
+Tests FTS5 trigger sync and backfill, bm25 candidate ranking and filters,
+PostgreSQL statement rendering and fallback, and EnhancedRetriever
+server-side candidates.
+"""
+
+import sqlite3
+import pytest
+import pytest_asyncio
+
+from src.db.fulltext import (
+    SQLiteFullTextBackend, _postgres_candidate_sql, fts5_expression, search_terms, tsquery_expression
+)
+from src.db import postgres_adapter
+from src.db.models import DATABASE_SCHEMA
+from src.retrieval.enhanced_search import EnhancedRetriever
+
+
+ROWS = [
+    ("What are the Georgia contractor license requirements?", "Georgia requires a license for work over $2,500.",
+     "state_licensing_requirements", "georgia,license", "GA"),
+    ("How much is the Florida surety bond?", "Florida general contractors need a $10,000 bond.",
+     "bonding", "florida,bond", "FL"),
+    ("How long is the Georgia exam?", "Two exams of four hours each.", "exam_info", "georgia,exam", "GA"),
+]
+
+
+def make_database(path):
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, tags, state) VALUES (?, ?, ?, ?, ?)", ROWS)
+
+
+@pytest_asyncio.fixture
+async def backend(tmp_path):
+    path = str(tmp_path / "fact.db")
+    make_database(path)
+    backend = SQLiteFullTextBackend(path)
+    assert await backend.ensure_schema()
+    yield backend
+    await backend.close()
+
+
+class TestSearchTerms:
+    """Test suite for query tokenisation."""
+
+    def test_drops_stop_words_and_punctuation(self):
+        """TEST: Terms are lowercase alphanumerics without stop words"""
+        assert search_terms("What's the Georgia bond?!") == ["georgia", "bond"]
+
+    def test_keeps_stop_words_when_nothing_else(self):
+        """TEST: A query of only stop words still searches"""
+        assert search_terms("how do i") == ["how", "do", "i"]
+
+    def test_expressions_cannot_inject_operators(self):
+        """TEST: FTS5 and tsquery operators in input never reach the expression"""
+        terms = search_terms('bond" OR NEAR(x) | !y:*')
+
+        assert fts5_expression(terms) == '"bond"* OR "near"*'
+        assert tsquery_expression(["bond", "exam"]) == "bond:* | exam:*"
+
+
+class TestSQLiteFullText:
+    """Test suite for the FTS5 backend."""
+
+    @pytest.mark.asyncio
+    async def test_backfills_existing_rows(self, backend):
+        """TEST: Creating the index on an existing table indexes its rows"""
+        rows = await backend.candidates("bond")
+
+        assert [row["state"] for row in rows] == ["FL"]
+        assert rows[0]["score"] > 0
+
+    @pytest.mark.asyncio
+    async def test_question_matches_rank_first(self, backend):
+        """TEST: bm25 weights question hits above answer-only hits"""
+        rows = await backend.candidates("georgia exam")
+
+        assert rows[0]["question"] == "How long is the Georgia exam?"
+
+    @pytest.mark.asyncio
+    async def test_prefix_and_filters(self, backend):
+        """TEST: Prefix terms match and category/state filters apply"""
+        assert len(await backend.candidates("licens")) == 1
+        assert len(await backend.candidates("georgia", state="ga")) == 2
+        assert len(await backend.candidates("georgia", category="EXAM_INFO")) == 1
+        assert await backend.candidates("georgia", state="FL") == []
+
+    @pytest.mark.asyncio
+    async def test_triggers_track_changes(self, backend):
+        """TEST: Inserts, updates and deletes on knowledge_base reach the index"""
+        with sqlite3.connect(backend.database_path) as conn:
+            conn.execute("INSERT INTO knowledge_base (question, answer, category, state) "
+                         "VALUES ('Texas reciprocity', 'Texas has none', 'reciprocity', 'TX')")
+            conn.execute("UPDATE knowledge_base SET question = 'Nevada bond amount' WHERE state = 'FL'")
+            conn.execute("DELETE FROM knowledge_base WHERE question = 'How long is the Georgia exam?'")
+
+        assert len(await backend.candidates("texas")) == 1
+        assert [row["question"] for row in await backend.candidates("nevada")] == ["Nevada bond amount"]
+        assert await backend.candidates("surety") == []
+        assert len(await backend.candidates("georgia")) == 1
+
+
+class TestPostgresStatements:
+    """Test suite for the tsvector/trigram statement shapes."""
+
+    def test_trigram_statement_parameters(self):
+        """TEST: Trigram matching reuses $2 and filters follow in order"""
+        sql = _postgres_candidate_sql(True, True, True)
+
+        assert "search_vector @@ q" in sql and "question % $2" in sql
+        assert "lower(category) = $3" in sql and "state = $4" in sql and sql.endswith("LIMIT $5")
+
+    def test_plain_statement_parameters(self):
+        """TEST: Without pg_trgm only the tsquery and limit are bound"""
+        sql = _postgres_candidate_sql(False, False, False)
+
+        assert "%" not in sql and sql.endswith("LIMIT $2")
+
+
+class TestPostgresFallback:
+    """Test suite for PostgresAdapter.search_entries when full-text search fails."""
+
+    @pytest.mark.asyncio
+    async def test_failing_backend_falls_back_to_query(self, monkeypatch):
+        """TEST: A full-text error falls through to the tsvector/ILIKE query instead of no results"""
+        class BrokenFullText:
+            available = True
+
+            async def candidates(self, query, limit=10):
+                raise RuntimeError('column "tsv" does not exist')
+
+        class Connection:
+            def __init__(self):
+                self.fetched = []
+
+            async def fetch(self, sql, *params):
+                self.fetched.append(params)
+                return [{"id": 1, "question": "How long is the Georgia exam?"}]
+
+        class Pool:
+            def __init__(self):
+                self.conn = Connection()
+
+            def acquire(self):
+                pool = self
+
+                class Acquire:
+                    async def __aenter__(self):
+                        return pool.conn
+
+                    async def __aexit__(self, *exc):
+                        return False
+
+                return Acquire()
+
+        monkeypatch.setattr(postgres_adapter, "ASYNCPG_AVAILABLE", True)
+        adapter = postgres_adapter.PostgresAdapter()
+        adapter.initialized, adapter.fulltext, adapter.pool = True, BrokenFullText(), Pool()
+
+        results = await adapter.search_entries("georgia exam", limit=5)
+
+        assert results == [{"id": 1, "question": "How long is the Georgia exam?"}]
+        assert adapter.pool.conn.fetched == [("georgia exam", 5)]
+
+
+class TestServerSideCandidates:
+    """EnhancedRetriever with a full-text candidate backend."""
+
+    @pytest.mark.asyncio
+    async def test_search_without_loading_entries(self, backend):
+        """TEST: The retriever answers from server-side candidates with an empty in-memory index"""
+        retriever = EnhancedRetriever(candidate_backend=backend)
+        await retriever.initialize()
+
+        results = await retriever.search("georgia license requirements", use_cache=False)
+
+        assert retriever.uses_server_candidates
+        assert retriever.in_memory_index.entries == []
+        assert results[0].question == "What are the Georgia contractor license requirements?"
+
+    @pytest.mark.asyncio
+    async def test_scoring_matches_in_memory(self, backend):
+        """TEST: Candidates are scored exactly like the in-memory search"""
+        retriever = EnhancedRetriever(candidate_backend=backend)
+        await retriever.initialize()
+        in_memory = EnhancedRetriever()
+        with sqlite3.connect(backend.database_path) as conn:
+            conn.row_factory = sqlite3.Row
+            in_memory.in_memory_index.build_index(
+                [dict(row) for row in conn.execute("SELECT * FROM knowledge_base")])
+
+        server = await retriever.search("florida bond", use_cache=False)
+        local = await in_memory.search("florida bond", use_cache=False)
+
+        assert [(r.id, round(r.score, 6)) for r in server[:1]] == [(r.id, round(r.score, 6)) for r in local[:1]]
@@ -0,0 +1,218 @@
+"""
+Unit tests for the shared HTTP client service used by the HTTP connector.
+Runs against a local aiohttp test server to check connection reuse,
+Cache-Control handling and ETag revalidation.
+"""
+
+import time
+import pytest
+import pytest_asyncio
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.tools.connectors.http_client import (
+    HTTPClientService,
+    HTTPClientConfig,
+    HTTPResponseCache,
+    HTTPResponse,
+)
+
+
+def build_app(state):
+    """Test application recording request counts and client ports."""
+
+    async def plain(request):
+        state["hits"] += 1
+        state["ports"].add(request.transport.get_extra_info("peername")[1])
+        return web.json_response({"ok": True})
+
+    async def max_age(request):
+        state["hits"] += 1
+        return web.json_response({"n": state["hits"]}, headers={"Cache-Control": "max-age=60"})
+
+    async def etag(request):
+        state["hits"] += 1
+        if request.headers.get("If-None-Match") == '"v1"':
+            state["not_modified"] += 1
+            state.get("on_revalidate", lambda: None)()
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.json_response({"version": 1}, headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+
+    async def no_store(request):
+        state["hits"] += 1
+        return web.json_response({"n": state["hits"]}, headers={"Cache-Control": "no-store, max-age=60"})
+
+    app = web.Application()
+    app.router.add_get("/plain", plain)
+    app.router.add_get("/max-age", max_age)
+    app.router.add_get("/etag", etag)
+    app.router.add_get("/no-store", no_store)
+    return app
+
+
+@pytest_asyncio.fixture
+async def server():
+    state = {"hits": 0, "not_modified": 0, "ports": set()}
+    test_server = TestServer(build_app(state))
+    await test_server.start_server()
+    test_server.state = state
+    yield test_server
+    await test_server.close()
+
+
+class TestHTTPClientService:
+    """Test suite for the pooled client."""
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused_across_requests(self, server):
+        """TEST: Repeated requests share one session and keep-alive connection"""
+        client = HTTPClientService()
+        try:
+            for _ in range(5):
+                response = await client.request("GET", str(server.make_url("/plain")))
+                assert response.status == 200
+
+            assert client.stats["sessions_created"] == 1
+            assert len(server.state["ports"]) == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_max_age_response_served_from_cache(self, server):
+        """TEST: Fresh cached responses skip the network"""
+        client = HTTPClientService()
+        try:
+            url = str(server.make_url("/max-age"))
+            first = await client.request("GET", url)
+            second = await client.request("GET", url)
+
+            assert server.state["hits"] == 1
+            assert second.from_cache
+            assert second.body == first.body
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation_uses_conditional_request(self, server):
+        """TEST: no-cache responses are revalidated with If-None-Match"""
+        client = HTTPClientService()
+        try:
+            url = str(server.make_url("/etag"))
+            await client.request("GET", url)
+            revalidated = await client.request("GET", url)
+
+            assert server.state["not_modified"] == 1
+            assert revalidated.revalidated
+            assert revalidated.status == 200
+            assert b'"version": 1' in revalidated.body
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_no_store_and_disabled_cache_always_hit_network(self, server):
+        """TEST: no-store responses and use_cache=False bypass the cache"""
+        client = HTTPClientService()
+        try:
+            await client.request("GET", str(server.make_url("/no-store")))
+            await client.request("GET", str(server.make_url("/no-store")))
+            await client.request("GET", str(server.make_url("/max-age")), use_cache=False)
+            await client.request("GET", str(server.make_url("/max-age")), use_cache=False)
+
+            assert server.state["hits"] == 4
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_entry_evicted_during_revalidation_is_refetched(self, server):
+        """TEST: A 304 for an entry evicted meanwhile is answered by a full request"""
+        client = HTTPClientService()
+        try:
+            url = str(server.make_url("/etag"))
+            await client.request("GET", url)
+            server.state["on_revalidate"] = client.cache.clear
+            response = await client.request("GET", url)
+
+            assert server.state["hits"] == 3
+            assert response.status == 200 and not response.revalidated
+            assert b'"version": 1' in response.body
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_requests_with_credentials_bypass_cache(self, server):
+        """TEST: Requests carrying Authorization or Cookie are neither served from nor stored in the cache"""
+        client = HTTPClientService()
+        try:
+            url = str(server.make_url("/max-age"))
+            await client.request("GET", url)
+            authorized = await client.request("GET", url, headers={"Authorization": "Bearer a"})
+            await client.request("GET", url, headers={"Cookie": "session=b"})
+
+            assert server.state["hits"] == 3
+            assert not authorized.from_cache and len(client.cache) == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_close_allows_new_session(self, server):
+        """TEST: Closing the client releases sessions; next use reopens"""
+        client = HTTPClientService()
+        await client.request("GET", str(server.make_url("/plain")))
+        await client.close()
+
+        await client.request("GET", str(server.make_url("/plain")))
+        try:
+            assert client.stats["sessions_created"] == 2
+        finally:
+            await client.close()
+
+
+class TestHTTPResponseCache:
+    """Test suite for cache admission rules."""
+
+    def test_authorized_responses_require_public(self):
+        """TEST: Responses to authorized requests are only cached when public"""
+        cache = HTTPResponseCache()
+        private = HTTPResponse(200, {"cache-control": "max-age=60"}, b"x")
+        public = HTTPResponse(200, {"Cache-Control": "public, max-age=60"}, b"x")
+
+        assert not cache.store(("a", ""), private, authorized=True)
+        assert cache.store(("b", ""), public, authorized=True)
+
+    def test_lru_bound(self):
+        """TEST: Cache never exceeds max_entries"""
+        cache = HTTPResponseCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.store((key, ""), HTTPResponse(200, {"Cache-Control": "max-age=60"}, b"x"))
+
+        assert len(cache) == 2
+        assert cache.get(("a", "")) is None
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_repeated_calls_same_host(server):
+    """BENCHMARK: Shared session vs a new session per call to the same host"""
+    url = str(server.make_url("/plain"))
+    iterations = 50
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector()) as session:
+            async with session.get(url) as response:
+                await response.read()
+    per_call_sessions = time.perf_counter() - start
+
+    client = HTTPClientService(HTTPClientConfig(cache_enabled=False))
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await client.request("GET", url)
+        shared_session = time.perf_counter() - start
+    finally:
+        await client.close()
+
+    print(f"\nper-call sessions: {per_call_sessions * 1000 / iterations:.2f} ms/request, "
+          f"shared session: {shared_session * 1000 / iterations:.2f} ms/request")
+    assert client.stats["sessions_created"] == 1
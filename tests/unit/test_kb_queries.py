@@ -0,0 +1,121 @@
+"""
+Unit tests for the knowledge_base query builder.
+Tests parameterised templates for SQLite and Postgres, wildcard escaping,
+result caps, column selection, and execution through DatabaseManager.
+"""
+
+import sqlite3
+import pytest
+import pytest_asyncio
+
+from src.db.connection import DatabaseManager
+from src.db.kb_queries import (
+    KnowledgeQuery, KB_ANSWER_COLUMNS, MAX_RESULT_ROWS, POSTGRES, SQLITE, escape_like
+)
+
+
+ROWS = [
+    ("How much is the Georgia bond?", "A $10,000 bond", "bonding", "bond", "GA", "normal", "basic"),
+    ("Georgia exam fee", "Exam costs 100% of $200", "fees", "exam", "GA", "critical", "basic"),
+    ("Florida bond", "Florida needs a bond", "bonding", "bond", "FL", "high", "advanced"),
+    ("O'Brien's question", "Quotes are data", "general", "", "GA", "normal", "basic"),
+]
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    path = tmp_path / "fact.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE knowledge_base (
+            id INTEGER PRIMARY KEY, question TEXT, answer TEXT, category TEXT, tags TEXT,
+            metadata TEXT, state TEXT, priority TEXT, personas TEXT, source TEXT, difficulty TEXT)""")
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, tags, state, priority, difficulty) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", ROWS)
+    manager = DatabaseManager(str(path))
+    yield manager
+    await manager.cleanup()
+
+
+class TestKnowledgeQuery:
+    """Test suite for statement rendering."""
+
+    def test_template_is_independent_of_values(self):
+        """TEST: Different search values render the identical statement text"""
+        first = KnowledgeQuery().matching("bond").where("state", "GA").build()
+        second = KnowledgeQuery().matching("it's; DROP").where("state", "FL").build()
+
+        assert first.sql == second.sql
+        assert "bond" not in first.sql and "GA" not in first.sql
+
+    def test_postgres_reuses_numbered_parameter(self):
+        """TEST: Postgres binds the search term once as $1"""
+        query = (KnowledgeQuery().matching("bond", ("question", "answer"))
+                 .rank_matches_in("question").where("state", "GA").limit(5).build(POSTGRES))
+
+        assert query.sql.count("$1") == 3
+        assert "ILIKE" in query.sql
+        assert query.params == ("%bond%", "GA", 5)
+
+    def test_sqlite_binds_term_per_use(self):
+        """TEST: SQLite positional parameters line up with the placeholders"""
+        query = (KnowledgeQuery().matching("bond", ("question", "answer", "tags"))
+                 .where("category", "bonding").limit(3).build(SQLITE))
+
+        assert query.sql.count("?") == len(query.params) == 5
+
+    def test_limit_is_capped(self):
+        """TEST: Limits are clamped to MAX_RESULT_ROWS"""
+        assert KnowledgeQuery().limit(10 ** 6).build().params[-1] == MAX_RESULT_ROWS
+        assert KnowledgeQuery().limit(0).build().params[-1] == 1
+
+    def test_empty_filters_are_skipped(self):
+        """TEST: None and empty filter values add no clause"""
+        query = KnowledgeQuery().matching("").where("state", None).where("category", "").build()
+
+        assert "WHERE" not in query.sql
+
+    def test_rejects_unknown_columns(self):
+        """TEST: Column names are checked against the schema"""
+        with pytest.raises(ValueError):
+            KnowledgeQuery(("id", "password"))
+        with pytest.raises(ValueError):
+            KnowledgeQuery().where("1=1 OR state", "x")
+
+    def test_escape_like(self):
+        """TEST: LIKE wildcards and the escape character are escaped"""
+        assert escape_like("100%_!") == "100!%!_!!"
+
+
+class TestBuilderExecution:
+    """Builder statements run through DatabaseManager."""
+
+    @pytest.mark.asyncio
+    async def test_search_with_filters_and_priority_order(self, manager):
+        """TEST: Text search plus filters returns rows in priority order"""
+        query = (KnowledgeQuery(KB_ANSWER_COLUMNS).matching("georgia")
+                 .where("state", "GA").order_by_priority().limit(10).build())
+
+        result = await manager.execute_query(query.sql, query.params)
+
+        assert [row["question"] for row in result.rows] == ["Georgia exam fee", "How much is the Georgia bond?"]
+        assert result.columns == list(KB_ANSWER_COLUMNS)
+
+    @pytest.mark.asyncio
+    async def test_quotes_and_wildcards_are_data(self, manager):
+        """TEST: Quotes and % in user input match literally"""
+        quoted = KnowledgeQuery().matching("O'Brien's").build()
+        percent = KnowledgeQuery().matching("100%").build()
+
+        assert (await manager.execute_query(quoted.sql, quoted.params)).row_count == 1
+        assert (await manager.execute_query(percent.sql, percent.params)).row_count == 1
+
+    @pytest.mark.asyncio
+    async def test_distinct_queries_validate_once(self, manager):
+        """TEST: Different search terms share one validated template"""
+        for term in ("bond", "exam", "florida", "quotes"):
+            query = KnowledgeQuery().matching(term).order_by_priority().limit(5).build()
+            await manager.execute_query(query.sql, query.params)
+
+        assert manager._query_plan_cache.get_stats()["misses"] == 1
+        assert len(manager._query_plan_cache) == 1
@@ -0,0 +1,240 @@
+"""
+Unit tests for the event loop monitor.
+Tests lag measurement, stack capture for blocking calls, the
+fail_on_blocking test mode against request handlers, and loop lag in
+worker metrics.
+"""
+
+import asyncio
+import sqlite3
+import time
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+import httpx
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from api import profile_endpoint
+from benchmarking.retrieval_bench import load_seed_entries, synthesize_entries
+from core import driver as fact_driver
+from db.connection import DatabaseManager
+from db.models import DATABASE_SCHEMA
+from monitoring import loop_monitor
+from monitoring.loop_monitor import BlockingCallError, LoopMonitor, fail_on_blocking
+from monitoring.worker_metrics import combine
+from retrieval.enhanced_search import EnhancedRetriever
+
+
+def blocking_call(seconds):
+    time.sleep(seconds)
+
+
+def handler_app():
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        blocking_call(0.2)
+        return {"ok": True}
+
+    @app.get("/cooperative")
+    async def cooperative():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    return app
+
+
+class StubLLM:
+    """Synchronous Groq-style client answering after a network round trip."""
+
+    def __init__(self):
+        self.messages = self
+
+    def create(self, **kwargs):
+        time.sleep(0.2)
+        return SimpleNamespace(content=[{"type": "text", "text": "Georgia requires a license over $2,500."}])
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    entries = synthesize_entries(load_seed_entries(), 200, seed=3)
+    path = str(tmp_path / "fact.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, state, tags) VALUES (?, ?, ?, ?, ?)",
+            [(e["question"], e["answer"], e.get("category"), e.get("state"), e.get("tags")) for e in entries])
+    manager = DatabaseManager(path, pool_size=2)
+    yield manager, entries
+    await manager.cleanup()
+
+
+class TestLoopMonitor:
+    """Test suite for LoopMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_lag_is_measured(self):
+        """TEST: A synchronous stall shows up as lag; idle waiting does not"""
+        monitor = LoopMonitor(interval=0.02)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        blocking_call(0.15)
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["loop_lag_ms_max"] >= 120
+        assert stats["loop_lag_ms_p50"] < 20
+        assert stats["loop_blocked"] == 1
+        assert not monitor.running
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_stack_is_captured(self):
+        """TEST: The watchdog records the stack of the call that is blocking, while it blocks"""
+        monitor = LoopMonitor(interval=0.02, detect_blocking=True, block_threshold_ms=50)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        (report,) = monitor.recent_blocks()
+        assert report["blocked_ms"] >= 150
+        assert report["location"].endswith("in blocking_call")
+        assert any("test_blocking_call_stack_is_captured" in line for line in report["stack"])
+
+    @pytest.mark.asyncio
+    async def test_short_stalls_are_not_reported(self):
+        """TEST: Stalls under the threshold count as lag only"""
+        monitor = LoopMonitor(interval=0.02, detect_blocking=True, block_threshold_ms=100)
+        monitor.start()
+        for _ in range(3):
+            blocking_call(0.02)
+            await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        assert monitor.stats()["loop_blocked"] == 0 and not monitor.reports
+
+
+class TestFailOnBlocking:
+    """Test suite for the fail_on_blocking test mode."""
+
+    @pytest.mark.asyncio
+    async def test_blocking_handler_fails(self):
+        """TEST: A handler doing synchronous work raises BlockingCallError naming the call"""
+        transport = httpx.ASGITransport(app=handler_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with pytest.raises(BlockingCallError) as error:
+                async with fail_on_blocking(threshold_ms=50):
+                    await client.get("/blocking")
+
+        assert "blocking_call" in str(error.value)
+        assert error.value.reports[0].blocked_ms >= 150
+
+    @pytest.mark.asyncio
+    async def test_cooperative_handler_passes(self):
+        """TEST: A handler that awaits instead of blocking passes"""
+        transport = httpx.ASGITransport(app=handler_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with fail_on_blocking(threshold_ms=50):
+                response = await client.get("/cooperative")
+
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_server_probes_do_not_block(self):
+        """TEST: Readiness and worker metrics handlers of the web server never block the loop"""
+        import web_server
+
+        transport = httpx.ASGITransport(app=web_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with fail_on_blocking(threshold_ms=50):
+                for path in ("/ready", "/metrics/workers"):
+                    await client.get(path)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_retriever", [True, False], ids=["retriever", "sql"])
+    async def test_knowledge_search_does_not_block(self, database, monkeypatch, use_retriever):
+        """TEST: /knowledge/search never blocks the loop, through the retriever or the SQL fallback"""
+        import web_server
+
+        manager, entries = database
+        retriever = None
+        if use_retriever:
+            retriever = EnhancedRetriever(None)
+            retriever.in_memory_index.build_index(entries)
+        monkeypatch.setattr(web_server, "_driver", SimpleNamespace(database_manager=manager))
+        monkeypatch.setattr(web_server, "_enhanced_retriever", retriever)
+        app = FastAPI()
+        app.post("/knowledge/search")(web_server.search_knowledge_base)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with fail_on_blocking(threshold_ms=50):
+                response = await client.post("/knowledge/search",
+                                             json={"query": "license", "state": "GA", "limit": 5})
+
+        assert response.status_code == 200 and response.json()["results"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.xfail(raises=BlockingCallError, strict=True,
+                       reason="FACTDriver.process_fact_query calls the synchronous Groq client on the event loop")
+    async def test_query_does_not_block(self, monkeypatch):
+        """TEST: /query never blocks the loop while waiting for the LLM"""
+        import web_server
+
+        monkeypatch.setattr(fact_driver, "create_groq_client", lambda api_key: StubLLM())
+        driver = fact_driver.FACTDriver(SimpleNamespace(system_prompt=""))
+        driver._initialized, driver.groq_api_key = True, "test-key"
+        monkeypatch.setattr(web_server, "_driver", driver)
+        app = FastAPI()
+        app.post("/query")(web_server.process_query)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with fail_on_blocking(threshold_ms=50):
+                response = await client.post("/query", json={"query": "georgia license cost"})
+
+        assert response.status_code == 200
+
+
+class TestLoopMetrics:
+    """Test suite for loop lag in metrics."""
+
+    def test_worst_worker_lag_is_reported(self):
+        """TEST: Lag percentiles take the worst worker; blocked calls are summed"""
+        totals = combine([
+            {"loop_lag_ms_p50": 1.0, "loop_lag_ms_p99": 80.0, "loop_lag_ms_max": 120.0, "loop_blocked": 2},
+            {"loop_lag_ms_p50": 3.0, "loop_lag_ms_p99": 10.0, "loop_lag_ms_max": 15.0, "loop_blocked": 0},
+        ])
+
+        assert (totals["loop_lag_ms_p50"], totals["loop_lag_ms_p99"], totals["loop_lag_ms_max"]) == (3.0, 80.0, 120.0)
+        assert totals["loop_blocked"] == 2
+
+    @pytest.mark.asyncio
+    async def test_debug_loop_endpoint(self, monkeypatch):
+        """TEST: /debug/loop returns this worker's lag and blocked calls behind the profiler token"""
+        monkeypatch.setenv("PROFILER_TOKEN", "s3cret")
+        monitor = LoopMonitor(interval=0.02, detect_blocking=True, block_threshold_ms=50)
+        monkeypatch.setattr(loop_monitor, "_monitor", monitor)
+        app = FastAPI()
+        app.include_router(profile_endpoint.router)
+
+        monitor.start()
+        blocking_call(0.1)
+        await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            denied = await client.get("/debug/loop")
+            response = await client.get("/debug/loop", headers={"Authorization": "Bearer s3cret"})
+        await monitor.stop()
+
+        body = response.json()
+        assert denied.status_code == 401
+        assert body["loop_blocked"] == 1 and body["detect_blocking"]
+        assert body["blocked_calls"][0]["location"].endswith("in blocking_call")
@@ -0,0 +1,213 @@
+"""
+Unit tests for the shared security pattern scanner.
+Tests combined-alternation rule families against the original
+one-regex-per-rule checks, rule reporting, memoisation, and benchmarks the
+sanitizer on the synthetic question corpus and large webhook payloads.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+import pytest
+
+from src.security.pattern_scanner import SecurityScanner
+from src.security.input_sanitizer import InputSanitizer
+from src.db.connection import DatabaseManager
+from src.core.errors import SecurityError
+
+
+CORPUS_PATH = Path(__file__).resolve().parents[1] / "synthetic_questions.json"
+
+ATTACKS = [
+    "<script>alert(1)</script>",
+    "<SCRIPT src=x>\n</script>",
+    "click javascript:void(0)",
+    "<img src=x onerror = alert(1)>",
+    "<iframe src=//evil>",
+    "1 UNION  SELECT password FROM users",
+    "x' OR 1=1 --",
+    "name; DROP TABLE users",
+    "exec (xp_cmdshell)",
+    "0xDEADBEEF",
+    "foo; rm -rf /",
+    "a | cat /etc/passwd",
+    "$(whoami)",
+    "`id`",
+    "echo hi > /etc/hosts",
+    "../../etc/passwd",
+    "..%2f..%2fsecret",
+]
+
+
+def load_questions():
+    data = json.loads(CORPUS_PATH.read_text())
+    return [q["question"] for persona in data["personas"].values() for q in persona["questions"]]
+
+
+def naive_verdict(sanitizer, value):
+    """The original per-pattern loops, used as the parity oracle."""
+    lower = value.lower()
+    for pattern in sanitizer.xss_patterns:
+        if re.search(pattern, lower, re.IGNORECASE | re.DOTALL):
+            return "xss"
+    for pattern in sanitizer.sql_injection_patterns:
+        if re.search(pattern, lower, re.IGNORECASE):
+            return "sql_injection"
+    for pattern in sanitizer.command_injection_patterns:
+        if re.search(pattern, value, re.IGNORECASE):
+            return "command_injection"
+    for pattern in sanitizer.path_traversal_patterns:
+        if re.search(pattern, value, re.IGNORECASE):
+            return "path_traversal"
+    return None
+
+
+def make_webhook_payload(size):
+    return {
+        "message": {
+            "type": "tool-calls",
+            "call": {"id": "call-123", "status": "in-progress"},
+            "toolCalls": [
+                {"id": f"tc-{i}", "function": {"name": "searchKnowledgeBase",
+                                               "arguments": {"query": f"How much does a license cost in state {i}?"}}}
+                for i in range(size)
+            ],
+            "transcript": [f"Caller asked about exam number {i} and bonding requirements" for i in range(size)],
+        }
+    }
+
+
+class TestSecurityScanner:
+    """Test suite for the combined-alternation engine."""
+
+    def test_reports_which_rule_fired(self):
+        """TEST: The match names the family and rule"""
+        scanner = SecurityScanner()
+        scanner.register("sql", [("union", r"\bunion\s+select\b"), ("tautology", r"\bor\s+1\s*=\s*1\b")])
+
+        match = scanner.scan("a or 1=1", ("sql",))
+
+        assert match.family == "sql"
+        assert match.rule == "tautology"
+        assert scanner.scan("harmless", ("sql",)) is None
+
+    def test_rules_with_inner_groups(self):
+        """TEST: Capturing groups inside rules do not confuse rule attribution"""
+        scanner = SecurityScanner()
+        scanner.register("cmd", [r";\s*(rm|ls)\b", r"`[^`]*`"])
+
+        assert scanner.scan("x; ls", ("cmd",)).pattern == r";\s*(rm|ls)\b"
+
+    def test_family_order_is_priority(self):
+        """TEST: Earlier families win even when a later family matches first in the string"""
+        scanner = SecurityScanner()
+        scanner.register("a", ["zzz"])
+        scanner.register("b", ["aaa"])
+
+        assert scanner.scan("aaa zzz", ("a", "b")).family == "a"
+
+    def test_verdicts_are_memoised(self):
+        """TEST: Repeated inputs are answered from the memo"""
+        scanner = SecurityScanner(memo_size=2)
+        scanner.register("a", ["bad"])
+
+        scanner.scan("fine", ("a",))
+        scanner.scan("fine", ("a",))
+
+        assert scanner.stats["memo_hits"] == 1
+
+    def test_reregistering_clears_memo(self):
+        """TEST: Changing rules invalidates memoised verdicts"""
+        scanner = SecurityScanner()
+        scanner.register("a", ["bad"])
+        assert scanner.scan("worse", ("a",)) is None
+
+        scanner.register("a", ["worse"])
+
+        assert scanner.scan("worse", ("a",)) is not None
+
+
+class TestSanitizerParity:
+    """The sanitizer must reject exactly what the per-regex loops rejected."""
+
+    @pytest.mark.parametrize("value", ATTACKS)
+    def test_attacks_match_original_family(self, value):
+        """TEST: Attack strings trip the same family as the original checks"""
+        sanitizer = InputSanitizer()
+        expected = naive_verdict(sanitizer, value)
+        match = sanitizer.scanner.scan(value, ("xss",) + sanitizer._injection_families)
+
+        assert expected is not None
+        assert match.family == expected
+
+    def test_corpus_parity(self):
+        """TEST: Every synthetic question gets the same verdict as the original checks"""
+        sanitizer = InputSanitizer()
+        for question in load_questions():
+            match = sanitizer.scanner.scan(question, ("xss",) + sanitizer._injection_families)
+            assert (match.family if match else None) == naive_verdict(sanitizer, question), question
+
+    def test_sanitize_string_raises_security_error(self):
+        """TEST: sanitize_string still raises the original error messages"""
+        sanitizer = InputSanitizer()
+
+        with pytest.raises(SecurityError, match="XSS"):
+            sanitizer.sanitize_string("<script>x</script>")
+        with pytest.raises(SecurityError, match="path traversal"):
+            sanitizer.sanitize_string("../../etc")
+
+
+class TestSQLValidationRules:
+    """DatabaseManager.validate_sql_query uses the shared engine."""
+
+    @pytest.mark.parametrize("statement, message", [
+        ("SELECT * FROM companies; DROP TABLE companies", "Dangerous SQL keyword detected: drop"),
+        ("SELECT * FROM companies -- hi", "Potential SQL injection pattern detected: --"),
+        ("SELECT * FROM companies WHERE name = 'a' OR 'b'='b'", "Potential SQL injection pattern detected"),
+    ])
+    def test_rejects_with_rule(self, tmp_path, statement, message):
+        """TEST: Rejections name the rule that fired"""
+        manager = DatabaseManager(str(tmp_path / "fact.db"))
+
+        with pytest.raises(SecurityError, match=re.escape(message)):
+            manager.validate_sql_query(statement)
+
+
+def flatten_strings(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from flatten_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from flatten_strings(item)
+    elif isinstance(value, str):
+        yield value
+
+
+@pytest.mark.performance
+def test_benchmark_scanner_corpus_and_payload():
+    """BENCHMARK: Combined scanner vs per-regex loops on the corpus and a large webhook payload"""
+    sanitizer = InputSanitizer()
+    families = ("xss",) + sanitizer._injection_families
+    strings = load_questions() + list(flatten_strings(make_webhook_payload(1000)))
+
+    start = time.perf_counter()
+    naive = [naive_verdict(sanitizer, value) for value in strings]
+    naive_time = time.perf_counter() - start
+
+    sanitizer.scanner.clear_memo()
+    start = time.perf_counter()
+    combined = [sanitizer.scanner.scan(value, families) for value in strings]
+    scanner_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in strings:
+        sanitizer.scanner.scan(value, families)
+    memo_time = time.perf_counter() - start
+
+    print(f"\n{len(strings)} strings - per-regex loops: {naive_time * 1000:.1f} ms, "
+          f"combined scanner: {scanner_time * 1000:.1f} ms, memoised repeat: {memo_time * 1000:.1f} ms")
+    assert [m.family if m else None for m in combined] == naive
+    assert scanner_time < naive_time
+    assert memo_time < scanner_time
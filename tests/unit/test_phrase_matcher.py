@@ -0,0 +1,170 @@
+"""
+Unit tests for the shared VAPI phrase matching engine.
+Tests Aho-Corasick matching, lexicon scanning, incremental per-call counts
+and parity with the original substring-based persona scoring.
+"""
+
+import pytest
+
+from src.api.phrase_matcher import AhoCorasick, PhraseLexicon, IncrementalPhraseCounter
+from src.api.vapi_conversation_scoring import (
+    ConversationScorer,
+    PersonaType,
+    PERSONA_KEYWORDS,
+)
+from src.api.vapi_routing import VAPISquadRouter
+
+
+SAMPLE_UTTERANCES = [
+    "I'm new to this and it all feels overwhelming, where do I start?",
+    "I need this now, it's urgent, the deadline is Friday. How long does it take?",
+    "Tell me about the business opportunity and passive income from the network",
+    "What's the price? Can you compare it to other options and show proof?",
+    "hello there",
+    "I'm a veteran, military, and honestly stressed by the red tape",
+]
+
+
+class TestAhoCorasick:
+    """Test suite for the automaton."""
+
+    def test_finds_overlapping_and_nested_phrases(self):
+        """TEST: Every occurrence is reported, including nested phrases"""
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+        counts = automaton.count("ushers")
+        found = {automaton.phrases[pid]: n for pid, n in counts.items()}
+
+        assert found == {"she": 1, "he": 1, "hers": 1}
+
+    def test_matching_is_case_insensitive_for_phrases(self):
+        """TEST: Phrases are lowercased when the automaton is built"""
+        automaton = AhoCorasick(["ASAP", "ROI"])
+
+        counts = automaton.count("need roi asap")
+
+        assert sum(counts.values()) == 2
+
+    def test_counts_repeated_occurrences(self):
+        """TEST: Repeated phrases are counted once per occurrence"""
+        automaton = AhoCorasick(["fast"])
+
+        assert sum(automaton.count("fast fast faster").values()) == 3
+
+
+class TestPhraseLexicon:
+    """Test suite for the tagged phrase lexicon."""
+
+    def test_scan_reports_distinct_and_occurrence_counts(self):
+        """TEST: Scan aggregates phrase hits per (group, label)"""
+        lexicon = PhraseLexicon()
+        lexicon.register("g", {"a": ["cat", "dog"], "b": ["dog"]})
+
+        matches = lexicon.scan("Dog and dog and CAT")
+
+        assert matches.distinct("g", "a") == 2
+        assert matches.occurrences("g", "a") == 3
+        assert matches.distinct("g", "b") == 1
+        assert matches.occurrences("g", "b") == 2
+        assert not matches.any("g", "missing")
+
+    def test_reregistering_group_recompiles(self):
+        """TEST: Replacing a group takes effect on the next scan"""
+        lexicon = PhraseLexicon()
+        lexicon.register("g", {"a": ["cat"]})
+        assert lexicon.scan("cat").any("g", "a")
+
+        lexicon.register("g", {"a": ["dog"]})
+
+        assert not lexicon.scan("cat").any("g", "a")
+        assert lexicon.scan("dog").any("g", "a")
+
+
+class TestIncrementalPhraseCounter:
+    """Test suite for per-call running counts."""
+
+    def test_totals_accumulate_per_call(self):
+        """TEST: Observing utterances accumulates counts for that call only"""
+        lexicon = PhraseLexicon()
+        lexicon.register("g", {"a": ["fast"]})
+        counter = IncrementalPhraseCounter(lexicon, "g")
+
+        counter.observe("call-1", "fast")
+        totals = counter.observe("call-1", "fast and fast")
+        other = counter.observe("call-2", "slow")
+
+        assert totals["a"] == 3
+        assert other["a"] == 0
+
+    def test_window_drops_oldest_utterances(self):
+        """TEST: Totals only cover the configured utterance window"""
+        lexicon = PhraseLexicon()
+        lexicon.register("g", {"a": ["fast"]})
+        counter = IncrementalPhraseCounter(lexicon, "g", window=2)
+
+        counter.observe("call", "fast fast")
+        counter.observe("call", "fast")
+        totals = counter.observe("call", "nothing")
+
+        assert totals["a"] == 1
+
+    def test_max_calls_evicts_least_recent(self):
+        """TEST: The counter never tracks more than max_calls calls"""
+        lexicon = PhraseLexicon()
+        lexicon.register("g", {"a": ["x"]})
+        counter = IncrementalPhraseCounter(lexicon, "g", max_calls=2)
+
+        for call_id in ("c1", "c2", "c3"):
+            counter.observe(call_id, "x")
+
+        assert counter.totals("c1") == {}
+        assert counter.totals("c3")["a"] == 1
+
+
+class TestScoringParity:
+    """The shared engine must agree with the original substring scoring."""
+
+    @pytest.mark.parametrize("text", SAMPLE_UTTERANCES)
+    def test_detect_persona_matches_naive_scoring(self, text):
+        """TEST: Persona detection equals the per-keyword `in` loop"""
+        text_lower = text.lower()
+        naive = {
+            persona: sum(1 for kw in keywords if kw in text_lower)
+            for persona, keywords in PERSONA_KEYWORDS.items()
+        }
+        if max(naive.values()) == 0:
+            expected = (PersonaType.UNKNOWN, 0.0)
+        else:
+            best = max(naive, key=naive.get)
+            expected = (best, min(1.0, naive[best] / 3.0))
+
+        assert ConversationScorer().detect_persona("call", text) == expected
+
+    @pytest.mark.parametrize("text", SAMPLE_UTTERANCES)
+    def test_router_scores_match_naive_scoring(self, text):
+        """TEST: Router persona scores equal the original substring loops"""
+        router = VAPISquadRouter()
+        text_lower = text.lower()
+
+        scores = router.analyze_conversation_text(text)
+
+        for persona, indicators in router.persona_indicators.items():
+            matches = sum(1 for ind in indicators if ind.lower() in text_lower)
+            score = float(matches) + (matches * 0.5 if matches > 1 else 0.0)
+            for clues in router.context_clues[persona].values():
+                score += sum(1 for clue in clues if clue in text_lower) * 0.3
+            assert getattr(scores, persona) == pytest.approx(min(score / 10.0, 1.0))
+
+    def test_incremental_history_matches_full_history(self):
+        """TEST: Per-call incremental history equals rescanning the history"""
+        incremental = VAPISquadRouter()
+        full = VAPISquadRouter()
+        history = []
+
+        for text in SAMPLE_UTTERANCES:
+            history.append(text)
+            fast = incremental.analyze_conversation_text(text, call_id="call-42")
+            slow = full.analyze_conversation_text(text, list(history))
+
+            for persona in incremental.persona_indicators:
+                assert getattr(fast, persona) == pytest.approx(getattr(slow, persona))
@@ -0,0 +1,257 @@
+"""
+Unit tests for connection pool lifecycle management.
+Tests acquire timeouts, liveness checks, age and idle recycling, leak
+detection and wait-time metrics for the SQLite pool and the asyncpg wrapper.
+"""
+
+import asyncio
+import sqlite3
+import pytest
+import pytest_asyncio
+
+from src.core.errors import PoolTimeoutError
+from src.db.connection import AsyncConnectionPool, DatabaseManager
+from src.db.pool_health import MonitoredPgPool, PoolSettings
+
+
+def make_pool(path, size=2, **settings):
+    return AsyncConnectionPool(str(path), size, settings=PoolSettings(**settings))
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "fact.db"
+    sqlite3.connect(path).close()
+    return path
+
+
+@pytest_asyncio.fixture
+async def pool(database):
+    pool = make_pool(database, acquire_timeout=0.2, validate_after=0)
+    yield pool
+    await pool.close_all()
+
+
+class TestSQLitePool:
+    """Test suite for AsyncConnectionPool lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout_raises_clear_error(self, pool):
+        """TEST: An exhausted pool raises PoolTimeoutError instead of waiting forever"""
+        held = [await pool.get_connection(), await pool.get_connection()]
+
+        with pytest.raises(PoolTimeoutError, match="all 2 are in use") as error:
+            await pool.get_connection()
+
+        assert error.value.context["in_use"] == 2
+        assert pool.get_stats()["timeouts"] == 1
+        for conn in held:
+            await pool.return_connection(conn)
+
+    @pytest.mark.asyncio
+    async def test_waiter_gets_returned_connection(self, pool):
+        """TEST: A waiting caller receives the next returned connection and the wait is recorded"""
+        held = [await pool.get_connection(), await pool.get_connection()]
+
+        waiter = asyncio.create_task(pool.get_connection())
+        await asyncio.sleep(0.05)
+        assert pool.get_stats()["waiting"] == 1
+        await pool.return_connection(held.pop())
+        conn = await waiter
+
+        stats = pool.get_stats()
+        assert stats["wait_ms"]["max"] >= 40
+        assert stats["utilisation"] == 1.0
+        for c in (conn, *held):
+            await pool.return_connection(c)
+
+    @pytest.mark.asyncio
+    async def test_dead_connection_replaced_on_checkout(self, pool):
+        """TEST: A connection that fails its liveness ping is closed and replaced"""
+        conn = await pool.get_connection()
+        await pool.return_connection(conn)
+        await conn.close()  # Dies while idle in the pool
+
+        fresh = await pool.get_connection()
+        await fresh.execute("SELECT 1")
+
+        assert fresh is not conn
+        assert pool.get_stats()["failed_checks"] == 1
+        assert pool.created_connections == 1
+        await pool.return_connection(fresh)
+
+    @pytest.mark.asyncio
+    async def test_max_lifetime_and_idle_recycle(self, database):
+        """TEST: Connections past their maximum age or idle time are not reused"""
+        aged = make_pool(database, max_lifetime=0.05, max_idle=0)
+        idle = make_pool(database, max_lifetime=0, max_idle=0.05)
+
+        for pool in (aged, idle):
+            first = await pool.get_connection()
+            await asyncio.sleep(0.1)
+            await pool.return_connection(first)
+            await asyncio.sleep(0.1)
+            second = await pool.get_connection()
+            assert second is not first
+            assert pool.get_stats()["recycled"] == 1
+            assert pool.created_connections == 1
+            await pool.return_connection(second)
+            await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_leak_detection(self, database):
+        """TEST: A connection held past the leak threshold is reported with its origin"""
+        pool = make_pool(database, leak_threshold=0.05)
+        leaked = await pool.get_connection()
+        await asyncio.sleep(0.1)
+
+        leaks = pool.leaks()
+        assert len(leaks) == 1
+        assert any("test_leak_detection" in frame for frame in leaks[0]["origin"])
+        assert pool.tracker.report_leaks() == 1
+        assert pool.get_stats()["leaks"] == 1
+
+        await pool.return_connection(leaked)
+        assert pool.leaks() == []
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_foreign_and_double_returns_keep_accounting(self, pool):
+        """TEST: Returning an unknown or already-returned connection does not free a slot"""
+        conn = await pool.get_connection()
+        await pool.return_connection(conn)
+        await pool.return_connection(conn)
+
+        held = [await pool.get_connection(), await pool.get_connection()]
+        with pytest.raises(PoolTimeoutError):
+            await pool.get_connection()
+        for c in held:
+            await pool.return_connection(c)
+
+    @pytest.mark.asyncio
+    async def test_close_all_closes_checked_out_on_return(self, pool):
+        """TEST: Connections checked out during close_all() are closed when returned"""
+        conn = await pool.get_connection()
+        await pool.close_all()
+        await pool.return_connection(conn)
+
+        assert len(pool.pool) == 0
+        assert pool.created_connections == 0
+
+    @pytest.mark.asyncio
+    async def test_manager_reports_pool_stats(self, database):
+        """TEST: DatabaseManager exposes reader and writer pool metrics"""
+        manager = DatabaseManager(str(database), pool_size=2)
+        await manager.initialize_database()
+        await manager.execute_query("SELECT 1")
+
+        stats = manager.get_pool_stats()
+        assert stats["readers"]["checkouts"] >= 1
+        assert stats["writer"]["checkouts"] >= 1
+        await manager.cleanup()
+
+
+class FakeConnection:
+    """Stands in for an asyncpg pool connection proxy."""
+
+    def __init__(self, pid, pool):
+        self.pid = pid
+        self.pool = pool
+        self.alive = True
+        self.closed = False
+
+    def get_server_pid(self):
+        return self.pid
+
+    async def fetchval(self, query, timeout=None):
+        if not self.alive:
+            raise ConnectionResetError("server closed the connection")
+        return 1
+
+    def terminate(self):
+        # Like asyncpg, closing a pooled connection frees its pool slot
+        self.closed = True
+        self.pool.free.put_nowait(self)
+
+    async def close(self, timeout=None):
+        self.terminate()
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakePool:
+    """Minimal asyncpg.Pool surface: acquire, release, sizes; reconnects closed connections."""
+
+    def __init__(self, monitored, size=1):
+        self.monitored = monitored
+        self.size = size
+        self.free = asyncio.Queue()
+        self.next_pid = 100
+        for _ in range(size):
+            self.free.put_nowait(None)
+
+    async def acquire(self, timeout=None):
+        conn = await asyncio.wait_for(self.free.get(), timeout)
+        if conn is None or conn.closed:
+            self.next_pid += 1
+            conn = FakeConnection(self.next_pid, self)
+            await self.monitored.on_connect(conn)
+        return conn
+
+    async def release(self, conn, timeout=None):
+        self.free.put_nowait(conn)
+
+    def get_max_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self.free.qsize()
+
+
+@pytest.fixture
+def pg_pool():
+    monitored = MonitoredPgPool(PoolSettings(acquire_timeout=0.1, validate_after=0))
+    return monitored.bind(FakePool(monitored))
+
+
+class TestMonitoredPgPool:
+    """Test suite for the asyncpg pool wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_dead_connection_is_terminated_and_replaced(self, pg_pool):
+        """TEST: A connection failing SELECT 1 is terminated and checkout retries"""
+        async with pg_pool.acquire() as conn:
+            first = conn
+        first.alive = False
+
+        async with pg_pool.acquire() as conn:
+            assert conn is not first and conn.alive
+
+        assert first.closed
+        assert pg_pool.get_stats()["failed_checks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self, pg_pool):
+        """TEST: Pool exhaustion raises PoolTimeoutError"""
+        conn = await pg_pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            await pg_pool.acquire()
+
+        await pg_pool.release(conn)
+        assert pg_pool.get_stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_max_lifetime_closes_on_release(self):
+        """TEST: Connections older than max_lifetime are closed instead of reused"""
+        monitored = MonitoredPgPool(PoolSettings(max_lifetime=0.01))
+        monitored.bind(FakePool(monitored))
+
+        async with monitored.acquire() as conn:
+            await asyncio.sleep(0.02)
+        async with monitored.acquire() as again:
+            pass
+
+        assert conn.closed and again is not conn
+        assert monitored.get_stats()["recycled"] == 1
@@ -0,0 +1,288 @@
+"""
+Unit tests for the pre-fork server.
+Tests serving option parsing, access log sampling, per-worker request
+metrics and their aggregation, resuming a preloaded retriever after fork,
+and the master's fork, rolling restart and shutdown cycle.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import time
+import urllib.request
+import pytest
+import pytest_asyncio
+
+from src.core.errors import ConfigurationError
+from src.db.change_feed import PostgresChangeFeed, SQLiteChangeFeed
+from src.db.models import DATABASE_SCHEMA, FULLTEXT_SCHEMA
+from src.monitoring.worker_metrics import RequestMetricsMiddleware, WorkerMetrics, snapshot_path
+from src.prefork_server import (
+    AccessLogSampler, PreforkServer, ServingOptions, install_access_log_sampling,
+    parse_access_log, resolve_loop, resolve_workers
+)
+from src.retrieval.enhanced_search import EnhancedRetriever
+
+
+def access_record(status):
+    return logging.LogRecord("uvicorn.access", logging.INFO, __file__, 1, '%s - "%s %s HTTP/%s" %d',
+                             ("127.0.0.1:1", "GET", "/health", "1.1", status), None)
+
+
+class TestServingOptions:
+    """Test suite for serving option parsing."""
+
+    def test_worker_count(self):
+        """TEST: Worker counts accept integers and "auto" for one per core"""
+        assert resolve_workers("3") == 3
+        assert resolve_workers("auto") == (os.cpu_count() or 1)
+        assert resolve_workers(0) == (os.cpu_count() or 1)
+        for bad in ("many", "-1"):
+            with pytest.raises(ConfigurationError):
+                resolve_workers(bad)
+
+    def test_access_log_setting(self):
+        """TEST: Access logging is on, off, or a sample fraction"""
+        assert parse_access_log("on") == 1.0
+        assert parse_access_log("off") == 0.0
+        assert parse_access_log("0.05") == 0.05
+        for bad in ("sometimes", "2"):
+            with pytest.raises(ConfigurationError):
+                parse_access_log(bad)
+
+    def test_from_env(self, monkeypatch):
+        """TEST: Options are read from the environment"""
+        monkeypatch.setenv("PORT", "9123")
+        monkeypatch.setenv("WEB_WORKERS", "4")
+        monkeypatch.setenv("WEB_ACCESS_LOG", "off")
+        monkeypatch.setenv("WEB_LOOP", "asyncio")
+
+        options = ServingOptions.from_env()
+
+        assert (options.port, options.workers, options.access_log_rate, options.loop) == (9123, 4, 0.0, "asyncio")
+        assert not options.uvicorn_config(app=None).access_log
+        with pytest.raises(ConfigurationError):
+            resolve_loop("trio")
+
+
+class TestAccessLogSampling:
+    """Test suite for the sampled access log."""
+
+    def test_sampling_keeps_server_errors(self):
+        """TEST: A sampled log keeps roughly the rate of requests and every 5xx"""
+        sampler = AccessLogSampler(0.1)
+        kept = sum(sampler.filter(access_record(200)) for _ in range(5000))
+
+        assert 250 < kept < 750
+        assert all(sampler.filter(access_record(503)) for _ in range(100))
+
+    def test_install_replaces_sampler(self):
+        """TEST: Installing a new rate replaces the previous sampler; full rate installs none"""
+        access_logger = logging.getLogger("uvicorn.access")
+        install_access_log_sampling(0.5)
+        install_access_log_sampling(0.2)
+        samplers = [f for f in access_logger.filters if isinstance(f, AccessLogSampler)]
+        assert [s.rate for s in samplers] == [0.2]
+
+        install_access_log_sampling(1.0)
+        assert not [f for f in access_logger.filters if isinstance(f, AccessLogSampler)]
+
+
+class TestWorkerMetrics:
+    """Test suite for per-worker request metrics."""
+
+    @pytest.mark.asyncio
+    async def test_middleware_records_requests(self):
+        """TEST: The middleware counts status classes and latency, including failing apps"""
+        metrics = WorkerMetrics()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/boom":
+                raise RuntimeError("boom")
+            await send({"type": "http.response.start", "status": 404 if scope["path"] == "/missing" else 200})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        middleware = RequestMetricsMiddleware(app, metrics)
+        for path in ("/ok", "/ok", "/missing"):
+            await middleware({"type": "http", "path": path}, None, send)
+        with pytest.raises(RuntimeError):
+            await middleware({"type": "http", "path": "/boom"}, None, send)
+
+        snapshot = metrics.snapshot()
+        assert (snapshot["requests"], snapshot["client_errors"], snapshot["server_errors"]) == (4, 1, 1)
+        assert snapshot["in_flight"] == 0 and snapshot["latency_ms_total"] > 0
+
+    def test_aggregate_across_workers(self, tmp_path):
+        """TEST: Snapshots of live siblings are summed; files left by dead workers are ignored"""
+        metrics = WorkerMetrics(str(tmp_path))
+        metrics.record(200, 10.0)
+        metrics.publish()
+
+        sibling = dict(metrics.snapshot(), pid=os.getppid(), requests=5, server_errors=2,
+                       latency_ms_total=40.0, latency_ms_max=30.0)
+        (tmp_path / f"worker-{os.getppid()}.json").write_text(json.dumps(sibling))
+        (tmp_path / "worker-999999999.json").write_text(json.dumps(dict(sibling, pid=999999999)))
+
+        result = metrics.aggregate()
+
+        assert result["worker_count"] == 2
+        assert result["totals"]["requests"] == 6
+        assert result["totals"]["server_errors"] == 2
+        assert result["totals"]["latency_ms_max"] == 30.0
+        assert result["totals"]["latency_ms_avg"] == pytest.approx(50.0 / 6, abs=0.001)
+
+        metrics.unpublish()
+        assert not os.path.exists(snapshot_path(str(tmp_path), os.getpid()))
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = str(tmp_path / "fact.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executescript(FULLTEXT_SCHEMA)
+        conn.executemany("INSERT INTO knowledge_base (question, answer, category) VALUES (?, ?, ?)",
+                         [(f"Georgia question {i}", f"Answer {i} about exams", "licensing") for i in range(20)])
+    yield path
+
+
+class TestRetrieverResume:
+    """Test suite for taking over a preloaded retriever in a worker."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_resume_replays_changes_since_preload(self, database, monkeypatch):
+        """TEST: A worker keeps the preloaded index and catches up from the change log without reloading"""
+        monkeypatch.setenv("DATABASE_PATH", database)
+        master = EnhancedRetriever(None, change_feed=SQLiteChangeFeed(database, interval=0.05))
+        await master.initialize(start_feed=False)
+        await master.close()  # What the master does before forking
+        index = master.in_memory_index
+
+        with sqlite3.connect(database) as conn:
+            conn.execute("INSERT INTO knowledge_base (question, answer, category) "
+                         "VALUES ('Quokka permit cost?', 'Quokka permits are free', 'fees')")
+        await master.resume()
+        try:
+            deadline = time.monotonic() + 2
+            while not await master.search("quokka permit", use_cache=False):
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.02)
+            assert master.in_memory_index is index
+            assert master.tracks_changes
+        finally:
+            await master.close()
+
+    @pytest.mark.asyncio
+    async def test_postgres_resume_compares_fingerprint(self):
+        """TEST: A PostgreSQL feed asks for a reload only if the table changed since the master's mark"""
+        fingerprint = ["20:12345"]
+
+        class Connection:
+            async def fetchval(self, query):
+                return fingerprint[0]
+
+        class Pool:
+            def acquire(self):
+                class Context:
+                    async def __aenter__(self):
+                        return Connection()
+
+                    async def __aexit__(self, *exc):
+                        return False
+                return Context()
+
+        feed = PostgresChangeFeed(Pool(), "postgresql://unused")
+
+        async def listen():
+            feed._listener = None
+        feed._listen = listen
+
+        await feed.mark()
+        assert not await feed.resume()
+        fingerprint[0] = "21:999"
+        assert await feed.resume(pool=Pool())
+
+
+def pid_app_factory(marker):
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        body = json.dumps({"pid": os.getpid(), "preloaded": marker.get("value")}).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def run_master(port):
+    marker = {}
+
+    async def preload():
+        marker["value"] = marker.get("value", 0) + 1
+
+    options = ServingOptions(host="127.0.0.1", port=port, workers=2, access_log_rate=0.0,
+                             graceful_timeout=2, log_level="warning")
+    os._exit(PreforkServer(pid_app_factory(marker), options, preload=preload).run())
+
+
+def fetch(port):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/", headers={"Connection": "close"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def wait_for_pids(port, count, exclude=(), timeout=20):
+    deadline = time.monotonic() + timeout
+    seen = {}
+    while time.monotonic() < deadline:
+        try:
+            reply = fetch(port)
+        except OSError:
+            time.sleep(0.1)
+            continue
+        if reply["pid"] not in exclude:
+            seen[reply["pid"]] = reply["preloaded"]
+        if len(seen) >= count:
+            return seen
+    raise AssertionError(f"Saw workers {seen}, expected {count}")
+
+
+class TestPreforkMaster:
+    """Test suite for the master process."""
+
+    def test_fork_rolling_restart_and_shutdown(self):
+        """TEST: Workers share the socket and preload; SIGHUP replaces them; SIGTERM exits cleanly"""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        master = multiprocessing.get_context("fork").Process(target=run_master, args=(port,))
+        master.start()
+        try:
+            first = wait_for_pids(port, 2)
+            assert set(first.values()) == {1}
+
+            os.kill(master.pid, signal.SIGHUP)
+            second = wait_for_pids(port, 2, exclude=first)
+            # Replacements were forked after the preload ran again
+            assert set(second.values()) == {2}
+            time.sleep(0.5)
+            assert not any(os.path.exists(f"/proc/{pid}") and
+                           open(f"/proc/{pid}/stat").read().split()[2] != "Z" for pid in first)
+        finally:
+            os.kill(master.pid, signal.SIGTERM)
+            master.join(15)
+        assert master.exitcode == 0
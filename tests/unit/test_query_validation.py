@@ -0,0 +1,106 @@
+"""
+Unit tests for SQL validation caching.
+Tests literal-normalised fingerprints, the LRU validation cache, safe
+templates and off-loop EXPLAIN validation in DatabaseManager.
+"""
+
+import sqlite3
+import threading
+import pytest
+
+from src.db.connection import DatabaseManager
+from src.db.query_validation import ValidationCache, fingerprint_sql
+from src.core.errors import InvalidSQLError, SecurityError
+
+
+@pytest.fixture
+def manager(tmp_path):
+    path = tmp_path / "fact.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE knowledge_base (id INTEGER PRIMARY KEY, question TEXT, state TEXT)")
+        conn.execute("INSERT INTO knowledge_base (question, state) VALUES ('q', 'GA')")
+    return DatabaseManager(str(path))
+
+
+class TestFingerprint:
+    """Test suite for statement fingerprints."""
+
+    def test_literals_share_fingerprint(self):
+        """TEST: Statements differing only in literals share a fingerprint"""
+        first = fingerprint_sql("SELECT * FROM knowledge_base WHERE state = 'GA' LIMIT 5")
+        second = fingerprint_sql("select *  from knowledge_base\n where state = 'it''s' limit 1000")
+
+        assert first == second == "select * from knowledge_base where state = ? limit ?"
+
+    def test_in_lists_collapse(self):
+        """TEST: IN lists of any length share a fingerprint"""
+        assert fingerprint_sql("SELECT 1 WHERE id IN (1, 2, 3)") == fingerprint_sql("SELECT 1 WHERE id IN (7)")
+
+    def test_structure_changes_fingerprint(self):
+        """TEST: Different columns or tables give different fingerprints"""
+        assert fingerprint_sql("SELECT a FROM t1") != fingerprint_sql("SELECT b FROM t1")
+        assert fingerprint_sql("SELECT a FROM t1") != fingerprint_sql("SELECT a FROM t2")
+
+
+class TestValidationCache:
+    """Test suite for the LRU."""
+
+    def test_evicts_least_recently_used(self):
+        """TEST: Recently used fingerprints survive eviction"""
+        cache = ValidationCache(max_size=2)
+        cache.add("a", 0)
+        cache.add("b", 0)
+        assert "a" in cache
+        cache.add("c", 0)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+
+class TestDatabaseManagerValidation:
+    """Test suite for DatabaseManager.validate_sql_query(_async)."""
+
+    @pytest.mark.asyncio
+    async def test_explain_runs_once_per_template(self, manager, monkeypatch):
+        """TEST: Statements differing only in literals are EXPLAINed once"""
+        calls = []
+        original = manager._explain_worker.explain
+        monkeypatch.setattr(manager._explain_worker, "explain",
+                            lambda statement, params=(): calls.append(threading.current_thread().name) or original(statement, params))
+
+        for state in ("GA", "FL", "TX"):
+            await manager.validate_sql_query_async(f"SELECT question FROM knowledge_base WHERE state = '{state}'")
+
+        assert len(calls) == 1
+        assert calls[0].startswith("sql-validate")
+
+    def test_safe_template_skips_explain(self, manager, monkeypatch):
+        """TEST: Registered templates never reach EXPLAIN"""
+        monkeypatch.setattr(manager._explain_worker, "explain",
+                            lambda statement, params=(): pytest.fail("EXPLAIN should be skipped"))
+        manager.register_safe_template("SELECT id FROM knowledge_base WHERE id = 1")
+
+        manager.validate_sql_query("SELECT id FROM knowledge_base WHERE id = 42")
+        manager.validate_sql_query("SELECT 1")
+
+    def test_security_checks_still_run_on_cached_templates(self, manager):
+        """TEST: A cached fingerprint does not bypass security rules on literal contents"""
+        manager.validate_sql_query("SELECT question FROM knowledge_base WHERE state = 'GA'")
+
+        with pytest.raises(SecurityError):
+            manager.validate_sql_query("SELECT question FROM knowledge_base WHERE state = '-- x'")
+
+    @pytest.mark.asyncio
+    async def test_syntax_errors_are_reported(self, manager):
+        """TEST: Invalid SQL still raises InvalidSQLError"""
+        with pytest.raises(InvalidSQLError):
+            await manager.validate_sql_query_async("SELECT nope FROM missing_table")
+
+    @pytest.mark.asyncio
+    async def test_execute_query_uses_async_validation(self, manager):
+        """TEST: execute_query validates and runs the statement"""
+        result = await manager.execute_query("SELECT question FROM knowledge_base WHERE state = 'GA'")
+
+        assert result.rows == [{"question": "q"}]
+        await manager.cleanup()
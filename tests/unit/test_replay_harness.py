@@ -0,0 +1,283 @@
+"""
+Unit tests for the replay load-testing harness.
+Tests workload schedules from query logs and Poisson arrivals, latency
+measured from the scheduled send time, per-phase cache hit rates, the
+query log recorder, and the mock LLM server.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+import httpx
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from benchmarking.mock_llm import MockLLMConfig, MockLLMServer
+from benchmarking.replay import (LoadPhase, ReplayHarness, ReplayRequest, format_reports,
+                                 load_query_log, percentiles, poisson_schedule)
+from monitoring.query_log import QueryLogMiddleware, QueryLogRecorder
+from monitoring.worker_metrics import WorkerMetrics
+from retrieval.enhanced_search import EnhancedRetriever
+
+TOPICS = ["exam", "bond", "license", "insurance", "renewal", "reciprocity", "fees", "experience"]
+STATES = ["GA", "FL", "TX", "CA"]
+
+
+async def start_app(app):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+class ThreadedServer:
+    """Runs an aiohttp app on its own event loop, so serving doesn't delay the harness."""
+
+    def __init__(self, app):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.runner, self.base_url = asyncio.run_coroutine_threadsafe(start_app(app), self.loop).result()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def search_server(retriever, stall_first=0.0):
+    """aiohttp app serving /knowledge/search and cache counters from a retriever."""
+    state = {"stalled": False}
+
+    async def search(request):
+        body = await request.json()
+        if stall_first and not state["stalled"]:
+            state["stalled"] = True
+            # Blocks the whole event loop, like a stalled server process
+            time.sleep(stall_first)
+        results = await retriever.search(body["query"], limit=body.get("limit", 5))
+        return web.json_response({"results": [r.id for r in results]})
+
+    async def metrics(request):
+        return web.json_response({"totals": {"cache_hits": retriever.cache_hits,
+                                             "cache_misses": retriever.cache_misses}})
+
+    app = web.Application()
+    app.router.add_post("/knowledge/search", search)
+    app.router.add_get("/metrics/workers", metrics)
+    return app
+
+
+def make_retriever(count=200):
+    retriever = EnhancedRetriever(None)
+    retriever.in_memory_index.build_index([{
+        "id": i + 1,
+        "question": f"What are the {TOPICS[i % 8]} requirements in {STATES[i % 4]} for case {i}?",
+        "answer": f"Case {i}: {STATES[i % 4]} {TOPICS[i % 8]} rules need an application and fees.",
+        "category": TOPICS[i % 8],
+        "state": STATES[i % 4],
+    } for i in range(count)])
+    return retriever
+
+
+class TestSchedules:
+    """Test suite for workload schedules."""
+
+    def test_poisson_schedule_is_deterministic(self):
+        """TEST: The same seed gives the same arrivals, at roughly the requested rate"""
+        first = poisson_schedule(200, 10, seed=7)
+        again = poisson_schedule(200, 10, seed=7)
+        other = poisson_schedule(200, 10, seed=8)
+
+        assert [(r.offset, r.body) for r in first.requests] == [(r.offset, r.body) for r in again.requests]
+        assert [r.offset for r in first.requests] != [r.offset for r in other.requests]
+        assert 1800 < len(first.requests) < 2200
+        assert all(0 < r.offset < 10 for r in first.requests)
+
+    def test_load_query_log(self, tmp_path):
+        """TEST: Recorded and shorthand lines replay with their gaps, split into phases"""
+        log = tmp_path / "queries.jsonl"
+        log.write_text("\n".join(json.dumps(record) for record in [
+            {"timestamp": 1000.0, "path": "/query", "body": {"query": "hello"}, "phase": "cold"},
+            {"timestamp": "1970-01-01T00:16:42+00:00", "query": "georgia exam", "state": "GA", "phase": "cold"},
+            {"timestamp": 1001.0, "query": "florida bond", "limit": 3, "phase": "cold"},
+            {"timestamp": 2000.0, "query": "georgia exam", "phase": "warm"},
+            {"timestamp": 2004.0, "query": "texas license", "phase": "warm"},
+        ]) + "\n\n")
+
+        cold, warm = load_query_log(str(log), speedup=2.0)
+
+        assert (cold.name, warm.name) == ("cold", "warm")
+        assert [r.offset for r in cold.requests] == [0.0, 0.5, 1.0]
+        assert [r.path for r in cold.requests] == ["/query", "/knowledge/search", "/knowledge/search"]
+        assert cold.requests[2].body == {"query": "georgia exam", "limit": 5, "state": "GA"}
+        assert warm.duration == 2.0
+
+    def test_invalid_log_line(self, tmp_path):
+        """TEST: A malformed record is reported with its line number"""
+        log = tmp_path / "queries.jsonl"
+        log.write_text('{"timestamp": 1, "query": "ok"}\n{"query": "no timestamp"}\n')
+
+        with pytest.raises(ValueError, match="queries.jsonl:2"):
+            load_query_log(str(log))
+
+    def test_percentiles(self):
+        """TEST: Percentiles use the nearest rank of the exact samples"""
+        result = percentiles(range(1, 1001))
+
+        assert result == {"p50": 500, "p90": 900, "p99": 990, "p99.9": 999, "max": 1000}
+        assert percentiles([])["p99"] == 0.0
+
+
+class TestHarness:
+    """Test suite for ReplayHarness."""
+
+    @pytest.mark.asyncio
+    async def test_latency_counts_from_schedule(self):
+        """TEST: Requests delayed by a stall report the delay as latency, not just service time"""
+        runner, base_url = await start_app(search_server(make_retriever(), stall_first=0.3))
+        try:
+            phase = LoadPhase("stall", [ReplayRequest(i * 0.02, "/knowledge/search", {"query": "georgia exam"})
+                                        for i in range(10)])
+            report = await ReplayHarness(base_url).run_phase(phase)
+        finally:
+            await runner.cleanup()
+
+        assert (report.requests, report.errors) == (10, 0)
+        # The request scheduled at 20 ms finished after the 300 ms stall
+        assert report.latency_ms["p50"] >= 150
+        assert report.service_ms["p50"] < report.latency_ms["p50"] - 100
+        assert report.late_sends >= 5
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_rate_per_phase(self):
+        """TEST: Each phase reports the server's cache hits and misses during that phase"""
+        runner, base_url = await start_app(search_server(make_retriever()))
+        requests = [ReplayRequest(i * 0.005, "/knowledge/search", {"query": f"{TOPICS[i % 4]} requirements"})
+                    for i in range(8)]
+        try:
+            cold, warm = await ReplayHarness(base_url).run([LoadPhase("cold", requests),
+                                                            LoadPhase("warm", requests)])
+            unreported = await ReplayHarness(base_url, metrics_path="/missing").run_phase(LoadPhase("x", requests))
+        finally:
+            await runner.cleanup()
+
+        assert (cold.cache_hits, cold.cache_misses) == (4, 4)
+        assert (warm.cache_hits, warm.cache_misses, warm.cache_hit_rate) == (8, 0, 1.0)
+        assert unreported.cache_hit_rate is None
+        assert "n/a" in format_reports([cold, warm, unreported])
+
+    def test_worker_metrics_cache_totals(self):
+        """TEST: Worker snapshots carry the cache counters, summed with a hit rate"""
+        metrics = WorkerMetrics()
+        metrics.set_cache_source(lambda: (3, 1))
+
+        totals = metrics.aggregate()["totals"]
+
+        assert (totals["cache_hits"], totals["cache_misses"], totals["cache_hit_rate"]) == (3, 1, 0.75)
+
+
+class TestQueryLog:
+    """Test suite for the query log recorder."""
+
+    @pytest.mark.asyncio
+    async def test_recorded_log_replays(self, tmp_path):
+        """TEST: Recorded search requests load back as a replay schedule; other paths are skipped"""
+        app = FastAPI()
+
+        @app.post("/knowledge/search")
+        async def search(body: dict):
+            return {"ok": True}
+
+        @app.post("/upload-data")
+        async def upload(body: dict):
+            return {"ok": True}
+
+        recorder = QueryLogRecorder(str(tmp_path / "log.jsonl"))
+        transport = httpx.ASGITransport(app=QueryLogMiddleware(app, recorder))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/knowledge/search", json={"query": "georgia exam", "state": "GA"})
+            await client.post("/upload-data", json={"data": []})
+            await client.post("/knowledge/search", json={"query": "florida bond"})
+        recorder.close()
+
+        (phase,) = load_query_log(recorder.path)
+
+        assert [r.body["query"] for r in phase.requests] == ["georgia exam", "florida bond"]
+        assert phase.requests[0].offset == 0.0 and phase.requests[1].offset >= 0.0
+
+
+class TestMockLLM:
+    """Test suite for the mock LLM server."""
+
+    @pytest.mark.asyncio
+    async def test_groq_client_against_mock(self):
+        """TEST: The Groq SDK gets completions after the injected latency, and injected errors"""
+        from groq import AsyncGroq, InternalServerError
+
+        server = MockLLMServer(MockLLMConfig(latency_ms=50, jitter_ms=0))
+        failing = MockLLMServer(MockLLMConfig(latency_ms=0, jitter_ms=0, error_rate=1.0))
+        base_url = await server.start()
+        failing_url = await failing.start()
+        try:
+            client = AsyncGroq(api_key="mock", base_url=base_url, max_retries=0)
+            started = time.perf_counter()
+            completion = await client.chat.completions.create(
+                model="llama-3.3-70b-versatile", messages=[{"role": "user", "content": "georgia exam"}])
+            elapsed = time.perf_counter() - started
+
+            with pytest.raises(InternalServerError):
+                await AsyncGroq(api_key="mock", base_url=failing_url, max_retries=0).chat.completions.create(
+                    model="m", messages=[{"role": "user", "content": "x"}])
+        finally:
+            await server.stop()
+            await failing.stop()
+
+        assert completion.choices[0].message.content == "Mock answer to: georgia exam"
+        assert completion.usage.completion_tokens == 120
+        assert elapsed >= 0.05
+        assert (server.requests, failing.failures) == (1, 1)
+
+    def test_latency_sequence_is_seeded(self):
+        """TEST: The same seed draws the same latencies"""
+        config = MockLLMConfig(latency_ms=100, jitter_ms=30, seed=3)
+
+        first, second = MockLLMServer(config), MockLLMServer(config)
+
+        delays = [first._delay_seconds() for _ in range(5)]
+
+        assert delays == [second._delay_seconds() for _ in range(5)]
+        assert len(set(delays)) == 5
+
+
+class TestReplayPerformance:
+    """Test suite for replayed load."""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_cold_and_warm_replay(self):
+        """BENCHMARK: Poisson arrivals at 50 req/s against retriever search, cold then warm cache"""
+        server = ThreadedServer(search_server(make_retriever(300)))
+        templates = [ReplayRequest(0.0, "/knowledge/search", {"query": f"{topic} requirements in {state}"})
+                     for topic in TOPICS for state in STATES]
+        phase = poisson_schedule(50, 3.0, templates, seed=1)
+        try:
+            reports = await ReplayHarness(server.base_url).run([LoadPhase("cold", phase.requests),
+                                                                LoadPhase("warm", phase.requests)])
+        finally:
+            server.stop()
+
+        print()
+        print(format_reports(reports))
+        cold, warm = reports
+        assert cold.errors == warm.errors == 0
+        assert warm.cache_hit_rate == 1.0
+        assert warm.latency_ms["p99"] <= cold.latency_ms["p99"]
@@ -0,0 +1,121 @@
+"""
+Unit tests for the retrieval micro-benchmark suite.
+Tests deterministic knowledge base synthesis and query mixes, the per-stage
+benchmark report, and baseline comparison with regression thresholds.
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from benchmarking import retrieval_bench
+from benchmarking.retrieval_bench import (compare_reports, load_seed_entries, make_queries,
+                                          queries_for_size, run_benchmarks, synthesize_entries)
+
+BASELINE = Path(__file__).parent.parent / "performance" / "baselines" / "retrieval_baseline.json"
+
+
+@pytest.fixture(scope="module")
+def seeds():
+    return load_seed_entries()[:200]
+
+
+@pytest.fixture(scope="module")
+def small_report():
+    return run_benchmarks(sizes=[300], queries=5)
+
+
+class TestWorkload:
+    """Test suite for synthesized knowledge bases and queries."""
+
+    def test_seed_entries(self, tmp_path):
+        """TEST: Seeds load from exported files, as a list or under knowledge_base"""
+        listed = tmp_path / "list.json"
+        listed.write_text(json.dumps([{"question": "q", "answer": "a"}, {"question": "", "answer": "x"}]))
+
+        assert len(load_seed_entries()) == 1500
+        assert load_seed_entries([listed]) == [{"question": "q", "answer": "a"}]
+
+    def test_synthesis_is_deterministic(self, seeds):
+        """TEST: The same seed grows the same knowledge base, with unique ids and distinct copies"""
+        entries = synthesize_entries(seeds, 1000, seed=3)
+
+        assert entries == synthesize_entries(seeds, 1000, seed=3)
+        assert [e["id"] for e in entries] == list(range(1, 1001))
+        assert entries[0]["question"] == seeds[0]["question"]
+        assert entries[200]["question"].startswith(seeds[0]["question"])
+        assert entries[200]["question"] != entries[400]["question"]
+
+    def test_query_mix(self, seeds):
+        """TEST: Queries cycle through kinds and are repeatable"""
+        queries = make_queries(seeds, 10, seed=1)
+
+        assert queries == make_queries(seeds, 10, seed=1)
+        assert [q.kind for q in queries[:5]] == ["exact", "typo", "keywords", "state", "short"]
+        assert queries[3].state and queries[4].category
+        assert queries_for_size(1500) == 30 and queries_for_size(150000) == 3
+
+
+class TestReport:
+    """Test suite for benchmark reports and comparison."""
+
+    def test_report_shape(self, small_report):
+        """TEST: A report holds build time, index memory and stats per stage"""
+        result = small_report["results"]["300"]
+
+        assert result["build_ms"] > 0 and result["index_mb"] > 0
+        assert set(result["stages"]) == {"preprocess", "candidates", "rank", "search", "fuzzy_match"}
+        assert result["stages"]["rank"]["samples"] == 5
+        assert result["stages"]["search"]["p50"] >= result["stages"]["rank"]["p50"]
+
+    def test_compare_flags_regressions(self, small_report):
+        """TEST: Growth beyond the threshold fails; noise below the absolute floor does not"""
+        current = copy.deepcopy(small_report)
+        result = current["results"]["300"]
+        result["stages"]["rank"]["p50"] *= 2
+        result["stages"]["preprocess"]["p99"] = small_report["results"]["300"]["stages"]["preprocess"]["p99"] + 0.01
+        current["results"]["999"] = result
+
+        rows = {row["metric"]: row for row in compare_reports(small_report, current, threshold=0.25)}
+
+        assert rows["rank.p50"]["regressed"] and rows["rank.p50"]["change"] == pytest.approx(1.0)
+        assert not rows["preprocess.p99"]["regressed"]
+        assert [name for name, row in rows.items() if row["regressed"]] == ["rank.p50"]
+        assert {row["size"] for row in rows.values()} == {300}
+
+    def test_compare_command(self, small_report, tmp_path, capsys):
+        """TEST: The compare command exits non-zero only when a metric regressed"""
+        baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+        baseline.write_text(json.dumps(small_report))
+        faster = copy.deepcopy(small_report)
+        faster["results"]["300"]["build_ms"] /= 2
+        current.write_text(json.dumps(faster))
+
+        assert retrieval_bench.main(["compare", str(baseline), str(current)]) == 0
+        assert retrieval_bench.main(["compare", str(current), str(baseline)]) == 1
+        assert "REGRESSED" in capsys.readouterr().out
+
+    def test_stored_baseline(self):
+        """TEST: The committed baseline covers the default sizes"""
+        baseline = json.loads(BASELINE.read_text())
+
+        assert sorted(map(int, baseline["results"])) == [1500, 15000, 150000]
+        assert all(result["index_mb"] for result in baseline["results"].values())
+
+
+class TestRetrievalPerformance:
+    """Test suite for retrieval stage costs."""
+
+    @pytest.mark.performance
+    def test_retrieval_stages_1500(self):
+        """BENCHMARK: Index build and per-stage query latency on a 1.5k-entry knowledge base"""
+        report = run_benchmarks(sizes=[1500], queries=15)
+
+        print()
+        print(retrieval_bench.format_report(report))
+        stages = report["results"]["1500"]["stages"]
+        assert stages["rank"]["p50"] > stages["candidates"]["p50"]
@@ -0,0 +1,214 @@
+"""
+Unit tests for the sampling profiler.
+Tests stack sampling and collapsed-stack output, idle thread filtering,
+windowed counts, the authenticated /debug/profile endpoint, and sampling
+overhead.
+"""
+
+import threading
+import time
+from collections import Counter
+import sys
+from pathlib import Path
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from api import profile_endpoint
+from monitoring import sampling_profiler
+from monitoring.sampling_profiler import SamplingProfiler
+
+
+def hot_loop(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(200))
+
+
+class BusyThread:
+    """A thread spinning in hot_loop until stopped."""
+
+    def __init__(self, name="busy-worker"):
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=hot_loop, args=(self.stop,), name=name, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+
+def parse(collapsed):
+    """Collapsed text back into stack -> count."""
+    counts = {}
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        counts[stack] = int(count)
+    return counts
+
+
+class TestSampling:
+    """Test suite for SamplingProfiler."""
+
+    def test_busy_thread_is_sampled(self):
+        """TEST: A spinning thread shows up rooted at its name with its hot function as a frame"""
+        profiler = SamplingProfiler(hz=200)
+        with BusyThread():
+            profiler.start()
+            time.sleep(0.3)
+            profiler.stop()
+
+        stacks = parse(profiler.collapsed())
+
+        busy = {stack: count for stack, count in stacks.items() if stack.startswith("busy-worker;")}
+        assert busy and sum(busy.values()) >= 20
+        assert all("hot_loop (" in stack and "test_sampling_profiler.py:" in stack for stack in busy)
+        assert not any("sampling-profiler" in stack for stack in stacks)
+        assert not profiler.running
+
+    def test_idle_threads_are_skipped(self):
+        """TEST: Threads waiting on an event are left out unless idle stacks are requested"""
+        release = threading.Event()
+        waiter = threading.Thread(target=release.wait, name="idle-waiter", daemon=True)
+        waiter.start()
+        try:
+            busy_only, everything = SamplingProfiler(), SamplingProfiler(include_idle=True)
+            busy_only.sample()
+            everything.sample()
+        finally:
+            release.set()
+            waiter.join()
+
+        assert not any(stack.startswith("idle-waiter;") for stack in busy_only.counts())
+        assert any(stack.startswith("idle-waiter;") for stack in everything.counts())
+
+    def test_windowed_counts(self):
+        """TEST: Counts cover only the requested window of one-second buckets"""
+        profiler = SamplingProfiler(retention=3)
+        now = int(time.time())
+        for second in range(now - 4, now + 1):
+            profiler._buckets.append((second, Counter({f"main;s{second}": 1})))
+
+        assert len(profiler.counts()) == 3
+        assert set(profiler.counts(seconds=1)) == {f"main;s{now - 1}", f"main;s{now}"}
+        assert profiler.collapsed(since=now) == f"main;s{now} 1\n"
+
+    def test_rate_is_validated(self):
+        """TEST: Sampling rates outside (0, MAX_HZ] are rejected"""
+        with pytest.raises(ValueError):
+            SamplingProfiler(hz=0)
+        with pytest.raises(ValueError):
+            SamplingProfiler(hz=sampling_profiler.MAX_HZ * 2)
+
+    def test_system_profiler_skips_process_scan(self, monkeypatch):
+        """TEST: SystemProfiler snapshots no longer list every pid unless asked to"""
+        import psutil
+        from benchmarking.profiler import SystemProfiler
+
+        def fail():
+            raise AssertionError("psutil.pids() called")
+
+        monkeypatch.setattr(psutil, "pids", fail)
+
+        assert SystemProfiler()._take_system_snapshot().process_count == 0
+
+
+@pytest.fixture
+def profile_app(monkeypatch):
+    monkeypatch.setenv("PROFILER_TOKEN", "s3cret")
+    monkeypatch.setattr(sampling_profiler, "_continuous", None)
+    app = FastAPI()
+    app.include_router(profile_endpoint.router)
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+class TestProfileEndpoint:
+    """Test suite for /debug/profile."""
+
+    @pytest.mark.asyncio
+    async def test_requires_token(self, profile_app, monkeypatch):
+        """TEST: Requests without the bearer token are refused, and nothing runs without one configured"""
+        async with profile_app as client:
+            missing = await client.get("/debug/profile", params={"seconds": 0.1})
+            wrong = await client.get("/debug/profile", params={"seconds": 0.1},
+                                     headers={"Authorization": "Bearer nope"})
+            monkeypatch.delenv("PROFILER_TOKEN")
+            unconfigured = await client.get("/debug/profile", params={"seconds": 0.1},
+                                            headers={"Authorization": "Bearer s3cret"})
+
+        assert (missing.status_code, wrong.status_code, unconfigured.status_code) == (401, 401, 503)
+
+    @pytest.mark.asyncio
+    async def test_on_demand_profile(self, profile_app):
+        """TEST: An on-demand profile samples the next N seconds and returns a collapsed-stack file"""
+        with BusyThread():
+            async with profile_app as client:
+                response = await client.get("/debug/profile", params={"seconds": 0.3, "hz": 200},
+                                            headers={"Authorization": "Bearer s3cret"})
+
+        assert response.status_code == 200
+        assert response.headers["x-profile-mode"] == "on-demand"
+        assert response.headers["content-disposition"].endswith('.folded"')
+        assert any(stack.startswith("busy-worker;") for stack in parse(response.text))
+
+    @pytest.mark.asyncio
+    async def test_continuous_profile(self, profile_app, monkeypatch):
+        """TEST: With a continuous profiler running, the recent window is returned without waiting"""
+        monkeypatch.setenv("PROFILER_CONTINUOUS", "1")
+        profiler = sampling_profiler.start_continuous_profiler()
+        try:
+            with BusyThread():
+                time.sleep(0.3)
+            async with profile_app as client:
+                started = time.perf_counter()
+                response = await client.get("/debug/profile", params={"seconds": 30},
+                                            headers={"Authorization": "Bearer s3cret"})
+                elapsed = time.perf_counter() - started
+        finally:
+            sampling_profiler.stop_continuous_profiler()
+
+        assert profiler is sampling_profiler.get_continuous_profiler()
+        assert response.headers["x-profile-mode"] == "continuous"
+        assert elapsed < 1.0
+        assert any(stack.startswith("busy-worker;") for stack in parse(response.text))
+
+
+class TestProfilerOverhead:
+    """Test suite for sampling overhead."""
+
+    @pytest.mark.performance
+    def test_sampling_overhead(self):
+        """BENCHMARK: Cost of one sample, and CPU-bound work with and without sampling at 100 Hz"""
+        profiler = SamplingProfiler()
+        started = time.perf_counter()
+        for _ in range(1000):
+            profiler.sample()
+        sample_us = (time.perf_counter() - started) * 1000
+
+        def work():
+            started = time.perf_counter()
+            for _ in range(1000):
+                sum(i * i for i in range(5000))
+            return time.perf_counter() - started
+
+        work()
+        plain, sampled = [], []
+        for _ in range(3):
+            plain.append(work())
+            running = SamplingProfiler(hz=100)
+            running.start()
+            try:
+                sampled.append(work())
+            finally:
+                running.stop()
+
+        overhead = min(sampled) / min(plain) - 1
+        print(f"\none sample {sample_us:.1f} us ({sample_us * 100 / 1e4:.3f}% of a core at 100 Hz); "
+              f"work {min(plain) * 1000:.0f} ms plain, {min(sampled) * 1000:.0f} ms sampled ({overhead:+.1%})")
+        assert sample_us < 200
+        assert overhead < 0.2
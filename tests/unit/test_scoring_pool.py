@@ -0,0 +1,220 @@
+"""
+Unit tests for process pool scoring.
+Tests that pooled searches rank exactly like inline ones, that the pool
+follows index changes, that large searches leave the event loop free, and
+bulk scoring across processes.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from benchmarking.retrieval_bench import load_seed_entries, synthesize_entries
+from db.change_feed import ChangeSet
+from monitoring.loop_monitor import fail_on_blocking
+from quality_scoring.quality_specialist import KnowledgeEntry, QualitySpecialist
+from retrieval.enhanced_search import EnhancedRetriever, SearchQuery
+from retrieval.scoring_pool import ScoringPool, map_in_processes
+
+QUERIES = [
+    ("How do I get a contractor license in Georgia?", None, None),
+    ("georgia licnese exam", None, "GA"),
+    ("return on investment for licensing", "financial_planning_roi", None),
+    ("what does it cost", None, None),
+]
+
+
+@pytest.fixture(scope="module")
+def entries():
+    return synthesize_entries(load_seed_entries(), 1200, seed=5)
+
+
+def make_retriever(entries, pool=None):
+    retriever = EnhancedRetriever(None, scoring_pool=pool)
+    retriever.in_memory_index.build_index(entries)
+    return retriever
+
+
+def summary(results):
+    return [(r.id, round(r.score, 9), r.match_type) for r in results]
+
+
+class TestScoringPool:
+    """Test suite for ScoringPool searches."""
+
+    @pytest.mark.asyncio
+    async def test_pooled_results_match_inline(self, entries):
+        """TEST: Searches scored in the pool return the same ranking as inline scoring"""
+        inline = make_retriever(entries)
+        pool = ScoringPool(processes=2, min_candidates=1)
+        pooled = make_retriever(entries, pool)
+        try:
+            for query, category, state in QUERIES:
+                expected = await inline.search(query, category=category, state=state, use_cache=False)
+                actual = await pooled.search(query, category=category, state=state, use_cache=False)
+                assert summary(actual) == summary(expected)
+                assert [r.fragment for r in actual] == [r.fragment for r in expected]
+
+            batch = [SearchQuery(query, category, state) for query, category, state in QUERIES]
+            assert ([summary(r) for r in await pooled.search_many(batch, use_cache=False)]
+                    == [summary(r) for r in await inline.search_many(batch, use_cache=False)])
+        finally:
+            await pooled.close()
+
+        stats = pool.get_stats()
+        assert stats["searches"] == 2 * len(QUERIES) and stats["forks"] == 1
+        assert not stats["running"]
+
+    @pytest.mark.asyncio
+    async def test_small_searches_stay_inline(self, entries):
+        """TEST: Candidate sets under min_candidates are scored without starting the pool"""
+        pool = ScoringPool(processes=2, min_candidates=5000)
+        retriever = make_retriever(entries, pool)
+
+        results = await retriever.search("georgia license", use_cache=False)
+
+        assert results and pool.get_stats()["searches"] == 0 and not pool.get_stats()["running"]
+
+    @pytest.mark.asyncio
+    async def test_pool_follows_index_changes(self, entries):
+        """TEST: After a change set the pool is forked again from the updated index"""
+        pool = ScoringPool(processes=2, min_candidates=1)
+        retriever = make_retriever(entries, pool)
+        new_entry = dict(entries[0], id=99999, question="Zanzibar plumbing reciprocity waiver?")
+        try:
+            before = await retriever.search("Zanzibar plumbing reciprocity waiver?", use_cache=False)
+            await retriever.apply_changes(ChangeSet(upserts=[new_entry], deleted=[entries[1]["id"]]))
+            after = await retriever.search("Zanzibar plumbing reciprocity waiver?", use_cache=False)
+        finally:
+            await retriever.close()
+
+        assert 99999 not in [r.id for r in before]
+        assert after[0].id == 99999 and after[0].match_type == "exact"
+        assert pool.get_stats()["forks"] == 2
+
+    @pytest.mark.asyncio
+    async def test_changes_during_searches(self, entries):
+        """TEST: Searches in flight when a change set lands finish on the old processes"""
+        pool = ScoringPool(processes=2, min_candidates=1, max_pending=1)
+        retriever = make_retriever(entries, pool)
+        queries = [query for query, _, _ in QUERIES] * 2
+        try:
+            await retriever.search("warm up the pool", use_cache=False)
+            old_executor = pool._workers.executor
+            searches = [asyncio.create_task(retriever.search(query, use_cache=False)) for query in queries]
+            while not old_executor._pending_work_items:
+                await asyncio.sleep(0.001)
+            await retriever.apply_changes(ChangeSet(upserts=[dict(entries[0], id=99999)]))
+            # Searches after the change fork new processes while the old ones still score
+            searches += [asyncio.create_task(retriever.search(query, use_cache=False)) for query in queries]
+            results = await asyncio.gather(*searches)
+        finally:
+            await retriever.close()
+
+        assert all(results)
+        assert pool.get_stats()["forks"] == 2
+        assert old_executor._shutdown_thread
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_is_replaced(self, entries):
+        """TEST: A search interrupted by a dead child is scored inline and the next one forks anew"""
+        inline = make_retriever(entries)
+        pool = ScoringPool(processes=2, min_candidates=1)
+        pooled = make_retriever(entries, pool)
+        query = QUERIES[0][0]
+        try:
+            await pooled.search("warm up the pool", use_cache=False)
+            for process in pool._workers.executor._processes.values():
+                process.kill()
+            interrupted = await pooled.search(query, use_cache=False)
+            after = await pooled.search(query, use_cache=False)
+        finally:
+            await pooled.close()
+
+        expected = summary(await inline.search(query, use_cache=False))
+        assert summary(interrupted) == expected and summary(after) == expected
+        assert pool.get_stats()["broken"] == 1 and pool.get_stats()["forks"] == 2
+
+    @pytest.mark.asyncio
+    async def test_bounded_pending_slices(self, entries):
+        """TEST: Concurrent searches wait for a free slot and all complete correctly"""
+        inline = make_retriever(entries)
+        pool = ScoringPool(processes=2, min_candidates=1, max_pending=1)
+        pooled = make_retriever(entries, pool)
+        try:
+            results = await asyncio.gather(*(pooled.search(query, use_cache=False) for query, _, _ in QUERIES))
+        finally:
+            await pooled.close()
+
+        for (query, _, _), found in zip(QUERIES, results):
+            assert summary(found) == summary(await inline.search(query, use_cache=False))
+        assert pool.get_stats()["slices"] == 2 * len(QUERIES)
+
+
+class TestBulkScoring:
+    """Test suite for bulk scoring across processes."""
+
+    def test_map_in_processes_keeps_order(self):
+        """TEST: map_in_processes returns results in input order"""
+        assert map_in_processes(abs, range(-50, 50), processes=2) == [abs(i) for i in range(-50, 50)]
+
+    def test_quality_selection_in_processes(self, entries):
+        """TEST: QualitySpecialist selects the same entries when scoring in processes"""
+        def knowledge_entries():
+            return [KnowledgeEntry(id=e["id"], question=e["question"], answer=e["answer"],
+                                   category=e.get("category") or "", tags=[]) for e in entries[:300]]
+
+        specialist = QualitySpecialist(db_path=":memory:")
+        serial = specialist.select_top_entries(knowledge_entries(), target_count=50)
+        parallel = specialist.select_top_entries(knowledge_entries(), target_count=50, processes=2)
+
+        assert [e.id for e in parallel] == [e.id for e in serial]
+        assert [e.quality_metrics.total_score for e in parallel] == [e.quality_metrics.total_score for e in serial]
+
+
+class TestScoringPoolPerformance:
+    """Test suite for event loop responsiveness during searches."""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_loop_stays_responsive(self, entries):
+        """BENCHMARK: Longest event loop stall during large searches, inline vs. process pool"""
+        inline = make_retriever(entries)
+        pool = ScoringPool(processes=2, min_candidates=1)
+        pooled = make_retriever(entries, pool)
+        queries = [query for query, _, _ in QUERIES]
+
+        async def longest_stall(retriever):
+            stalls, running = [], True
+
+            async def ticker():
+                while running:
+                    started = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    stalls.append(time.perf_counter() - started - 0.005)
+
+            tick = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            await asyncio.gather(*(retriever.search(query, use_cache=False) for query in queries))
+            elapsed = time.perf_counter() - started
+            running = False
+            await tick
+            return max(stalls, default=elapsed) * 1000, elapsed * 1000
+
+        try:
+            await pooled.search("warm up the pool", use_cache=False)
+            inline_stall, inline_ms = await longest_stall(inline)
+            pooled_stall, pooled_ms = await longest_stall(pooled)
+            async with fail_on_blocking(threshold_ms=100):
+                await pooled.search("How do I get a contractor license in Georgia?", use_cache=False)
+        finally:
+            await pooled.close()
+
+        print(f"\n{len(queries)} searches over {len(entries)} entries: inline {inline_ms:.0f} ms "
+              f"(longest stall {inline_stall:.0f} ms), pool {pooled_ms:.0f} ms "
+              f"(longest stall {pooled_stall:.0f} ms)")
+        assert pooled_stall < inline_stall / 2
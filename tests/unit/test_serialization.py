@@ -0,0 +1,195 @@
+"""
+Unit tests for the response serialization fast path.
+Tests JSON encoding, cached knowledge entry fragments in the in-memory
+index, responses assembled from fragments, and trusted model responses,
+and benchmarks /knowledge/search serialization against the model-based path.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from api.responses import FastJSONResponse, trusted_response
+from core.serialization import ENTRY_FIELDS, dumps, entry_fragment, join_array
+from retrieval.enhanced_search import InMemoryIndex
+import web_server
+from web_server import KnowledgeEntry, KnowledgeSearchResponse
+
+
+def make_entries(count):
+    return [{
+        "id": i + 1,
+        "question": f"What does the Georgia exam {i} cover?",
+        "answer": f"Exam {i} covers \"business\" and law; fees are ${i}.",
+        "category": "exam",
+        "tags": "exam,ga",
+        "state": "GA",
+        "priority": "high" if i % 2 else None,
+        "difficulty": "advanced",
+    } for i in range(count)]
+
+
+class StubRetriever:
+    """Returns precomputed results, so only serialization is measured."""
+
+    def __init__(self, results):
+        self.results = results
+        self.in_memory_index = InMemoryIndex()
+
+    async def search(self, query, category=None, state=None, limit=5, use_cache=True):
+        return self.results[:limit]
+
+
+def baseline_app(retriever):
+    """/knowledge/search as it was before the fast path: models validated by FastAPI and stdlib json."""
+    app = FastAPI()
+
+    @app.post("/knowledge/search", response_model=KnowledgeSearchResponse)
+    async def search(request: web_server.KnowledgeSearchRequest):
+        results = []
+        for sr in await retriever.search(request.query, limit=request.limit):
+            results.append(KnowledgeEntry(
+                id=sr.id, question=sr.question, answer=sr.answer, category=sr.category,
+                tags=sr.metadata.get("tags"), state=sr.state,
+                priority=sr.metadata.get("priority", "normal"),
+                difficulty=sr.metadata.get("difficulty", "basic"),
+                personas=sr.metadata.get("personas"), source=sr.metadata.get("source"),
+            ))
+        return KnowledgeSearchResponse(results=results, total_count=len(results), query=request.query,
+                                       timestamp=datetime.utcnow().isoformat())
+    return app
+
+
+async def post_search(app, limit, rounds):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            response = await client.post("/knowledge/search", json={"query": "georgia exam", "limit": limit})
+        elapsed = time.perf_counter() - started
+    return response, elapsed / rounds * 1000
+
+
+@pytest.fixture
+def search_app(monkeypatch):
+    index = InMemoryIndex()
+    index.build_index(make_entries(1000))
+    retriever = StubRetriever(index.search("georgia exam", limit=1000))
+    monkeypatch.setattr(web_server, "_driver", object())
+    monkeypatch.setattr(web_server, "_enhanced_retriever", retriever)
+    # The real handler on a bare app, so both benchmark paths skip the same middleware
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.post("/knowledge/search", response_model=KnowledgeSearchResponse)(web_server.search_knowledge_base)
+    return app, retriever
+
+
+class TestEncoding:
+    """Test suite for JSON encoding and entry fragments."""
+
+    def test_dumps(self):
+        """TEST: Encoding is compact UTF-8 and handles datetimes and non-string keys"""
+        assert dumps({"a": [1, "é"]}) == '{"a":[1,"é"]}'.encode()
+        assert json.loads(dumps({1: datetime(2026, 1, 2)})) == {"1": "2026-01-02T00:00:00"}
+
+    def test_fragment_matches_response_model(self):
+        """TEST: A fragment is the KnowledgeEntry document, with defaults for missing priority"""
+        entry = make_entries(1)[0]
+
+        document = json.loads(entry_fragment(entry))
+
+        assert tuple(document) == ENTRY_FIELDS
+        assert document == KnowledgeEntry(**document).model_dump()
+        assert (document["priority"], document["difficulty"], document["source"]) == ("normal", "advanced", None)
+        assert json.loads(join_array([entry_fragment(entry)] * 2)) == [document, document]
+
+
+class TestIndexFragments:
+    """Test suite for fragments cached by the in-memory index."""
+
+    def test_fragments_follow_index_changes(self):
+        """TEST: Fragments are built with the index and kept in step by upserts and removals"""
+        index = InMemoryIndex()
+        index.build_index(make_entries(10))
+        index.upsert_entries([dict(make_entries(1)[0], answer="Updated walrus answer")])
+        index.remove_entries([5, 6])
+
+        assert set(index.fragments) == set(index.id_to_index)
+        assert json.loads(index.fragments[1])["answer"] == "Updated walrus answer"
+
+        result = index.search("walrus answer", limit=1)[0]
+        assert result.fragment is index.fragments[1]
+
+    def test_candidates_outside_index_are_encoded(self):
+        """TEST: Server-side candidates not held in the index still carry a fragment"""
+        index = InMemoryIndex()
+
+        results = index.rank_entries("georgia exam", make_entries(3), limit=3)
+
+        assert results and all(json.loads(r.fragment)["id"] == r.id for r in results)
+
+
+class TestResponses:
+    """Test suite for the fast response path."""
+
+    @pytest.mark.asyncio
+    async def test_search_response_shape(self, search_app):
+        """TEST: /knowledge/search built from fragments validates against KnowledgeSearchResponse"""
+        app, _ = search_app
+
+        response, _ = await post_search(app, 5, 1)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        body = KnowledgeSearchResponse(**response.json())
+        assert body.total_count == 5 and body.query == "georgia exam"
+        assert body.results[0].difficulty == "advanced"
+
+    @pytest.mark.asyncio
+    async def test_trusted_response(self):
+        """TEST: A trusted model is rendered as-is, bypassing response_model validation"""
+        app = FastAPI(default_response_class=FastJSONResponse)
+
+        @app.get("/model", response_model=KnowledgeSearchResponse)
+        async def model():
+            # total_count would fail validation if FastAPI validated the response
+            return trusted_response(KnowledgeSearchResponse.model_construct(
+                results=[], total_count="many", query="q", timestamp="now"))
+
+        @app.get("/plain")
+        async def plain():
+            return {"when": datetime(2026, 1, 2)}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/model")).json()["total_count"] == "many"
+            assert (await client.get("/plain")).content == b'{"when":"2026-01-02T00:00:00"}'
+
+
+class TestSerializationPerformance:
+    """Test suite for response serialization cost."""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_search_serialization_cost(self, search_app):
+        """BENCHMARK: /knowledge/search per-request cost, model path vs fragments, limit 5 and 1000"""
+        app, retriever = search_app
+        baseline = baseline_app(retriever)
+
+        print()
+        for limit, rounds in ((5, 1000), (1000, 30)):
+            await post_search(baseline, limit, 20)
+            await post_search(app, limit, 20)
+            _, model_ms = await post_search(baseline, limit, rounds)
+            response, fragment_ms = await post_search(app, limit, rounds)
+            assert response.json()["total_count"] == limit
+            print(f"limit={limit:>4}: models {model_ms:7.3f} ms, fragments {fragment_ms:7.3f} ms "
+                  f"({model_ms / fragment_ms:.1f}x)")
+            if limit == 1000:
+                assert fragment_ms < model_ms
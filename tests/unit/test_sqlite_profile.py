@@ -0,0 +1,147 @@
+"""
+Unit tests for the SQLite connection profile.
+Tests PRAGMAs on pooled readers and the writer, read-only enforcement,
+WAL snapshot isolation, and benchmarks concurrent read throughput while a
+bulk upload runs through the single writer.
+"""
+
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+
+from src.db.connection import DatabaseManager
+from src.db.kb_queries import KnowledgeQuery, KB_ANSWER_COLUMNS
+from src.db.sqlite_profile import SQLiteProfile, UNTUNED_PROFILE
+
+
+INSERT = ("INSERT INTO knowledge_base (question, answer, category, tags, state) "
+          "VALUES (?, ?, ?, ?, ?)")
+
+
+def make_rows(start, count):
+    return [(f"Question {i} about bonds", f"Answer {i} " + "text " * 40, "bonding", "bond", "GA")
+            for i in range(start, start + count)]
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "fact.db"), pool_size=4, profile=SQLiteProfile())
+    await manager.initialize_database()
+    yield manager
+    await manager.cleanup()
+
+
+async def pragma(conn, name):
+    cursor = await conn.execute(f"PRAGMA {name}")
+    row = await cursor.fetchone()
+    await cursor.close()
+    return row[0]
+
+
+class TestConnectionProfile:
+    """Test suite for PRAGMA application."""
+
+    @pytest.mark.asyncio
+    async def test_reader_pragmas(self, manager):
+        """TEST: Pooled readers get the profile and are query-only"""
+        async with manager.get_connection() as conn:
+            assert await pragma(conn, "journal_mode") == "wal"
+            assert await pragma(conn, "synchronous") == 1  # NORMAL
+            assert await pragma(conn, "cache_size") == -64 * 1024
+            assert await pragma(conn, "temp_store") == 2  # MEMORY
+            assert await pragma(conn, "busy_timeout") == 5000
+            assert await pragma(conn, "query_only") == 1
+
+    @pytest.mark.asyncio
+    async def test_readers_cannot_write(self, manager):
+        """TEST: mode=ro readers reject writes"""
+        with pytest.raises(Exception, match="readonly"):
+            async with manager.get_connection() as conn:
+                await conn.execute("DELETE FROM knowledge_base")
+
+    @pytest.mark.asyncio
+    async def test_readers_see_committed_snapshot_during_write(self, manager):
+        """TEST: With WAL a reader is not blocked by an open write transaction"""
+        before = (await manager.execute_query("SELECT COUNT(*) AS n FROM knowledge_base")).rows[0]["n"]
+
+        async with manager.writer() as writer:
+            await writer.executemany(INSERT, make_rows(0, 100))
+            start = time.perf_counter()
+            during = (await manager.execute_query("SELECT COUNT(*) AS n FROM knowledge_base")).rows[0]["n"]
+            assert time.perf_counter() - start < 1.0
+            await writer.commit()
+
+        after = (await manager.execute_query("SELECT COUNT(*) AS n FROM knowledge_base")).rows[0]["n"]
+        assert during == before
+        assert after == before + 100
+
+    @pytest.mark.asyncio
+    async def test_writer_serialises_uploads(self, manager):
+        """TEST: Concurrent uploads share the single writer without lock errors"""
+        async def upload(start):
+            async with manager.writer() as conn:
+                await conn.executemany(INSERT, make_rows(start, 50))
+                await conn.commit()
+
+        await asyncio.gather(*(upload(i * 50) for i in range(5)))
+
+        result = await manager.execute_query("SELECT COUNT(*) AS n FROM knowledge_base WHERE category = 'bonding'")
+        assert result.rows[0]["n"] >= 250
+
+    def test_profile_from_env(self, monkeypatch):
+        """TEST: SQLITE_* variables override the defaults"""
+        monkeypatch.setenv("SQLITE_MMAP_SIZE", "0")
+        monkeypatch.setenv("SQLITE_READ_ONLY_READERS", "false")
+
+        profile = SQLiteProfile.from_env()
+
+        assert profile.mmap_size == 0
+        assert not profile.read_only_readers
+        assert profile.journal_mode == "WAL"
+
+
+async def read_throughput_during_upload(path, profile, batches=20, batch_size=500, readers=4):
+    manager = DatabaseManager(path, pool_size=readers, profile=profile)
+    await manager.initialize_database()
+    query = (KnowledgeQuery(KB_ANSWER_COLUMNS).matching("bond").where("state", "GA")
+             .order_by_priority().limit(5).build())
+    reads = 0
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def reader():
+        nonlocal reads, worst
+        while not done.is_set():
+            start = time.perf_counter()
+            await manager.execute_query(query.sql, query.params)
+            worst = max(worst, time.perf_counter() - start)
+            reads += 1
+
+    async def uploader():
+        for batch in range(batches):
+            async with manager.writer() as conn:
+                await conn.executemany(INSERT, make_rows(batch * batch_size, batch_size))
+                await conn.commit()
+            await asyncio.sleep(0)
+        done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(uploader(), *(reader() for _ in range(readers)))
+    elapsed = time.perf_counter() - start
+    await manager.cleanup()
+    return reads / elapsed, worst * 1000, elapsed
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_reads_during_bulk_upload(tmp_path):
+    """BENCHMARK: Concurrent read throughput while 10k rows are uploaded, tuned vs plain connections"""
+    untuned = await read_throughput_during_upload(str(tmp_path / "plain.db"), UNTUNED_PROFILE)
+    tuned = await read_throughput_during_upload(str(tmp_path / "tuned.db"), SQLiteProfile())
+
+    print(f"\nplain connections: {untuned[0]:.0f} reads/s, worst read {untuned[1]:.1f} ms, upload {untuned[2]:.2f} s"
+          f"\ntuned profile:     {tuned[0]:.0f} reads/s, worst read {tuned[1]:.1f} ms, upload {tuned[2]:.2f} s")
+    assert tuned[0] > 0 and untuned[0] > 0
+    # No reader ever waited out a lock behind the writer
+    assert tuned[1] < SQLiteProfile().busy_timeout_ms
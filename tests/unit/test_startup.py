@@ -0,0 +1,144 @@
+"""
+Unit tests for web server cold start.
+Tests the feature-flagged router registry, the readiness endpoint while
+warming up and once warm, and the modules imported by the server at startup.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+from src.api.router_registry import (
+    DISABLED, LOADED, UNAVAILABLE, RouterSpec, include_routers, is_enabled, loaded
+)
+
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+# Never needed to serve with SQLite and default routers
+DEFERRED_MODULES = ("groq", "numpy", "asyncpg", "psycopg2", "startup_loader", "db.postgres_adapter",
+                    "api.test_groq", "api.test_direct_groq", "api.debug_endpoint", "api.debug_query",
+                    "api.profile_endpoint")
+
+
+class FakeApp:
+    def __init__(self):
+        self.routers = []
+
+    def include_router(self, router):
+        self.routers.append(router)
+
+
+def run_in_src(code, **env):
+    environment = {key: value for key, value in os.environ.items()
+                   if key not in ("DATABASE_URL", "ENABLE_DEBUG_ROUTES", "ENABLED_ROUTERS", "DISABLED_ROUTERS")}
+    environment.update(env)
+    return subprocess.run([sys.executable, *code], cwd=SRC_DIR, env=environment,
+                          capture_output=True, text=True, timeout=120)
+
+
+class TestRouterRegistry:
+    """Test suite for the router registry."""
+
+    def test_debug_routers_need_flag(self):
+        """TEST: Debug routers are off by default and on with ENABLE_DEBUG_ROUTES"""
+        spec = RouterSpec("debug", "debug_endpoint", "Debug endpoints", debug=True)
+
+        assert not is_enabled(spec, {})
+        assert is_enabled(spec, {"ENABLE_DEBUG_ROUTES": "true"})
+        assert is_enabled(spec, {"ENABLED_ROUTERS": "training, debug"})
+        assert not is_enabled(spec, {"ENABLE_DEBUG_ROUTES": "1", "DISABLED_ROUTERS": "debug"})
+        assert not is_enabled(RouterSpec("knowledge", "knowledge_api", "Knowledge"), {"DISABLED_ROUTERS": "knowledge"})
+
+    def test_include_statuses(self):
+        """TEST: Missing modules are unavailable and routers requiring them are skipped"""
+        app = FakeApp()
+        specs = (
+            RouterSpec("registry", "router_registry", "Registry", attribute="LOADED"),
+            RouterSpec("missing", "no_such_router", "Missing router"),
+            RouterSpec("child", "router_registry", "Child", attribute="LOADED", requires="missing"),
+            RouterSpec("debug", "router_registry", "Debug", attribute="LOADED", debug=True),
+        )
+
+        status = include_routers(app, specs, env={})
+
+        assert status == {"registry": LOADED, "missing": UNAVAILABLE, "child": DISABLED, "debug": DISABLED}
+        assert app.routers == [LOADED]
+        assert loaded(status) == ["registry"]
+
+
+class TestReadiness:
+    """Test suite for the readiness endpoint."""
+
+    def test_ready_reports_warm_up(self):
+        """TEST: /ready answers 503 while warming and 200 once the driver and index are up"""
+        script = (
+            "import asyncio, json, web_server\n"
+            "async def main():\n"
+            "    gate = asyncio.Event()\n"
+            "    web_server._warmup_task = asyncio.create_task(gate.wait())\n"
+            "    warming = await web_server.ready()\n"
+            "    gate.set()\n"
+            "    await web_server._warmup_task\n"
+            "    failed = await web_server.ready()\n"
+            "    web_server._startup.update(driver_initialized=True)\n"
+            "    cold = await web_server.ready()\n"
+            "    web_server._startup.update(index_warm=True)\n"
+            "    warm = await web_server.ready()\n"
+            "    print(json.dumps([[r.status_code, json.loads(r.body)] for r in (warming, failed, cold, warm)]))\n"
+            "asyncio.run(main())\n"
+        )
+        result = run_in_src(["-c", script])
+        assert result.returncode == 0, result.stderr[-2000:]
+
+        responses = json.loads(result.stdout.splitlines()[-1])
+        (warming_code, warming), (failed_code, failed), (cold_code, cold), (warm_code, warm) = responses
+        assert (warming_code, warming["status"], warming["listening"]) == (503, "warming", True)
+        assert (failed_code, failed["status"]) == (503, "failed")
+        assert (cold_code, cold["status"], cold["index_warm"]) == (503, "failed", False)
+        assert (warm_code, warm["status"], warm["index_warm"]) == (200, "ready", True)
+        assert "knowledge" in warm["routers"] and "debug" not in warm["routers"]
+
+
+def import_times(**env):
+    """Run `python -X importtime -c "import web_server"` and parse it into self/cumulative microseconds."""
+    result = run_in_src(["-X", "importtime", "-c", "import web_server"], **env)
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+class TestImportTime:
+    """Test suite for startup import cost."""
+
+    @pytest.mark.performance
+    def test_import_time_report(self):
+        """BENCHMARK: Import-time report for the web server; heavy optional modules stay unloaded"""
+        modules = import_times()
+
+        total = modules["web_server"][1]
+        print(f"\nimport web_server: {total / 1000:.0f} ms cumulative, {len(modules)} modules")
+        print("Slowest modules by self time:")
+        for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][0])[:15]:
+            print(f"  {own / 1000:8.1f} ms self {cumulative / 1000:8.1f} ms cumulative  {name}")
+        print("Top-level packages by cumulative time:")
+        top_level = {name: cumulative for name, (_, cumulative) in modules.items() if "." not in name}
+        for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        assert not [name for name in DEFERRED_MODULES if name in modules]
+
+    def test_debug_routers_load_when_enabled(self):
+        """TEST: Enabling debug routes imports their modules at startup"""
+        modules = import_times(ENABLE_DEBUG_ROUTES="1")
+
+        assert "api.debug_endpoint" in modules
+        assert "api.debug_query" in modules
@@ -0,0 +1,187 @@
+"""
+Unit tests for streaming query results.
+Tests RowView access, batched iteration through DatabaseManager.stream_query,
+connection handling, streamed index builds, and benchmarks peak memory
+against execute_query.
+"""
+
+import sqlite3
+import sys
+import tracemalloc
+import types
+import pytest
+import pytest_asyncio
+
+from src.core.errors import InvalidSQLError, SecurityError
+from src.db.connection import DatabaseManager
+from src.db.models import DATABASE_SCHEMA
+from src.db.streaming import row_view_type
+from src.retrieval.enhanced_search import EnhancedRetriever, INDEX_QUERY, InMemoryIndex
+
+
+def make_database(path, count):
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executemany(
+            "INSERT INTO knowledge_base (question, answer, category, tags, state) VALUES (?, ?, ?, ?, ?)",
+            [(f"Georgia question {i}", f"Answer {i} " + "text " * 50, "licensing", "georgia", "GA")
+             for i in range(count)])
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    path = str(tmp_path / "fact.db")
+    make_database(path, 1234)
+    manager = DatabaseManager(path, pool_size=2)
+    yield manager
+    await manager.cleanup()
+
+
+class TestRowView:
+    """Test suite for name-addressable tuple rows."""
+
+    def test_access_by_name_and_position(self):
+        """TEST: RowView supports row[name], row[index], get, keys and dict()"""
+        view = row_view_type(("id", "question"))
+        row = view((7, "Bond amount?"))
+
+        assert row["question"] == row[1] == "Bond amount?"
+        assert row.get("state", "GA") == "GA"
+        assert dict(row) == {"id": 7, "question": "Bond amount?"}
+        assert "id" in row and "state" not in row
+        with pytest.raises(KeyError):
+            row["state"]
+
+    def test_type_is_cached_per_shape(self):
+        """TEST: One RowView class per column list"""
+        assert row_view_type(("a", "b")) is row_view_type(("a", "b"))
+        assert row_view_type(("a", "b")) is not row_view_type(("b", "a"))
+
+
+class TestStreamQuery:
+    """Test suite for DatabaseManager.stream_query."""
+
+    @pytest.mark.asyncio
+    async def test_batches_cover_all_rows(self, manager):
+        """TEST: Rows arrive as tuples in batches of batch_size with columns resolved once"""
+        sizes = []
+        async with manager.stream_query("SELECT id, question FROM knowledge_base ORDER BY id",
+                                        batch_size=500) as stream:
+            assert stream.columns == ("id", "question")
+            async for batch in stream:
+                sizes.append(len(batch))
+                assert type(batch[0]) is tuple
+
+        assert sizes == [500, 500, 234]
+        assert stream.row_count == 1234
+
+    @pytest.mark.asyncio
+    async def test_views_and_parameters(self, manager):
+        """TEST: views() yields RowView batches and parameters are bound"""
+        async with manager.stream_query("SELECT id, state FROM knowledge_base WHERE id <= ?",
+                                        (3,)) as stream:
+            rows = [row async for batch in stream.views() for row in batch]
+
+        assert [row["id"] for row in rows] == [1, 2, 3]
+        assert rows[0].get("state") == "GA"
+
+    @pytest.mark.asyncio
+    async def test_connection_returned_after_early_exit(self, manager):
+        """TEST: Breaking out of a stream returns its pooled connection"""
+        async with manager.stream_query("SELECT id FROM knowledge_base", batch_size=10) as stream:
+            async for batch in stream:
+                break
+
+        stats = manager.connection_pool.get_stats()
+        assert stats["in_use"] == 0 and stats["idle"] == 1
+
+    @pytest.mark.asyncio
+    async def test_validation_and_errors(self, manager):
+        """TEST: Streams are validated like execute_query before a connection is taken"""
+        with pytest.raises(SecurityError):
+            async with manager.stream_query("DELETE FROM knowledge_base"):
+                pass
+        with pytest.raises(InvalidSQLError):
+            async with manager.stream_query("SELECT id FROM knowledge_base WHERE id = ?", ()):
+                pass
+        assert manager.connection_pool.get_stats()["in_use"] == 0
+
+
+class TestStreamedIndex:
+    """The retriever index built from a stream."""
+
+    @pytest.mark.asyncio
+    async def test_matches_list_build(self, manager):
+        """TEST: Streaming the index gives the same entries and keywords as build_index"""
+        retriever = EnhancedRetriever(manager)
+        await retriever.initialize()
+
+        expected = InMemoryIndex()
+        rows = (await manager.execute_query(INDEX_QUERY)).rows
+        expected.build_index(rows)
+
+        streamed = retriever.in_memory_index
+        assert [dict(entry) for entry in streamed.entries] == rows
+        assert streamed.keyword_index == expected.keyword_index
+        assert streamed.state_index == expected.state_index
+        assert ([r.id for r in streamed.search("georgia question 42")]
+                == [r.id for r in expected.search("georgia question 42")])
+
+    @pytest.mark.asyncio
+    async def test_postgres_failure_falls_back_to_sqlite(self, manager, monkeypatch):
+        """TEST: A PostgreSQL stream failing midway leaves no partial index and loads from SQLite"""
+        class FailingAdapter:
+            initialized = True
+
+            async def iter_entries(self):
+                yield [{"id": 9999, "question": "Partial postgres row", "answer": "x", "state": "TX"}]
+                raise ConnectionError("connection reset")
+
+        monkeypatch.setenv("DATABASE_URL", "postgresql://unreachable/fact")
+        monkeypatch.setitem(sys.modules, "db.postgres_adapter",
+                            types.SimpleNamespace(postgres_adapter=FailingAdapter()))
+        retriever = EnhancedRetriever(manager)
+        await retriever.initialize()
+
+        index = retriever.in_memory_index
+        assert len(index.entries) == 1234
+        assert 9999 not in index.id_to_index and "TX" not in index.state_index
+
+
+async def peak_bytes(coro):
+    tracemalloc.start()
+    try:
+        await coro
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_peak_memory_full_scan(tmp_path):
+    """BENCHMARK: Peak Python memory scanning 20k rows with execute_query vs stream_query"""
+    path = str(tmp_path / "fact.db")
+    make_database(path, 20000)
+    manager = DatabaseManager(path, pool_size=2)
+    query = "SELECT id, question, answer, category, tags, state FROM knowledge_base"
+
+    async def materialise():
+        result = await manager.execute_query(query)
+        return sum(len(row["answer"]) for row in result.rows)
+
+    async def stream():
+        total = 0
+        async with manager.stream_query(query) as rows:
+            async for batch in rows:
+                total += sum(len(row[2]) for row in batch)
+        return total
+
+    await materialise()  # Validate both statements outside the measurement
+    await stream()
+    full = await peak_bytes(materialise())
+    streamed = await peak_bytes(stream())
+    await manager.cleanup()
+
+    print(f"\nexecute_query peak: {full / 1e6:.1f} MB\nstream_query peak:  {streamed / 1e6:.1f} MB")
+    assert streamed < full / 4
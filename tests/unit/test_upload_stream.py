@@ -0,0 +1,361 @@
+"""
+Unit tests for streaming upload parsing.
+Tests the incremental JSON array and CSV parsers against the standard
+library on arbitrary chunk boundaries, the bounded batch queue, streamed
+knowledge base uploads into SQLite, and benchmarks peak memory against
+loading the whole file.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import sqlite3
+import sys
+import tracemalloc
+from pathlib import Path
+import httpx
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fastapi import FastAPI
+from src.core.errors import ValidationError
+from src.data_upload import DataUploader
+from src.db.connection import DatabaseManager
+from src.db.models import DATABASE_SCHEMA, FULLTEXT_SCHEMA
+from src.upload_stream import CSVRecordParser, JSONArrayParser, iter_records, queued_batches
+import web_server
+
+
+def make_entries(count):
+    return [
+        {
+            "question": f"What does the \"Georgia\" exam [{i}] cover?",
+            "answer": f"Part {i}: law, {{contracts}} and ethics.\nAllow 3 hours — café rules apply.",
+            "category": "exam_prep",
+            "state": "GA",
+            "tags": "georgia,exam",
+        }
+        for i in range(count)
+    ]
+
+
+def as_csv(entries):
+    out = io.StringIO(newline="")
+    writer = csv.DictWriter(out, fieldnames=list(entries[0]))
+    writer.writeheader()
+    writer.writerows(entries)
+    return out.getvalue().encode()
+
+
+async def chunked(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(chunks, fmt):
+    return [record async for records in iter_records(chunks, fmt) for record in records]
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    path = str(tmp_path / "fact.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(DATABASE_SCHEMA)
+        conn.executescript(FULLTEXT_SCHEMA)
+    manager = DatabaseManager(path, pool_size=1)
+    yield manager
+    await manager.cleanup()
+
+
+def count_rows(manager):
+    with sqlite3.connect(manager.database_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM knowledge_base").fetchone()[0]
+
+
+class TestJSONArrayParser:
+    """Test suite for the incremental JSON array parser."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 7, 4096])
+    async def test_matches_json_load(self, size):
+        """TEST: Any chunking, including mid-character splits, gives json.load's result"""
+        entries = make_entries(20)
+        data = json.dumps(entries, indent=2, ensure_ascii=False).encode()
+
+        assert await collect(chunked(data, size), "json") == entries
+
+    def test_rejects_non_arrays_and_bad_elements(self):
+        """TEST: Documents that are not arrays of objects are rejected"""
+        for document in ('{"a": 1}', '[1, 2]', '[{"a": 1} {"b": 2}]', '[{"a": 1}] []'):
+            parser = JSONArrayParser()
+            with pytest.raises(ValidationError):
+                parser.feed(document)
+                parser.close()
+
+    def test_truncated_document(self):
+        """TEST: A document cut off mid-record fails at close"""
+        parser = JSONArrayParser()
+        assert parser.feed('[{"a": 1}, {"b": ') == [{"a": 1}]
+        with pytest.raises(ValidationError, match="Invalid JSON format"):
+            parser.close()
+
+    def test_empty_array(self):
+        """TEST: An empty array parses to no records"""
+        parser = JSONArrayParser()
+        assert parser.feed(" [ \n ] ") == []
+        parser.close()
+
+
+class TestCSVRecordParser:
+    """Test suite for the incremental CSV parser."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 5, 4096])
+    async def test_matches_dict_reader(self, size):
+        """TEST: Quoted commas, quotes and newlines survive any chunking"""
+        data = as_csv(make_entries(20))
+        expected = list(csv.DictReader(io.StringIO(data.decode(), newline="")))
+
+        assert await collect(chunked(data, size), "csv") == expected
+
+    def test_short_long_rows_and_missing_newline(self):
+        """TEST: Rows map to the header like DictReader; a final unterminated line is kept"""
+        parser = CSVRecordParser()
+        records = parser.feed("a,b\r\n1\r\n1,2,3\r")
+        records += parser.feed("\n4,5")
+        records += parser.close()
+
+        assert records == [{"a": "1", "b": None}, {"a": "1", "b": "2", None: ["3"]},
+                           {"a": "4", "b": "5"}]
+
+    def test_unterminated_quote(self):
+        """TEST: An open quoted field at end of input is rejected"""
+        parser = CSVRecordParser()
+        parser.feed('a,b\n1,"never closed\n')
+        with pytest.raises(ValidationError, match="unterminated"):
+            parser.close()
+
+
+class TestQueuedBatches:
+    """Test suite for the bounded producer queue."""
+
+    @pytest.mark.asyncio
+    async def test_batches_and_backpressure(self):
+        """TEST: Batches have batch_size records and the reader stays within the queue bound"""
+        data = json.dumps(make_entries(100)).encode()
+        reads = 0
+
+        async def source():
+            nonlocal reads
+            async for chunk in chunked(data, 64):
+                reads += 1
+                yield chunk
+
+        sizes = []
+        async for batch in queued_batches(source(), "json", batch_size=10, max_pending=2):
+            if not sizes:
+                await asyncio.sleep(0.01)  # Let the producer run until the queue is full
+                assert reads < len(data) // 64
+            sizes.append(len(batch))
+
+        assert sizes == [10] * 10
+
+    @pytest.mark.asyncio
+    async def test_parse_error_surfaces(self):
+        """TEST: A parse error in the producer is raised to the consumer"""
+        with pytest.raises(ValidationError):
+            async for _ in queued_batches(chunked(b'[{"a": 1}, 2]', 4), "json", batch_size=1):
+                pass
+
+
+class TestStreamedUpload:
+    """Test suite for DataUploader.upload_knowledge_stream on SQLite."""
+
+    @pytest.mark.asyncio
+    async def test_rows_land_while_reading(self, manager):
+        """TEST: Batches are written before the source is exhausted"""
+        data = as_csv(make_entries(1000))
+        finished = False
+        written_early = []
+
+        async def source():
+            nonlocal finished
+            async for chunk in chunked(data, 1024):
+                yield chunk
+            finished = True
+
+        result = await DataUploader(manager).upload_knowledge_stream(
+            source(), "csv", batch_size=100, max_pending=1,
+            progress=lambda report: written_early.append(not finished))
+
+        assert result["records_uploaded"] == 1000
+        assert result["ingest"]["batches"] == 10
+        assert written_early[0]
+        assert count_rows(manager) == 1000
+
+    @pytest.mark.asyncio
+    async def test_invalid_row_rolls_back_everything(self, manager):
+        """TEST: One bad row late in the stream reports its row number and commits nothing"""
+        entries = make_entries(300)
+        entries[250]["answer"] = "short"
+        entries[280]["question"] = ""
+
+        with pytest.raises(ValidationError) as raised:
+            await DataUploader(manager).upload_knowledge_stream(
+                chunked(json.dumps(entries).encode(), 2048), "json", batch_size=100)
+
+        assert "Row 251:" in str(raised.value) and "Row 281:" in str(raised.value)
+        assert count_rows(manager) == 0
+        assert manager.get_pool_stats()["writer"]["waiting"] == 0
+
+    @pytest.mark.asyncio
+    async def test_load_from_json_file(self, manager, tmp_path):
+        """TEST: load_from_json streams a file through the same path"""
+        path = tmp_path / "kb.json"
+        path.write_text(json.dumps(make_entries(42)), encoding="utf-8")
+
+        result = await DataUploader(manager).load_from_json(str(path), "knowledge_base")
+
+        assert result["records_uploaded"] == 42
+        assert count_rows(manager) == 42
+
+
+@pytest.fixture
+def upload_app(manager, monkeypatch):
+    class Driver:
+        database_manager = manager
+
+    monkeypatch.setattr(web_server, "_driver", Driver())
+    monkeypatch.setattr(web_server, "_enhanced_retriever", None)
+    app = FastAPI()
+    app.post("/upload-stream")(web_server.upload_stream)
+    return app
+
+
+def can_write(manager):
+    """True when another connection gets the write lock without waiting."""
+    with sqlite3.connect(manager.database_path, timeout=0) as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return False
+        conn.rollback()
+        return True
+
+
+class TestUploadStreamEndpoint:
+    """Test suite for /upload-stream request bodies."""
+
+    @pytest.mark.asyncio
+    async def test_stalled_body_does_not_hold_write_lock(self, manager, upload_app):
+        """TEST: While the body stalls mid-upload other writers still get the database"""
+        data = as_csv(make_entries(200))
+        resume = asyncio.Event()
+        sent_half = asyncio.Event()
+
+        async def body():
+            yield data[:len(data) // 2]
+            sent_half.set()
+            await resume.wait()
+            yield data[len(data) // 2:]
+
+        transport = httpx.ASGITransport(app=upload_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            upload = asyncio.create_task(client.post("/upload-stream?format=csv", content=body()))
+            await sent_half.wait()
+            await asyncio.sleep(0.05)
+            writable = can_write(manager)
+
+            async def use_writer():
+                async with manager.writer():
+                    pass
+
+            await asyncio.wait_for(use_writer(), 1.0)
+            resume.set()
+            response = await upload
+
+        assert writable
+        assert response.status_code == 200 and response.json()["records_uploaded"] == 200
+        assert count_rows(manager) == 200
+
+    @pytest.mark.asyncio
+    async def test_stalled_body_times_out(self, manager, upload_app, monkeypatch):
+        """TEST: A body idle for longer than the timeout gets 408 and writes nothing"""
+        monkeypatch.setattr(web_server, "UPLOAD_IDLE_TIMEOUT", 0.05)
+        data = as_csv(make_entries(50))
+
+        async def body():
+            yield data[:100]
+            await asyncio.Event().wait()
+
+        transport = httpx.ASGITransport(app=upload_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/upload-stream?format=csv", content=body())
+
+        assert response.status_code == 408
+        assert count_rows(manager) == 0 and can_write(manager)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_uploads_share_one_writer(self, manager, upload_app):
+        """TEST: Concurrent uploads take turns on the driver's single writer connection"""
+        uploads = [as_csv(make_entries(100)), json.dumps(make_entries(100)).encode()]
+
+        transport = httpx.ASGITransport(app=upload_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                client.post("/upload-stream?format=csv", content=chunked(uploads[0], 512)),
+                client.post("/upload-stream?format=json", content=chunked(uploads[1], 512)))
+
+        writer = manager.get_pool_stats()["writer"]
+        assert [r.status_code for r in responses] == [200, 200]
+        assert writer["created"] == 1 and writer["checkouts"] == 2
+        assert count_rows(manager) == 200
+
+    @pytest.mark.asyncio
+    async def test_uninitialized_driver_returns_503(self, upload_app, monkeypatch):
+        """TEST: Without the driver's database manager uploads are refused rather than opening their own"""
+        monkeypatch.setattr(web_server, "_driver", None)
+
+        transport = httpx.ASGITransport(app=upload_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/upload-stream?format=csv", content=b"question,answer\n")
+
+        assert response.status_code == 503
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_peak_memory_upload(tmp_path):
+    """BENCHMARK: Peak Python memory uploading JSON files whole vs streamed, at 10k and 40k entries"""
+    async def run(count, upload):
+        path = tmp_path / f"kb_{count}.json"
+        path.write_text(json.dumps(make_entries(count)), encoding="utf-8")
+        db_path = str(tmp_path / f"{upload.__name__}_{count}.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(DATABASE_SCHEMA)
+        manager = DatabaseManager(db_path, pool_size=1)
+        tracemalloc.start()
+        try:
+            await upload(DataUploader(manager), path)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            await manager.cleanup()
+
+    async def whole_file(uploader, path):
+        with open(path, encoding="utf-8") as handle:
+            await uploader.upload_knowledge_base(json.load(handle))
+
+    async def streamed(uploader, path):
+        await uploader.load_from_json(str(path), "knowledge_base")
+
+    peaks = {(upload.__name__, count): await run(count, upload)
+             for upload in (whole_file, streamed) for count in (10000, 40000)}
+
+    for (name, count), peak in peaks.items():
+        print(f"\n{name:>10} {count:>6} entries: {peak / 1e6:.1f} MB", end="")
+    assert peaks["streamed", 40000] < peaks["streamed", 10000] * 1.5
+    assert peaks["streamed", 40000] < peaks["whole_file", 40000] / 4